@@ -7,6 +7,8 @@ from SGPM.models import (
     SolicitudMigratoria,
     Documento,
     Tarea,
+    EstadisticaTareaDiaria,
+    RecursoCita,
     Cita,
     Notificacion,
     HistorialEstadoSolicitud,
@@ -128,14 +130,43 @@ class TareaAdmin(admin.ModelAdmin):
     raw_id_fields = ('solicitud', 'asignada_a')
 
 
+# ========================================
+# Admin: EstadisticaTareaDiaria
+# ========================================
+@admin.register(EstadisticaTareaDiaria)
+class EstadisticaTareaDiariaAdmin(admin.ModelAdmin):
+    list_display = ('dia', 'asesor_email', 'estado', 'prioridad', 'cantidad')
+    search_fields = ('asesor_email',)
+    list_filter = ('estado', 'prioridad', 'dia')
+    ordering = ('-dia', 'asesor_email')
+
+    # Tabla derivada: se mantiene desde TareaService o con reconstruir_estadisticas_tareas
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+# ========================================
+# Admin: RecursoCita
+# ========================================
+@admin.register(RecursoCita)
+class RecursoCitaAdmin(admin.ModelAdmin):
+    list_display = ('codigo', 'nombre', 'tipo', 'capacidad', 'activo')
+    search_fields = ('codigo', 'nombre')
+    list_filter = ('tipo', 'activo')
+    ordering = ('codigo',)
+
+
 # ========================================
 # Admin: Cita
 # ========================================
 @admin.register(Cita)
 class CitaAdmin(admin.ModelAdmin):
-    list_display = ('id_cita', 'tipo', 'estado', 'solicitud', 'inicio', 'fin', 'fecha_creacion')
+    list_display = ('id_cita', 'tipo', 'estado', 'solicitud', 'recurso', 'inicio', 'fin', 'fecha_creacion')
     search_fields = ('id_cita', 'solicitud__codigo')
-    list_filter = ('tipo', 'estado', 'fecha_creacion')
+    list_filter = ('tipo', 'estado', 'recurso', 'fecha_creacion')
     ordering = ('-fecha_creacion',)
     raw_id_fields = ('solicitud',)
 
@@ -10,6 +10,7 @@ from .services import (
     CitaService,
     NotificacionService,
     ReporteTareasService,
+    ExpedienteQueryService,
 )
 from .dtos import (
     SolicitanteDTO,
@@ -18,11 +19,17 @@ from .dtos import (
     DocumentoDTO,
     TareaDTO,
     CitaDTO,
+    CitaAgendaDTO,
+    HuecoCitaDTO,
     NotificacionDTO,
     FiltroReporteTareasDTO,
     EstadisticasTareasDTO,
     ReporteTareasDTO,
+    PaginaDTO,
+    SolicitudExpedienteDTO,
+    ExpedienteDTO,
 )
+from .contenedor import Contenedor, DependenciaNoRegistradaError, contenedor
 
 __all__ = [
     # Services
@@ -34,6 +41,7 @@ __all__ = [
     "CitaService",
     "NotificacionService",
     "ReporteTareasService",
+    "ExpedienteQueryService",
     # DTOs
     "SolicitanteDTO",
     "AsesorDTO",
@@ -41,8 +49,17 @@ __all__ = [
     "DocumentoDTO",
     "TareaDTO",
     "CitaDTO",
+    "CitaAgendaDTO",
+    "HuecoCitaDTO",
     "NotificacionDTO",
     "FiltroReporteTareasDTO",
     "EstadisticasTareasDTO",
     "ReporteTareasDTO",
+    "PaginaDTO",
+    "SolicitudExpedienteDTO",
+    "ExpedienteDTO",
+    # Contenedor
+    "Contenedor",
+    "DependenciaNoRegistradaError",
+    "contenedor",
 ]
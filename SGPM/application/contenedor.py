@@ -0,0 +1,145 @@
+"""
+Contenedor de servicios de la aplicación.
+
+Los servicios y los repositorios no guardan estado de una petición a otra: lo
+que es de la petición vive en la unidad de trabajo y en la caché, que se
+resuelven por contexto. Por eso el contenedor los crea una sola vez por
+proceso y los comparte.
+
+Con `alcance` se sustituyen piezas solo dentro del contexto actual, por
+ejemplo un repositorio sin caché durante una petición o un comando. Los
+servicios que dependen de una pieza sustituida se arman de nuevo dentro del
+alcance. El resto sigue siendo la instancia compartida.
+
+Las fábricas se registran al arrancar la app (`SgpmConfig.ready`) con las
+implementaciones de infraestructura. Reciben el contenedor, o el alcance
+activo, para pedir sus dependencias.
+"""
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Type, TypeVar
+
+T = TypeVar("T")
+
+
+class DependenciaNoRegistradaError(LookupError):
+    """Se pidió al contenedor una clave sin fábrica registrada"""
+    pass
+
+
+class Contenedor:
+    """
+    Fábricas por clave (la clase del servicio o la interfaz del repositorio) e
+    instancias compartidas creadas en el primer uso.
+    """
+
+    def __init__(self):
+        self._fabricas: Dict[type, Callable[[Any], Any]] = {}
+        self._instancias: Dict[type, Any] = {}
+        self._lock = threading.Lock()
+        self._alcance: ContextVar[Optional[_Alcance]] = ContextVar(
+            f"sgpm_contenedor_{id(self)}", default=None
+        )
+
+    def registrar(self, clave: type, fabrica: Callable[[Any], Any]) -> None:
+        """Registra (o reemplaza) la fábrica de `clave`; descarta las instancias ya creadas"""
+        with self._lock:
+            self._fabricas[clave] = fabrica
+            self._instancias.clear()
+
+    def registrado(self, clave: type) -> bool:
+        return clave in self._fabricas
+
+    def reiniciar(self) -> None:
+        """Descarta las instancias compartidas: se vuelven a crear en el próximo uso"""
+        with self._lock:
+            self._instancias.clear()
+
+    def obtener(self, clave: Type[T]) -> T:
+        """Instancia de `clave`: la del alcance activo si la sustituye, si no la compartida"""
+        alcance = self._alcance.get()
+        if alcance is not None:
+            return alcance.obtener(clave)
+        return self._compartida(clave)
+
+    def _compartida(self, clave: type) -> Any:
+        # Sin alcance activo, o con uno que no sustituye nada: las dependencias
+        # que pide la fábrica también son las compartidas
+        instancia = self._instancias.get(clave)
+        if instancia is None:
+            instancia = self._compartir(clave, self._fabrica(clave)(self))
+        return instancia
+
+    @contextmanager
+    def alcance(self, sustituciones: Optional[Dict[type, Any]] = None) -> Iterator["Contenedor"]:
+        """
+        Sustituye instancias mientras dura el bloque, solo en el contexto actual
+        (hilo o tarea). Los alcances se anidan: el interior hereda las
+        sustituciones del exterior.
+        """
+        padre = self._alcance.get()
+        heredadas = dict(padre.sustituciones) if padre is not None else {}
+        heredadas.update(sustituciones or {})
+        token = self._alcance.set(_Alcance(self, heredadas))
+        try:
+            yield self
+        finally:
+            self._alcance.reset(token)
+
+    def _fabrica(self, clave: type) -> Callable[[Any], Any]:
+        try:
+            return self._fabricas[clave]
+        except KeyError:
+            nombre = getattr(clave, "__name__", clave)
+            raise DependenciaNoRegistradaError(f"No hay fábrica registrada para {nombre}") from None
+
+    def _compartir(self, clave: type, instancia: Any) -> Any:
+        # Dos hilos pueden crear la misma a la vez: se queda la primera
+        with self._lock:
+            return self._instancias.setdefault(clave, instancia)
+
+
+class _Alcance:
+    """
+    Resolución dentro de un alcance. Lo que no depende de ninguna sustitución
+    es la instancia compartida; lo que sí, se crea una vez y vive en el alcance.
+    """
+
+    def __init__(self, contenedor: Contenedor, sustituciones: Dict[type, Any]):
+        self._contenedor = contenedor
+        self.sustituciones = sustituciones
+        # clave -> (instancia, si depende de alguna sustitución)
+        self._resueltas: Dict[type, Tuple[Any, bool]] = {}
+        self._afectada = False
+
+    def obtener(self, clave: Type[T]) -> T:
+        if clave in self.sustituciones:
+            self._afectada = True
+            return self.sustituciones[clave]
+        if not self.sustituciones:
+            return self._contenedor._compartida(clave)
+        if clave not in self._resueltas:
+            self._resueltas[clave] = self._crear(clave)
+        instancia, afectada = self._resueltas[clave]
+        self._afectada = self._afectada or afectada
+        return instancia
+
+    def _crear(self, clave: type) -> Tuple[Any, bool]:
+        # La fábrica pide sus dependencias a este alcance: así se sabe si alguna
+        # está sustituida y la instancia tiene que ser propia del alcance
+        externa, self._afectada = self._afectada, False
+        try:
+            instancia = self._contenedor._fabrica(clave)(self)
+            afectada = self._afectada
+        finally:
+            self._afectada = externa
+        if afectada:
+            return instancia, True
+        return self._contenedor._compartir(clave, instancia), False
+
+
+# Contenedor del proceso: lo configura `SgpmConfig.ready` y lo usan las vistas
+contenedor = Contenedor()
@@ -5,7 +5,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import date, datetime
-from typing import Optional, Dict
+from typing import Any, Optional, Dict, List
 
 
 @dataclass
@@ -84,6 +84,28 @@ class CitaDTO:
     inicio: Optional[datetime] = None
     fin: Optional[datetime] = None
     observacion: str = ""
+    recurso_codigo: Optional[str] = None  # Ventanilla/asesor; None: asignación automática
+
+
+@dataclass
+class CitaAgendaDTO:
+    """DTO de una fila de la agenda de citas (solo lo que muestra el listado)"""
+    id_cita: str
+    solicitud_codigo: str
+    tipo: str
+    estado: str
+    inicio: datetime
+    fin: datetime
+    observacion: str = ""
+    solicitante_nombre: Optional[str] = None
+    asesor_nombre: Optional[str] = None
+
+
+@dataclass
+class HuecoCitaDTO:
+    """DTO para un tramo libre de la agenda donde cabe una cita"""
+    inicio: datetime
+    fin: datetime
 
 
 @dataclass
@@ -124,3 +146,32 @@ class ReporteTareasDTO:
     filtro: FiltroReporteTareasDTO
     estadisticas: EstadisticasTareasDTO
     formato_exportacion: Optional[str] = None  # "PDF", "EXCEL", "JSON"
+
+
+@dataclass
+class SolicitudExpedienteDTO:
+    """Solicitud del expediente con todo lo que cuelga de ella, lista para mostrar"""
+    solicitud: SolicitudMigratoriaDTO
+    documentos: List[DocumentoDTO] = field(default_factory=list)
+    citas: List[CitaDTO] = field(default_factory=list)
+    tareas: List[TareaDTO] = field(default_factory=list)
+    historial_estados: List[Dict[str, Any]] = field(default_factory=list)  # más reciente primero
+    historial_fechas: List[Dict[str, Any]] = field(default_factory=list)  # más reciente primero
+
+
+@dataclass
+class ExpedienteDTO:
+    """DTO de lectura del expediente de un solicitante: sus datos y todas sus solicitudes"""
+    solicitante: Optional[SolicitanteDTO] = None
+    solicitudes: List[SolicitudExpedienteDTO] = field(default_factory=list)
+
+
+@dataclass
+class PaginaDTO:
+    """DTO para una página de resultados paginada por cursor"""
+    elementos: List[Any] = field(default_factory=list)
+    siguiente_cursor: Optional[str] = None
+
+    @property
+    def tiene_siguiente(self) -> bool:
+        return self.siguiente_cursor is not None
@@ -4,8 +4,8 @@ Implementan la lógica de negocio siguiendo los patrones de los steps de BDD.
 """
 from __future__ import annotations
 
-from datetime import datetime, date
-from typing import Optional, List, Dict, Any, Tuple
+from datetime import datetime, date, timedelta
+from typing import Optional, List, Dict, Any, Tuple, Iterable
 
 from SGPM.domain.entities import (
     Solicitante,
@@ -14,7 +14,9 @@ from SGPM.domain.entities import (
     Documento,
     Tarea,
     Cita,
+    RecursoCita,
     Notificacion,
+    TransicionEstadoNoPermitida,
 )
 from SGPM.domain.enums import (
     RolUsuario,
@@ -28,7 +30,16 @@ from SGPM.domain.enums import (
     EstadoCita,
     TipoNotificacion,
 )
-from SGPM.domain.value_objects import RangoFechaHora
+from SGPM.domain.value_objects import (
+    RangoFechaHora,
+    HorarioLaboral,
+    ConteoTareas,
+    FiltroReporteTareas,
+    max_simultaneos,
+    tramos_saturados,
+    interseccion_tramos,
+)
+from SGPM.domain.identificadores import nuevo_id
 from SGPM.domain.exceptions import (
     TareaNoEncontradaError,
     CitaInvalidaError,
@@ -38,10 +49,15 @@ from SGPM.domain.repositories import (
     SolicitanteRepository,
     AsesorRepository,
     SolicitudMigratoriaRepository,
+    ExpedienteRepository,
     DocumentoRepository,
     TareaRepository,
+    EstadisticaTareaRepository,
+    RecordatorioTareaRepository,
     CitaRepository,
+    RecursoCitaRepository,
     NotificacionRepository,
+    TAMANO_PAGINA,
 )
 from .dtos import (
     SolicitanteDTO,
@@ -50,10 +66,15 @@ from .dtos import (
     DocumentoDTO,
     TareaDTO,
     CitaDTO,
+    CitaAgendaDTO,
+    HuecoCitaDTO,
     NotificacionDTO,
     FiltroReporteTareasDTO,
     EstadisticasTareasDTO,
     ReporteTareasDTO,
+    PaginaDTO,
+    SolicitudExpedienteDTO,
+    ExpedienteDTO,
 )
 
 
@@ -131,6 +152,7 @@ class SolicitanteService:
         )
 
         resultado = self._repo.guardar(solicitante)
+        self._repo.confirmar_cambios()
         return self._to_dto(resultado)
 
     def actualizar_contacto(self, cedula: str, correo: str, telefono: str, direccion: str = "") -> SolicitanteDTO:
@@ -156,6 +178,7 @@ class SolicitanteService:
         )
 
         resultado = self._repo.guardar(solicitante_actualizado)
+        self._repo.confirmar_cambios()
         return self._to_dto(resultado)
 
     def obtener_por_cedula(self, cedula: str) -> Optional[SolicitanteDTO]:
@@ -167,6 +190,12 @@ class SolicitanteService:
         """Lista todos los solicitantes"""
         return [self._to_dto(s) for s in self._repo.listar_todos()]
 
+    def listar_pagina(self, cursor: Optional[str] = None,
+                      limite: int = TAMANO_PAGINA) -> PaginaDTO:
+        """Lista una página de solicitantes a partir del cursor de la página anterior"""
+        pagina = self._repo.listar_pagina(cursor, limite)
+        return PaginaDTO([self._to_dto(s) for s in pagina], pagina.siguiente_cursor)
+
     def eliminar(self, cedula: str) -> bool:
         """Elimina un solicitante"""
         return self._repo.eliminar(cedula)
@@ -175,7 +204,8 @@ class SolicitanteService:
         """Verifica si existe un solicitante"""
         return self._repo.existe(cedula)
 
-    def _to_dto(self, entity: Solicitante) -> SolicitanteDTO:
+    @staticmethod
+    def _to_dto(entity: Solicitante) -> SolicitanteDTO:
         return SolicitanteDTO(
             cedula=entity.obtener_cedula(),
             nombres=entity._nombres,
@@ -206,6 +236,7 @@ class AsesorService:
             rol=RolUsuario[dto.rol],
         )
         resultado = self._repo.guardar(asesor)
+        self._repo.confirmar_cambios()
         return self._to_dto(resultado)
 
     def obtener_por_email(self, email: str) -> Optional[AsesorDTO]:
@@ -256,6 +287,7 @@ class SolicitudMigratoriaService:
             fechaExpiracion=dto.fecha_expiracion,
         )
         resultado = self._repo.guardar(solicitud)
+        self._repo.confirmar_cambios()
         return self._to_dto(resultado)
 
     def obtener_por_codigo(self, codigo: str) -> Optional[SolicitudMigratoriaDTO]:
@@ -269,29 +301,75 @@ class SolicitudMigratoriaService:
         Cambia el estado de una solicitud.
         Retorna resultado con estado de la operación.
         """
-        solicitud = self._repo.obtener_por_codigo(codigo)
-        if solicitud is None:
-            raise SolicitudNoEncontradaError(f"No existe solicitud con código {codigo}")
-
+        with self._repo.transaccion():
+            solicitud = self._repo.obtener_para_actualizar(codigo)
+            if solicitud is None:
+                raise SolicitudNoEncontradaError(f"No existe solicitud con código {codigo}")
+
+            try:
+                solicitud.cambiar_estado(
+                    nuevo=EstadoSolicitud[nuevo_estado],
+                    usuario=usuario,
+                    motivo=motivo,
+                    fecha_evento=fecha_evento,
+                )
+                self._repo.guardar(solicitud)
+                return {
+                    "resultado": "aceptado",
+                    "mensaje": f"Estado cambiado a {nuevo_estado}",
+                    "solicitud": self._to_dto(solicitud),
+                }
+            except Exception as e:
+                return {
+                    "resultado": "rechazado",
+                    "mensaje": str(e),
+                    "solicitud": self._to_dto(solicitud),
+                }
+
+    def cambiar_estado_masivo(self, codigos: Iterable[str], nuevo_estado: str, usuario: str,
+                              motivo: str = "", fecha_evento: Optional[datetime] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Cambia el estado de un lote de solicitudes (p. ej. cerrar las aprobadas del mes).
+        Cada transición se valida con la máquina de estados de la entidad; las
+        aceptadas se escriben juntas. Retorna, por código y en el orden recibido,
+        el resultado ("aceptado"/"rechazado") y su mensaje.
+        """
         try:
-            solicitud.cambiar_estado(
-                nuevo=EstadoSolicitud[nuevo_estado],
-                usuario=usuario,
-                motivo=motivo,
-                fecha_evento=fecha_evento,
-            )
-            self._repo.guardar(solicitud)
-            return {
-                "resultado": "aceptado",
-                "mensaje": f"Estado cambiado a {nuevo_estado}",
-                "solicitud": self._to_dto(solicitud),
-            }
-        except Exception as e:
-            return {
-                "resultado": "rechazado",
-                "mensaje": str(e),
-                "solicitud": self._to_dto(solicitud),
-            }
+            nuevo = EstadoSolicitud[nuevo_estado]
+        except KeyError:
+            raise ServiceError(f"Estado no válido: {nuevo_estado}")
+        codigos = list(dict.fromkeys(c.strip() for c in codigos if c and c.strip()))
+
+        resultados: Dict[str, Dict[str, Any]] = {}
+        aceptadas: List[SolicitudMigratoria] = []
+        with self._repo.transaccion():
+            solicitudes = self._repo.obtener_por_codigos(codigos, bloquear=True)
+            for codigo in codigos:
+                solicitud = solicitudes.get(codigo)
+                if solicitud is None:
+                    resultados[codigo] = {
+                        "resultado": "rechazado",
+                        "mensaje": f"No existe solicitud con código {codigo}",
+                    }
+                    continue
+                try:
+                    solicitud.cambiar_estado(nuevo=nuevo, usuario=usuario, motivo=motivo,
+                                             fecha_evento=fecha_evento)
+                except TransicionEstadoNoPermitida as e:
+                    resultados[codigo] = {"resultado": "rechazado", "mensaje": str(e)}
+                    continue
+                aceptadas.append(solicitud)
+                resultados[codigo] = {"resultado": "aceptado", "mensaje": f"Estado cambiado a {nuevo_estado}"}
+            self._repo.guardar_cambios_estado(aceptadas)
+        return resultados
+
+    def codigos_elegibles(self, nuevo_estado: str) -> List[str]:
+        """Códigos de las solicitudes que hoy pueden pasar a `nuevo_estado`, ordenados"""
+        try:
+            nuevo = EstadoSolicitud[nuevo_estado]
+        except KeyError:
+            raise ServiceError(f"Estado no válido: {nuevo_estado}")
+        return sorted(self._repo.codigos_elegibles(nuevo))
 
     def asignar_fecha_proceso(self, codigo: str, campo: str, valor_iso: str,
                                usuario: str, fecha_evento: Optional[datetime] = None) -> Dict[str, Any]:
@@ -299,43 +377,58 @@ class SolicitudMigratoriaService:
         Asigna una fecha de proceso a la solicitud.
         Campos válidos: fechaRecepcionDocs, fechaEnvioSolicitud, fechaCita
         """
-        solicitud = self._repo.obtener_por_codigo(codigo)
-        if solicitud is None:
+        with self._repo.transaccion():
+            solicitud = self._repo.obtener_para_actualizar(codigo)
+            if solicitud is None:
+                raise SolicitudNoEncontradaError(f"No existe solicitud con código {codigo}")
+
+            try:
+                solicitud.asignar_fecha_proceso(
+                    campo=campo,
+                    valor_iso=valor_iso,
+                    usuario=usuario,
+                    fecha_evento=fecha_evento,
+                )
+                self._repo.guardar(solicitud)
+                return {
+                    "resultado": "aceptado",
+                    "mensaje": f"Fecha {campo} asignada correctamente",
+                    "solicitud": self._to_dto(solicitud),
+                }
+            except Exception as e:
+                return {
+                    "resultado": "rechazado",
+                    "mensaje": str(e),
+                    "solicitud": self._to_dto(solicitud),
+                }
+
+    def _verificar_existe(self, codigo: str) -> None:
+        if not self._repo.existe(codigo):
             raise SolicitudNoEncontradaError(f"No existe solicitud con código {codigo}")
 
-        try:
-            solicitud.asignar_fecha_proceso(
-                campo=campo,
-                valor_iso=valor_iso,
-                usuario=usuario,
-                fecha_evento=fecha_evento,
-            )
-            self._repo.guardar(solicitud)
-            return {
-                "resultado": "aceptado",
-                "mensaje": f"Fecha {campo} asignada correctamente",
-                "solicitud": self._to_dto(solicitud),
-            }
-        except Exception as e:
-            return {
-                "resultado": "rechazado",
-                "mensaje": str(e),
-                "solicitud": self._to_dto(solicitud),
-            }
-
     def obtener_historial_estados(self, codigo: str) -> List[Dict[str, Any]]:
-        """Obtiene el historial de estados de una solicitud"""
-        solicitud = self._repo.obtener_por_codigo(codigo)
-        if solicitud is None:
-            raise SolicitudNoEncontradaError(f"No existe solicitud con código {codigo}")
-        return solicitud.obtener_historial_estados()
+        """Obtiene el historial de estados persistido de una solicitud (más reciente primero)"""
+        self._verificar_existe(codigo)
+        return list(self._repo.iterar_historial_estados(codigo))
+
+    def listar_historial_estados(self, codigo: str, cursor: Optional[str] = None,
+                                 limite: int = TAMANO_PAGINA) -> PaginaDTO:
+        """Una página del historial de estados a partir del cursor de la página anterior"""
+        self._verificar_existe(codigo)
+        pagina = self._repo.listar_pagina_historial_estados(codigo, cursor, limite)
+        return PaginaDTO(list(pagina), pagina.siguiente_cursor)
 
     def obtener_historial_fechas(self, codigo: str) -> List[Dict[str, Any]]:
-        """Obtiene el historial de fechas de una solicitud"""
-        solicitud = self._repo.obtener_por_codigo(codigo)
-        if solicitud is None:
-            raise SolicitudNoEncontradaError(f"No existe solicitud con código {codigo}")
-        return solicitud.obtener_historial_fechas()
+        """Obtiene el historial de fechas persistido de una solicitud (más reciente primero)"""
+        self._verificar_existe(codigo)
+        return list(self._repo.iterar_historial_fechas(codigo))
+
+    def listar_historial_fechas(self, codigo: str, cursor: Optional[str] = None,
+                                limite: int = TAMANO_PAGINA) -> PaginaDTO:
+        """Una página del historial de fechas a partir del cursor de la página anterior"""
+        self._verificar_existe(codigo)
+        pagina = self._repo.listar_pagina_historial_fechas(codigo, cursor, limite)
+        return PaginaDTO(list(pagina), pagina.siguiente_cursor)
 
     def obtener_fechas_clave(self, codigo: str) -> Dict[str, Optional[str]]:
         """Obtiene las fechas clave de una solicitud"""
@@ -348,6 +441,24 @@ class SolicitudMigratoriaService:
         """Lista todas las solicitudes"""
         return [self._to_dto(s) for s in self._repo.listar_todas()]
 
+    def listar_pagina(self, cursor: Optional[str] = None,
+                      limite: int = TAMANO_PAGINA) -> PaginaDTO:
+        """Lista una página de solicitudes a partir del cursor de la página anterior"""
+        pagina = self._repo.listar_pagina(cursor, limite)
+        return PaginaDTO([self._to_dto(s) for s in pagina], pagina.siguiente_cursor)
+
+    def listar_pagina_resumen(self, cursor: Optional[str] = None,
+                              limite: int = TAMANO_PAGINA) -> PaginaDTO:
+        """
+        Página para el listado: DTOs construidos desde las filas planas del
+        repositorio, sin entidades. `fechas_proceso` y `asesor_email` quedan vacíos.
+        """
+        pagina = self._repo.listar_pagina_resumen(cursor, limite)
+        return PaginaDTO(
+            [SolicitudMigratoriaDTO(**{**fila, 'tipo_servicio': fila['tipo_servicio'] or ""}) for fila in pagina],
+            pagina.siguiente_cursor,
+        )
+
     def listar_por_estado(self, estado: str) -> List[SolicitudMigratoriaDTO]:
         """Lista solicitudes por estado"""
         return [self._to_dto(s) for s in self._repo.listar_por_estado(EstadoSolicitud[estado])]
@@ -356,7 +467,8 @@ class SolicitudMigratoriaService:
         """Lista solicitudes de un solicitante"""
         return [self._to_dto(s) for s in self._repo.listar_por_solicitante(cedula)]
 
-    def _to_dto(self, entity: SolicitudMigratoria) -> SolicitudMigratoriaDTO:
+    @staticmethod
+    def _to_dto(entity: SolicitudMigratoria) -> SolicitudMigratoriaDTO:
         return SolicitudMigratoriaDTO(
             codigo=entity.codigo,
             tipo_servicio=entity.tipoServicio.value if entity.tipoServicio else "",
@@ -475,7 +587,8 @@ class DocumentoService:
         """Lista documentos por estado"""
         return [self._to_dto(d) for d in self._repo.listar_por_estado(EstadoDocumento[estado])]
 
-    def _to_dto(self, entity: Documento) -> DocumentoDTO:
+    @staticmethod
+    def _to_dto(entity: Documento) -> DocumentoDTO:
         return DocumentoDTO(
             id_documento=entity.obtener_id(),
             tipo=entity.obtener_tipo().value if isinstance(entity.obtener_tipo(), TipoDocumento) else str(entity.obtener_tipo()),
@@ -497,10 +610,32 @@ class TareaService:
 
     def __init__(self, repository: TareaRepository,
                  asesor_repo: Optional[AsesorRepository] = None,
-                 notificacion_service: Optional["NotificacionService"] = None):
+                 notificacion_service: Optional["NotificacionService"] = None,
+                 estadistica_repo: Optional[EstadisticaTareaRepository] = None,
+                 recordatorio_repo: Optional[RecordatorioTareaRepository] = None):
         self._repo = repository
         self._asesor_repo = asesor_repo
         self._notificacion_service = notificacion_service
+        self._estadistica_repo = estadistica_repo
+        self._recordatorio_repo = recordatorio_repo
+
+    def _guardar(self, tarea: Tarea) -> Tarea:
+        """
+        Guarda la tarea y, si hay repositorio de estadísticas, ajusta los conteos
+        materializados en la misma transacción. El antes y el después se leen de
+        la fila bloqueada, no de la copia en memoria: dos ediciones concurrentes
+        de la misma tarea se serializan y cada una descuenta lo que había de verdad.
+        """
+        if self._estadistica_repo is None:
+            resultado = self._repo.guardar(tarea)
+            self._repo.confirmar_cambios()
+            return resultado
+        with self._estadistica_repo.transaccion():
+            antes = self._repo.obtener_para_actualizar(tarea.idTarea)
+            resultado = self._repo.guardar(tarea)
+            despues = self._repo.obtener_para_actualizar(tarea.idTarea)
+            self._estadistica_repo.registrar_cambio(antes, despues)
+        return resultado
 
     def crear_tarea(self, dto: TareaDTO) -> TareaDTO:
         """Crea una nueva tarea"""
@@ -512,7 +647,8 @@ class TareaService:
             comentario=dto.comentario,
             estado=EstadoTarea[dto.estado] if dto.estado else EstadoTarea.PENDIENTE,
         )
-        resultado = self._repo.guardar(tarea)
+        # guardar es un upsert: si el ID ya existía, se descuenta la versión anterior
+        resultado = self._guardar(tarea)
         return self._to_dto(resultado)
 
     def asignar_a_asesor(self, id_tarea: str, email_asesor: str,
@@ -540,7 +676,7 @@ class TareaService:
         if vencimiento:
             tarea.establecer_vencimiento(vencimiento)
 
-        resultado = self._repo.guardar(tarea)
+        resultado = self._guardar(tarea)
 
         # Enviar notificación si está configurado
         if enviar_notificacion and self._notificacion_service:
@@ -585,7 +721,7 @@ class TareaService:
         if comentario is not None:
             tarea.comentario = comentario
 
-        resultado = self._repo.guardar(tarea)
+        resultado = self._guardar(tarea)
         return self._to_dto(resultado)
 
     def cambiar_estado(self, id_tarea: str, nuevo_estado: str) -> TareaDTO:
@@ -595,7 +731,7 @@ class TareaService:
             raise TareaNoEncontradaError(f"No existe la tarea {id_tarea}")
 
         tarea.cambiar_estado(EstadoTarea[nuevo_estado])
-        resultado = self._repo.guardar(tarea)
+        resultado = self._guardar(tarea)
         return self._to_dto(resultado)
 
     def actualizar_prioridad(self, id_tarea: str, nueva_prioridad: str) -> TareaDTO:
@@ -605,9 +741,22 @@ class TareaService:
             raise TareaNoEncontradaError(f"No existe la tarea {id_tarea}")
 
         tarea.actualizar_prioridad(PrioridadTarea[nueva_prioridad])
-        resultado = self._repo.guardar(tarea)
+        resultado = self._guardar(tarea)
         return self._to_dto(resultado)
 
+    def eliminar(self, id_tarea: str) -> bool:
+        """Elimina una tarea (y la descuenta de las estadísticas materializadas)"""
+        if self._estadistica_repo is None:
+            return self._repo.eliminar(id_tarea)
+        with self._estadistica_repo.transaccion():
+            tarea = self._repo.obtener_para_actualizar(id_tarea)
+            if tarea is None:
+                return False
+            eliminada = self._repo.eliminar(id_tarea)
+            if eliminada:
+                self._estadistica_repo.registrar_cambio(tarea, None)
+        return eliminada
+
     def obtener_por_id(self, id_tarea: str) -> Optional[TareaDTO]:
         """Obtiene una tarea por ID"""
         tarea = self._repo.obtener_por_id(id_tarea)
@@ -617,6 +766,21 @@ class TareaService:
         """Lista todas las tareas"""
         return [self._to_dto(t) for t in self._repo.listar_todas()]
 
+    def listar_pagina(self, cursor: Optional[str] = None, limite: int = TAMANO_PAGINA,
+                      email_asesor: Optional[str] = None) -> PaginaDTO:
+        """Lista una página de tareas (opcionalmente de un asesor) a partir del cursor"""
+        pagina = self._repo.listar_pagina(cursor, limite, email_asesor=email_asesor)
+        return PaginaDTO([self._to_dto(t) for t in pagina], pagina.siguiente_cursor)
+
+    def listar_pagina_resumen(self, cursor: Optional[str] = None, limite: int = TAMANO_PAGINA,
+                              email_asesor: Optional[str] = None) -> PaginaDTO:
+        """
+        Página para el listado: DTOs construidos desde las filas planas del
+        repositorio, sin entidades. `comentario` y `solicitud_codigo` quedan vacíos.
+        """
+        pagina = self._repo.listar_pagina_resumen(cursor, limite, email_asesor=email_asesor)
+        return PaginaDTO([TareaDTO(**fila) for fila in pagina], pagina.siguiente_cursor)
+
     def listar_por_asesor(self, email_asesor: str) -> List[TareaDTO]:
         """Lista tareas asignadas a un asesor"""
         return [self._to_dto(t) for t in self._repo.listar_por_asesor(email_asesor)]
@@ -633,29 +797,27 @@ class TareaService:
         """Lista tareas próximas a vencer"""
         return [self._to_dto(t) for t in self._repo.listar_por_vencer(horas)]
 
-    def enviar_recordatorios_vencimiento(self) -> int:
+    def enviar_recordatorios_vencimiento(self, horas: int = 24) -> int:
         """
         Envía recordatorios para tareas próximas a vencer.
         Retorna cantidad de notificaciones enviadas.
+        Con repositorio de recordatorios, cada (tarea, vencimiento) se recuerda una
+        sola vez: las marcas y las notificaciones se escriben en lote y en la misma
+        transacción.
         """
         if self._notificacion_service is None:
             return 0
 
-        tareas_por_vencer = self._repo.listar_por_vencer(24)
-        count = 0
-
-        for tarea in tareas_por_vencer:
-            if tarea.asignadaA:
-                self._notificacion_service.crear_recordatorio_vencimiento(
-                    destinatario=tarea.asignadaA.emailAsesor,
-                    tarea_titulo=tarea.titulo,
-                    fecha_vencimiento=tarea.vencimiento,
-                )
-                count += 1
+        if self._recordatorio_repo is None:
+            tareas = [t for t in self._repo.iterar_por_vencer(horas) if t.asignadaA]
+            return len(self._notificacion_service.crear_recordatorios_vencimiento(tareas))
 
-        return count
+        with self._recordatorio_repo.transaccion():
+            tareas = self._recordatorio_repo.reservar_pendientes(horas)
+            return len(self._notificacion_service.crear_recordatorios_vencimiento(tareas))
 
-    def _to_dto(self, entity: Tarea) -> TareaDTO:
+    @staticmethod
+    def _to_dto(entity: Tarea) -> TareaDTO:
         return TareaDTO(
             id_tarea=entity.idTarea,
             titulo=entity.titulo,
@@ -678,23 +840,23 @@ class CitaService:
 
     def __init__(self, repository: CitaRepository,
                  solicitud_repo: Optional[SolicitudMigratoriaRepository] = None,
-                 notificacion_service: Optional["NotificacionService"] = None):
+                 notificacion_service: Optional["NotificacionService"] = None,
+                 recurso_repo: Optional[RecursoCitaRepository] = None):
         self._repo = repository
         self._solicitud_repo = solicitud_repo
         self._notificacion_service = notificacion_service
+        self._recurso_repo = recurso_repo
 
     def agendar_cita(self, dto: CitaDTO) -> CitaDTO:
         """
         Agenda una nueva cita.
-        Verifica disponibilidad de horario.
+        Verifica disponibilidad y guarda en una misma transacción (sin carreras).
+        Sin recurso indicado y con ventanillas/asesores configurados, se asigna el
+        recurso con menor ocupación en ese horario.
         """
         if dto.inicio is None or dto.fin is None:
             raise CitaInvalidaError("Debe especificar inicio y fin de la cita")
 
-        # Verificar disponibilidad
-        if not self._repo.verificar_disponibilidad(dto.inicio, dto.fin):
-            raise HorarioNoDisponibleError("El horario no está disponible")
-
         cita = Cita(
             idCita=dto.id_cita,
             solicitudCodigo=dto.solicitud_codigo,
@@ -702,9 +864,18 @@ class CitaService:
             rango=RangoFechaHora(inicio=dto.inicio, fin=dto.fin),
             tipo=TipoCita[dto.tipo],
             estado=EstadoCita.PROGRAMADA,
+            recursoCodigo=dto.recurso_codigo,
         )
 
-        resultado = self._repo.guardar(cita)
+        if dto.recurso_codigo is not None:
+            self._validar_recurso(dto.recurso_codigo)
+            resultado = self._reservar(cita, "El horario no está disponible")
+        else:
+            recursos = self._recursos_activos()
+            if recursos:
+                resultado = self._asignar_recurso(cita, recursos)
+            else:
+                resultado = self._reservar(cita, "El horario no está disponible")
         return self._to_dto(resultado)
 
     def reprogramar_cita(self, id_cita: str, nuevo_inicio: datetime, nuevo_fin: datetime,
@@ -721,10 +892,6 @@ class CitaService:
         if cita.estado in [EstadoCita.CANCELADA, EstadoCita.COMPLETADA]:
             raise CitaInvalidaError(f"No se puede reprogramar una cita {cita.estado.value}")
 
-        # Verificar disponibilidad (excluyendo la cita actual)
-        if not self._verificar_disponibilidad_excluyendo(nuevo_inicio, nuevo_fin, id_cita):
-            raise HorarioNoDisponibleError("El nuevo horario no está disponible")
-
         # Crear nueva cita reprogramada
         cita_reprogramada = Cita(
             idCita=cita.idCita,
@@ -733,9 +900,12 @@ class CitaService:
             rango=RangoFechaHora(inicio=nuevo_inicio, fin=nuevo_fin),
             tipo=cita.tipo,
             estado=EstadoCita.REPROGRAMADA,
+            recursoCodigo=cita.recursoCodigo,
         )
 
-        resultado = self._repo.guardar(cita_reprogramada)
+        # Verificar disponibilidad (excluyendo la cita actual) y guardar de forma atómica
+        resultado = self._reservar(cita_reprogramada, "El nuevo horario no está disponible",
+                                   excluir_id=id_cita)
         return self._to_dto(resultado)
 
     def cancelar_cita(self, id_cita: str, motivo: str = "") -> CitaDTO:
@@ -751,6 +921,7 @@ class CitaService:
             rango=cita.rango,
             tipo=cita.tipo,
             estado=EstadoCita.CANCELADA,
+            recursoCodigo=cita.recursoCodigo,
         )
 
         resultado = self._repo.guardar(cita_cancelada)
@@ -769,6 +940,7 @@ class CitaService:
             rango=cita.rango,
             tipo=cita.tipo,
             estado=EstadoCita.COMPLETADA,
+            recursoCodigo=cita.recursoCodigo,
         )
 
         resultado = self._repo.guardar(cita_completada)
@@ -787,14 +959,109 @@ class CitaService:
             rango=cita.rango,
             tipo=cita.tipo,
             estado=EstadoCita.NO_ASISTIO,
+            recursoCodigo=cita.recursoCodigo,
         )
 
         resultado = self._repo.guardar(cita_no_asistio)
         return self._to_dto(resultado)
 
-    def verificar_disponibilidad(self, inicio: datetime, fin: datetime) -> bool:
+    def verificar_disponibilidad(self, inicio: datetime, fin: datetime,
+                                 excluir_id: Optional[str] = None) -> bool:
         """Verifica si hay disponibilidad en el horario"""
-        return self._repo.verificar_disponibilidad(inicio, fin)
+        return self._repo.verificar_disponibilidad(inicio, fin, excluir_id=excluir_id)
+
+    def buscar_huecos(self, desde: datetime, hasta: datetime, duracion: timedelta,
+                      horario_laboral: Optional[HorarioLaboral] = None) -> List[HuecoCitaDTO]:
+        """
+        Tramos libres de al menos `duracion` dentro del horario laboral.
+        Trae las citas activas del rango en una sola consulta y las recorre una vez
+        (barrido ordenado por inicio), fusionando solapamientos sobre la marcha.
+        """
+        if duracion <= timedelta(0):
+            raise CitaInvalidaError("La duración de la cita debe ser positiva")
+        if hasta <= desde:
+            return []
+
+        horario = horario_laboral or HorarioLaboral()
+        ocupados = self._bloqueados(desde, hasta)
+        huecos: List[HuecoCitaDTO] = []
+        i = 0
+        for ventana in horario.ventanas(desde, hasta):
+            libre_desde = ventana.inicio
+            # Los tramos que terminan antes de la ventana ya no afectan a ninguna posterior
+            while i < len(ocupados) and ocupados[i].fin <= libre_desde:
+                i += 1
+            j = i
+            while j < len(ocupados) and ocupados[j].inicio < ventana.fin:
+                ocupado = ocupados[j]
+                if ocupado.inicio - libre_desde >= duracion:
+                    huecos.append(HuecoCitaDTO(inicio=libre_desde, fin=ocupado.inicio))
+                libre_desde = max(libre_desde, ocupado.fin)
+                j += 1
+            if ventana.fin - libre_desde >= duracion:
+                huecos.append(HuecoCitaDTO(inicio=libre_desde, fin=ventana.fin))
+        return huecos
+
+    def _bloqueados(self, desde: datetime, hasta: datetime) -> List[RangoFechaHora]:
+        """
+        Tramos ordenados y disjuntos en los que no cabe ninguna cita más: aquellos en
+        los que todos los recursos activos están a su capacidad (o la agenda general
+        está ocupada, si no hay recursos configurados).
+        """
+        ocupados = self._repo.ocupados_por_recurso(desde, hasta)
+        recursos = self._recursos_activos()
+        if not recursos:
+            return tramos_saturados(ocupados.get(None, []))
+
+        bloqueados = tramos_saturados(ocupados.get(recursos[0].codigo, []), recursos[0].capacidad)
+        for recurso in recursos[1:]:
+            if not bloqueados:
+                break
+            bloqueados = interseccion_tramos(
+                bloqueados, tramos_saturados(ocupados.get(recurso.codigo, []), recurso.capacidad)
+            )
+        return bloqueados
+
+    def _recursos_activos(self) -> List[RecursoCita]:
+        return self._recurso_repo.listar_activos() if self._recurso_repo else []
+
+    def _validar_recurso(self, codigo: str) -> None:
+        if self._recurso_repo is None:
+            raise ServiceError("Repositorio de recursos de citas no configurado")
+        recurso = self._recurso_repo.obtener_por_codigo(codigo)
+        if recurso is None or not recurso.activo:
+            raise CitaInvalidaError(f"No existe un recurso activo con código {codigo}")
+
+    def _asignar_recurso(self, cita: Cita, recursos: List[RecursoCita]) -> Cita:
+        """
+        Reparte las citas de forma pareja entre los recursos: se prueban primero los de
+        menor ocupación relativa en el horario (citas simultáneas / capacidad) y, a
+        igualdad, los de más capacidad libre. La ocupación sale de una sola consulta;
+        si una reserva concurrente llena el recurso elegido, se pasa al siguiente.
+        """
+        ocupados = self._repo.ocupados_por_recurso(cita.rango.inicio, cita.rango.fin)
+        candidatos = []
+        for recurso in recursos:
+            en_uso = max_simultaneos(r.recortar(cita.rango) for r in ocupados.get(recurso.codigo, []))
+            if en_uso < recurso.capacidad:
+                candidatos.append((en_uso / recurso.capacidad, en_uso - recurso.capacidad, recurso.codigo))
+
+        for _, _, codigo in sorted(candidatos):
+            cita.recursoCodigo = cita.recurso_codigo = codigo
+            resultado = self._repo.reservar(cita)
+            if resultado is not None:
+                return resultado
+        raise HorarioNoDisponibleError("No hay ventanillas disponibles en ese horario")
+
+    def _reservar(self, cita: Cita, mensaje: str, excluir_id: Optional[str] = None) -> Cita:
+        """
+        Camino único de agendar y reprogramar: el repositorio verifica (EXISTS) y
+        guarda en una sola transacción serializada por horario.
+        """
+        resultado = self._repo.reservar(cita, excluir_id=excluir_id)
+        if resultado is None:
+            raise HorarioNoDisponibleError(mensaje)
+        return resultado
 
     def obtener_por_id(self, id_cita: str) -> Optional[CitaDTO]:
         """Obtiene una cita por ID"""
@@ -805,28 +1072,29 @@ class CitaService:
         """Lista citas de una solicitud"""
         return [self._to_dto(c) for c in self._repo.listar_por_solicitud(solicitud_codigo)]
 
+    def listar_pagina(self, cursor: Optional[str] = None,
+                      limite: int = TAMANO_PAGINA) -> PaginaDTO:
+        """Lista una página de citas a partir del cursor de la página anterior"""
+        pagina = self._repo.listar_pagina(cursor, limite)
+        return PaginaDTO([self._to_dto(c) for c in pagina], pagina.siguiente_cursor)
+
     def listar_por_rango_fecha(self, inicio: datetime, fin: datetime) -> List[CitaDTO]:
         """Lista citas en un rango de fechas"""
         return [self._to_dto(c) for c in self._repo.listar_por_rango_fecha(inicio, fin)]
 
+    def listar_agenda(self, inicio: datetime, fin: datetime,
+                      email_asesor: Optional[str] = None) -> List[CitaAgendaDTO]:
+        """Citas que empiezan en [inicio, fin] para la agenda, sin entidades"""
+        return [CitaAgendaDTO(**fila) for fila in self._repo.listar_agenda(inicio, fin, email_asesor)]
+
     def obtener_agenda(self, fecha: date) -> List[CitaDTO]:
         """Obtiene la agenda del día"""
         inicio = datetime.combine(fecha, datetime.min.time())
         fin = datetime.combine(fecha, datetime.max.time())
         return self.listar_por_rango_fecha(inicio, fin)
 
-    def _verificar_disponibilidad_excluyendo(self, inicio: datetime, fin: datetime,
-                                              excluir_cita_id: str) -> bool:
-        """Verifica disponibilidad excluyendo una cita específica"""
-        citas = self._repo.listar_por_rango_fecha(inicio, fin)
-        for cita in citas:
-            if cita.idCita != excluir_cita_id and cita.estado not in [EstadoCita.CANCELADA, EstadoCita.COMPLETADA]:
-                # Verificar solapamiento
-                if cita.rango.inicio < fin and cita.rango.fin > inicio:
-                    return False
-        return True
-
-    def _to_dto(self, entity: Cita) -> CitaDTO:
+    @staticmethod
+    def _to_dto(entity: Cita) -> CitaDTO:
         return CitaDTO(
             id_cita=entity.idCita,
             solicitud_codigo=entity.solicitudCodigo,
@@ -835,6 +1103,7 @@ class CitaService:
             inicio=entity.rango.inicio,
             fin=entity.rango.fin,
             observacion=entity.observacion,
+            recurso_codigo=entity.recursoCodigo,
         )
 
 
@@ -848,12 +1117,10 @@ class NotificacionService:
 
     def __init__(self, repository: NotificacionRepository):
         self._repo = repository
-        self._contador = 0
 
     def _generar_id(self) -> str:
-        """Genera un ID único para la notificación"""
-        self._contador += 1
-        return f"NOTIF-{self._contador:03d}"
+        """ID único entre peticiones y procesos, ordenado por momento de creación"""
+        return nuevo_id("NOTIF")
 
     def crear_notificacion(self, destinatario: str, tipo: str, mensaje: str) -> NotificacionDTO:
         """Crea una nueva notificación"""
@@ -875,19 +1142,49 @@ class NotificacionService:
     def crear_recordatorio_vencimiento(self, destinatario: str, tarea_titulo: str,
                                         fecha_vencimiento: Optional[datetime]) -> NotificacionDTO:
         """Crea recordatorio de vencimiento de tarea"""
-        fecha_str = fecha_vencimiento.strftime("%Y-%m-%d %H:%M") if fecha_vencimiento else "próximamente"
-        mensaje = f"Recordatorio: La tarea '{tarea_titulo}' vence el {fecha_str}"
+        mensaje = self._mensaje_recordatorio_vencimiento(tarea_titulo, fecha_vencimiento)
         return self.crear_notificacion(destinatario, "RECORDATORIO", mensaje)
 
+    def crear_recordatorios_vencimiento(self, tareas: Iterable[Tarea]) -> List[NotificacionDTO]:
+        """
+        Crea los recordatorios de vencimiento de varias tareas asignadas con una
+        sola escritura en lote (guardar_muchos).
+        """
+        notificaciones = [
+            Notificacion(
+                id_notificacion=self._generar_id(),
+                destinatario=tarea.asignadaA.emailAsesor,
+                tipo=TipoNotificacion.RECORDATORIO,
+                mensaje=self._mensaje_recordatorio_vencimiento(tarea.titulo, tarea.vencimiento),
+            )
+            for tarea in tareas
+        ]
+        if not notificaciones:
+            return []
+        return [self._to_dto(n) for n in self._repo.guardar_muchos(notificaciones)]
+
+    @staticmethod
+    def _mensaje_recordatorio_vencimiento(tarea_titulo: str, fecha_vencimiento: Optional[datetime]) -> str:
+        fecha_str = fecha_vencimiento.strftime("%Y-%m-%d %H:%M") if fecha_vencimiento else "próximamente"
+        return f"Recordatorio: La tarea '{tarea_titulo}' vence el {fecha_str}"
+
     def crear_recordatorio_cita(self, destinatario: str, fecha_cita: datetime,
                                  tipo_cita: str) -> NotificacionDTO:
         """Crea recordatorio de cita próxima"""
         mensaje = f"Recordatorio: Tiene una cita de {tipo_cita} programada para {fecha_cita.strftime('%Y-%m-%d %H:%M')}"
         return self.crear_notificacion(destinatario, "CITA_PROXIMA", mensaje)
 
-    def marcar_como_leida(self, id_notificacion: str) -> bool:
-        """Marca una notificación como leída"""
-        return self._repo.marcar_como_leida(id_notificacion)
+    def marcar_como_leida(self, id_notificacion: str, destinatario: Optional[str] = None) -> bool:
+        """Marca una notificación como leída; con destinatario, solo si le pertenece"""
+        return self._repo.marcar_como_leida(id_notificacion, destinatario)
+
+    def marcar_todas_como_leidas(self, destinatario: str) -> int:
+        """Marca como leída toda la bandeja del destinatario con una sola escritura"""
+        return self._repo.marcar_todas_como_leidas(destinatario)
+
+    def contar_no_leidas(self, destinatario: str) -> int:
+        """Número de no leídas para el indicador de la barra lateral (no carga filas)"""
+        return self._repo.contar_no_leidas(destinatario)
 
     def obtener_por_id(self, id_notificacion: str) -> Optional[NotificacionDTO]:
         """Obtiene una notificación por ID"""
@@ -902,6 +1199,12 @@ class NotificacionService:
         """Lista notificaciones no leídas"""
         return [self._to_dto(n) for n in self._repo.listar_no_leidas(destinatario)]
 
+    def listar_bandeja(self, destinatario: str, cursor: Optional[str] = None,
+                       limite: int = TAMANO_PAGINA) -> PaginaDTO:
+        """Bandeja del destinatario paginada por cursor (más recientes primero)"""
+        pagina = self._repo.listar_pagina_por_destinatario(destinatario, cursor, limite)
+        return PaginaDTO([self._to_dto(n) for n in pagina], pagina.siguiente_cursor)
+
     def _to_dto(self, entity: Notificacion) -> NotificacionDTO:
         return NotificacionDTO(
             id_notificacion=entity._id,
@@ -923,10 +1226,17 @@ class ReporteTareasService:
     """
 
     def __init__(self, tarea_repo: TareaRepository,
-                 asesor_repo: Optional[AsesorRepository] = None):
+                 asesor_repo: Optional[AsesorRepository] = None,
+                 estadistica_repo: Optional[EstadisticaTareaRepository] = None):
         self._tarea_repo = tarea_repo
         self._asesor_repo = asesor_repo
-        self._contador_reportes = 0
+        self._estadistica_repo = estadistica_repo
+
+    def _contar(self, momento: datetime,
+                filtro: Optional[FiltroReporteTareasDTO] = None) -> List[ConteoTareas]:
+        """Conteos agrupados: de las estadísticas materializadas si están configuradas"""
+        origen = self._estadistica_repo or self._tarea_repo
+        return origen.contar_por_grupo(momento, self._filtro_dominio(filtro) if filtro else None)
 
     def generar_reporte(self, filtro: FiltroReporteTareasDTO,
                         momento_actual: Optional[datetime] = None) -> ReporteTareasDTO:
@@ -935,31 +1245,11 @@ class ReporteTareasService:
         """
         momento = momento_actual or datetime.now()
 
-        # Obtener todas las tareas
-        todas_las_tareas = self._tarea_repo.listar_todas()
-
-        # Filtrar por período (usando vencimiento como referencia)
-        tareas_filtradas = [
-            t for t in todas_las_tareas
-            if t.vencimiento and filtro.desde <= t.vencimiento <= filtro.hasta
-        ]
-
-        # Filtrar por asesor si se especifica
-        if filtro.asesor_email:
-            tareas_filtradas = [
-                t for t in tareas_filtradas
-                if t.asignadaA and t.asignadaA.emailAsesor == filtro.asesor_email
-            ]
-
-        # Calcular estadísticas
-        estadisticas = self._calcular_estadisticas(tareas_filtradas, momento)
-
-        # Generar ID de reporte
-        self._contador_reportes += 1
-        id_reporte = f"REP-{self._contador_reportes:03d}"
+        # Conteos agregados en la base (período sobre el vencimiento y asesor opcional)
+        estadisticas = self._calcular_estadisticas(self._contar(momento, filtro))
 
         return ReporteTareasDTO(
-            id_reporte=id_reporte,
+            id_reporte=nuevo_id("REP"),
             creado_en=momento,
             filtro=filtro,
             estadisticas=estadisticas,
@@ -979,33 +1269,19 @@ class ReporteTareasService:
         - por_asesor: {email: {nombre, total, completadas, pendientes}}
         """
         momento = momento_actual or datetime.now()
-        tareas = self._tarea_repo.listar_todas()
-        estadisticas = self._calcular_estadisticas(tareas, momento)
+        por_asesor: Dict[str, Dict[str, Any]] = {}
+        estadisticas = self._calcular_estadisticas(
+            self._contar(momento), por_asesor=por_asesor
+        )
 
         completadas = estadisticas.por_estado.get(EstadoTarea.COMPLETADA.value, 0)
         vencidas = estadisticas.vencidas_total
 
-        por_asesor: Dict[str, Dict[str, Any]] = {}
-        for t in tareas:
-            if not t.asignadaA:
-                continue
-            email = t.asignadaA.emailAsesor
-            entry = por_asesor.setdefault(
-                email,
-                {"nombre": email, "total": 0, "completadas": 0, "pendientes": 0},
-            )
-            entry["total"] += 1
-            if t.estado == EstadoTarea.COMPLETADA:
-                entry["completadas"] += 1
-            elif t.estado in (EstadoTarea.PENDIENTE, EstadoTarea.EN_PROGRESO):
-                entry["pendientes"] += 1
-
         # Si tenemos repositorio de asesores, reemplazar nombre por nombre completo
-        if self._asesor_repo is not None:
-            for email, datos in por_asesor.items():
-                asesor = self._asesor_repo.obtener_por_email(email)
-                if asesor:
-                    datos["nombre"] = asesor.obtener_nombre_completo()
+        if self._asesor_repo is not None and por_asesor:
+            for asesor in self._asesor_repo.iterar_todos():
+                if asesor.emailAsesor in por_asesor:
+                    por_asesor[asesor.emailAsesor]["nombre"] = asesor.obtener_nombre_completo()
 
         return {
             "total": estadisticas.total_tareas,
@@ -1016,55 +1292,51 @@ class ReporteTareasService:
             "por_asesor": por_asesor,
         }
 
-    def _calcular_estadisticas(self, tareas: List[Tarea],
-                                momento: datetime) -> EstadisticasTareasDTO:
-        """Calcula estadísticas a partir de lista de tareas"""
-        # Normalizar comparaciones de datetime (naive vs aware) para evitar TypeError en Django
-        try:
-            from django.utils import timezone as dj_timezone  # type: ignore
-        except Exception:  # pragma: no cover
-            dj_timezone = None
+    def _filtro_dominio(self, filtro: FiltroReporteTareasDTO) -> FiltroReporteTareas:
+        return FiltroReporteTareas(filtro.desde, filtro.hasta, filtro.asesor_email)
 
-        # Conteo por estado
+    def _calcular_estadisticas(self, conteos: Iterable[ConteoTareas],
+                                por_asesor: Optional[Dict[str, Dict[str, Any]]] = None) -> EstadisticasTareasDTO:
+        """
+        Combina los conteos agrupados que devuelve el repositorio (una fila por
+        asesor, estado y prioridad) en las estadísticas del reporte.
+        Si se pasa `por_asesor`, acumula ahí también el resumen por asesor del dashboard.
+        """
+        total_tareas = 0
         por_estado = {e.value: 0 for e in EstadoTarea}
-        for t in tareas:
-            por_estado[t.estado.value] += 1
-
-        # Conteo por prioridad
         por_prioridad = {p.value: 0 for p in PrioridadTarea}
-        for t in tareas:
-            por_prioridad[t.prioridad.value] += 1
-
-        # Vencidas (no completadas/canceladas con vencimiento pasado)
         vencidas_por_asesor: Dict[str, int] = {}
         vencidas_total = 0
-        for t in tareas:
-            if t.estado in [EstadoTarea.PENDIENTE, EstadoTarea.EN_PROGRESO]:
-                if t.vencimiento:
-                    venc = t.vencimiento
-                    mom = momento
-                    if dj_timezone is not None:
-                        tz = dj_timezone.get_current_timezone()
-                        if dj_timezone.is_aware(venc) and dj_timezone.is_naive(mom):
-                            mom = dj_timezone.make_aware(mom, tz)
-                        elif dj_timezone.is_naive(venc) and dj_timezone.is_aware(mom):
-                            venc = dj_timezone.make_aware(venc, tz)
-
-                    if venc < mom:
-                        vencidas_total += 1
-                        if t.asignadaA:
-                            email = t.asignadaA.emailAsesor
-                            vencidas_por_asesor[email] = vencidas_por_asesor.get(email, 0) + 1
-
-        # Completadas por asesor
         completadas_por_asesor: Dict[str, int] = {}
-        for t in tareas:
-            if t.estado == EstadoTarea.COMPLETADA and t.asignadaA:
-                email = t.asignadaA.emailAsesor
-                completadas_por_asesor[email] = completadas_por_asesor.get(email, 0) + 1
+
+        for c in conteos:
+            total_tareas += c.total
+            por_estado[c.estado.value] += c.total
+            por_prioridad[c.prioridad.value] += c.total
+            email = c.asesor_email
+
+            # Vencidas (no completadas/canceladas con vencimiento pasado)
+            vencidas_total += c.vencidas
+            if c.vencidas and email:
+                vencidas_por_asesor[email] = vencidas_por_asesor.get(email, 0) + c.vencidas
+
+            # Completadas por asesor
+            if c.estado == EstadoTarea.COMPLETADA and email:
+                completadas_por_asesor[email] = completadas_por_asesor.get(email, 0) + c.total
+
+            if por_asesor is not None and email:
+                entry = por_asesor.setdefault(
+                    email,
+                    {"nombre": email, "total": 0, "completadas": 0, "pendientes": 0},
+                )
+                entry["total"] += c.total
+                if c.estado == EstadoTarea.COMPLETADA:
+                    entry["completadas"] += c.total
+                elif c.estado in (EstadoTarea.PENDIENTE, EstadoTarea.EN_PROGRESO):
+                    entry["pendientes"] += c.total
 
         return EstadisticasTareasDTO(
-            total_tareas=len(tareas),
+            total_tareas=total_tareas,
             por_estado=por_estado,
             por_prioridad=por_prioridad,
             vencidas_total=vencidas_total,
@@ -1077,9 +1349,8 @@ class ReporteTareasService:
         Obtiene ranking de asesores por tareas completadas.
         Retorna lista de tuplas (email, cantidad) ordenada descendentemente.
         """
-        reporte = self.generar_reporte(filtro)
         ranking = sorted(
-            reporte.estadisticas.completadas_por_asesor.items(),
+            self._calcular_estadisticas(self._contar(datetime.now(), filtro)).completadas_por_asesor.items(),
             key=lambda x: x[1],
             reverse=True,
         )
@@ -1134,3 +1405,57 @@ class ReporteTareasService:
             comentario=entity.comentario,
             asesor_email=entity.asignadaA.emailAsesor if entity.asignadaA else None,
         )
+
+
+# ============================================================
+# Servicio: ExpedienteQuery (lectura)
+# ============================================================
+class ExpedienteQueryService:
+    """
+    Consulta del expediente completo para las pantallas de consulta y detalle.
+    Toda la carga la hace el ExpedienteRepository en un número fijo de consultas;
+    aquí solo se arma el DTO anidado.
+    """
+
+    def __init__(self, repository: ExpedienteRepository,
+                 solicitante_repo: Optional[SolicitanteRepository] = None):
+        self._repo = repository
+        self._solicitante_repo = solicitante_repo
+
+    def consultar_por_solicitante(self, cedula: str) -> Optional[ExpedienteDTO]:
+        """Expediente con todas las solicitudes del solicitante; None si no existe"""
+        solicitudes = self._repo.listar_por_solicitante(cedula)
+        if solicitudes:
+            solicitante = solicitudes[0]._solicitante
+        elif self._solicitante_repo is not None:
+            solicitante = self._solicitante_repo.obtener_por_cedula(cedula)
+        else:
+            solicitante = None
+        if solicitante is None:
+            return None
+        return ExpedienteDTO(
+            solicitante=SolicitanteService._to_dto(solicitante),
+            solicitudes=[self._solicitud_to_dto(s) for s in solicitudes],
+        )
+
+    def consultar_por_codigo(self, codigo: str) -> Optional[ExpedienteDTO]:
+        """Expediente reducido a una sola solicitud; None si no existe"""
+        solicitud = self._repo.obtener_por_codigo(codigo)
+        if solicitud is None:
+            return None
+        solicitante = solicitud._solicitante
+        return ExpedienteDTO(
+            solicitante=SolicitanteService._to_dto(solicitante) if solicitante else None,
+            solicitudes=[self._solicitud_to_dto(solicitud)],
+        )
+
+    @staticmethod
+    def _solicitud_to_dto(solicitud: SolicitudMigratoria) -> SolicitudExpedienteDTO:
+        return SolicitudExpedienteDTO(
+            solicitud=SolicitudMigratoriaService._to_dto(solicitud),
+            documentos=[DocumentoService._to_dto(d) for d in solicitud.obtener_documentos()],
+            citas=[CitaService._to_dto(c) for c in solicitud._citas],
+            tareas=[TareaService._to_dto(t) for t in solicitud._tareas],
+            historial_estados=list(solicitud._historial_estados),
+            historial_fechas=list(solicitud._historial_fechas),
+        )
@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class SgpmConfig(AppConfig):
     name = 'SGPM'
+
+    def ready(self):
+        from SGPM.application.contenedor import contenedor
+        from SGPM.infrastructure.contenedor import registrar_servicios
+
+        registrar_servicios(contenedor)
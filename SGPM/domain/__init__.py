@@ -6,6 +6,7 @@ from .entities import (
     Asesor,
     Documento,
     Cita,
+    RecursoCita,
     Tarea,
     Notificacion,
     SolicitudMigratoria,
@@ -19,6 +20,7 @@ from .enums import (
     EstadoTarea,
     PrioridadTarea,
     TipoCita,
+    TipoRecursoCita,
     EstadoCita,
     TipoNotificacion,
 )
@@ -37,12 +39,17 @@ from .repositories import (
     SolicitanteRepository,
     AsesorRepository,
     SolicitudMigratoriaRepository,
+    ExpedienteRepository,
     DocumentoRepository,
     TareaRepository,
+    EstadisticaTareaRepository,
+    RecordatorioTareaRepository,
     CitaRepository,
+    RecursoCitaRepository,
     NotificacionRepository,
 )
-from .value_objects import RangoFechaHora
+from .value_objects import RangoFechaHora, HorarioLaboral, Pagina, ConteoTareas
+from .identificadores import GeneradorULID, nuevo_id, instante_ulid
 
 __all__ = [
     # Entities
@@ -50,6 +57,7 @@ __all__ = [
     "Asesor",
     "Documento",
     "Cita",
+    "RecursoCita",
     "Tarea",
     "Notificacion",
     "SolicitudMigratoria",
@@ -62,6 +70,7 @@ __all__ = [
     "EstadoTarea",
     "PrioridadTarea",
     "TipoCita",
+    "TipoRecursoCita",
     "EstadoCita",
     "TipoNotificacion",
     # Exceptions
@@ -78,10 +87,21 @@ __all__ = [
     "SolicitanteRepository",
     "AsesorRepository",
     "SolicitudMigratoriaRepository",
+    "ExpedienteRepository",
     "DocumentoRepository",
     "TareaRepository",
+    "EstadisticaTareaRepository",
+    "RecordatorioTareaRepository",
     "CitaRepository",
+    "RecursoCitaRepository",
     "NotificacionRepository",
     # Value Objects
     "RangoFechaHora",
+    "HorarioLaboral",
+    "Pagina",
+    "ConteoTareas",
+    # Identificadores
+    "GeneradorULID",
+    "nuevo_id",
+    "instante_ulid",
 ]
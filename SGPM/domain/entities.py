@@ -1,17 +1,18 @@
 from __future__ import annotations
 
 from datetime import date, datetime
-from typing import Optional, List, Dict, Any
+from types import MappingProxyType
+from typing import Optional, List, Dict, Any, Tuple, Iterable, Mapping, FrozenSet
 
 from .enums import (
     RolUsuario,
     EstadoSolicitud,
     TipoServicio,
-    TipoDocumento,
     EstadoDocumento,
     EstadoTarea,
     PrioridadTarea,
     TipoCita,
+    TipoRecursoCita,
     EstadoCita,
     TipoNotificacion,
 )
@@ -44,6 +45,21 @@ def parse_date_iso(value: str) -> date:
     return date.fromisoformat(value.strip())
 
 
+def compilar_transiciones(
+    tabla: Mapping[EstadoSolicitud, Iterable[EstadoSolicitud]],
+) -> Tuple[Mapping[EstadoSolicitud, FrozenSet[EstadoSolicitud]], Mapping[EstadoSolicitud, FrozenSet[EstadoSolicitud]]]:
+    """
+    Compila una tabla origen -> destinos en dos mapas inmutables: destinos por
+    origen y su inversa, orígenes por destino. Todo estado del enum tiene entrada.
+    """
+    destinos = {estado: frozenset(tabla.get(estado, ())) for estado in EstadoSolicitud}
+    origenes = {
+        estado: frozenset(o for o, ds in destinos.items() if estado in ds)
+        for estado in EstadoSolicitud
+    }
+    return MappingProxyType(destinos), MappingProxyType(origenes)
+
+
 def parse_datetime_iso(value: str) -> datetime:
     v = value.strip()
     if "T" in v:
@@ -73,12 +89,86 @@ def parse_estado_solicitud(texto: str) -> EstadoSolicitud:
         raise ValueError(f"EstadoSolicitud desconocido: '{texto}'") from e
 
 
+class ColeccionPerezosa:
+    """
+    Colección de una entidad con __slots__ que se crea en el primer acceso.
+    El valor vive en el slot `<nombre>_`, que queda vacío (sin objeto asignado)
+    mientras nadie use la colección. `fabrica` recibe la entidad.
+    """
+
+    def __init__(self, fabrica=None):
+        self._fabrica = fabrica or (lambda entidad: [])
+        self._slot = None
+
+    def __set_name__(self, owner, nombre: str) -> None:
+        self._slot = f"{nombre}_"
+
+    def __get__(self, entidad, owner=None):
+        if entidad is None:
+            return self
+        try:
+            return getattr(entidad, self._slot)
+        except AttributeError:
+            valor = self._fabrica(entidad)
+            setattr(entidad, self._slot, valor)
+            return valor
+
+    def __set__(self, entidad, valor) -> None:
+        setattr(entidad, self._slot, valor)
+
+    def existente(self, entidad) -> Optional[Any]:
+        """La colección si ya se creó; None sin crearla"""
+        return getattr(entidad, self._slot, None)
+
+
 # =========================
 # Entidades (UML)
 # =========================
-class Solicitante:
+# Las entidades declaran __slots__: sin __dict__ por instancia, lo que importa en
+# los listados que materializan miles de filas. Sus colecciones son perezosas.
+class RastreoCambios:
+    """
+    Cambios desde la carga: el repositorio fija la instantánea de lo persistido
+    al leer o guardar la entidad y, al volver a guardarla, la compara con el
+    estado actual para escribir solo las columnas modificadas.
+    """
+
+    __slots__ = ('_persistido',)
+
+    def marcar_persistida(self, estado: Dict[str, Any]) -> None:
+        self._persistido = dict(estado)
+
+    def actualizar_persistido(self, **campos: Any) -> None:
+        """Ajusta la instantánea tras una escritura parcial hecha fuera de `guardar`"""
+        persistido = getattr(self, '_persistido', None)
+        if persistido is not None:
+            persistido.update(campos)
+
+    def cambios_desde_carga(self, estado: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Entradas de `estado` distintas de la instantánea; None si la entidad no viene de la base"""
+        persistido = getattr(self, '_persistido', None)
+        if persistido is None:
+            return None
+        return {
+            campo: valor for campo, valor in estado.items()
+            if campo not in persistido or persistido[campo] != valor
+        }
+
+
+class Solicitante(RastreoCambios):
     """Representa al solicitante/migrante según el diagrama"""
 
+    __slots__ = (
+        '_cedula', '_nombres', '_apellidos', '_correo', '_telefono', '_fecha_nacimiento',
+        '_direccion', '_habilitado',
+        'cedula', 'nombres', 'apellidos', 'correo', 'telefono', 'fecha_nacimiento',
+        'direccion', 'habilitado',
+        '_documentos_',
+    )
+
+    # Relación UML: Solicitante tiene varios documentos
+    _documentos = ColeccionPerezosa()
+
     def __init__(self, cedula, nombres, apellidos, correo, telefono, fecha_nacimiento=None,
                  direccion: str = "", habilitado: bool = True):
         # Atributos privados para compatibilidad con métodos getter
@@ -101,9 +191,6 @@ class Solicitante:
         self.direccion = direccion
         self.habilitado = habilitado
 
-        # Relación UML: Solicitante tiene varios documentos
-        self._documentos: List["Documento"] = []
-
     def existe(self):
         """Verifica si el solicitante está registrado correctamente"""
         return self._cedula is not None and len(self._cedula) > 0
@@ -127,9 +214,13 @@ class Solicitante:
         return self._documentos
 
 
-class Asesor:
+class Asesor(RastreoCambios):
     """Representa un asesor según el diagrama UML"""
 
+    __slots__ = ('nombres', 'apellidos', 'email_asesor', 'emailAsesor', 'rol', '_tareas_asignadas_')
+
+    _tareas_asignadas = ColeccionPerezosa()
+
     def __init__(self, nombres: str, apellidos: str, emailAsesor: str = None, email_asesor: str = None,
                  rol: RolUsuario = RolUsuario.ASESOR):
         self.nombres = nombres
@@ -138,7 +229,6 @@ class Asesor:
         self.email_asesor = email_asesor or emailAsesor
         self.emailAsesor = self.email_asesor  # Alias para compatibilidad
         self.rol = rol
-        self._tareas_asignadas: List["Tarea"] = []
 
     def asignar_tarea(self, tarea: "Tarea") -> None:
         """Asigna una tarea a este asesor"""
@@ -147,20 +237,25 @@ class Asesor:
 
     def obtener_tareas(self) -> List["Tarea"]:
         """Retorna la lista de tareas asignadas al asesor"""
-        return self._tareas_asignadas.copy()
+        return list(Asesor._tareas_asignadas.existente(self) or ())
 
     def tiene_tarea(self, id_tarea: str) -> bool:
         """Verifica si el asesor tiene asignada una tarea específica"""
-        return any(t.idTarea == id_tarea for t in self._tareas_asignadas)
+        return any(t.idTarea == id_tarea for t in Asesor._tareas_asignadas.existente(self) or ())
 
     def obtener_nombre_completo(self) -> str:
         """Retorna el nombre completo del asesor"""
         return f"{self.nombres} {self.apellidos}"
 
 
-class Documento:
+class Documento(RastreoCambios):
     """Representa un documento según el diagrama"""
 
+    __slots__ = (
+        '_id', '_tipo', '_estado', '_fecha_expiracion', '_version_actual', '_observacion',
+        'id_documento', 'tipo', 'estado', 'fecha_expiracion', 'version_actual', 'observacion',
+    )
+
     def __init__(self, id_documento, tipo, estado=EstadoDocumento.RECIBIDO,
                  fecha_expiracion=None, version_actual=1, observacion=""):
         self._id = id_documento
@@ -211,30 +306,65 @@ class Documento:
         return self._observacion is not None and len(self._observacion) > 0
 
 
-class Cita:
-    """Representa una cita según el diagrama"""
+class RecursoCita:
+    """
+    Ventanilla o asesor que atiende citas.
+    `capacidad` es el número de citas que puede atender a la vez.
+    """
+
+    def __init__(self, codigo: str, nombre: str = "",
+                 tipo: TipoRecursoCita = TipoRecursoCita.VENTANILLA,
+                 capacidad: int = 1, activo: bool = True):
+        if capacidad < 1:
+            raise ValueError("La capacidad de un recurso de citas debe ser al menos 1.")
+        self.codigo = codigo
+        self.nombre = nombre
+        self.tipo = tipo
+        self.capacidad = capacidad
+        self.activo = activo
+
+
+class Cita(RastreoCambios):
+    """
+    Representa una cita según el diagrama.
+    `recurso_codigo` es la ventanilla o asesor que la atiende (None: agenda general).
+    """
+
+    __slots__ = (
+        'id_cita', 'idCita', 'solicitud_codigo', 'solicitudCodigo', 'recurso_codigo', 'recursoCodigo',
+        'observacion', 'rango', 'tipo', 'estado',
+    )
 
     def __init__(self, id_cita: Optional[str] = None, observacion: str = "",
                  rango: Optional[RangoFechaHora] = None,
                  tipo: Optional[TipoCita] = None,
                  estado: EstadoCita = EstadoCita.PROGRAMADA,
                  solicitud_codigo: Optional[str] = None,
+                 recurso_codigo: Optional[str] = None,
                  # Alias para compatibilidad
-                 idCita: Optional[str] = None, solicitudCodigo: Optional[str] = None):
+                 idCita: Optional[str] = None, solicitudCodigo: Optional[str] = None,
+                 recursoCodigo: Optional[str] = None):
         # Soportar ambos formatos
         self.id_cita = id_cita or idCita
         self.idCita = self.id_cita  # Alias para compatibilidad
         self.solicitud_codigo = solicitud_codigo or solicitudCodigo
         self.solicitudCodigo = self.solicitud_codigo  # Alias para compatibilidad
+        self.recurso_codigo = recurso_codigo or recursoCodigo
+        self.recursoCodigo = self.recurso_codigo  # Alias para compatibilidad
         self.observacion = observacion
         self.rango = rango
         self.tipo = tipo
         self.estado = estado
 
 
-class Tarea:
+class Tarea(RastreoCambios):
     """Representa una tarea según el diagrama UML"""
 
+    __slots__ = (
+        'id_tarea', 'idTarea', 'titulo', 'prioridad', 'vencimiento', 'comentario', 'estado',
+        'asignada_a', 'asignadaA',
+    )
+
     def __init__(self, idTarea: str = None, titulo: str = None, prioridad: PrioridadTarea = None,
                  vencimiento: Optional[datetime] = None, comentario: str = "",
                  estado: EstadoTarea = EstadoTarea.PENDIENTE,
@@ -374,9 +504,58 @@ class Notificacion:
         )
 
 
-class SolicitudMigratoria:
+class SolicitudMigratoria(RastreoCambios):
     """Representa la solicitud migratoria según el diagrama"""
 
+    # Máquina de estados: tabla declarativa compilada una sola vez al importar
+    TRANSICIONES, ORIGENES = compilar_transiciones({
+        EstadoSolicitud.CREADA: {
+            EstadoSolicitud.EN_REVISION,
+            EstadoSolicitud.CERRADA,
+        },
+        EstadoSolicitud.EN_REVISION: {
+            EstadoSolicitud.DOCUMENTOS_PENDIENTES,
+            EstadoSolicitud.ENVIADA,
+            EstadoSolicitud.RECHAZADA,
+            EstadoSolicitud.CERRADA,
+        },
+        EstadoSolicitud.DOCUMENTOS_PENDIENTES: {
+            EstadoSolicitud.EN_REVISION,
+            EstadoSolicitud.CERRADA,
+        },
+        EstadoSolicitud.ENVIADA: {
+            EstadoSolicitud.APROBADA,
+            EstadoSolicitud.RECHAZADA,
+            EstadoSolicitud.CERRADA,
+        },
+        EstadoSolicitud.APROBADA: {EstadoSolicitud.CERRADA},
+        EstadoSolicitud.RECHAZADA: {EstadoSolicitud.CERRADA},
+        EstadoSolicitud.CERRADA: set(),
+    })
+
+    __slots__ = (
+        '_codigo', '_tipo_servicio', '_estado_actual', '_fecha_creacion', '_fecha_expiracion',
+        '_solicitante', '_asesor', '_estados_persistidos', '_fechas_persistidas',
+        '_citas_', '_tareas_', '_notificaciones_', '_documentos_', '_documentos_requeridos_',
+        '_historial_estados_', '_historial_fechas_', '_fechas_proceso_',
+    )
+
+    # Relaciones UML y registro interno para BDD: se crean al usarlos por primera vez
+    _citas = ColeccionPerezosa()
+    _tareas = ColeccionPerezosa()
+    _notificaciones = ColeccionPerezosa()
+    _documentos = ColeccionPerezosa()
+    _documentos_requeridos = ColeccionPerezosa()
+    _historial_estados = ColeccionPerezosa()
+    _historial_fechas = ColeccionPerezosa()
+    _fechas_proceso = ColeccionPerezosa(lambda solicitud: {
+        "fechaCreacion": solicitud._fecha_creacion.date().isoformat(),
+        "fechaUltimaActualizacion": solicitud._fecha_creacion.date().isoformat(),
+        "fechaRecepcionDocs": None,
+        "fechaEnvioSolicitud": None,
+        "fechaCita": None,
+    })
+
     def __init__(self, codigo: str, tipoServicio: Optional[TipoServicio] = None,
                  estadoActual: Optional[EstadoSolicitud] = None,
                  fechaCreación: Optional[datetime] = None, fechaExpiracion: Optional[datetime] = None,
@@ -398,24 +577,13 @@ class SolicitudMigratoria:
         # -------------------------
         self._solicitante = solicitante
         self._asesor = asesor
-        self._citas: List[Cita] = []
-        self._tareas: List[Tarea] = []
-        self._notificaciones: List[Notificacion] = []
-        self._documentos: List[Documento] = []
-        self._documentos_requeridos: List[TipoDocumento] = []
 
         # -------------------------
         # Interno para BDD
         # -------------------------
-        self._historial_estados: List[Dict[str, Any]] = []
-        self._historial_fechas: List[Dict[str, Any]] = []
-        self._fechas_proceso: Dict[str, Optional[str]] = {
-            "fechaCreacion": self._fecha_creacion.date().isoformat(),
-            "fechaUltimaActualizacion": self._fecha_creacion.date().isoformat(),
-            "fechaRecepcionDocs": None,
-            "fechaEnvioSolicitud": None,
-            "fechaCita": None,
-        }
+        # Cuántas entradas de cada historial ya están persistidas (el resto está pendiente)
+        self._estados_persistidos = 0
+        self._fechas_persistidas = 0
 
     # =====================================================
     # Vincular relaciones
@@ -461,36 +629,22 @@ class SolicitudMigratoria:
     # =====================================================
     # Estados y transiciones (BDD)
     # =====================================================
-    def _transiciones_permitidas(self) -> Dict[EstadoSolicitud, set[EstadoSolicitud]]:
-        return {
-            EstadoSolicitud.CREADA: {
-                EstadoSolicitud.EN_REVISION,
-                EstadoSolicitud.CERRADA,
-            },
-            EstadoSolicitud.EN_REVISION: {
-                EstadoSolicitud.DOCUMENTOS_PENDIENTES,
-                EstadoSolicitud.ENVIADA,
-                EstadoSolicitud.RECHAZADA,
-                EstadoSolicitud.CERRADA,
-            },
-            EstadoSolicitud.DOCUMENTOS_PENDIENTES: {
-                EstadoSolicitud.EN_REVISION,
-                EstadoSolicitud.CERRADA,
-            },
-            EstadoSolicitud.ENVIADA: {
-                EstadoSolicitud.APROBADA,
-                EstadoSolicitud.RECHAZADA,
-                EstadoSolicitud.CERRADA,
-            },
-            EstadoSolicitud.APROBADA: {EstadoSolicitud.CERRADA},
-            EstadoSolicitud.RECHAZADA: {EstadoSolicitud.CERRADA},
-            EstadoSolicitud.CERRADA: set(),
-        }
+    def _transiciones_permitidas(self) -> Mapping[EstadoSolicitud, FrozenSet[EstadoSolicitud]]:
+        return self.TRANSICIONES
 
     def transicion_permitida(self, nuevo: EstadoSolicitud) -> bool:
-        return nuevo in self._transiciones_permitidas().get(
-            self._estado_actual, set()
-        )
+        return nuevo in self.TRANSICIONES[self._estado_actual]
+
+    @classmethod
+    def transiciones_validas(cls, estados: Iterable[EstadoSolicitud]) -> List[FrozenSet[EstadoSolicitud]]:
+        """Destinos permitidos para cada estado de la lista (mismo orden), sin instanciar solicitudes"""
+        tabla = cls.TRANSICIONES
+        return [tabla[estado] for estado in estados]
+
+    @classmethod
+    def origenes_validos(cls, nuevo: EstadoSolicitud) -> FrozenSet[EstadoSolicitud]:
+        """Estados desde los que se puede pasar a `nuevo`"""
+        return cls.ORIGENES[nuevo]
 
     def cambiar_estado(self, *, nuevo: EstadoSolicitud, usuario: str, motivo: str,
                        fecha_evento: Optional[datetime] = None, ) -> None:
@@ -526,6 +680,7 @@ class SolicitudMigratoria:
                 "nuevo": nuevo.value,
                 "fecha": fecha_evento.date().isoformat(),
                 "motivo": motivo,
+                "momento": fecha_evento,
             }
         )
 
@@ -575,11 +730,18 @@ class SolicitudMigratoria:
                 "valorAnterior": anterior,
                 "valorNuevo": valor_date.isoformat(),
                 "fecha": fecha_evento.date().isoformat(),
+                "momento": fecha_evento,
             }
         )
 
     def obtener_fecha_proceso(self, campo: str) -> Optional[str]:
-        return self._fechas_proceso.get(campo)
+        fechas = SolicitudMigratoria._fechas_proceso.existente(self)
+        if fechas is not None:
+            return fechas.get(campo)
+        # Sin fechas asignadas: los valores iniciales, sin crear el diccionario
+        if campo in ("fechaCreacion", "fechaUltimaActualizacion"):
+            return self._fecha_creacion.date().isoformat()
+        return None
 
     def obtener_fechas_clave(self) -> Dict[str, Optional[str]]:
         return {
@@ -597,6 +759,17 @@ class SolicitudMigratoria:
             reverse=True,
         )
 
+    def historial_pendiente(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Entradas de (estados, fechas) registradas desde la carga o el último guardado"""
+        estados = SolicitudMigratoria._historial_estados.existente(self) or []
+        fechas = SolicitudMigratoria._historial_fechas.existente(self) or []
+        return estados[self._estados_persistidos:], fechas[self._fechas_persistidas:]
+
+    def confirmar_historial(self) -> None:
+        """Lo llama el repositorio tras persistir el historial pendiente"""
+        self._estados_persistidos = len(SolicitudMigratoria._historial_estados.existente(self) or ())
+        self._fechas_persistidas = len(SolicitudMigratoria._historial_fechas.existente(self) or ())
+
     # =====================================================
     # Documentos (flujo operativo)
     # =====================================================
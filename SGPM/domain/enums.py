@@ -62,6 +62,11 @@ class TipoCita(str, Enum):
     ASESORIA = "ASESORIA"
 
 
+class TipoRecursoCita(str, Enum):
+    VENTANILLA = "VENTANILLA"
+    ASESOR = "ASESOR"
+
+
 class EstadoCita(str, Enum):
     PROGRAMADA = "PROGRAMADA"
     REPROGRAMADA = "REPROGRAMADA"
@@ -0,0 +1,77 @@
+"""
+Identificadores únicos ordenados por tiempo (formato ULID).
+Se generan sin coordinación entre peticiones, procesos ni servidores, y al
+crecer con el reloj las inserciones caen al final de los índices B-tree.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+# Base32 de Crockford: sin I, L, O ni U; conserva el orden al comparar como texto
+_ALFABETO = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_BITS_ALEATORIOS = 80
+_MAX_ALEATORIO = (1 << _BITS_ALEATORIOS) - 1
+LONGITUD_ULID = 26
+
+
+def _milisegundos() -> int:
+    return time.time_ns() // 1_000_000
+
+
+class GeneradorULID:
+    """
+    ULID: 48 bits de milisegundos Unix seguidos de 80 bits aleatorios, en 26
+    caracteres. Monótono dentro del proceso: en un mismo milisegundo (o si el reloj
+    retrocede) se incrementa la parte aleatoria del anterior, de modo que el orden
+    de generación coincide con el orden del texto.
+    """
+
+    def __init__(self, reloj: Callable[[], int] = _milisegundos) -> None:
+        self._reloj = reloj
+        self._lock = threading.Lock()
+        self._reiniciar()
+
+    def _reiniciar(self) -> None:
+        self._ultimo_ms = -1
+        self._aleatorio = 0
+
+    def nuevo(self) -> str:
+        with self._lock:
+            ms = self._reloj()
+            if ms > self._ultimo_ms:
+                self._aleatorio = int.from_bytes(os.urandom(_BITS_ALEATORIOS // 8), "big")
+            elif self._aleatorio < _MAX_ALEATORIO:
+                ms = self._ultimo_ms
+                self._aleatorio += 1
+            else:
+                # 2^80 IDs en un milisegundo: se toma prestado el siguiente
+                ms = self._ultimo_ms + 1
+                self._aleatorio = int.from_bytes(os.urandom(_BITS_ALEATORIOS // 8), "big")
+            self._ultimo_ms = ms
+            valor = (ms << _BITS_ALEATORIOS) | self._aleatorio
+        return "".join(_ALFABETO[(valor >> (5 * i)) & 0x1F] for i in reversed(range(LONGITUD_ULID)))
+
+
+def instante_ulid(ulid: str) -> datetime:
+    """Momento (UTC, con precisión de milisegundos) codificado en un ULID"""
+    ms = 0
+    for caracter in ulid[-LONGITUD_ULID:][:10]:
+        ms = (ms << 5) | _ALFABETO.index(caracter.upper())
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+
+
+_generador = GeneradorULID()
+
+# Un proceso hijo (workers de gunicorn, etc.) no debe continuar la secuencia del padre
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_generador._reiniciar)
+
+
+def nuevo_id(prefijo: str = "") -> str:
+    """Nuevo ULID del generador compartido, opcionalmente con prefijo: 'NOTIF-01J…'"""
+    ulid = _generador.nuevo()
+    return f"{prefijo}-{ulid}" if prefijo else ulid
@@ -6,7 +6,7 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Optional, Dict, List, Iterable, Iterator, ContextManager, Set
 
 from .entities import (
     Solicitante,
@@ -15,6 +15,7 @@ from .entities import (
     Documento,
     Tarea,
     Cita,
+    RecursoCita,
     Notificacion,
 )
 from .enums import (
@@ -26,6 +27,10 @@ from .enums import (
     TipoCita,
     PrioridadTarea,
 )
+from .value_objects import RangoFechaHora, Pagina, ConteoTareas, FiltroReporteTareas
+
+# Tamaño de página por defecto de los listados paginados por cursor
+TAMANO_PAGINA = 50
 
 
 # ========================================
@@ -39,6 +44,16 @@ class SolicitanteRepository(ABC):
         """Guarda o actualiza un solicitante"""
         pass
 
+    @abstractmethod
+    def guardar_muchos(self, solicitantes: Iterable[Solicitante]) -> List[Solicitante]:
+        """Guarda o actualiza varios solicitantes en lote"""
+        pass
+
+    @abstractmethod
+    def confirmar_cambios(self) -> None:
+        """Escribe ya lo que `guardar` haya dejado pendiente (escritura diferida); los errores de la base salen aquí"""
+        pass
+
     @abstractmethod
     def obtener_por_cedula(self, cedula: str) -> Optional[Solicitante]:
         """Obtiene un solicitante por su cédula"""
@@ -54,6 +69,17 @@ class SolicitanteRepository(ABC):
         """Lista todos los solicitantes"""
         pass
 
+    @abstractmethod
+    def iterar_todos(self) -> Iterator[Solicitante]:
+        """Itera todos los solicitantes sin materializar la lista"""
+        pass
+
+    @abstractmethod
+    def listar_pagina(self, cursor: Optional[str] = None,
+                      limite: int = TAMANO_PAGINA) -> Pagina[Solicitante]:
+        """Lista una página de solicitantes (más recientes primero) a partir del cursor"""
+        pass
+
     @abstractmethod
     def eliminar(self, cedula: str) -> bool:
         """Elimina un solicitante por su cédula"""
@@ -76,6 +102,16 @@ class AsesorRepository(ABC):
         """Guarda o actualiza un asesor"""
         pass
 
+    @abstractmethod
+    def guardar_muchos(self, asesores: Iterable[Asesor]) -> List[Asesor]:
+        """Guarda o actualiza varios asesores en lote"""
+        pass
+
+    @abstractmethod
+    def confirmar_cambios(self) -> None:
+        """Escribe ya lo que `guardar` haya dejado pendiente (escritura diferida); los errores de la base salen aquí"""
+        pass
+
     @abstractmethod
     def obtener_por_email(self, email: str) -> Optional[Asesor]:
         """Obtiene un asesor por su email"""
@@ -86,11 +122,21 @@ class AsesorRepository(ABC):
         """Lista todos los asesores"""
         pass
 
+    @abstractmethod
+    def iterar_todos(self) -> Iterator[Asesor]:
+        """Itera todos los asesores sin materializar la lista"""
+        pass
+
     @abstractmethod
     def listar_activos(self) -> List[Asesor]:
         """Lista solo los asesores activos"""
         pass
 
+    @abstractmethod
+    def iterar_activos(self) -> Iterator[Asesor]:
+        """Itera solo los asesores activos sin materializar la lista"""
+        pass
+
     @abstractmethod
     def eliminar(self, email: str) -> bool:
         """Elimina un asesor por su email"""
@@ -110,7 +156,17 @@ class SolicitudMigratoriaRepository(ABC):
 
     @abstractmethod
     def guardar(self, solicitud: SolicitudMigratoria) -> SolicitudMigratoria:
-        """Guarda o actualiza una solicitud migratoria"""
+        """Guarda o actualiza una solicitud migratoria junto con su historial pendiente"""
+        pass
+
+    @abstractmethod
+    def guardar_muchos(self, solicitudes: Iterable[SolicitudMigratoria]) -> List[SolicitudMigratoria]:
+        """Guarda o actualiza varias solicitudes migratorias en lote"""
+        pass
+
+    @abstractmethod
+    def confirmar_cambios(self) -> None:
+        """Escribe ya lo que `guardar` haya dejado pendiente (escritura diferida); los errores de la base salen aquí"""
         pass
 
     @abstractmethod
@@ -118,26 +174,118 @@ class SolicitudMigratoriaRepository(ABC):
         """Obtiene una solicitud por su código"""
         pass
 
+    @abstractmethod
+    def transaccion(self) -> ContextManager[None]:
+        """Contexto transaccional para leer, validar y escribir un lote de solicitudes"""
+        pass
+
+    @abstractmethod
+    def obtener_por_codigos(self, codigos: Iterable[str], bloquear: bool = False) -> Dict[str, SolicitudMigratoria]:
+        """
+        Solicitudes existentes de la lista, por código, en una sola consulta.
+        Con `bloquear`, las filas quedan bloqueadas hasta el fin de la transacción.
+        """
+        pass
+
+    @abstractmethod
+    def obtener_para_actualizar(self, codigo: str) -> Optional[SolicitudMigratoria]:
+        """
+        Lee la solicitud de la base bloqueando su fila hasta el fin de la transacción
+        en curso, sin pasar por el mapa de identidad ni por la caché
+        """
+        pass
+
+    @abstractmethod
+    def guardar_cambios_estado(self, solicitudes: List[SolicitudMigratoria]) -> None:
+        """Persiste el estado actual y el historial pendiente de solicitudes ya existentes"""
+        pass
+
+    @abstractmethod
+    def codigos_elegibles(self, nuevo: EstadoSolicitud, codigos: Optional[Iterable[str]] = None) -> Set[str]:
+        """
+        Códigos de las solicitudes cuyo estado actual permite pasar a `nuevo`,
+        resuelto en la base de datos sin cargar entidades (opcionalmente dentro de `codigos`)
+        """
+        pass
+
     @abstractmethod
     def listar_todas(self) -> List[SolicitudMigratoria]:
         """Lista todas las solicitudes"""
         pass
 
+    @abstractmethod
+    def iterar_todas(self) -> Iterator[SolicitudMigratoria]:
+        """Itera todas las solicitudes sin materializar la lista"""
+        pass
+
+    @abstractmethod
+    def listar_pagina(self, cursor: Optional[str] = None,
+                      limite: int = TAMANO_PAGINA) -> Pagina[SolicitudMigratoria]:
+        """Lista una página de solicitudes (más recientes primero) a partir del cursor"""
+        pass
+
+    @abstractmethod
+    def listar_pagina_resumen(self, cursor: Optional[str] = None,
+                              limite: int = TAMANO_PAGINA) -> Pagina[Dict[str, Any]]:
+        """
+        Misma página que `listar_pagina` como filas planas con las columnas del
+        listado (codigo, tipo_servicio, estado_actual, fecha_creacion,
+        fecha_expiracion, solicitante_cedula), sin construir entidades
+        """
+        pass
+
     @abstractmethod
     def listar_por_estado(self, estado: EstadoSolicitud) -> List[SolicitudMigratoria]:
         """Lista solicitudes por estado"""
         pass
 
+    @abstractmethod
+    def iterar_por_estado(self, estado: EstadoSolicitud) -> Iterator[SolicitudMigratoria]:
+        """Itera solicitudes por estado sin materializar la lista"""
+        pass
+
     @abstractmethod
     def listar_por_solicitante(self, cedula: str) -> List[SolicitudMigratoria]:
         """Lista solicitudes de un solicitante específico"""
         pass
 
+    @abstractmethod
+    def iterar_por_solicitante(self, cedula: str) -> Iterator[SolicitudMigratoria]:
+        """Itera solicitudes de un solicitante específico sin materializar la lista"""
+        pass
+
     @abstractmethod
     def listar_por_asesor(self, email_asesor: str) -> List[SolicitudMigratoria]:
         """Lista solicitudes asignadas a un asesor"""
         pass
 
+    @abstractmethod
+    def iterar_por_asesor(self, email_asesor: str) -> Iterator[SolicitudMigratoria]:
+        """Itera solicitudes asignadas a un asesor sin materializar la lista"""
+        pass
+
+    @abstractmethod
+    def iterar_historial_estados(self, codigo: str) -> Iterator[Dict[str, Any]]:
+        """Itera el historial de estados persistido, del cambio más reciente al más antiguo"""
+        pass
+
+    @abstractmethod
+    def listar_pagina_historial_estados(self, codigo: str, cursor: Optional[str] = None,
+                                        limite: int = TAMANO_PAGINA) -> Pagina[Dict[str, Any]]:
+        """Página del historial de estados a partir del cursor de la página anterior"""
+        pass
+
+    @abstractmethod
+    def iterar_historial_fechas(self, codigo: str) -> Iterator[Dict[str, Any]]:
+        """Itera el historial de fechas del proceso persistido, del más reciente al más antiguo"""
+        pass
+
+    @abstractmethod
+    def listar_pagina_historial_fechas(self, codigo: str, cursor: Optional[str] = None,
+                                       limite: int = TAMANO_PAGINA) -> Pagina[Dict[str, Any]]:
+        """Página del historial de fechas a partir del cursor de la página anterior"""
+        pass
+
     @abstractmethod
     def eliminar(self, codigo: str) -> bool:
         """Elimina una solicitud por su código"""
@@ -149,6 +297,27 @@ class SolicitudMigratoriaRepository(ABC):
         pass
 
 
+# ========================================
+# Repositorio: Expediente (lectura)
+# ========================================
+class ExpedienteRepository(ABC):
+    """
+    Lectura del expediente completo: solicitudes con sus documentos, citas,
+    tareas e historial ya cargados, en un número fijo de consultas sin importar
+    el tamaño del expediente. Solo lectura: las escrituras van por cada repositorio.
+    """
+
+    @abstractmethod
+    def listar_por_solicitante(self, cedula: str) -> List[SolicitudMigratoria]:
+        """Solicitudes del solicitante (más recientes primero) con todas sus relaciones"""
+        pass
+
+    @abstractmethod
+    def obtener_por_codigo(self, codigo: str) -> Optional[SolicitudMigratoria]:
+        """Una solicitud con todas sus relaciones"""
+        pass
+
+
 # ========================================
 # Repositorio: Documento
 # ========================================
@@ -160,6 +329,11 @@ class DocumentoRepository(ABC):
         """Guarda o actualiza un documento"""
         pass
 
+    @abstractmethod
+    def guardar_muchos(self, documentos: Iterable[Documento], solicitud_codigo: str) -> List[Documento]:
+        """Guarda o actualiza varios documentos de una solicitud en lote"""
+        pass
+
     @abstractmethod
     def obtener_por_id(self, id_documento: str) -> Optional[Documento]:
         """Obtiene un documento por su ID"""
@@ -170,16 +344,31 @@ class DocumentoRepository(ABC):
         """Lista documentos de una solicitud"""
         pass
 
+    @abstractmethod
+    def iterar_por_solicitud(self, solicitud_codigo: str) -> Iterator[Documento]:
+        """Itera documentos de una solicitud sin materializar la lista"""
+        pass
+
     @abstractmethod
     def listar_por_estado(self, estado: EstadoDocumento) -> List[Documento]:
         """Lista documentos por estado"""
         pass
 
+    @abstractmethod
+    def iterar_por_estado(self, estado: EstadoDocumento) -> Iterator[Documento]:
+        """Itera documentos por estado sin materializar la lista"""
+        pass
+
     @abstractmethod
     def listar_por_tipo(self, tipo: TipoDocumento) -> List[Documento]:
         """Lista documentos por tipo"""
         pass
 
+    @abstractmethod
+    def iterar_por_tipo(self, tipo: TipoDocumento) -> Iterator[Documento]:
+        """Itera documentos por tipo sin materializar la lista"""
+        pass
+
     @abstractmethod
     def eliminar(self, id_documento: str) -> bool:
         """Elimina un documento por su ID"""
@@ -202,46 +391,124 @@ class TareaRepository(ABC):
         """Guarda o actualiza una tarea"""
         pass
 
+    @abstractmethod
+    def guardar_muchos(self, tareas: Iterable[Tarea]) -> List[Tarea]:
+        """Guarda o actualiza varias tareas en lote"""
+        pass
+
+    @abstractmethod
+    def confirmar_cambios(self) -> None:
+        """Escribe ya lo que `guardar` haya dejado pendiente (escritura diferida); los errores de la base salen aquí"""
+        pass
+
     @abstractmethod
     def obtener_por_id(self, id_tarea: str) -> Optional[Tarea]:
         """Obtiene una tarea por su ID"""
         pass
 
+    @abstractmethod
+    def obtener_para_actualizar(self, id_tarea: str) -> Optional[Tarea]:
+        """
+        Lee la tarea de la base bloqueando su fila hasta el fin de la transacción
+        en curso, sin pasar por el mapa de identidad
+        """
+        pass
+
     @abstractmethod
     def listar_todas(self) -> List[Tarea]:
         """Lista todas las tareas"""
         pass
 
+    @abstractmethod
+    def iterar_todas(self) -> Iterator[Tarea]:
+        """Itera todas las tareas sin materializar la lista"""
+        pass
+
+    @abstractmethod
+    def listar_pagina(self, cursor: Optional[str] = None, limite: int = TAMANO_PAGINA,
+                      email_asesor: Optional[str] = None) -> Pagina[Tarea]:
+        """Lista una página de tareas (opcionalmente de un asesor) a partir del cursor"""
+        pass
+
+    @abstractmethod
+    def listar_pagina_resumen(self, cursor: Optional[str] = None, limite: int = TAMANO_PAGINA,
+                              email_asesor: Optional[str] = None) -> Pagina[Dict[str, Any]]:
+        """
+        Misma página que `listar_pagina` como filas planas con las columnas del
+        listado (id_tarea, titulo, prioridad, estado, vencimiento, asesor_email),
+        sin construir entidades
+        """
+        pass
+
     @abstractmethod
     def listar_por_estado(self, estado: EstadoTarea) -> List[Tarea]:
         """Lista tareas por estado"""
         pass
 
+    @abstractmethod
+    def iterar_por_estado(self, estado: EstadoTarea) -> Iterator[Tarea]:
+        """Itera tareas por estado sin materializar la lista"""
+        pass
+
     @abstractmethod
     def listar_por_prioridad(self, prioridad: PrioridadTarea) -> List[Tarea]:
         """Lista tareas por prioridad"""
         pass
 
+    @abstractmethod
+    def iterar_por_prioridad(self, prioridad: PrioridadTarea) -> Iterator[Tarea]:
+        """Itera tareas por prioridad sin materializar la lista"""
+        pass
+
     @abstractmethod
     def listar_por_asesor(self, email_asesor: str) -> List[Tarea]:
         """Lista tareas asignadas a un asesor"""
         pass
 
+    @abstractmethod
+    def iterar_por_asesor(self, email_asesor: str) -> Iterator[Tarea]:
+        """Itera tareas asignadas a un asesor sin materializar la lista"""
+        pass
+
     @abstractmethod
     def listar_por_solicitud(self, solicitud_codigo: str) -> List[Tarea]:
         """Lista tareas de una solicitud"""
         pass
 
+    @abstractmethod
+    def iterar_por_solicitud(self, solicitud_codigo: str) -> Iterator[Tarea]:
+        """Itera tareas de una solicitud sin materializar la lista"""
+        pass
+
     @abstractmethod
     def listar_vencidas(self) -> List[Tarea]:
         """Lista tareas vencidas"""
         pass
 
+    @abstractmethod
+    def iterar_vencidas(self) -> Iterator[Tarea]:
+        """Itera tareas vencidas sin materializar la lista"""
+        pass
+
     @abstractmethod
     def listar_por_vencer(self, horas: int = 24) -> List[Tarea]:
         """Lista tareas próximas a vencer en las próximas horas indicadas"""
         pass
 
+    @abstractmethod
+    def iterar_por_vencer(self, horas: int = 24) -> Iterator[Tarea]:
+        """Itera tareas próximas a vencer en las próximas horas indicadas sin materializar la lista"""
+        pass
+
+    @abstractmethod
+    def contar_por_grupo(self, momento: datetime,
+                         filtro: Optional[FiltroReporteTareas] = None) -> List[ConteoTareas]:
+        """
+        Cuenta las tareas agrupadas por (asesor, estado, prioridad), incluyendo cuántas
+        están vencidas en `momento`. El filtro acota por vencimiento y asesor.
+        """
+        pass
+
     @abstractmethod
     def eliminar(self, id_tarea: str) -> bool:
         """Elimina una tarea por su ID"""
@@ -253,6 +520,66 @@ class TareaRepository(ABC):
         pass
 
 
+# ========================================
+# Repositorio: EstadisticaTarea
+# ========================================
+class EstadisticaTareaRepository(ABC):
+    """
+    Repositorio abstracto de las estadísticas materializadas de tareas
+    (conteos por día de vencimiento, asesor, estado y prioridad).
+    """
+
+    @abstractmethod
+    def transaccion(self) -> ContextManager[None]:
+        """Contexto transaccional compartido con el repositorio de tareas"""
+        pass
+
+    @abstractmethod
+    def registrar_cambio(self, antes: Optional[Tarea], despues: Optional[Tarea]) -> None:
+        """
+        Ajusta los conteos por el cambio de una tarea: `antes` None es una creación
+        y `despues` None una eliminación.
+        """
+        pass
+
+    @abstractmethod
+    def contar_por_grupo(self, momento: datetime,
+                         filtro: Optional[FiltroReporteTareas] = None) -> List[ConteoTareas]:
+        """Mismo resultado que TareaRepository.contar_por_grupo, leído de los conteos"""
+        pass
+
+
+# ========================================
+# Repositorio: RecordatorioTarea
+# ========================================
+class RecordatorioTareaRepository(ABC):
+    """
+    Repositorio abstracto de las marcas de recordatorio enviado, una por
+    (tarea, vencimiento): si el vencimiento cambia, la tarea vuelve a recordarse.
+    """
+
+    @abstractmethod
+    def transaccion(self) -> ContextManager[None]:
+        """Contexto transaccional compartido con el repositorio de notificaciones"""
+        pass
+
+    @abstractmethod
+    def listar_pendientes(self, horas: int = 24) -> List[Tarea]:
+        """
+        Tareas abiertas y asignadas que vencen en las próximas `horas` y aún no tienen
+        recordatorio para su vencimiento actual (una sola consulta, con el asesor)
+        """
+        pass
+
+    @abstractmethod
+    def reservar_pendientes(self, horas: int = 24) -> List[Tarea]:
+        """
+        Marca como recordadas las tareas pendientes y retorna solo las que marcó esta
+        llamada: si dos despachos corren a la vez, cada tarea queda en uno solo.
+        """
+        pass
+
+
 # ========================================
 # Repositorio: Cita
 # ========================================
@@ -264,6 +591,21 @@ class CitaRepository(ABC):
         """Guarda o actualiza una cita"""
         pass
 
+    @abstractmethod
+    def guardar_muchos(self, citas: Iterable[Cita]) -> List[Cita]:
+        """Guarda o actualiza varias citas en lote"""
+        pass
+
+    @abstractmethod
+    def reservar(self, cita: Cita, excluir_id: Optional[str] = None) -> Optional[Cita]:
+        """
+        Guarda la cita solo si su horario sigue libre en su recurso (según la capacidad
+        del recurso), verificando y escribiendo de forma atómica frente a reservas
+        concurrentes. Retorna None si el recurso ya está completo en ese horario y
+        lanza CitaInvalidaError si el recurso no existe o está inactivo.
+        """
+        pass
+
     @abstractmethod
     def obtener_por_id(self, id_cita: str) -> Optional[Cita]:
         """Obtiene una cita por su ID"""
@@ -274,29 +616,84 @@ class CitaRepository(ABC):
         """Lista todas las citas"""
         pass
 
+    @abstractmethod
+    def iterar_todas(self) -> Iterator[Cita]:
+        """Itera todas las citas sin materializar la lista"""
+        pass
+
+    @abstractmethod
+    def listar_pagina(self, cursor: Optional[str] = None,
+                      limite: int = TAMANO_PAGINA) -> Pagina[Cita]:
+        """Lista una página de citas (más recientes primero) a partir del cursor"""
+        pass
+
     @abstractmethod
     def listar_por_estado(self, estado: EstadoCita) -> List[Cita]:
         """Lista citas por estado"""
         pass
 
+    @abstractmethod
+    def iterar_por_estado(self, estado: EstadoCita) -> Iterator[Cita]:
+        """Itera citas por estado sin materializar la lista"""
+        pass
+
     @abstractmethod
     def listar_por_tipo(self, tipo: TipoCita) -> List[Cita]:
         """Lista citas por tipo"""
         pass
 
+    @abstractmethod
+    def iterar_por_tipo(self, tipo: TipoCita) -> Iterator[Cita]:
+        """Itera citas por tipo sin materializar la lista"""
+        pass
+
     @abstractmethod
     def listar_por_solicitud(self, solicitud_codigo: str) -> List[Cita]:
         """Lista citas de una solicitud"""
         pass
 
+    @abstractmethod
+    def iterar_por_solicitud(self, solicitud_codigo: str) -> Iterator[Cita]:
+        """Itera citas de una solicitud sin materializar la lista"""
+        pass
+
     @abstractmethod
     def listar_por_rango_fecha(self, inicio: datetime, fin: datetime) -> List[Cita]:
         """Lista citas en un rango de fechas"""
         pass
 
     @abstractmethod
-    def verificar_disponibilidad(self, inicio: datetime, fin: datetime) -> bool:
-        """Verifica si hay disponibilidad en el horario indicado"""
+    def iterar_por_rango_fecha(self, inicio: datetime, fin: datetime) -> Iterator[Cita]:
+        """Itera citas en un rango de fechas sin materializar la lista"""
+        pass
+
+    @abstractmethod
+    def listar_agenda(self, inicio: datetime, fin: datetime,
+                      email_asesor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Citas que empiezan en [inicio, fin] (opcionalmente de las solicitudes de un
+        asesor), por inicio, como filas planas: id_cita, solicitud_codigo, tipo,
+        estado, inicio, fin, observacion, solicitante_nombre y asesor_nombre
+        """
+        pass
+
+    @abstractmethod
+    def ocupados_por_recurso(self, inicio: datetime, fin: datetime) -> Dict[Optional[str], List[RangoFechaHora]]:
+        """
+        Rangos de las citas activas que se solapan con [inicio, fin), agrupados por
+        código de recurso (None: agenda general) y ordenados por inicio (una sola consulta)
+        """
+        pass
+
+    @abstractmethod
+    def verificar_disponibilidad(self, inicio: datetime, fin: datetime,
+                                 excluir_id: Optional[str] = None,
+                                 recurso: Optional[str] = None, capacidad: int = 1) -> bool:
+        """
+        Verifica que en [inicio, fin) el recurso no llegue a `capacidad` citas activas
+        simultáneas (recurso None: agenda general, una cita a la vez).
+        `excluir_id` omite una cita (la que se está reprogramando).
+        """
         pass
 
     @abstractmethod
@@ -310,6 +707,28 @@ class CitaRepository(ABC):
         pass
 
 
+# ========================================
+# Repositorio: RecursoCita
+# ========================================
+class RecursoCitaRepository(ABC):
+    """Repositorio abstracto para RecursoCita (ventanillas y asesores que atienden citas)"""
+
+    @abstractmethod
+    def guardar(self, recurso: RecursoCita) -> RecursoCita:
+        """Guarda un recurso"""
+        pass
+
+    @abstractmethod
+    def obtener_por_codigo(self, codigo: str) -> Optional[RecursoCita]:
+        """Obtiene un recurso por su código"""
+        pass
+
+    @abstractmethod
+    def listar_activos(self) -> List[RecursoCita]:
+        """Lista los recursos activos ordenados por código"""
+        pass
+
+
 # ========================================
 # Repositorio: Notificacion
 # ========================================
@@ -321,6 +740,11 @@ class NotificacionRepository(ABC):
         """Guarda una notificación"""
         pass
 
+    @abstractmethod
+    def guardar_muchos(self, notificaciones: Iterable[Notificacion]) -> List[Notificacion]:
+        """Guarda varias notificaciones en lote"""
+        pass
+
     @abstractmethod
     def obtener_por_id(self, id_notificacion: str) -> Optional[Notificacion]:
         """Obtiene una notificación por su ID"""
@@ -331,14 +755,40 @@ class NotificacionRepository(ABC):
         """Lista notificaciones por destinatario"""
         pass
 
+    @abstractmethod
+    def iterar_por_destinatario(self, destinatario: str) -> Iterator[Notificacion]:
+        """Itera notificaciones por destinatario sin materializar la lista"""
+        pass
+
     @abstractmethod
     def listar_no_leidas(self, destinatario: str) -> List[Notificacion]:
         """Lista notificaciones no leídas de un destinatario"""
         pass
 
     @abstractmethod
-    def marcar_como_leida(self, id_notificacion: str) -> bool:
-        """Marca una notificación como leída"""
+    def iterar_no_leidas(self, destinatario: str) -> Iterator[Notificacion]:
+        """Itera notificaciones no leídas de un destinatario sin materializar la lista"""
+        pass
+
+    @abstractmethod
+    def listar_pagina_por_destinatario(self, destinatario: str, cursor: Optional[str] = None,
+                                       limite: int = TAMANO_PAGINA) -> Pagina[Notificacion]:
+        """Página de la bandeja de un destinatario, de la más reciente a la más antigua"""
+        pass
+
+    @abstractmethod
+    def contar_no_leidas(self, destinatario: str) -> int:
+        """Número de notificaciones no leídas de un destinatario, sin cargarlas"""
+        pass
+
+    @abstractmethod
+    def marcar_como_leida(self, id_notificacion: str, destinatario: Optional[str] = None) -> bool:
+        """Marca una notificación como leída (solo si es del destinatario, cuando se indica)"""
+        pass
+
+    @abstractmethod
+    def marcar_todas_como_leidas(self, destinatario: str) -> int:
+        """Marca como leídas todas las notificaciones de un destinatario; devuelve cuántas cambiaron"""
         pass
 
     @abstractmethod
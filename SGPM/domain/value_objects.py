@@ -1,6 +1,10 @@
 from __future__ import annotations
-from datetime import datetime
-from typing import Optional, Dict
+from datetime import datetime, time, timedelta, tzinfo
+from typing import Optional, Dict, FrozenSet, Generic, Iterable, Iterator, List, Tuple, TypeVar
+
+from .enums import EstadoTarea, PrioridadTarea
+
+T = TypeVar("T")
 
 
 class RangoFechaHora:
@@ -24,6 +28,12 @@ class RangoFechaHora:
     def solapa(self, other: "RangoFechaHora") -> bool:
         return self.inicio < other.fin and other.inicio < self.fin
 
+    def recortar(self, other: "RangoFechaHora") -> Optional["RangoFechaHora"]:
+        """Parte de este rango que cae dentro de `other` (None si no se solapan)"""
+        if not self.solapa(other):
+            return None
+        return RangoFechaHora(inicio=max(self.inicio, other.inicio), fin=min(self.fin, other.fin))
+
     def __setattr__(self, name, value):
         raise AttributeError("RangoFechaHora es inmutable")
 
@@ -34,6 +44,116 @@ class RangoFechaHora:
         return f"RangoFechaHora(inicio={self._inicio}, fin={self._fin})"
 
 
+def _eventos(rangos: Iterable[RangoFechaHora]) -> List[Tuple[datetime, int]]:
+    """+1 al inicio y -1 al fin de cada rango; en un mismo instante los fines van antes ([inicio, fin))"""
+    eventos = []
+    for rango in rangos:
+        eventos.append((rango.inicio, 1))
+        eventos.append((rango.fin, -1))
+    eventos.sort()
+    return eventos
+
+
+def max_simultaneos(rangos: Iterable[RangoFechaHora]) -> int:
+    """Máximo número de rangos que coinciden en algún instante"""
+    activos = maximo = 0
+    for _, delta in _eventos(rangos):
+        activos += delta
+        maximo = max(maximo, activos)
+    return maximo
+
+
+def tramos_saturados(rangos: Iterable[RangoFechaHora], capacidad: int = 1) -> List[RangoFechaHora]:
+    """
+    Tramos ordenados y disjuntos en los que coinciden al menos `capacidad` rangos.
+    Con capacidad 1 es la unión de los rangos.
+    """
+    tramos: List[RangoFechaHora] = []
+    activos = 0
+    desde: Optional[datetime] = None
+    for momento, delta in _eventos(rangos):
+        activos += delta
+        if delta > 0 and activos == capacidad:
+            desde = momento
+        elif delta < 0 and activos == capacidad - 1:
+            if tramos and tramos[-1].fin == desde:
+                desde = tramos.pop().inicio
+            tramos.append(RangoFechaHora(inicio=desde, fin=momento))
+    return tramos
+
+
+def interseccion_tramos(a: List[RangoFechaHora], b: List[RangoFechaHora]) -> List[RangoFechaHora]:
+    """Intersección de dos listas de tramos ordenados y disjuntos"""
+    tramos: List[RangoFechaHora] = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        inicio, fin = max(a[i].inicio, b[j].inicio), min(a[i].fin, b[j].fin)
+        if inicio < fin:
+            tramos.append(RangoFechaHora(inicio=inicio, fin=fin))
+        if a[i].fin < b[j].fin:
+            i += 1
+        else:
+            j += 1
+    return tramos
+
+
+class HorarioLaboral:
+    """
+    Value Object que representa el horario de atención para citas (inmutable).
+    `dias` usa la numeración de `date.weekday()` (0 = lunes). Si `zona` es None,
+    las horas se interpretan en la zona horaria del rango consultado.
+    """
+    __slots__ = ('_apertura', '_cierre', '_dias', '_zona')
+
+    def __init__(self, apertura: time = time(8, 0), cierre: time = time(17, 0),
+                 dias: Iterable[int] = (0, 1, 2, 3, 4), zona: Optional[tzinfo] = None) -> None:
+        if cierre <= apertura:
+            raise ValueError("HorarioLaboral inválido: cierre debe ser mayor que apertura.")
+        object.__setattr__(self, '_apertura', apertura)
+        object.__setattr__(self, '_cierre', cierre)
+        object.__setattr__(self, '_dias', frozenset(dias))
+        object.__setattr__(self, '_zona', zona)
+
+    @property
+    def apertura(self) -> time:
+        return self._apertura
+
+    @property
+    def cierre(self) -> time:
+        return self._cierre
+
+    @property
+    def dias(self) -> FrozenSet[int]:
+        return self._dias
+
+    @property
+    def zona(self) -> Optional[tzinfo]:
+        return self._zona
+
+    def ventanas(self, desde: datetime, hasta: datetime) -> Iterator[RangoFechaHora]:
+        """Tramos de atención dentro de [desde, hasta), en orden cronológico"""
+        zona = self._zona or desde.tzinfo
+        dia = desde.astimezone(zona).date() if zona else desde.date()
+        ultimo = hasta.astimezone(zona).date() if zona else hasta.date()
+        while dia <= ultimo:
+            if dia.weekday() in self._dias:
+                inicio = max(desde, datetime.combine(dia, self._apertura, tzinfo=zona))
+                fin = min(hasta, datetime.combine(dia, self._cierre, tzinfo=zona))
+                if inicio < fin:
+                    yield RangoFechaHora(inicio=inicio, fin=fin)
+            dia += timedelta(days=1)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("HorarioLaboral es inmutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("HorarioLaboral es inmutable")
+
+    def __repr__(self) -> str:
+        return (f"HorarioLaboral(apertura={self._apertura}, cierre={self._cierre}, "
+                f"dias={sorted(self._dias)}, zona={self._zona})")
+
+
 class FiltroReporteTareas:
     """Value Object que representa un filtro para reportes de tareas (inmutable)"""
     __slots__ = ('_desde', '_hasta', '_asesor_email')
@@ -111,3 +231,88 @@ class EstadisticasTareas:
 
     def __repr__(self) -> str:
         return f"EstadisticasTareas(total_tareas={self._total_tareas})"
+
+
+class Pagina(Generic[T]):
+    """
+    Value Object que representa una página de resultados paginada por cursor (inmutable).
+    `siguiente_cursor` es opaco para el dominio: solo se devuelve al repositorio.
+    """
+    __slots__ = ('_elementos', '_siguiente_cursor')
+
+    def __init__(self, elementos: List[T], siguiente_cursor: Optional[str] = None) -> None:
+        object.__setattr__(self, '_elementos', tuple(elementos))
+        object.__setattr__(self, '_siguiente_cursor', siguiente_cursor)
+
+    @property
+    def elementos(self) -> Tuple[T, ...]:
+        return self._elementos
+
+    @property
+    def siguiente_cursor(self) -> Optional[str]:
+        return self._siguiente_cursor
+
+    @property
+    def tiene_siguiente(self) -> bool:
+        return self._siguiente_cursor is not None
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._elementos)
+
+    def __len__(self) -> int:
+        return len(self._elementos)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Pagina es inmutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Pagina es inmutable")
+
+    def __repr__(self) -> str:
+        return f"Pagina(elementos={len(self._elementos)}, siguiente_cursor={self._siguiente_cursor!r})"
+
+
+class ConteoTareas:
+    """
+    Value Object con el conteo de tareas de un grupo (asesor, estado, prioridad) (inmutable).
+    Es la unidad que devuelve la agregación de tareas hecha en el repositorio.
+    """
+    __slots__ = ('_asesor_email', '_estado', '_prioridad', '_total', '_vencidas')
+
+    def __init__(self, asesor_email: Optional[str], estado: EstadoTarea, prioridad: PrioridadTarea,
+                 total: int, vencidas: int = 0) -> None:
+        object.__setattr__(self, '_asesor_email', asesor_email)
+        object.__setattr__(self, '_estado', estado)
+        object.__setattr__(self, '_prioridad', prioridad)
+        object.__setattr__(self, '_total', total)
+        object.__setattr__(self, '_vencidas', vencidas)
+
+    @property
+    def asesor_email(self) -> Optional[str]:
+        return self._asesor_email
+
+    @property
+    def estado(self) -> EstadoTarea:
+        return self._estado
+
+    @property
+    def prioridad(self) -> PrioridadTarea:
+        return self._prioridad
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    @property
+    def vencidas(self) -> int:
+        return self._vencidas
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ConteoTareas es inmutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("ConteoTareas es inmutable")
+
+    def __repr__(self) -> str:
+        return (f"ConteoTareas(asesor_email={self._asesor_email!r}, estado={self._estado.value}, "
+                f"prioridad={self._prioridad.value}, total={self._total}, vencidas={self._vencidas})")
@@ -7,7 +7,11 @@ from .models import (
     SolicitudMigratoria,
     Documento,
     Tarea,
+    EstadisticaTareaDiaria,
+    RecordatorioTareaEnviado,
+    RecursoCita,
     Cita,
+    BloqueoAgendaCita,
     Notificacion,
     HistorialEstadoSolicitud,
     HistorialFechaProceso,
@@ -16,11 +20,26 @@ from .repositories import (
     DjangoSolicitanteRepository,
     DjangoAsesorRepository,
     DjangoSolicitudMigratoriaRepository,
+    DjangoExpedienteRepository,
     DjangoDocumentoRepository,
     DjangoTareaRepository,
+    DjangoEstadisticaTareaRepository,
+    DjangoRecordatorioTareaRepository,
     DjangoCitaRepository,
+    DjangoRecursoCitaRepository,
     DjangoNotificacionRepository,
 )
+from .unidad_de_trabajo import UnidadDeTrabajo, unidad_de_trabajo_actual
+from .cache_repositorios import (
+    SolicitanteRepositoryEnCache,
+    AsesorRepositoryEnCache,
+    SolicitudMigratoriaRepositoryEnCache,
+    EstadisticasCache,
+    en_cache,
+    estadisticas_cache,
+    reiniciar_estadisticas_cache,
+)
+from .contenedor import registrar_servicios
 
 __all__ = [
     # Models
@@ -29,7 +48,11 @@ __all__ = [
     "SolicitudMigratoria",
     "Documento",
     "Tarea",
+    "EstadisticaTareaDiaria",
+    "RecordatorioTareaEnviado",
+    "RecursoCita",
     "Cita",
+    "BloqueoAgendaCita",
     "Notificacion",
     "HistorialEstadoSolicitud",
     "HistorialFechaProceso",
@@ -37,8 +60,25 @@ __all__ = [
     "DjangoSolicitanteRepository",
     "DjangoAsesorRepository",
     "DjangoSolicitudMigratoriaRepository",
+    "DjangoExpedienteRepository",
     "DjangoDocumentoRepository",
     "DjangoTareaRepository",
+    "DjangoEstadisticaTareaRepository",
+    "DjangoRecordatorioTareaRepository",
     "DjangoCitaRepository",
+    "DjangoRecursoCitaRepository",
     "DjangoNotificacionRepository",
+    # Unidad de trabajo
+    "UnidadDeTrabajo",
+    "unidad_de_trabajo_actual",
+    # Caché de lectura de repositorios
+    "SolicitanteRepositoryEnCache",
+    "AsesorRepositoryEnCache",
+    "SolicitudMigratoriaRepositoryEnCache",
+    "EstadisticasCache",
+    "en_cache",
+    "estadisticas_cache",
+    "reiniciar_estadisticas_cache",
+    # Contenedor de servicios
+    "registrar_servicios",
 ]
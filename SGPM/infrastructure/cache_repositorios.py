@@ -0,0 +1,276 @@
+"""
+Caché de lectura (read-through) para las búsquedas por clave de los repositorios.
+
+Las envolturas de este módulo decoran un repositorio Django: la búsqueda por
+clave se sirve del framework de caché de Django y las escrituras hechas a
+través de la envoltura invalidan las claves que tocan. Cualquier otro método
+se delega sin cambios al repositorio envuelto.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from SGPM.domain.entities import (
+    Solicitante as SolicitanteEntity,
+    Asesor as AsesorEntity,
+    SolicitudMigratoria as SolicitudMigratoriaEntity,
+)
+from .models import SolicitudMigratoria as SolicitudMigratoriaModel
+from .repositories import (
+    DjangoSolicitanteRepository,
+    DjangoAsesorRepository,
+    DjangoSolicitudMigratoriaRepository,
+)
+from .unidad_de_trabajo import unidad_de_trabajo_actual
+
+
+# Segundos que vive una entidad en caché si no se indica otro TTL. Las
+# escrituras por la envoltura la invalidan, junto con las solicitudes que llevan
+# embebido al solicitante o al asesor escrito; el TTL acota el desfase frente a
+# escrituras que no pasan por ella (otro proceso con LocMemCache, SQL directo).
+REPOSITORIO_CACHE_TTL = 60
+
+
+@dataclass
+class EstadisticasCache:
+    """Contadores de uso de la caché de un tipo de entidad (en el proceso actual)"""
+    aciertos: int = 0
+    fallos: int = 0
+    invalidaciones: int = 0
+
+    @property
+    def tasa_aciertos(self) -> float:
+        total = self.aciertos + self.fallos
+        return self.aciertos / total if total else 0.0
+
+
+_estadisticas: Dict[str, EstadisticasCache] = {}
+_estadisticas_lock = threading.Lock()
+
+
+def _contar(espacio: str, contador: str, cantidad: int = 1) -> None:
+    with _estadisticas_lock:
+        actuales = _estadisticas.setdefault(espacio, EstadisticasCache())
+        setattr(actuales, contador, getattr(actuales, contador) + cantidad)
+
+
+def estadisticas_cache() -> Dict[str, EstadisticasCache]:
+    """Copia de los contadores por espacio ('solicitud', 'solicitante', 'asesor')"""
+    with _estadisticas_lock:
+        return {
+            espacio: EstadisticasCache(e.aciertos, e.fallos, e.invalidaciones)
+            for espacio, e in _estadisticas.items()
+        }
+
+
+def reiniciar_estadisticas_cache() -> None:
+    with _estadisticas_lock:
+        _estadisticas.clear()
+
+
+def _clave(espacio: str, valor: Any) -> str:
+    return f"sgpm:repo:{espacio}:{valor}"
+
+
+class RepositorioEnCache:
+    """
+    Base de las envolturas: cada subclase declara su `espacio` y redefine la
+    búsqueda por clave y los métodos de escritura; el resto se delega.
+
+    Las ausencias (None) no se guardan, porque el alta puede llegar por un camino
+    que no invalida. Dentro de una transacción la lectura no puebla la caché: lo
+    leído podría no confirmarse nunca; tampoco con escrituras de la unidad de
+    trabajo sin volcar.
+    """
+
+    espacio = ''
+
+    def __init__(self, repositorio: Any, ttl: int = REPOSITORIO_CACHE_TTL):
+        self._repo = repositorio
+        self._ttl = ttl
+
+    def __getattr__(self, nombre: str) -> Any:
+        # Solo se llega aquí con lo que la envoltura no define
+        return getattr(self._repo, nombre)
+
+    def _clave(self, valor: Any) -> str:
+        return _clave(self.espacio, valor)
+
+    def _leer(self, valor: Any, cargar: Callable[[Any], Optional[Any]]) -> Optional[Any]:
+        # La entidad ya conocida en la unidad de trabajo tiene prioridad: es la misma
+        # instancia que el resto de la petición y puede llevar cambios sin volcar
+        uow = unidad_de_trabajo_actual()
+        if uow is not None:
+            conocida = uow.entidad(type(self._repo), valor)
+            if conocida is not None:
+                return conocida
+
+        clave = self._clave(valor)
+        entidad = cache.get(clave)
+        if entidad is not None:
+            _contar(self.espacio, 'aciertos')
+            if uow is not None:
+                uow.registrar_entidad(type(self._repo), valor, entidad)
+            return entidad
+        _contar(self.espacio, 'fallos')
+        entidad = cargar(valor)
+        sin_confirmar = connection.in_atomic_block or (uow is not None and uow.tiene_pendientes())
+        if entidad is not None and not sin_confirmar:
+            cache.set(clave, entidad, self._ttl)
+        return entidad
+
+    def _invalidar(self, valores: Iterable[Any]) -> None:
+        _invalidar_espacio(self.espacio, valores)
+
+    def _invalidar_solicitudes(self, **filtro: Any) -> None:
+        """Solicitudes que llevan embebida la entidad escrita: su copia cacheada queda vieja"""
+        codigos = SolicitudMigratoriaModel.objects.filter(**filtro).values_list('codigo', flat=True)
+        _invalidar_espacio(SolicitudMigratoriaRepositoryEnCache.espacio, codigos)
+
+
+def _invalidar_espacio(espacio: str, valores: Iterable[Any]) -> None:
+    """
+    Borra las claves ya y otra vez al confirmar: una lectura concurrente
+    anterior al commit podría haber vuelto a guardar el valor viejo.
+    """
+    claves = [_clave(espacio, v) for v in set(valores)]
+    if not claves:
+        return
+    cache.delete_many(claves)
+    transaction.on_commit(lambda: cache.delete_many(claves))
+    uow = unidad_de_trabajo_actual()
+    if uow is not None:
+        # Con la escritura diferida, el valor nuevo llega a la base en el volcado
+        uow.al_confirmar(lambda: cache.delete_many(claves))
+    _contar(espacio, 'invalidaciones', len(claves))
+
+
+# ========================================
+# Envoltura: Solicitante
+# ========================================
+class SolicitanteRepositoryEnCache(RepositorioEnCache):
+    """Solicitante por cédula. Sus escrituras invalidan también sus solicitudes."""
+
+    espacio = 'solicitante'
+
+    def obtener_por_cedula(self, cedula: str) -> Optional[SolicitanteEntity]:
+        return self._leer(cedula, self._repo.obtener_por_cedula)
+
+    def guardar(self, solicitante: SolicitanteEntity) -> SolicitanteEntity:
+        guardado = self._repo.guardar(solicitante)
+        self._invalidar_cedulas([solicitante.obtener_cedula()])
+        return guardado
+
+    def guardar_muchos(self, solicitantes: Iterable[SolicitanteEntity]) -> List[SolicitanteEntity]:
+        solicitantes = list(solicitantes)
+        guardados = self._repo.guardar_muchos(solicitantes)
+        self._invalidar_cedulas([s.obtener_cedula() for s in solicitantes])
+        return guardados
+
+    def eliminar(self, cedula: str) -> bool:
+        # Antes de borrar: el borrado en cascada se lleva las solicitudes
+        self._invalidar_solicitudes(solicitante__cedula=cedula)
+        eliminado = self._repo.eliminar(cedula)
+        self._invalidar([cedula])
+        return eliminado
+
+    def _invalidar_cedulas(self, cedulas: List[str]) -> None:
+        self._invalidar(cedulas)
+        self._invalidar_solicitudes(solicitante__cedula__in=cedulas)
+
+
+# ========================================
+# Envoltura: Asesor
+# ========================================
+class AsesorRepositoryEnCache(RepositorioEnCache):
+    """Asesor por email. Sus escrituras invalidan también las solicitudes que tiene asignadas."""
+
+    espacio = 'asesor'
+
+    def obtener_por_email(self, email: str) -> Optional[AsesorEntity]:
+        return self._leer(email, self._repo.obtener_por_email)
+
+    def guardar(self, asesor: AsesorEntity) -> AsesorEntity:
+        guardado = self._repo.guardar(asesor)
+        self._invalidar_emails([asesor.emailAsesor])
+        return guardado
+
+    def guardar_muchos(self, asesores: Iterable[AsesorEntity]) -> List[AsesorEntity]:
+        asesores = list(asesores)
+        guardados = self._repo.guardar_muchos(asesores)
+        self._invalidar_emails([a.emailAsesor for a in asesores])
+        return guardados
+
+    def eliminar(self, email: str) -> bool:
+        # Antes de borrar: después la solicitud ya no apunta al asesor (SET_NULL)
+        self._invalidar_solicitudes(asesor__email_asesor=email)
+        eliminado = self._repo.eliminar(email)
+        self._invalidar([email])
+        return eliminado
+
+    def _invalidar_emails(self, emails: List[str]) -> None:
+        self._invalidar(emails)
+        self._invalidar_solicitudes(asesor__email_asesor__in=emails)
+
+
+# ========================================
+# Envoltura: SolicitudMigratoria
+# ========================================
+class SolicitudMigratoriaRepositoryEnCache(RepositorioEnCache):
+    """
+    Solicitud por código. La entidad lleva embebidos su solicitante y su asesor:
+    las envolturas de estos invalidan la solicitud cuando se escriben.
+    Solo para mostrar: quien lee para modificar usa `obtener_para_actualizar`,
+    que se delega sin caché.
+    """
+
+    espacio = 'solicitud'
+
+    def obtener_por_codigo(self, codigo: str) -> Optional[SolicitudMigratoriaEntity]:
+        return self._leer(codigo, self._repo.obtener_por_codigo)
+
+    def guardar(self, solicitud: SolicitudMigratoriaEntity) -> SolicitudMigratoriaEntity:
+        guardada = self._repo.guardar(solicitud)
+        self._invalidar([solicitud.codigo])
+        return guardada
+
+    def guardar_muchos(self, solicitudes: Iterable[SolicitudMigratoriaEntity]) -> List[SolicitudMigratoriaEntity]:
+        solicitudes = list(solicitudes)
+        guardadas = self._repo.guardar_muchos(solicitudes)
+        self._invalidar(s.codigo for s in solicitudes)
+        return guardadas
+
+    def guardar_cambios_estado(self, solicitudes: List[SolicitudMigratoriaEntity]) -> None:
+        self._repo.guardar_cambios_estado(solicitudes)
+        self._invalidar(s.codigo for s in solicitudes)
+
+    def eliminar(self, codigo: str) -> bool:
+        eliminada = self._repo.eliminar(codigo)
+        self._invalidar([codigo])
+        return eliminada
+
+
+_ENVOLTURAS = {
+    DjangoSolicitanteRepository: SolicitanteRepositoryEnCache,
+    DjangoAsesorRepository: AsesorRepositoryEnCache,
+    DjangoSolicitudMigratoriaRepository: SolicitudMigratoriaRepositoryEnCache,
+}
+
+
+def en_cache(repositorio: Any, ttl: Optional[int] = None) -> Any:
+    """
+    Envuelve el repositorio con su caché de lectura si la tiene y el TTL
+    (por defecto `SGPM_REPOSITORIOS_CACHE_TTL`) es positivo; si no, lo devuelve tal cual.
+    """
+    if ttl is None:
+        ttl = getattr(settings, 'SGPM_REPOSITORIOS_CACHE_TTL', 0)
+    envoltura = _ENVOLTURAS.get(type(repositorio))
+    if envoltura is None or ttl <= 0:
+        return repositorio
+    return envoltura(repositorio, ttl)
@@ -0,0 +1,113 @@
+"""
+Registro de los repositorios Django y de los servicios en el contenedor de la
+aplicación. Se ejecuta una vez al arrancar (`SgpmConfig.ready`).
+
+Los repositorios se registran por su interfaz del dominio, con la caché de
+lectura de `en_cache` donde la hay. Los servicios reciben los mismos
+colaboradores que les pasaban las vistas.
+"""
+from __future__ import annotations
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from SGPM.application.auth_service import AuthenticationService
+from SGPM.application.contenedor import Contenedor, contenedor as contenedor_aplicacion
+from SGPM.application.services import (
+    SolicitanteService,
+    AsesorService,
+    SolicitudMigratoriaService,
+    DocumentoService,
+    TareaService,
+    CitaService,
+    NotificacionService,
+    ReporteTareasService,
+    ExpedienteQueryService,
+)
+from SGPM.domain.repositories import (
+    SolicitanteRepository,
+    AsesorRepository,
+    SolicitudMigratoriaRepository,
+    ExpedienteRepository,
+    DocumentoRepository,
+    TareaRepository,
+    EstadisticaTareaRepository,
+    RecordatorioTareaRepository,
+    CitaRepository,
+    RecursoCitaRepository,
+    NotificacionRepository,
+)
+from .cache_repositorios import en_cache
+from .repositories import (
+    DjangoSolicitanteRepository,
+    DjangoAsesorRepository,
+    DjangoSolicitudMigratoriaRepository,
+    DjangoExpedienteRepository,
+    DjangoDocumentoRepository,
+    DjangoTareaRepository,
+    DjangoEstadisticaTareaRepository,
+    DjangoRecordatorioTareaRepository,
+    DjangoCitaRepository,
+    DjangoRecursoCitaRepository,
+    DjangoNotificacionRepository,
+)
+
+
+def registrar_servicios(contenedor: Contenedor) -> None:
+    """Registra en `contenedor` las fábricas de repositorios y servicios"""
+    # ========================================
+    # Repositorios
+    # ========================================
+    contenedor.registrar(SolicitanteRepository, lambda c: en_cache(DjangoSolicitanteRepository()))
+    contenedor.registrar(AsesorRepository, lambda c: en_cache(DjangoAsesorRepository()))
+    contenedor.registrar(SolicitudMigratoriaRepository, lambda c: en_cache(DjangoSolicitudMigratoriaRepository()))
+    contenedor.registrar(ExpedienteRepository, lambda c: DjangoExpedienteRepository())
+    contenedor.registrar(DocumentoRepository, lambda c: DjangoDocumentoRepository())
+    contenedor.registrar(TareaRepository, lambda c: DjangoTareaRepository())
+    contenedor.registrar(EstadisticaTareaRepository, lambda c: DjangoEstadisticaTareaRepository())
+    contenedor.registrar(RecordatorioTareaRepository, lambda c: DjangoRecordatorioTareaRepository())
+    contenedor.registrar(CitaRepository, lambda c: DjangoCitaRepository())
+    contenedor.registrar(RecursoCitaRepository, lambda c: DjangoRecursoCitaRepository())
+    contenedor.registrar(NotificacionRepository, lambda c: DjangoNotificacionRepository())
+
+    # ========================================
+    # Servicios
+    # ========================================
+    contenedor.registrar(SolicitanteService, lambda c: SolicitanteService(c.obtener(SolicitanteRepository)))
+    contenedor.registrar(AsesorService, lambda c: AsesorService(c.obtener(AsesorRepository)))
+    contenedor.registrar(SolicitudMigratoriaService, lambda c: SolicitudMigratoriaService(
+        c.obtener(SolicitudMigratoriaRepository),
+        solicitante_repo=c.obtener(SolicitanteRepository),
+        asesor_repo=c.obtener(AsesorRepository),
+    ))
+    contenedor.registrar(DocumentoService, lambda c: DocumentoService(
+        c.obtener(DocumentoRepository),
+        solicitud_repo=c.obtener(SolicitudMigratoriaRepository),
+    ))
+    contenedor.registrar(TareaService, lambda c: TareaService(
+        c.obtener(TareaRepository),
+        asesor_repo=c.obtener(AsesorRepository),
+        estadistica_repo=c.obtener(EstadisticaTareaRepository),
+    ))
+    contenedor.registrar(CitaService, lambda c: CitaService(
+        c.obtener(CitaRepository),
+        recurso_repo=c.obtener(RecursoCitaRepository),
+    ))
+    contenedor.registrar(NotificacionService, lambda c: NotificacionService(c.obtener(NotificacionRepository)))
+    contenedor.registrar(ReporteTareasService, lambda c: ReporteTareasService(
+        c.obtener(TareaRepository),
+        asesor_repo=c.obtener(AsesorRepository),
+        estadistica_repo=c.obtener(EstadisticaTareaRepository),
+    ))
+    contenedor.registrar(ExpedienteQueryService, lambda c: ExpedienteQueryService(
+        c.obtener(ExpedienteRepository),
+        c.obtener(SolicitanteRepository),
+    ))
+    contenedor.registrar(AuthenticationService, lambda c: AuthenticationService())
+
+
+@receiver(setting_changed)
+def _reiniciar_al_cambiar_ttl(setting, **kwargs):
+    # `en_cache` lee el TTL al crear el repositorio: con otro valor hay que rehacerlos
+    if setting == 'SGPM_REPOSITORIOS_CACHE_TTL':
+        contenedor_aplicacion.reiniciar()
@@ -1,6 +1,7 @@
 from django.db import models
 from django.core.validators import URLValidator
 from datetime import datetime
+from django.utils import timezone
 
 from SGPM.domain.enums import (
     RolUsuario,
@@ -11,6 +12,7 @@ from SGPM.domain.enums import (
     EstadoTarea,
     PrioridadTarea,
     TipoCita,
+    TipoRecursoCita,
     EstadoCita,
     TipoNotificacion,
 )
@@ -34,6 +36,12 @@ class Solicitante(models.Model):
     class Meta:
         db_table = 'solicitante'
         ordering = ['-fecha_creacion']
+        indexes = [
+            # Paginación por cursor (fecha_creacion, pk)
+            models.Index(fields=['fecha_creacion', 'id'], name='solicitante_keyset_idx'),
+            # obtener_por_correo
+            models.Index(fields=['correo'], name='solicitante_correo_idx'),
+        ]
 
     def __str__(self):
         return f"{self.nombres} {self.apellidos} ({self.cedula})"
@@ -118,6 +126,12 @@ class SolicitudMigratoria(models.Model):
     class Meta:
         db_table = 'solicitud_migratoria'
         ordering = ['-fecha_creacion']
+        indexes = [
+            # Paginación por cursor (fecha_creacion, pk)
+            models.Index(fields=['fecha_creacion', 'codigo'], name='solicitud_keyset_idx'),
+            # listar_por_estado: filtro por estado y orden por fecha de creación
+            models.Index(fields=['estado_actual', 'fecha_creacion'], name='solicitud_estado_idx'),
+        ]
 
     def __str__(self):
         return f"Solicitud {self.codigo} - {self.estado_actual}"
@@ -164,6 +178,10 @@ class Documento(models.Model):
     class Meta:
         db_table = 'documento'
         ordering = ['-fecha_creacion']
+        indexes = [
+            # listar_por_estado y barridos de expiración por estado
+            models.Index(fields=['estado', 'fecha_expiracion'], name='documento_estado_exp_idx'),
+        ]
 
     def __str__(self):
         return f"Documento {self.id_documento} - {self.tipo}"
@@ -212,11 +230,135 @@ class Tarea(models.Model):
     class Meta:
         db_table = 'tarea'
         ordering = ['-fecha_creacion']
+        indexes = [
+            # Paginación por cursor (fecha_creacion, pk), global y por asesor
+            models.Index(fields=['fecha_creacion', 'id_tarea'], name='tarea_keyset_idx'),
+            models.Index(
+                fields=['asignada_a', 'fecha_creacion', 'id_tarea'],
+                name='tarea_asesor_keyset_idx'
+            ),
+            # listar_por_estado: filtro por estado y orden por fecha de creación
+            models.Index(fields=['estado', 'fecha_creacion'], name='tarea_estado_idx'),
+            # listar_vencidas / listar_por_vencer: solo tareas abiertas, por vencimiento
+            models.Index(
+                fields=['vencimiento'],
+                name='tarea_abierta_venc_idx',
+                condition=~models.Q(estado=EstadoTarea.COMPLETADA.value),
+            ),
+        ]
 
     def __str__(self):
         return f"Tarea {self.id_tarea} - {self.titulo}"
 
 
+# ========================================
+# Modelo: EstadisticaTareaDiaria
+# ========================================
+class EstadisticaTareaDiaria(models.Model):
+    """
+    Conteo materializado de tareas por (día de vencimiento, asesor, estado, prioridad).
+    Lo mantiene TareaService en la misma transacción que cada cambio de tarea;
+    `reconstruir_estadisticas_tareas` lo recalcula desde la tabla de tareas.
+    """
+
+    ESTADO_TAREA_CHOICES = [(estado.value, estado.value) for estado in EstadoTarea]
+    PRIORIDAD_TAREA_CHOICES = [(prioridad.value, prioridad.value) for prioridad in PrioridadTarea]
+
+    dia = models.DateField(null=True, blank=True)  # None: tareas sin vencimiento
+    asesor_email = models.EmailField(blank=True, default='')  # '': tareas sin asignar
+    estado = models.CharField(max_length=20, choices=ESTADO_TAREA_CHOICES)
+    prioridad = models.CharField(max_length=20, choices=PRIORIDAD_TAREA_CHOICES)
+    cantidad = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'estadistica_tarea_diaria'
+        ordering = ['dia', 'asesor_email', 'estado', 'prioridad']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dia', 'asesor_email', 'estado', 'prioridad'],
+                name='estadistica_tarea_clave_uniq'
+            ),
+            # NULL no es igual a NULL en un índice único: se cubre aparte el caso sin día
+            models.UniqueConstraint(
+                fields=['asesor_email', 'estado', 'prioridad'],
+                condition=models.Q(dia__isnull=True),
+                name='estadistica_tarea_sin_dia_uniq'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.dia} {self.asesor_email or '-'} {self.estado}/{self.prioridad}: {self.cantidad}"
+
+
+# ========================================
+# Modelo: RecordatorioTareaEnviado
+# ========================================
+class RecordatorioTareaEnviado(models.Model):
+    """
+    Marca de recordatorio de vencimiento ya enviado para (tarea, vencimiento).
+    `lote` identifica el despacho que la insertó: con inserciones concurrentes,
+    cada despacho notifica solo las tareas cuyas marcas quedaron a su nombre.
+    """
+
+    tarea = models.ForeignKey(
+        Tarea,
+        on_delete=models.CASCADE,
+        related_name='recordatorios_enviados'
+    )
+    vencimiento = models.DateTimeField()
+    lote = models.CharField(max_length=32)
+    enviado_en = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'recordatorio_tarea_enviado'
+        ordering = ['-enviado_en']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tarea', 'vencimiento'],
+                name='recordatorio_tarea_venc_uniq'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['lote'], name='recordatorio_lote_idx'),
+        ]
+
+    def __str__(self):
+        return f"Recordatorio {self.tarea_id} ({self.vencimiento})"
+
+
+# ========================================
+# Modelo: RecursoCita
+# ========================================
+class RecursoCita(models.Model):
+    """Ventanilla o asesor que atiende citas, con su capacidad de citas simultáneas"""
+
+    TIPO_RECURSO_CHOICES = [(tipo.value, tipo.value) for tipo in TipoRecursoCita]
+
+    codigo = models.CharField(max_length=50, primary_key=True)
+    nombre = models.CharField(max_length=100, blank=True)
+    tipo = models.CharField(
+        max_length=20,
+        choices=TIPO_RECURSO_CHOICES,
+        default=TipoRecursoCita.VENTANILLA.value
+    )
+    capacidad = models.PositiveSmallIntegerField(default=1)
+    activo = models.BooleanField(default=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'recurso_cita'
+        ordering = ['codigo']
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(capacidad__gte=1),
+                name='recurso_cita_capacidad_positiva'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.codigo} ({self.tipo}, capacidad {self.capacidad})"
+
+
 # ========================================
 # Modelo: Cita
 # ========================================
@@ -232,6 +374,13 @@ class Cita(models.Model):
         on_delete=models.CASCADE,
         related_name='citas'
     )
+    recurso = models.ForeignKey(
+        RecursoCita,
+        on_delete=models.PROTECT,
+        related_name='citas',
+        null=True,
+        blank=True
+    )
     observacion = models.TextField(blank=True)
     tipo = models.CharField(
         max_length=30,
@@ -251,6 +400,29 @@ class Cita(models.Model):
     class Meta:
         db_table = 'cita'
         ordering = ['-fecha_creacion']
+        indexes = [
+            # Paginación por cursor (fecha_creacion, pk)
+            models.Index(fields=['fecha_creacion', 'id_cita'], name='cita_keyset_idx'),
+            # listar_por_rango_fecha: rango sobre el inicio
+            models.Index(fields=['inicio'], name='cita_inicio_idx'),
+            # verificar_disponibilidad: solapamiento solo contra citas activas
+            models.Index(
+                fields=['inicio', 'fin'],
+                name='cita_activa_rango_idx',
+                condition=~models.Q(
+                    estado__in=[EstadoCita.CANCELADA.value, EstadoCita.COMPLETADA.value]
+                ),
+            ),
+            models.Index(fields=['estado', 'fecha_creacion'], name='cita_estado_idx'),
+            # verificar_disponibilidad por recurso: solapamiento dentro de una ventanilla/asesor
+            models.Index(
+                fields=['recurso', 'inicio', 'fin'],
+                name='cita_recurso_activa_idx',
+                condition=~models.Q(
+                    estado__in=[EstadoCita.CANCELADA.value, EstadoCita.COMPLETADA.value]
+                ),
+            ),
+        ]
         constraints = [
             models.CheckConstraint(
                 condition=models.Q(fin__gt=models.F('inicio')),
@@ -262,6 +434,26 @@ class Cita(models.Model):
         return f"Cita {self.id_cita} - {self.tipo}"
 
 
+# ========================================
+# Modelo: BloqueoAgendaCita
+# ========================================
+class BloqueoAgendaCita(models.Model):
+    """
+    Fila de bloqueo por día de agenda. Reservar una cita bloquea (SELECT ... FOR
+    UPDATE) los días que toca, de modo que las reservas que podrían solaparse se
+    serializan entre la verificación de disponibilidad y la escritura.
+    """
+
+    dia = models.DateField(primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'bloqueo_agenda_cita'
+
+    def __str__(self):
+        return f"Bloqueo agenda {self.dia}"
+
+
 # ========================================
 # Modelo: Notificacion
 # ========================================
@@ -284,6 +476,16 @@ class Notificacion(models.Model):
     class Meta:
         db_table = 'notificacion'
         ordering = ['-fecha_creacion']
+        indexes = [
+            # listar_por_destinatario
+            models.Index(fields=['destinatario', 'fecha_creacion'], name='notif_destinatario_idx'),
+            # listar_no_leidas: bandeja de no leídas por destinatario
+            models.Index(
+                fields=['destinatario', 'fecha_creacion'],
+                name='notif_no_leidas_idx',
+                condition=models.Q(leida=False),
+            ),
+        ]
 
     def __str__(self):
         return f"Notificación {self.id_notificacion} - {self.tipo}"
@@ -304,11 +506,16 @@ class HistorialEstadoSolicitud(models.Model):
     estado_anterior = models.CharField(max_length=30, null=False)
     estado_nuevo = models.CharField(max_length=30, null=False)
     motivo = models.TextField(blank=True)
-    fecha_cambio = models.DateTimeField(auto_now_add=True)
+    # Momento del cambio en el dominio (no el de la escritura, que puede ir en lote)
+    fecha_cambio = models.DateTimeField(default=timezone.now)
 
     class Meta:
         db_table = 'historial_estado_solicitud'
         ordering = ['-fecha_cambio']
+        indexes = [
+            # Historial de una solicitud paginado por cursor (fecha_cambio, pk)
+            models.Index(fields=['solicitud', 'fecha_cambio', 'id'], name='hist_estado_solicitud_idx'),
+        ]
 
     def __str__(self):
         return f"Cambio {self.estado_anterior} -> {self.estado_nuevo} ({self.fecha_cambio})"
@@ -329,11 +536,16 @@ class HistorialFechaProceso(models.Model):
     campo = models.CharField(max_length=50, null=False)
     valor_anterior = models.DateField(null=True, blank=True)
     valor_nuevo = models.DateField(null=False)
-    fecha_cambio = models.DateTimeField(auto_now_add=True)
+    # Momento del cambio en el dominio (no el de la escritura, que puede ir en lote)
+    fecha_cambio = models.DateTimeField(default=timezone.now)
 
     class Meta:
         db_table = 'historial_fecha_proceso'
         ordering = ['-fecha_cambio']
+        indexes = [
+            # Historial de una solicitud paginado por cursor (fecha_cambio, pk)
+            models.Index(fields=['solicitud', 'fecha_cambio', 'id'], name='hist_fecha_solicitud_idx'),
+        ]
 
     def __str__(self):
         return f"Cambio {self.campo}: {self.valor_anterior} -> {self.valor_nuevo}"
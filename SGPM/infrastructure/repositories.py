@@ -4,19 +4,31 @@ Implementan los contratos definidos en domain.repositories usando Django ORM.
 """
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from typing import Optional, List
-
-from django.db.models import Q
+import base64
+import json
+from datetime import date, datetime, time, timedelta
+from dataclasses import dataclass
+from typing import Optional, List, Iterable, Iterator, Dict, Any, Set, Tuple
+
+from django.core.cache import cache
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Count, Exists, F, OuterRef, Prefetch, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
 
 from SGPM.domain.repositories import (
     SolicitanteRepository,
     AsesorRepository,
     SolicitudMigratoriaRepository,
+    ExpedienteRepository,
     DocumentoRepository,
     TareaRepository,
+    EstadisticaTareaRepository,
+    RecordatorioTareaRepository,
     CitaRepository,
+    RecursoCitaRepository,
     NotificacionRepository,
+    TAMANO_PAGINA,
 )
 from SGPM.domain.entities import (
     Solicitante as SolicitanteEntity,
@@ -25,6 +37,7 @@ from SGPM.domain.entities import (
     Documento as DocumentoEntity,
     Tarea as TareaEntity,
     Cita as CitaEntity,
+    RecursoCita as RecursoCitaEntity,
     Notificacion as NotificacionEntity,
 )
 from SGPM.domain.enums import (
@@ -35,29 +48,404 @@ from SGPM.domain.enums import (
     EstadoCita,
     TipoDocumento,
     TipoCita,
+    TipoRecursoCita,
     PrioridadTarea,
 )
-from SGPM.domain.value_objects import RangoFechaHora
+from SGPM.domain.exceptions import CitaInvalidaError
+from SGPM.domain.identificadores import nuevo_id
+from SGPM.domain.value_objects import RangoFechaHora, Pagina, ConteoTareas, FiltroReporteTareas, max_simultaneos
+from .unidad_de_trabajo import unidad_de_trabajo_actual
 from .models import (
     Solicitante as SolicitanteModel,
     Asesor as AsesorModel,
     SolicitudMigratoria as SolicitudMigratoriaModel,
+    HistorialEstadoSolicitud as HistorialEstadoSolicitudModel,
+    HistorialFechaProceso as HistorialFechaProcesoModel,
     Documento as DocumentoModel,
     Tarea as TareaModel,
+    EstadisticaTareaDiaria as EstadisticaTareaDiariaModel,
+    RecordatorioTareaEnviado as RecordatorioTareaEnviadoModel,
+    RecursoCita as RecursoCitaModel,
     Cita as CitaModel,
+    BloqueoAgendaCita as BloqueoAgendaCitaModel,
     Notificacion as NotificacionModel,
 )
 
 
+# Tamaño de lote para las operaciones masivas (bulk_create/bulk_update)
+BULK_BATCH_SIZE = 500
+
+# Filas por bloque al recorrer consultas con los métodos iterar_*
+ITER_CHUNK_SIZE = 2000
+
+# Segundos que vive en caché el contador de no leídas de un destinatario. Cada
+# escritura lo invalida; el TTL solo acota el desfase entre procesos cuando el
+# backend de caché no es compartido (LocMemCache).
+NO_LEIDAS_CACHE_TTL = 300
+
+
+def _bulk_upsert(model_cls, objs: List[Any], unique_fields: List[str],
+                 update_fields: List[str]) -> None:
+    """
+    Inserta o actualiza en lote con un único INSERT ... ON CONFLICT por lote.
+    MySQL/MariaDB no aceptan `unique_fields` (usan cualquier clave única).
+    """
+    if not objs:
+        return
+    opciones: Dict[str, Any] = {'update_conflicts': True, 'update_fields': update_fields}
+    if connections[router.db_for_write(model_cls)].features.supports_update_conflicts_with_target:
+        opciones['unique_fields'] = unique_fields
+    model_cls.objects.bulk_create(objs, batch_size=BULK_BATCH_SIZE, **opciones)
+
+
+def _codificar_cursor(fecha: datetime, pk: Any) -> str:
+    """Cursor opaco (base64 URL-safe) con la clave de orden de la última fila"""
+    crudo = json.dumps([fecha.isoformat(), str(pk)]).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip('=')
+
+
+def _decodificar_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inversa de `_codificar_cursor`; lanza ValueError si el cursor no es válido"""
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        fecha, pk = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        return datetime.fromisoformat(fecha), pk
+    except (ValueError, TypeError) as e:
+        raise ValueError("Cursor de paginación inválido") from e
+
+
+def _valores(queryset, columnas: Dict[str, str]):
+    """
+    `.values()` con las columnas renombradas: {clave de la fila: campo o lookup}.
+    Devuelve diccionarios sin instanciar modelos ni convertir a entidades.
+    """
+    campos = [clave for clave, origen in columnas.items() if clave == origen]
+    renombradas = {clave: F(origen) for clave, origen in columnas.items() if clave != origen}
+    return queryset.values(*campos, **renombradas)
+
+
+def _aware(momento: datetime) -> datetime:
+    """Interpreta un datetime naive en la zona horaria actual (las columnas son aware)"""
+    if timezone.is_naive(momento):
+        return timezone.make_aware(momento, timezone.get_current_timezone())
+    return momento
+
+
+# Estados en los que una tarea con vencimiento pasado cuenta como vencida
+ESTADOS_TAREA_ABIERTA = [EstadoTarea.PENDIENTE.value, EstadoTarea.EN_PROGRESO.value]
+
+
+def _contar_tareas(queryset, momento: datetime) -> List[ConteoTareas]:
+    """GROUP BY asesor, estado, prioridad sobre tareas, con las vencidas en `momento`"""
+    filas = (
+        queryset.order_by()
+        .values('asignada_a__email_asesor', 'estado', 'prioridad')
+        .annotate(
+            total=Count('pk'),
+            vencidas=Count('pk', filter=Q(estado__in=ESTADOS_TAREA_ABIERTA, vencimiento__lt=momento)),
+        )
+    )
+    return [
+        ConteoTareas(
+            asesor_email=fila['asignada_a__email_asesor'],
+            estado=EstadoTarea(fila['estado']),
+            prioridad=PrioridadTarea(fila['prioridad']),
+            total=fila['total'],
+            vencidas=fila['vencidas'],
+        )
+        for fila in filas
+    ]
+
+
+def _es_violacion_exclusion(error: IntegrityError) -> bool:
+    """True si el error viene de una restricción EXCLUDE de PostgreSQL (SQLSTATE 23P01)"""
+    causa = error.__cause__
+    return getattr(causa, 'sqlstate', None) == '23P01' or getattr(causa, 'pgcode', None) == '23P01'
+
+
+def _sin_duplicados(entidades: Iterable[Any], clave) -> List[Any]:
+    """Elimina entidades repetidas en el lote (gana la última aparición)"""
+    unicas: Dict[Any, Any] = {}
+    for entidad in entidades:
+        unicas[clave(entidad)] = entidad
+    return list(unicas.values())
+
+
+# Clave natural de los modelos cuyas filas se reutilizan para resolver claves foráneas
+_CLAVE_NATURAL = {
+    SolicitanteModel: 'cedula',
+    AsesorModel: 'email_asesor',
+    SolicitudMigratoriaModel: 'codigo',
+}
+
+
+def _recordar_filas(*filas: Any) -> None:
+    """Deja las filas en el mapa de identidad de la unidad de trabajo activa"""
+    uow = unidad_de_trabajo_actual()
+    if uow is None:
+        return
+    for fila in filas:
+        campo = _CLAVE_NATURAL.get(type(fila))
+        if campo:
+            uow.registrar_fila(type(fila), campo, getattr(fila, campo), fila)
+
+
+def _filas_por_clave(model_cls, valores: Iterable[Any]) -> Dict[Any, Any]:
+    """
+    `in_bulk` por clave natural que solo consulta las filas que la unidad de
+    trabajo activa no tiene ya cargadas.
+    """
+    campo = _CLAVE_NATURAL[model_cls]
+    uow = unidad_de_trabajo_actual()
+    encontradas: Dict[Any, Any] = {}
+    faltan = []
+    for valor in set(valores):
+        fila = uow.fila(model_cls, campo, valor) if uow is not None else None
+        if fila is None:
+            faltan.append(valor)
+        else:
+            encontradas[valor] = fila
+    if faltan:
+        nuevas = model_cls.objects.in_bulk(faltan, field_name=campo)
+        _recordar_filas(*nuevas.values())
+        encontradas.update(nuevas)
+    return encontradas
+
+
+# Entidades relacionadas compartidas dentro de un resultado: {(tipo, clave): entidad}
+Internadas = Dict[Tuple[type, Any], Any]
+
+
+def _internar(internadas: Optional[Internadas], tipo: type, clave: Any, crear) -> Any:
+    """
+    La misma clave da el mismo objeto dentro del resultado (p. ej. el asesor de
+    miles de tareas); sin `internadas`, una entidad nueva por fila.
+    """
+    if internadas is None:
+        return crear()
+    entidad = internadas.get((tipo, clave))
+    if entidad is None:
+        entidad = internadas[(tipo, clave)] = crear()
+    return entidad
+
+
+def _asesor_de(model: AsesorModel, internadas: Optional[Internadas] = None) -> AsesorEntity:
+    """Entidad del asesor relacionado (fila ya cargada con select_related)"""
+    return _internar(internadas, AsesorEntity, model.email_asesor, lambda: AsesorEntity(
+        nombres=model.nombres,
+        apellidos=model.apellidos,
+        emailAsesor=model.email_asesor,
+        rol=RolUsuario(model.rol),
+    ))
+
+
+def _solicitante_de(model: SolicitanteModel, internadas: Optional[Internadas] = None) -> SolicitanteEntity:
+    """Entidad del solicitante relacionado (fila ya cargada con select_related)"""
+    return _internar(internadas, SolicitanteEntity, model.cedula, lambda: SolicitanteEntity(
+        cedula=model.cedula,
+        nombres=model.nombres,
+        apellidos=model.apellidos,
+        correo=model.correo,
+        telefono=model.telefono,
+        fecha_nacimiento=model.fecha_nacimiento,
+    ))
+
+
+@dataclass(frozen=True)
+class PerfilCarga:
+    """
+    Perfil de carga declarativo de un repositorio: relaciones que `_to_entity`
+    recorre y que deben traerse junto con cada fila para evitar consultas N+1.
+    """
+    select_related: Tuple[str, ...] = ()
+    prefetch_related: Tuple[Any, ...] = ()  # nombres de relación u objetos Prefetch
+
+    def aplicar(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        return queryset
+
+
+class _DjangoRepositoryBase:
+    """Base de los repositorios Django: toda lectura parte de `_consulta()`"""
+
+    modelo = None
+    perfil_carga = PerfilCarga()
+    # Relaciones del estado rastreado: campo FK -> modelo, guardadas por su clave natural
+    relaciones: Dict[str, Any] = {}
+
+    def _consulta(self):
+        """QuerySet base con el perfil de carga del repositorio ya aplicado"""
+        return self.perfil_carga.aplicar(self.modelo.objects.all())
+
+    def _cargar(self, **filtro) -> Optional[Any]:
+        """Entidad de la única fila que cumple el filtro; la fila y sus relaciones quedan en el mapa de identidad"""
+        try:
+            model = self._consulta().get(**filtro)
+        except self.modelo.DoesNotExist:
+            return None
+        _recordar_filas(model, *(getattr(model, r) for r in self.perfil_carga.select_related))
+        return self._to_entity(model)
+
+    def _obtener(self, clave: Any, cargar) -> Optional[Any]:
+        """Lectura por clave a través del mapa de identidad de la unidad de trabajo activa"""
+        uow = unidad_de_trabajo_actual()
+        if uow is None:
+            return cargar()
+        entidad = uow.entidad(type(self), clave)
+        if entidad is None:
+            entidad = cargar()
+            if entidad is not None:
+                uow.registrar_entidad(type(self), clave, entidad)
+        return entidad
+
+    def _identificar(self, clave, entidades: Iterable[Any]) -> None:
+        """Registra en el mapa de identidad entidades recién escritas"""
+        uow = unidad_de_trabajo_actual()
+        if uow is not None:
+            for entidad in entidades:
+                uow.registrar_entidad(type(self), clave(entidad), entidad)
+
+    def _tablas_escritura(self) -> Set[str]:
+        """Tablas que toca `guardar_muchos`: la propia y las de sus claves foráneas"""
+        meta = self.modelo._meta
+        return {meta.db_table} | {
+            f.related_model._meta.db_table for f in meta.concrete_fields if f.is_relation
+        }
+
+    def _diferir(self, clave: Any, entidad: Any, estado: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Con una unidad de trabajo activa, marca la entidad como modificada en vez
+        de escribirla (se guardará en el volcado); si `estado` no difiere de lo
+        cargado no hay nada que marcar. False si hay que escribir ya: dentro de una
+        transacción abierta por el llamador la escritura debe formar parte de ella.
+        """
+        uow = unidad_de_trabajo_actual()
+        if uow is None or uow.volcando or transaction.get_connection().in_atomic_block:
+            return False
+        if estado is not None and entidad.cambios_desde_carga(estado) == {}:
+            return True
+        uow.registrar_modificada(self, clave, entidad, self._tablas_escritura())
+        return True
+
+    def confirmar_cambios(self) -> None:
+        """
+        Vuelca la unidad de trabajo activa (no solo este repositorio). Los servicios
+        lo llaman al terminar cada operación de escritura: así un error de la base
+        llega a quien la pidió y no al salir de la petición, con la respuesta ya
+        decidida. El mapa de identidad sigue vivo hasta el final de la petición.
+        """
+        uow = unidad_de_trabajo_actual()
+        if uow is not None and not uow.volcando:
+            uow.confirmar()
+
+    def _guardar_cambios(self, entidad: Any, filtro: Dict[str, Any], estado: Dict[str, Any]) -> bool:
+        """
+        Escritura parcial de una entidad cargada de la base: un único
+        UPDATE ... SET <columnas modificadas> WHERE <clave>, sin SELECT previo, y
+        ninguna escritura si nada cambió. False si hay que seguir por la escritura
+        completa: entidad nueva, relación que no existe o fila ya borrada.
+        """
+        cambios = entidad.cambios_desde_carga(estado)
+        if cambios is None:
+            return False
+        if cambios:
+            for campo, model_cls in self.relaciones.items():
+                clave = cambios.get(campo)
+                if clave is not None:
+                    cambios[campo] = _filas_por_clave(model_cls, [clave]).get(clave)
+                    if cambios[campo] is None:
+                        return False
+            ahora = timezone.now()
+            cambios.update({
+                f.attname: ahora for f in self.modelo._meta.concrete_fields if getattr(f, 'auto_now', False)
+            })
+            if not self.modelo.objects.filter(**filtro).update(**cambios):
+                return False
+        entidad.marcar_persistida(estado)
+        return True
+
+    def _olvidar(self) -> None:
+        uow = unidad_de_trabajo_actual()
+        if uow is not None:
+            uow.olvidar()
+
+    def _iterar(self, queryset) -> Iterator[Any]:
+        """
+        Recorre el QuerySet por bloques sin cachearlo, convirtiendo fila a fila.
+        Las entidades relacionadas se comparten dentro de cada bloque, no de todo
+        el recorrido, para que la memoria no crezca con el número de filas.
+        """
+        internadas: Internadas = {}
+        for i, model in enumerate(queryset.iterator(chunk_size=ITER_CHUNK_SIZE), 1):
+            yield self._to_entity(model, internadas)
+            if i % ITER_CHUNK_SIZE == 0:
+                internadas = {}
+
+    def _paginar(self, queryset, cursor: Optional[str], limite: int,
+                 campo_fecha: str = 'fecha_creacion', convertir=None,
+                 columnas: Optional[Dict[str, str]] = None) -> Pagina[Any]:
+        """
+        Paginación por cursor (keyset) sobre (campo_fecha, pk) descendente.
+        Cada página es un único SELECT ... WHERE (fecha, pk) < cursor LIMIT n,
+        con coste independiente de la profundidad, a diferencia de OFFSET.
+        Con `columnas` ({clave: campo o lookup}) las filas son diccionarios con
+        solo esas claves, leídos con `.values()`.
+        """
+        if limite < 1:
+            raise ValueError("El límite de la página debe ser mayor que cero")
+        pk = queryset.model._meta.pk
+        if columnas is not None:
+            # Las columnas de la clave de orden se leen para el cursor y luego se descartan
+            sobrantes = {campo_fecha, pk.attname} - set(columnas)
+            queryset = _valores(queryset, {**columnas, campo_fecha: campo_fecha, pk.attname: pk.attname})
+
+            def convertir(fila: Dict[str, Any]) -> Dict[str, Any]:
+                for clave in sobrantes:
+                    del fila[clave]
+                return fila
+        if convertir is None:
+            internadas: Internadas = {}
+
+            def convertir(model):
+                return self._to_entity(model, internadas)
+        queryset = queryset.order_by(f'-{campo_fecha}', f'-{pk.attname}')
+        if cursor:
+            fecha, valor = _decodificar_cursor(cursor)
+            try:
+                valor = pk.to_python(valor)
+            except Exception as e:
+                raise ValueError("Cursor de paginación inválido") from e
+            queryset = queryset.filter(
+                Q(**{f'{campo_fecha}__lt': fecha}) | Q(**{campo_fecha: fecha, 'pk__lt': valor})
+            )
+
+        # Se pide una fila extra solo para saber si existe una página siguiente
+        modelos = list(queryset[:limite + 1])
+        siguiente = None
+        if len(modelos) > limite:
+            modelos = modelos[:limite]
+            ultimo = modelos[-1]
+            if columnas is not None:
+                siguiente = _codificar_cursor(ultimo[campo_fecha], ultimo[pk.attname])
+            else:
+                siguiente = _codificar_cursor(getattr(ultimo, campo_fecha), ultimo.pk)
+        return Pagina([convertir(m) for m in modelos], siguiente)
+
+
 # ========================================
 # Repositorio: DjangoSolicitanteRepository
 # ========================================
-class DjangoSolicitanteRepository(SolicitanteRepository):
+class DjangoSolicitanteRepository(_DjangoRepositoryBase, SolicitanteRepository):
     """Implementación Django ORM del repositorio de Solicitante"""
 
-    def _to_entity(self, model: SolicitanteModel) -> SolicitanteEntity:
+    modelo = SolicitanteModel
+
+    def _to_entity(self, model: SolicitanteModel, internadas: Optional[Internadas] = None) -> SolicitanteEntity:
         """Convierte un modelo Django a entidad de dominio"""
-        return SolicitanteEntity(
+        entity = SolicitanteEntity(
             cedula=model.cedula,
             nombres=model.nombres,
             apellidos=model.apellidos,
@@ -65,6 +453,8 @@ class DjangoSolicitanteRepository(SolicitanteRepository):
             telefono=model.telefono,
             fecha_nacimiento=model.fecha_nacimiento,
         )
+        entity.marcar_persistida(self._valores(entity))
+        return entity
 
     def _to_model(self, entity: SolicitanteEntity) -> SolicitanteModel:
         """Convierte una entidad de dominio a modelo Django"""
@@ -80,38 +470,68 @@ class DjangoSolicitanteRepository(SolicitanteRepository):
         )
         return model
 
+    def _valores(self, solicitante: SolicitanteEntity) -> Dict[str, Any]:
+        """Columnas persistibles de la entidad (sin la clave natural)"""
+        return {
+            'nombres': solicitante._nombres,
+            'apellidos': solicitante._apellidos,
+            'correo': solicitante.obtener_correo(),
+            'telefono': solicitante._telefono,
+            'fecha_nacimiento': solicitante._fecha_nacimiento,
+        }
+
     def guardar(self, solicitante: SolicitanteEntity) -> SolicitanteEntity:
-        model, created = SolicitanteModel.objects.update_or_create(
-            cedula=solicitante.obtener_cedula(),
-            defaults={
-                'nombres': solicitante._nombres,
-                'apellidos': solicitante._apellidos,
-                'correo': solicitante.obtener_correo(),
-                'telefono': solicitante._telefono,
-                'fecha_nacimiento': solicitante._fecha_nacimiento,
-            }
-        )
+        cedula = solicitante.obtener_cedula()
+        estado = self._valores(solicitante)
+        if self._diferir(cedula, solicitante, estado):
+            return solicitante
+        if self._guardar_cambios(solicitante, {'cedula': cedula}, estado):
+            return solicitante
+        model, created = SolicitanteModel.objects.update_or_create(cedula=cedula, defaults=estado)
+        solicitante.marcar_persistida(estado)
         return self._to_entity(model)
 
+    def guardar_muchos(self, solicitantes: Iterable[SolicitanteEntity]) -> List[SolicitanteEntity]:
+        solicitantes = _sin_duplicados(solicitantes, lambda s: s.obtener_cedula())
+        models = [
+            SolicitanteModel(cedula=s.obtener_cedula(), **self._valores(s))
+            for s in solicitantes
+        ]
+        with transaction.atomic():
+            _bulk_upsert(
+                SolicitanteModel, models,
+                unique_fields=['cedula'],
+                update_fields=['nombres', 'apellidos', 'correo', 'telefono',
+                               'fecha_nacimiento', 'fecha_actualizacion'],
+            )
+        for solicitante in solicitantes:
+            solicitante.marcar_persistida(self._valores(solicitante))
+        self._identificar(lambda s: s.obtener_cedula(), solicitantes)
+        return [self._to_entity(m) for m in models]
+
     def obtener_por_cedula(self, cedula: str) -> Optional[SolicitanteEntity]:
-        try:
-            model = SolicitanteModel.objects.get(cedula=cedula)
-            return self._to_entity(model)
-        except SolicitanteModel.DoesNotExist:
-            return None
+        return self._obtener(cedula, lambda: self._cargar(cedula=cedula))
 
     def obtener_por_correo(self, correo: str) -> Optional[SolicitanteEntity]:
         try:
-            model = SolicitanteModel.objects.get(correo=correo)
+            model = self._consulta().get(correo=correo)
             return self._to_entity(model)
         except SolicitanteModel.DoesNotExist:
             return None
 
     def listar_todos(self) -> List[SolicitanteEntity]:
-        return [self._to_entity(m) for m in SolicitanteModel.objects.all()]
+        return list(self.iterar_todos())
+
+    def iterar_todos(self) -> Iterator[SolicitanteEntity]:
+        yield from self._iterar(self._consulta())
+
+    def listar_pagina(self, cursor: Optional[str] = None,
+                      limite: int = TAMANO_PAGINA) -> Pagina[SolicitanteEntity]:
+        return self._paginar(self._consulta(), cursor, limite)
 
     def eliminar(self, cedula: str) -> bool:
         deleted, _ = SolicitanteModel.objects.filter(cedula=cedula).delete()
+        self._olvidar()
         return deleted > 0
 
     def existe(self, cedula: str) -> bool:
@@ -121,43 +541,74 @@ class DjangoSolicitanteRepository(SolicitanteRepository):
 # ========================================
 # Repositorio: DjangoAsesorRepository
 # ========================================
-class DjangoAsesorRepository(AsesorRepository):
+class DjangoAsesorRepository(_DjangoRepositoryBase, AsesorRepository):
     """Implementación Django ORM del repositorio de Asesor"""
 
-    def _to_entity(self, model: AsesorModel) -> AsesorEntity:
-        return AsesorEntity(
+    modelo = AsesorModel
+
+    def _to_entity(self, model: AsesorModel, internadas: Optional[Internadas] = None) -> AsesorEntity:
+        entity = AsesorEntity(
             nombres=model.nombres,
             apellidos=model.apellidos,
             emailAsesor=model.email_asesor,
             rol=RolUsuario(model.rol),
         )
+        entity.marcar_persistida(self._valores(entity))
+        return entity
+
+    def _valores(self, asesor: AsesorEntity) -> Dict[str, Any]:
+        """Columnas persistibles de la entidad (sin la clave natural)"""
+        return {
+            'nombres': asesor.nombres,
+            'apellidos': asesor.apellidos,
+            'rol': asesor.rol.value,
+        }
 
     def guardar(self, asesor: AsesorEntity) -> AsesorEntity:
-        model, _ = AsesorModel.objects.update_or_create(
-            email_asesor=asesor.emailAsesor,
-            defaults={
-                'nombres': asesor.nombres,
-                'apellidos': asesor.apellidos,
-                'rol': asesor.rol.value,
-            }
-        )
+        estado = self._valores(asesor)
+        if self._diferir(asesor.emailAsesor, asesor, estado):
+            return asesor
+        if self._guardar_cambios(asesor, {'email_asesor': asesor.emailAsesor}, estado):
+            return asesor
+        model, _ = AsesorModel.objects.update_or_create(email_asesor=asesor.emailAsesor, defaults=estado)
+        asesor.marcar_persistida(estado)
         return self._to_entity(model)
 
+    def guardar_muchos(self, asesores: Iterable[AsesorEntity]) -> List[AsesorEntity]:
+        asesores = _sin_duplicados(asesores, lambda a: a.emailAsesor)
+        models = [
+            AsesorModel(email_asesor=a.emailAsesor, **self._valores(a))
+            for a in asesores
+        ]
+        with transaction.atomic():
+            _bulk_upsert(
+                AsesorModel, models,
+                unique_fields=['email_asesor'],
+                update_fields=['nombres', 'apellidos', 'rol', 'fecha_actualizacion'],
+            )
+        for asesor in asesores:
+            asesor.marcar_persistida(self._valores(asesor))
+        self._identificar(lambda a: a.emailAsesor, asesores)
+        return [self._to_entity(m) for m in models]
+
     def obtener_por_email(self, email: str) -> Optional[AsesorEntity]:
-        try:
-            model = AsesorModel.objects.get(email_asesor=email)
-            return self._to_entity(model)
-        except AsesorModel.DoesNotExist:
-            return None
+        return self._obtener(email, lambda: self._cargar(email_asesor=email))
 
     def listar_todos(self) -> List[AsesorEntity]:
-        return [self._to_entity(m) for m in AsesorModel.objects.all()]
+        return list(self.iterar_todos())
+
+    def iterar_todos(self) -> Iterator[AsesorEntity]:
+        yield from self._iterar(self._consulta())
 
     def listar_activos(self) -> List[AsesorEntity]:
-        return [self._to_entity(m) for m in AsesorModel.objects.filter(activo=True)]
+        return list(self.iterar_activos())
+
+    def iterar_activos(self) -> Iterator[AsesorEntity]:
+        yield from self._iterar(self._consulta().filter(activo=True))
 
     def eliminar(self, email: str) -> bool:
         deleted, _ = AsesorModel.objects.filter(email_asesor=email).delete()
+        self._olvidar()
         return deleted > 0
 
     def existe(self, email: str) -> bool:
@@ -167,36 +618,23 @@ class DjangoAsesorRepository(AsesorRepository):
 # ========================================
 # Repositorio: DjangoSolicitudMigratoriaRepository
 # ========================================
-class DjangoSolicitudMigratoriaRepository(SolicitudMigratoriaRepository):
+class DjangoSolicitudMigratoriaRepository(_DjangoRepositoryBase, SolicitudMigratoriaRepository):
     """Implementación Django ORM del repositorio de SolicitudMigratoria"""
 
-    def _to_entity(self, model: SolicitudMigratoriaModel) -> SolicitudMigratoriaEntity:
-        # Convertir solicitante si existe
-        solicitante = None
-        if model.solicitante:
-            solicitante = SolicitanteEntity(
-                cedula=model.solicitante.cedula,
-                nombres=model.solicitante.nombres,
-                apellidos=model.solicitante.apellidos,
-                correo=model.solicitante.correo,
-                telefono=model.solicitante.telefono,
-                fecha_nacimiento=model.solicitante.fecha_nacimiento,
-            )
+    modelo = SolicitudMigratoriaModel
+    perfil_carga = PerfilCarga(select_related=('solicitante', 'asesor'))
+    relaciones = {'solicitante': SolicitanteModel, 'asesor': AsesorModel}
 
-        # Convertir asesor si existe
-        asesor = None
-        if model.asesor:
-            asesor = AsesorEntity(
-                nombres=model.asesor.nombres,
-                apellidos=model.asesor.apellidos,
-                emailAsesor=model.asesor.email_asesor,
-                rol=RolUsuario(model.asesor.rol),
-            )
+    def _to_entity(self, model: SolicitudMigratoriaModel,
+                   internadas: Optional[Internadas] = None) -> SolicitudMigratoriaEntity:
+        # Solicitante y asesor si existen, compartidos con las demás filas del resultado
+        solicitante = _solicitante_de(model.solicitante, internadas) if model.solicitante else None
+        asesor = _asesor_de(model.asesor, internadas) if model.asesor else None
 
         from SGPM.domain.enums import TipoServicio
         tipo_servicio = TipoServicio(model.tipo_servicio) if model.tipo_servicio else None
 
-        return SolicitudMigratoriaEntity(
+        entity = SolicitudMigratoriaEntity(
             codigo=model.codigo,
             tipoServicio=tipo_servicio,
             estadoActual=EstadoSolicitud(model.estado_actual),
@@ -205,91 +643,418 @@ class DjangoSolicitudMigratoriaRepository(SolicitudMigratoriaRepository):
             solicitante=solicitante,
             asesor=asesor,
         )
+        # Fechas del proceso ya asignadas: sin ellas el siguiente guardar las borraría
+        # y el historial registraría un valor anterior vacío. Las vacías ya lo están
+        # en la entidad, que así no crea su diccionario de fechas
+        for campo, valor in (
+            ('fechaRecepcionDocs', model.fecha_recepcion_docs),
+            ('fechaEnvioSolicitud', model.fecha_envio_solicitud),
+            ('fechaCita', model.fecha_cita),
+        ):
+            if valor:
+                entity._fechas_proceso[campo] = valor.isoformat()
+        entity.marcar_persistida(self._estado(entity))
+        return entity
 
     def guardar(self, solicitud: SolicitudMigratoriaEntity) -> SolicitudMigratoriaEntity:
-        # Obtener o crear solicitante si existe
-        solicitante_model = None
-        if solicitud._solicitante:
-            solicitante_model, _ = SolicitanteModel.objects.get_or_create(
-                cedula=solicitud._solicitante.obtener_cedula(),
+        estado = self._estado(solicitud)
+        pendientes_estados, pendientes_fechas = solicitud.historial_pendiente()
+        sin_historial = not pendientes_estados and not pendientes_fechas
+        if self._diferir(solicitud.codigo, solicitud, estado if sin_historial else None):
+            return solicitud
+
+        with transaction.atomic():
+            if self._guardar_cambios(solicitud, {'codigo': solicitud.codigo}, estado):
+                self._escribir_historial([solicitud])
+                solicitud.confirmar_historial()
+                return solicitud
+
+            # Solicitante (se crea si no existe) y asesor, reutilizando las filas ya cargadas
+            solicitante_model = None
+            if solicitud._solicitante:
+                cedula = solicitud._solicitante.obtener_cedula()
+                solicitante_model = self._solicitantes_por_cedula([solicitud]).get(cedula)
+            asesor_model = None
+            if solicitud._asesor:
+                email = solicitud._asesor.emailAsesor
+                asesor_model = _filas_por_clave(AsesorModel, [email]).get(email)
+
+            model, _ = SolicitudMigratoriaModel.objects.update_or_create(
+                codigo=solicitud.codigo,
                 defaults={
-                    'nombres': solicitud._solicitante._nombres,
-                    'apellidos': solicitud._solicitante._apellidos,
-                    'correo': solicitud._solicitante.obtener_correo(),
-                    'telefono': solicitud._solicitante._telefono,
+                    **self._valores(solicitud),
+                    'solicitante': solicitante_model,
+                    'asesor': asesor_model,
                 }
             )
-
-        # Obtener asesor si existe
-        asesor_model = None
-        if solicitud._asesor:
-            asesor_model = AsesorModel.objects.filter(
-                email_asesor=solicitud._asesor.emailAsesor
-            ).first()
-
-        model, _ = SolicitudMigratoriaModel.objects.update_or_create(
-            codigo=solicitud.codigo,
-            defaults={
-                'tipo_servicio': solicitud.tipoServicio.value if solicitud.tipoServicio else None,
-                'estado_actual': solicitud.estadoActual.value,
-                'fecha_expiracion': solicitud._fecha_expiracion,
-                'solicitante': solicitante_model,
-                'asesor': asesor_model,
-                'fecha_recepcion_docs': solicitud.obtener_fecha_proceso('fechaRecepcionDocs'),
-                'fecha_envio_solicitud': solicitud.obtener_fecha_proceso('fechaEnvioSolicitud'),
-                'fecha_cita': solicitud.obtener_fecha_proceso('fechaCita'),
-            }
-        )
+            self._escribir_historial([solicitud])
+        solicitud.confirmar_historial()
+        solicitud.marcar_persistida(estado)
         return self._to_entity(model)
 
+    def _escribir_historial(self, solicitudes: List[SolicitudMigratoriaEntity]) -> None:
+        """
+        Vuelca el historial pendiente de las solicitudes con un bulk_create por
+        tabla. Debe llamarse dentro de la transacción que guarda las solicitudes.
+        """
+        estados: List[HistorialEstadoSolicitudModel] = []
+        fechas: List[HistorialFechaProcesoModel] = []
+        for solicitud in solicitudes:
+            pendientes_estados, pendientes_fechas = solicitud.historial_pendiente()
+            estados.extend(
+                HistorialEstadoSolicitudModel(
+                    solicitud_id=solicitud.codigo,
+                    usuario=e['usuario'],
+                    estado_anterior=e['anterior'],
+                    estado_nuevo=e['nuevo'],
+                    motivo=e.get('motivo') or '',
+                    fecha_cambio=_aware(e.get('momento') or timezone.now()),
+                )
+                for e in pendientes_estados
+            )
+            fechas.extend(
+                HistorialFechaProcesoModel(
+                    solicitud_id=solicitud.codigo,
+                    usuario=f['usuario'],
+                    campo=f['campo'],
+                    valor_anterior=f['valorAnterior'],
+                    valor_nuevo=f['valorNuevo'],
+                    fecha_cambio=_aware(f.get('momento') or timezone.now()),
+                )
+                for f in pendientes_fechas
+            )
+        if estados:
+            HistorialEstadoSolicitudModel.objects.bulk_create(estados, batch_size=BULK_BATCH_SIZE)
+        if fechas:
+            HistorialFechaProcesoModel.objects.bulk_create(fechas, batch_size=BULK_BATCH_SIZE)
+
+    def _valores(self, solicitud: SolicitudMigratoriaEntity) -> Dict[str, Any]:
+        """Columnas propias de la solicitud (sin relaciones ni clave)"""
+        return {
+            'tipo_servicio': solicitud.tipoServicio.value if solicitud.tipoServicio else None,
+            'estado_actual': solicitud.estadoActual.value,
+            'fecha_expiracion': solicitud._fecha_expiracion,
+            'fecha_recepcion_docs': solicitud.obtener_fecha_proceso('fechaRecepcionDocs'),
+            'fecha_envio_solicitud': solicitud.obtener_fecha_proceso('fechaEnvioSolicitud'),
+            'fecha_cita': solicitud.obtener_fecha_proceso('fechaCita'),
+        }
+
+    def _estado(self, solicitud: SolicitudMigratoriaEntity) -> Dict[str, Any]:
+        """Estado rastreado: columnas propias más las relaciones por su clave natural"""
+        return {
+            **self._valores(solicitud),
+            'solicitante': solicitud._solicitante.obtener_cedula() if solicitud._solicitante else None,
+            'asesor': solicitud._asesor.emailAsesor if solicitud._asesor else None,
+        }
+
+    def _solicitantes_por_cedula(self, solicitudes: List[SolicitudMigratoriaEntity]) -> Dict[str, SolicitanteModel]:
+        """
+        Resuelve los solicitantes del lote con una consulta; los que no existen
+        se crean con un único bulk_create (equivalente masivo del get_or_create).
+        """
+        pendientes = {
+            s._solicitante.obtener_cedula(): s._solicitante
+            for s in solicitudes if s._solicitante
+        }
+        if not pendientes:
+            return {}
+        existentes = _filas_por_clave(SolicitanteModel, pendientes)
+        nuevos = [
+            SolicitanteModel(
+                cedula=cedula,
+                nombres=sol._nombres,
+                apellidos=sol._apellidos,
+                correo=sol.obtener_correo(),
+                telefono=sol._telefono,
+            )
+            for cedula, sol in pendientes.items() if cedula not in existentes
+        ]
+        if nuevos:
+            SolicitanteModel.objects.bulk_create(
+                nuevos, batch_size=BULK_BATCH_SIZE, ignore_conflicts=True
+            )
+            creados = SolicitanteModel.objects.in_bulk([m.cedula for m in nuevos], field_name='cedula')
+            _recordar_filas(*creados.values())
+            existentes.update(creados)
+        return existentes
+
+    def guardar_muchos(self, solicitudes: Iterable[SolicitudMigratoriaEntity]) -> List[SolicitudMigratoriaEntity]:
+        solicitudes = _sin_duplicados(solicitudes, lambda s: s.codigo)
+        with transaction.atomic():
+            solicitantes = self._solicitantes_por_cedula(solicitudes)
+            asesores = _filas_por_clave(AsesorModel, {s._asesor.emailAsesor for s in solicitudes if s._asesor})
+
+            models = [
+                SolicitudMigratoriaModel(
+                    codigo=s.codigo,
+                    solicitante=solicitantes.get(s._solicitante.obtener_cedula()) if s._solicitante else None,
+                    asesor=asesores.get(s._asesor.emailAsesor) if s._asesor else None,
+                    **self._valores(s),
+                )
+                for s in solicitudes
+            ]
+            _bulk_upsert(
+                SolicitudMigratoriaModel, models,
+                unique_fields=['codigo'],
+                update_fields=[
+                    'tipo_servicio', 'estado_actual', 'fecha_expiracion', 'solicitante',
+                    'asesor', 'fecha_recepcion_docs', 'fecha_envio_solicitud', 'fecha_cita',
+                    'fecha_ultima_actualizacion',
+                ],
+            )
+            self._escribir_historial(solicitudes)
+        for solicitud in solicitudes:
+            solicitud.confirmar_historial()
+            solicitud.marcar_persistida(self._estado(solicitud))
+        self._identificar(lambda s: s.codigo, solicitudes)
+        internadas: Internadas = {}
+        return [self._to_entity(m, internadas) for m in models]
+
     def obtener_por_codigo(self, codigo: str) -> Optional[SolicitudMigratoriaEntity]:
-        try:
-            model = SolicitudMigratoriaModel.objects.select_related(
-                'solicitante', 'asesor'
-            ).get(codigo=codigo)
-            return self._to_entity(model)
-        except SolicitudMigratoriaModel.DoesNotExist:
-            return None
+        return self._obtener(codigo, lambda: self._cargar(codigo=codigo))
+
+    def _tablas_escritura(self) -> Set[str]:
+        return super()._tablas_escritura() | {
+            HistorialEstadoSolicitudModel._meta.db_table,
+            HistorialFechaProcesoModel._meta.db_table,
+        }
+
+    def transaccion(self):
+        return transaction.atomic()
+
+    def obtener_por_codigos(self, codigos: Iterable[str],
+                            bloquear: bool = False) -> Dict[str, SolicitudMigratoriaEntity]:
+        codigos = list(codigos)
+        consulta = self._consulta().filter(codigo__in=codigos)
+        if bloquear:
+            if connections[router.db_for_write(SolicitudMigratoriaModel)].features.has_select_for_update:
+                # Solo la fila de la solicitud: las relaciones nulables van por LEFT JOIN
+                consulta = consulta.select_for_update(of=('self',))
+            else:
+                # SQLite ignora FOR UPDATE: un UPDATE sin cambios toma el bloqueo de escritura
+                # antes de leer, en lugar de subir de lectura a escritura al guardar
+                SolicitudMigratoriaModel.objects.filter(codigo__in=codigos).update(
+                    estado_actual=F('estado_actual')
+                )
+        internadas: Internadas = {}
+        return {model.codigo: self._to_entity(model, internadas) for model in consulta}
+
+    def obtener_para_actualizar(self, codigo: str) -> Optional[SolicitudMigratoriaEntity]:
+        """Fila bloqueada (SQLite ignora FOR UPDATE: un UPDATE sin cambios toma el bloqueo)"""
+        consulta = self._consulta().filter(codigo=codigo)
+        if connections[router.db_for_write(SolicitudMigratoriaModel)].features.has_select_for_update:
+            consulta = consulta.select_for_update(of=('self',))
+        else:
+            SolicitudMigratoriaModel.objects.filter(codigo=codigo).update(estado_actual=F('estado_actual'))
+        model = consulta.first()
+        return self._to_entity(model) if model else None
+
+    def guardar_cambios_estado(self, solicitudes: List[SolicitudMigratoriaEntity]) -> None:
+        """Un UPDATE ... CASE en lote para el estado y un INSERT en lote para el historial"""
+        if not solicitudes:
+            return
+        ahora = timezone.now()
+        # bulk_update no aplica auto_now: la fecha de actualización se asigna aquí
+        models = [
+            SolicitudMigratoriaModel(
+                codigo=s.codigo,
+                estado_actual=s.estadoActual.value,
+                fecha_ultima_actualizacion=ahora,
+            )
+            for s in solicitudes
+        ]
+        with transaction.atomic():
+            SolicitudMigratoriaModel.objects.bulk_update(
+                models, ['estado_actual', 'fecha_ultima_actualizacion'], batch_size=BULK_BATCH_SIZE
+            )
+            self._escribir_historial(solicitudes)
+        for solicitud in solicitudes:
+            solicitud.confirmar_historial()
+            solicitud.actualizar_persistido(estado_actual=solicitud.estadoActual.value)
+        self._identificar(lambda s: s.codigo, solicitudes)
+
+    def codigos_elegibles(self, nuevo: EstadoSolicitud,
+                          codigos: Optional[Iterable[str]] = None) -> Set[str]:
+        """SELECT codigo ... WHERE estado_actual IN (orígenes de `nuevo`), sobre solicitud_estado_idx"""
+        origenes = SolicitudMigratoriaEntity.origenes_validos(nuevo)
+        if not origenes:
+            return set()
+        consulta = SolicitudMigratoriaModel.objects.filter(estado_actual__in=[e.value for e in origenes])
+        if codigos is not None:
+            consulta = consulta.filter(codigo__in=list(codigos))
+        return set(consulta.order_by().values_list('codigo', flat=True))
 
     def listar_todas(self) -> List[SolicitudMigratoriaEntity]:
-        return [
-            self._to_entity(m) for m in
-            SolicitudMigratoriaModel.objects.select_related('solicitante', 'asesor').all()
-        ]
+        return list(self.iterar_todas())
+
+    def iterar_todas(self) -> Iterator[SolicitudMigratoriaEntity]:
+        yield from self._iterar(self._consulta())
+
+    def listar_pagina(self, cursor: Optional[str] = None,
+                      limite: int = TAMANO_PAGINA) -> Pagina[SolicitudMigratoriaEntity]:
+        return self._paginar(self._consulta(), cursor, limite)
+
+    # Columnas del listado de solicitudes: {clave de la fila: campo}
+    COLUMNAS_RESUMEN = {
+        'codigo': 'codigo',
+        'tipo_servicio': 'tipo_servicio',
+        'estado_actual': 'estado_actual',
+        'fecha_creacion': 'fecha_creacion',
+        'fecha_expiracion': 'fecha_expiracion',
+        'solicitante_cedula': 'solicitante__cedula',
+    }
+
+    def listar_pagina_resumen(self, cursor: Optional[str] = None,
+                              limite: int = TAMANO_PAGINA) -> Pagina[Dict[str, Any]]:
+        return self._paginar(
+            SolicitudMigratoriaModel.objects.all(), cursor, limite, columnas=self.COLUMNAS_RESUMEN
+        )
+
+    @staticmethod
+    def _entrada_estado(model: HistorialEstadoSolicitudModel) -> Dict[str, Any]:
+        """Entrada del historial de estados con el mismo formato que la entidad"""
+        return {
+            "usuario": model.usuario,
+            "anterior": model.estado_anterior,
+            "nuevo": model.estado_nuevo,
+            "fecha": timezone.localdate(model.fecha_cambio).isoformat(),
+            "motivo": model.motivo,
+            "momento": model.fecha_cambio,
+        }
+
+    @staticmethod
+    def _entrada_fecha(model: HistorialFechaProcesoModel) -> Dict[str, Any]:
+        """Entrada del historial de fechas con el mismo formato que la entidad"""
+        return {
+            "usuario": model.usuario,
+            "campo": model.campo,
+            "valorAnterior": model.valor_anterior.isoformat() if model.valor_anterior else None,
+            "valorNuevo": model.valor_nuevo.isoformat(),
+            "fecha": timezone.localdate(model.fecha_cambio).isoformat(),
+            "momento": model.fecha_cambio,
+        }
+
+    def iterar_historial_estados(self, codigo: str) -> Iterator[Dict[str, Any]]:
+        consulta = HistorialEstadoSolicitudModel.objects.filter(solicitud_id=codigo).order_by('-fecha_cambio', '-id')
+        for model in consulta.iterator(chunk_size=ITER_CHUNK_SIZE):
+            yield self._entrada_estado(model)
+
+    def listar_pagina_historial_estados(self, codigo: str, cursor: Optional[str] = None,
+                                        limite: int = TAMANO_PAGINA) -> Pagina[Dict[str, Any]]:
+        return self._paginar(
+            HistorialEstadoSolicitudModel.objects.filter(solicitud_id=codigo), cursor, limite,
+            campo_fecha='fecha_cambio', convertir=self._entrada_estado,
+        )
+
+    def iterar_historial_fechas(self, codigo: str) -> Iterator[Dict[str, Any]]:
+        consulta = HistorialFechaProcesoModel.objects.filter(solicitud_id=codigo).order_by('-fecha_cambio', '-id')
+        for model in consulta.iterator(chunk_size=ITER_CHUNK_SIZE):
+            yield self._entrada_fecha(model)
+
+    def listar_pagina_historial_fechas(self, codigo: str, cursor: Optional[str] = None,
+                                       limite: int = TAMANO_PAGINA) -> Pagina[Dict[str, Any]]:
+        return self._paginar(
+            HistorialFechaProcesoModel.objects.filter(solicitud_id=codigo), cursor, limite,
+            campo_fecha='fecha_cambio', convertir=self._entrada_fecha,
+        )
 
     def listar_por_estado(self, estado: EstadoSolicitud) -> List[SolicitudMigratoriaEntity]:
-        return [
-            self._to_entity(m) for m in
-            SolicitudMigratoriaModel.objects.filter(estado_actual=estado.value)
-        ]
+        return list(self.iterar_por_estado(estado))
+
+    def iterar_por_estado(self, estado: EstadoSolicitud) -> Iterator[SolicitudMigratoriaEntity]:
+        yield from self._iterar(self._consulta().filter(estado_actual=estado.value))
 
     def listar_por_solicitante(self, cedula: str) -> List[SolicitudMigratoriaEntity]:
-        return [
-            self._to_entity(m) for m in
-            SolicitudMigratoriaModel.objects.filter(solicitante__cedula=cedula)
-        ]
+        return list(self.iterar_por_solicitante(cedula))
+
+    def iterar_por_solicitante(self, cedula: str) -> Iterator[SolicitudMigratoriaEntity]:
+        yield from self._iterar(self._consulta().filter(solicitante__cedula=cedula))
 
     def listar_por_asesor(self, email_asesor: str) -> List[SolicitudMigratoriaEntity]:
-        return [
-            self._to_entity(m) for m in
-            SolicitudMigratoriaModel.objects.filter(asesor__email_asesor=email_asesor)
-        ]
+        return list(self.iterar_por_asesor(email_asesor))
+
+    def iterar_por_asesor(self, email_asesor: str) -> Iterator[SolicitudMigratoriaEntity]:
+        yield from self._iterar(self._consulta().filter(asesor__email_asesor=email_asesor))
 
     def eliminar(self, codigo: str) -> bool:
         deleted, _ = SolicitudMigratoriaModel.objects.filter(codigo=codigo).delete()
+        self._olvidar()
         return deleted > 0
 
     def existe(self, codigo: str) -> bool:
         return SolicitudMigratoriaModel.objects.filter(codigo=codigo).exists()
 
 
+# ========================================
+# Repositorio: DjangoExpedienteRepository
+# ========================================
+class DjangoExpedienteRepository(_DjangoRepositoryBase, ExpedienteRepository):
+    """
+    Carga de expedientes con prefetch_related: un SELECT de las solicitudes (con
+    solicitante y asesor) y uno por cada relación, es decir 6 consultas en total
+    tanto para un expediente con una cita como para uno con cientos.
+    """
+
+    modelo = SolicitudMigratoriaModel
+    perfil_carga = PerfilCarga(
+        select_related=('solicitante', 'asesor'),
+        prefetch_related=(
+            Prefetch('documentos', queryset=DocumentoModel.objects.order_by('-fecha_creacion')),
+            Prefetch('citas', queryset=CitaModel.objects.order_by('inicio')),
+            Prefetch('tareas', queryset=TareaModel.objects.select_related('asignada_a').order_by('vencimiento')),
+            Prefetch('historial_estados',
+                     queryset=HistorialEstadoSolicitudModel.objects.order_by('-fecha_cambio', '-id')),
+            Prefetch('historial_fechas',
+                     queryset=HistorialFechaProcesoModel.objects.order_by('-fecha_cambio', '-id')),
+        ),
+    )
+
+    def __init__(self):
+        # Se reutilizan las conversiones de cada repositorio; ninguna consulta por fila
+        self._solicitudes = DjangoSolicitudMigratoriaRepository()
+        self._documentos = DjangoDocumentoRepository()
+        self._citas = DjangoCitaRepository()
+        self._tareas = DjangoTareaRepository()
+
+    def _to_entity(self, model: SolicitudMigratoriaModel,
+                   internadas: Optional[Internadas] = None) -> SolicitudMigratoriaEntity:
+        internadas = {} if internadas is None else internadas
+        solicitud = self._solicitudes._to_entity(model, internadas)
+        for documento in model.documentos.all():
+            solicitud.agregar_documento(self._documentos._to_entity(documento))
+        for cita in model.citas.all():
+            solicitud.agregar_cita(self._citas._to_entity(cita))
+        for tarea in model.tareas.all():
+            solicitud.agregar_tarea(self._tareas._to_entity(tarea, internadas))
+        solicitud._historial_estados = [
+            DjangoSolicitudMigratoriaRepository._entrada_estado(h) for h in model.historial_estados.all()
+        ]
+        solicitud._historial_fechas = [
+            DjangoSolicitudMigratoriaRepository._entrada_fecha(h) for h in model.historial_fechas.all()
+        ]
+        solicitud.confirmar_historial()
+        return solicitud
+
+    def listar_por_solicitante(self, cedula: str) -> List[SolicitudMigratoriaEntity]:
+        consulta = self._consulta().filter(solicitante__cedula=cedula).order_by('-fecha_creacion')
+        internadas: Internadas = {}
+        return [self._to_entity(m, internadas) for m in consulta]
+
+    def obtener_por_codigo(self, codigo: str) -> Optional[SolicitudMigratoriaEntity]:
+        model = self._consulta().filter(codigo=codigo).first()
+        return self._to_entity(model) if model else None
+
+
 # ========================================
 # Repositorio: DjangoDocumentoRepository
 # ========================================
-class DjangoDocumentoRepository(DocumentoRepository):
+class DjangoDocumentoRepository(_DjangoRepositoryBase, DocumentoRepository):
     """Implementación Django ORM del repositorio de Documento"""
 
-    def _to_entity(self, model: DocumentoModel) -> DocumentoEntity:
+    modelo = DocumentoModel
+    relaciones = {'solicitud': SolicitudMigratoriaModel}
+
+    def _to_entity(self, model: DocumentoModel, internadas: Optional[Internadas] = None) -> DocumentoEntity:
         entity = DocumentoEntity(
             id_documento=model.id_documento,
             tipo=TipoDocumento(model.tipo),
@@ -298,47 +1063,73 @@ class DjangoDocumentoRepository(DocumentoRepository):
         entity._fecha_expiracion = model.fecha_expiracion
         entity._version_actual = model.version_actual
         entity._observacion = model.observacion
+        entity.marcar_persistida({**self._valores(entity), 'solicitud': model.solicitud_id})
         return entity
 
+    def _valores(self, documento: DocumentoEntity) -> Dict[str, Any]:
+        """Columnas propias del documento (sin relaciones ni clave)"""
+        return {
+            'tipo': documento.obtener_tipo().value if isinstance(documento.obtener_tipo(), TipoDocumento) else documento.obtener_tipo(),
+            'estado': documento._estado.value,
+            'fecha_expiracion': documento._fecha_expiracion,
+            'version_actual': documento._version_actual,
+            'observacion': documento._observacion,
+        }
+
     def guardar(self, documento: DocumentoEntity, solicitud_codigo: str) -> DocumentoEntity:
+        estado = {**self._valores(documento), 'solicitud': solicitud_codigo}
+        if self._guardar_cambios(documento, {'id_documento': documento.obtener_id()}, estado):
+            return documento
         solicitud = SolicitudMigratoriaModel.objects.get(codigo=solicitud_codigo)
         model, _ = DocumentoModel.objects.update_or_create(
             id_documento=documento.obtener_id(),
-            defaults={
-                'solicitud': solicitud,
-                'tipo': documento.obtener_tipo().value if isinstance(documento.obtener_tipo(), TipoDocumento) else documento.obtener_tipo(),
-                'estado': documento._estado.value,
-                'fecha_expiracion': documento._fecha_expiracion,
-                'version_actual': documento._version_actual,
-                'observacion': documento._observacion,
-            }
+            defaults={'solicitud': solicitud, **self._valores(documento)},
         )
+        documento.marcar_persistida(estado)
         return self._to_entity(model)
 
+    def guardar_muchos(self, documentos: Iterable[DocumentoEntity], solicitud_codigo: str) -> List[DocumentoEntity]:
+        documentos = _sin_duplicados(documentos, lambda d: d.obtener_id())
+        with transaction.atomic():
+            solicitud = SolicitudMigratoriaModel.objects.get(codigo=solicitud_codigo)
+            models = [
+                DocumentoModel(id_documento=d.obtener_id(), solicitud=solicitud, **self._valores(d))
+                for d in documentos
+            ]
+            _bulk_upsert(
+                DocumentoModel, models,
+                unique_fields=['id_documento'],
+                update_fields=['solicitud', 'tipo', 'estado', 'fecha_expiracion',
+                               'version_actual', 'observacion', 'fecha_actualizacion'],
+            )
+        for documento in documentos:
+            documento.marcar_persistida({**self._valores(documento), 'solicitud': solicitud_codigo})
+        return [self._to_entity(m) for m in models]
+
     def obtener_por_id(self, id_documento: str) -> Optional[DocumentoEntity]:
         try:
-            model = DocumentoModel.objects.get(id_documento=id_documento)
+            model = self._consulta().get(id_documento=id_documento)
             return self._to_entity(model)
         except DocumentoModel.DoesNotExist:
             return None
 
     def listar_por_solicitud(self, solicitud_codigo: str) -> List[DocumentoEntity]:
-        return [
-            self._to_entity(m) for m in
-            DocumentoModel.objects.filter(solicitud__codigo=solicitud_codigo)
-        ]
+        return list(self.iterar_por_solicitud(solicitud_codigo))
+
+    def iterar_por_solicitud(self, solicitud_codigo: str) -> Iterator[DocumentoEntity]:
+        yield from self._iterar(self._consulta().filter(solicitud__codigo=solicitud_codigo))
 
     def listar_por_estado(self, estado: EstadoDocumento) -> List[DocumentoEntity]:
-        return [
-            self._to_entity(m) for m in
-            DocumentoModel.objects.filter(estado=estado.value)
-        ]
+        return list(self.iterar_por_estado(estado))
+
+    def iterar_por_estado(self, estado: EstadoDocumento) -> Iterator[DocumentoEntity]:
+        yield from self._iterar(self._consulta().filter(estado=estado.value))
 
     def listar_por_tipo(self, tipo: TipoDocumento) -> List[DocumentoEntity]:
-        return [
-            self._to_entity(m) for m in
-            DocumentoModel.objects.filter(tipo=tipo.value)
-        ]
+        return list(self.iterar_por_tipo(tipo))
+
+    def iterar_por_tipo(self, tipo: TipoDocumento) -> Iterator[DocumentoEntity]:
+        yield from self._iterar(self._consulta().filter(tipo=tipo.value))
 
     def eliminar(self, id_documento: str) -> bool:
         deleted, _ = DocumentoModel.objects.filter(id_documento=id_documento).delete()
@@ -351,20 +1142,16 @@ class DjangoDocumentoRepository(DocumentoRepository):
 # ========================================
 # Repositorio: DjangoTareaRepository
 # ========================================
-class DjangoTareaRepository(TareaRepository):
+class DjangoTareaRepository(_DjangoRepositoryBase, TareaRepository):
     """Implementación Django ORM del repositorio de Tarea"""
 
-    def _to_entity(self, model: TareaModel) -> TareaEntity:
-        asesor = None
-        if model.asignada_a:
-            asesor = AsesorEntity(
-                nombres=model.asignada_a.nombres,
-                apellidos=model.asignada_a.apellidos,
-                emailAsesor=model.asignada_a.email_asesor,
-                rol=RolUsuario(model.asignada_a.rol),
-            )
+    modelo = TareaModel
+    perfil_carga = PerfilCarga(select_related=('asignada_a',))
+    relaciones = {'asignada_a': AsesorModel}
 
-        return TareaEntity(
+    def _to_entity(self, model: TareaModel, internadas: Optional[Internadas] = None) -> TareaEntity:
+        asesor = _asesor_de(model.asignada_a, internadas) if model.asignada_a else None
+        entity = TareaEntity(
             idTarea=model.id_tarea,
             titulo=model.titulo,
             prioridad=PrioridadTarea(model.prioridad),
@@ -373,174 +1160,653 @@ class DjangoTareaRepository(TareaRepository):
             estado=EstadoTarea(model.estado),
             asignadaA=asesor,
         )
+        entity.marcar_persistida(self._estado(entity))
+        return entity
 
     def guardar(self, tarea: TareaEntity) -> TareaEntity:
+        estado = self._estado(tarea)
+        if self._diferir(tarea.idTarea, tarea, estado):
+            return tarea
+        if self._guardar_cambios(tarea, {'id_tarea': tarea.idTarea}, estado):
+            return tarea
         asesor_model = None
         if tarea.asignadaA:
-            asesor_model = AsesorModel.objects.filter(
-                email_asesor=tarea.asignadaA.emailAsesor
-            ).first()
+            email = tarea.asignadaA.emailAsesor
+            asesor_model = _filas_por_clave(AsesorModel, [email]).get(email)
 
         model, _ = TareaModel.objects.update_or_create(
             id_tarea=tarea.idTarea,
-            defaults={
-                'titulo': tarea.titulo,
-                'prioridad': tarea.prioridad.value,
-                'estado': tarea.estado.value,
-                'vencimiento': tarea.vencimiento,
-                'comentario': tarea.comentario,
-                'asignada_a': asesor_model,
-            }
+            defaults={**self._valores(tarea), 'asignada_a': asesor_model},
         )
+        tarea.marcar_persistida(estado)
         return self._to_entity(model)
 
+    def _valores(self, tarea: TareaEntity) -> Dict[str, Any]:
+        """Columnas propias de la tarea (sin relaciones ni clave)"""
+        return {
+            'titulo': tarea.titulo,
+            'prioridad': tarea.prioridad.value,
+            'estado': tarea.estado.value,
+            'vencimiento': tarea.vencimiento,
+            'comentario': tarea.comentario,
+        }
+
+    def _estado(self, tarea: TareaEntity) -> Dict[str, Any]:
+        """Estado rastreado: columnas propias más el asesor por su email"""
+        return {**self._valores(tarea), 'asignada_a': tarea.asignadaA.emailAsesor if tarea.asignadaA else None}
+
+    def guardar_muchos(self, tareas: Iterable[TareaEntity]) -> List[TareaEntity]:
+        tareas = _sin_duplicados(tareas, lambda t: t.idTarea)
+        with transaction.atomic():
+            asesores = _filas_por_clave(AsesorModel, {t.asignadaA.emailAsesor for t in tareas if t.asignadaA})
+            models = [
+                TareaModel(
+                    id_tarea=t.idTarea,
+                    asignada_a=asesores.get(t.asignadaA.emailAsesor) if t.asignadaA else None,
+                    **self._valores(t),
+                )
+                for t in tareas
+            ]
+            _bulk_upsert(
+                TareaModel, models,
+                unique_fields=['id_tarea'],
+                update_fields=['titulo', 'prioridad', 'estado', 'vencimiento', 'comentario',
+                               'asignada_a', 'fecha_actualizacion'],
+            )
+        for tarea in tareas:
+            tarea.marcar_persistida(self._estado(tarea))
+        self._identificar(lambda t: t.idTarea, tareas)
+        internadas: Internadas = {}
+        return [self._to_entity(m, internadas) for m in models]
+
     def obtener_por_id(self, id_tarea: str) -> Optional[TareaEntity]:
-        try:
-            model = TareaModel.objects.select_related('asignada_a').get(id_tarea=id_tarea)
-            return self._to_entity(model)
-        except TareaModel.DoesNotExist:
-            return None
+        return self._obtener(id_tarea, lambda: self._cargar(id_tarea=id_tarea))
+
+    def obtener_para_actualizar(self, id_tarea: str) -> Optional[TareaEntity]:
+        """Fila bloqueada (SQLite ignora FOR UPDATE: un UPDATE sin cambios toma el bloqueo)"""
+        consulta = self._consulta().filter(id_tarea=id_tarea)
+        if connections[router.db_for_write(TareaModel)].features.has_select_for_update:
+            # Solo la fila de la tarea: el asesor nulable va por LEFT JOIN
+            consulta = consulta.select_for_update(of=('self',))
+        else:
+            TareaModel.objects.filter(id_tarea=id_tarea).update(estado=F('estado'))
+        model = consulta.first()
+        return self._to_entity(model) if model else None
 
     def listar_todas(self) -> List[TareaEntity]:
-        return [
-            self._to_entity(m) for m in
-            TareaModel.objects.select_related('asignada_a').all()
-        ]
+        return list(self.iterar_todas())
+
+    def iterar_todas(self) -> Iterator[TareaEntity]:
+        yield from self._iterar(self._consulta())
+
+    def listar_pagina(self, cursor: Optional[str] = None, limite: int = TAMANO_PAGINA,
+                      email_asesor: Optional[str] = None) -> Pagina[TareaEntity]:
+        queryset = self._consulta()
+        if email_asesor:
+            queryset = queryset.filter(asignada_a__email_asesor=email_asesor)
+        return self._paginar(queryset, cursor, limite)
+
+    # Columnas del listado de tareas: {clave de la fila: campo o lookup}
+    COLUMNAS_RESUMEN = {
+        'id_tarea': 'id_tarea',
+        'titulo': 'titulo',
+        'prioridad': 'prioridad',
+        'estado': 'estado',
+        'vencimiento': 'vencimiento',
+        'asesor_email': 'asignada_a__email_asesor',
+    }
+
+    def listar_pagina_resumen(self, cursor: Optional[str] = None, limite: int = TAMANO_PAGINA,
+                              email_asesor: Optional[str] = None) -> Pagina[Dict[str, Any]]:
+        queryset = TareaModel.objects.all()
+        if email_asesor:
+            queryset = queryset.filter(asignada_a__email_asesor=email_asesor)
+        return self._paginar(queryset, cursor, limite, columnas=self.COLUMNAS_RESUMEN)
 
     def listar_por_estado(self, estado: EstadoTarea) -> List[TareaEntity]:
-        return [
-            self._to_entity(m) for m in
-            TareaModel.objects.filter(estado=estado.value)
-        ]
+        return list(self.iterar_por_estado(estado))
+
+    def iterar_por_estado(self, estado: EstadoTarea) -> Iterator[TareaEntity]:
+        yield from self._iterar(self._consulta().filter(estado=estado.value))
 
     def listar_por_prioridad(self, prioridad: PrioridadTarea) -> List[TareaEntity]:
-        return [
-            self._to_entity(m) for m in
-            TareaModel.objects.filter(prioridad=prioridad.value)
-        ]
+        return list(self.iterar_por_prioridad(prioridad))
+
+    def iterar_por_prioridad(self, prioridad: PrioridadTarea) -> Iterator[TareaEntity]:
+        yield from self._iterar(self._consulta().filter(prioridad=prioridad.value))
 
     def listar_por_asesor(self, email_asesor: str) -> List[TareaEntity]:
-        return [
-            self._to_entity(m) for m in
-            TareaModel.objects.filter(asignada_a__email_asesor=email_asesor)
-        ]
+        return list(self.iterar_por_asesor(email_asesor))
+
+    def iterar_por_asesor(self, email_asesor: str) -> Iterator[TareaEntity]:
+        yield from self._iterar(self._consulta().filter(asignada_a__email_asesor=email_asesor))
 
     def listar_por_solicitud(self, solicitud_codigo: str) -> List[TareaEntity]:
-        return [
-            self._to_entity(m) for m in
-            TareaModel.objects.filter(solicitud__codigo=solicitud_codigo)
-        ]
+        return list(self.iterar_por_solicitud(solicitud_codigo))
+
+    def iterar_por_solicitud(self, solicitud_codigo: str) -> Iterator[TareaEntity]:
+        yield from self._iterar(self._consulta().filter(solicitud__codigo=solicitud_codigo))
 
     def listar_vencidas(self) -> List[TareaEntity]:
-        now = datetime.now()
-        return [
-            self._to_entity(m) for m in
-            TareaModel.objects.filter(
+        return list(self.iterar_vencidas())
+
+    def iterar_vencidas(self) -> Iterator[TareaEntity]:
+        now = timezone.now()
+        # Orden por vencimiento: con el de Meta (-fecha_creacion) el planificador
+        # recorre tarea_keyset_idx entero en lugar del índice parcial
+        yield from self._iterar(
+            self._consulta().filter(
                 vencimiento__lt=now
             ).exclude(
                 estado=EstadoTarea.COMPLETADA.value
-            )
-        ]
+            ).order_by('vencimiento', 'pk')
+        )
 
     def listar_por_vencer(self, horas: int = 24) -> List[TareaEntity]:
-        now = datetime.now()
+        return list(self.iterar_por_vencer(horas))
+
+    def iterar_por_vencer(self, horas: int = 24) -> Iterator[TareaEntity]:
+        now = timezone.now()
         limite = now + timedelta(hours=horas)
-        return [
-            self._to_entity(m) for m in
-            TareaModel.objects.filter(
+        yield from self._iterar(
+            self._consulta().filter(
                 vencimiento__gte=now,
                 vencimiento__lte=limite
             ).exclude(
                 estado=EstadoTarea.COMPLETADA.value
             )
-        ]
+        )
+
+    def contar_por_grupo(self, momento: datetime,
+                         filtro: Optional[FiltroReporteTareas] = None) -> List[ConteoTareas]:
+        """
+        Un único SELECT ... GROUP BY asesor, estado, prioridad con COUNT(*) y
+        COUNT(*) FILTER (vencidas): el coste no depende de cargar las tareas.
+        """
+        momento = _aware(momento)
+        queryset = TareaModel.objects.all()
+        if filtro is not None:
+            queryset = queryset.filter(
+                vencimiento__gte=_aware(filtro.desde),
+                vencimiento__lte=_aware(filtro.hasta),
+            )
+            if filtro.asesor_email:
+                queryset = queryset.filter(asignada_a__email_asesor=filtro.asesor_email)
+
+        return _contar_tareas(queryset, momento)
 
     def eliminar(self, id_tarea: str) -> bool:
         deleted, _ = TareaModel.objects.filter(id_tarea=id_tarea).delete()
+        self._olvidar()
         return deleted > 0
 
     def existe(self, id_tarea: str) -> bool:
         return TareaModel.objects.filter(id_tarea=id_tarea).exists()
 
 
+# ========================================
+# Repositorio: DjangoEstadisticaTareaRepository
+# ========================================
+ClaveEstadistica = Tuple[Optional[date], str, str, str]  # (día, asesor_email, estado, prioridad)
+
+
+def _dia(momento: datetime) -> date:
+    """Día de un instante en la zona horaria del proyecto (la de los conteos diarios)"""
+    return timezone.localtime(_aware(momento), timezone.get_default_timezone()).date()
+
+
+def _inicio_dia(dia: date) -> datetime:
+    return timezone.make_aware(datetime.combine(dia, time.min), timezone.get_default_timezone())
+
+
+class DjangoEstadisticaTareaRepository(EstadisticaTareaRepository):
+    """
+    Implementación Django ORM de las estadísticas materializadas de tareas.
+    Las vencidas dependen de la hora: el día de hoy y los días parciales del
+    período se cuentan en vivo sobre `tarea`; el resto sale de la tabla diaria.
+    """
+
+    def transaccion(self):
+        return transaction.atomic()
+
+    def _clave(self, tarea: TareaEntity) -> ClaveEstadistica:
+        return (
+            _dia(tarea.vencimiento) if tarea.vencimiento else None,
+            tarea.asignadaA.emailAsesor if tarea.asignadaA else '',
+            tarea.estado.value,
+            tarea.prioridad.value,
+        )
+
+    def registrar_cambio(self, antes: Optional[TareaEntity], despues: Optional[TareaEntity]) -> None:
+        clave_antes = self._clave(antes) if antes is not None else None
+        clave_despues = self._clave(despues) if despues is not None else None
+        if clave_antes == clave_despues:
+            return
+        with transaction.atomic():
+            if clave_antes is not None:
+                self._sumar(clave_antes, -1)
+            if clave_despues is not None:
+                self._sumar(clave_despues, 1)
+
+    def _sumar(self, clave: ClaveEstadistica, delta: int) -> None:
+        dia, asesor_email, estado, prioridad = clave
+        campos = {'dia': dia, 'asesor_email': asesor_email, 'estado': estado, 'prioridad': prioridad}
+        if EstadisticaTareaDiariaModel.objects.filter(**campos).update(cantidad=F('cantidad') + delta):
+            return
+        try:
+            with transaction.atomic():
+                EstadisticaTareaDiariaModel.objects.create(cantidad=delta, **campos)
+        except IntegrityError:
+            # Otra transacción creó la fila entre el UPDATE y el INSERT
+            EstadisticaTareaDiariaModel.objects.filter(**campos).update(cantidad=F('cantidad') + delta)
+
+    def contar_por_grupo(self, momento: datetime,
+                         filtro: Optional[FiltroReporteTareas] = None) -> List[ConteoTareas]:
+        momento = _aware(momento)
+        hoy = _dia(momento)
+        filas = EstadisticaTareaDiariaModel.objects.exclude(dia=hoy)
+        tareas = TareaModel.objects.all()
+        en_vivo = Q(vencimiento__gte=_inicio_dia(hoy), vencimiento__lt=_inicio_dia(hoy + timedelta(days=1)))
+
+        if filtro is not None:
+            desde, hasta = _aware(filtro.desde), _aware(filtro.hasta)
+            # Solo los días completos dentro de [desde, hasta] salen de la tabla diaria
+            primer_dia = _dia(desde)
+            if desde > _inicio_dia(primer_dia):
+                primer_dia += timedelta(days=1)
+            ultimo_dia = _dia(hasta) - timedelta(days=1)
+            filas = filas.filter(dia__gte=primer_dia, dia__lte=ultimo_dia)
+            en_vivo |= (
+                Q(vencimiento__lt=_inicio_dia(primer_dia))
+                | Q(vencimiento__gte=_inicio_dia(ultimo_dia + timedelta(days=1)))
+            )
+            tareas = tareas.filter(vencimiento__gte=desde, vencimiento__lte=hasta)
+            if filtro.asesor_email:
+                filas = filas.filter(asesor_email=filtro.asesor_email)
+                tareas = tareas.filter(asignada_a__email_asesor=filtro.asesor_email)
+
+        materializadas = (
+            filas.order_by()
+            .values('asesor_email', 'estado', 'prioridad')
+            .annotate(
+                total=Sum('cantidad'),
+                vencidas=Sum('cantidad', filter=Q(estado__in=ESTADOS_TAREA_ABIERTA, dia__lt=hoy)),
+            )
+        )
+        totales: Dict[Tuple[Optional[str], str, str], List[int]] = {}
+        for fila in materializadas:
+            acumulado = totales.setdefault(
+                (fila['asesor_email'] or None, fila['estado'], fila['prioridad']), [0, 0]
+            )
+            acumulado[0] += fila['total'] or 0
+            acumulado[1] += fila['vencidas'] or 0
+        for conteo in _contar_tareas(tareas.filter(en_vivo), momento):
+            acumulado = totales.setdefault(
+                (conteo.asesor_email, conteo.estado.value, conteo.prioridad.value), [0, 0]
+            )
+            acumulado[0] += conteo.total
+            acumulado[1] += conteo.vencidas
+
+        return [
+            ConteoTareas(
+                asesor_email=email,
+                estado=EstadoTarea(estado),
+                prioridad=PrioridadTarea(prioridad),
+                total=total,
+                vencidas=vencidas,
+            )
+            for (email, estado, prioridad), (total, vencidas) in totales.items()
+            if total
+        ]
+
+    def _conteos_reales(self) -> Dict[ClaveEstadistica, int]:
+        """Conteos recalculados desde la tabla de tareas (un GROUP BY)"""
+        filas = (
+            TareaModel.objects.order_by()
+            .annotate(dia=TruncDate('vencimiento', tzinfo=timezone.get_default_timezone()))
+            .values('dia', 'asignada_a__email_asesor', 'estado', 'prioridad')
+            .annotate(cantidad=Count('pk'))
+        )
+        return {
+            (f['dia'], f['asignada_a__email_asesor'] or '', f['estado'], f['prioridad']): f['cantidad']
+            for f in filas
+        }
+
+    def _conteos_materializados(self) -> Dict[ClaveEstadistica, int]:
+        filas = EstadisticaTareaDiariaModel.objects.exclude(cantidad=0).values_list(
+            'dia', 'asesor_email', 'estado', 'prioridad', 'cantidad'
+        )
+        return {tuple(f[:4]): f[4] for f in filas}
+
+    def diferencias(self) -> Dict[ClaveEstadistica, Tuple[int, int]]:
+        """Claves cuyo conteo materializado no coincide con el real: {clave: (materializado, real)}"""
+        reales = self._conteos_reales()
+        materializados = self._conteos_materializados()
+        return {
+            clave: (materializados.get(clave, 0), reales.get(clave, 0))
+            for clave in reales.keys() | materializados.keys()
+            if materializados.get(clave, 0) != reales.get(clave, 0)
+        }
+
+    def reconstruir(self) -> int:
+        """Recalcula la tabla completa desde las tareas; retorna la cantidad de filas"""
+        with transaction.atomic():
+            reales = self._conteos_reales()
+            EstadisticaTareaDiariaModel.objects.all().delete()
+            EstadisticaTareaDiariaModel.objects.bulk_create(
+                [
+                    EstadisticaTareaDiariaModel(
+                        dia=dia, asesor_email=email, estado=estado, prioridad=prioridad, cantidad=cantidad
+                    )
+                    for (dia, email, estado, prioridad), cantidad in reales.items()
+                ],
+                batch_size=BULK_BATCH_SIZE,
+            )
+        return len(reales)
+
+
+# ========================================
+# Repositorio: DjangoRecordatorioTareaRepository
+# ========================================
+class DjangoRecordatorioTareaRepository(RecordatorioTareaRepository):
+    """Marcas de recordatorio enviado sobre la tabla recordatorio_tarea_enviado"""
+
+    def __init__(self, tarea_repo: Optional[DjangoTareaRepository] = None):
+        self._tareas = tarea_repo or DjangoTareaRepository()
+
+    def transaccion(self):
+        return transaction.atomic()
+
+    def _pendientes(self, horas: int):
+        """Tareas abiertas por vencer sin marca para su vencimiento: JOIN al asesor + NOT EXISTS"""
+        ahora = timezone.now()
+        enviado = RecordatorioTareaEnviadoModel.objects.filter(
+            tarea=OuterRef('pk'), vencimiento=OuterRef('vencimiento')
+        )
+        return self._tareas._consulta().filter(
+            vencimiento__gte=ahora,
+            vencimiento__lte=ahora + timedelta(hours=horas),
+            estado__in=ESTADOS_TAREA_ABIERTA,
+            asignada_a__isnull=False,
+        ).filter(~Exists(enviado)).order_by('vencimiento', 'pk')
+
+    def listar_pendientes(self, horas: int = 24) -> List[TareaEntity]:
+        internadas: Internadas = {}
+        return [self._tareas._to_entity(m, internadas) for m in self._pendientes(horas)]
+
+    def reservar_pendientes(self, horas: int = 24) -> List[TareaEntity]:
+        """
+        Inserta las marcas con ON CONFLICT DO NOTHING y relee cuáles quedaron con el
+        lote de esta llamada: las que ya había insertado otro despacho se descartan.
+        """
+        pendientes = list(self._pendientes(horas))
+        if not pendientes:
+            return []
+
+        lote = nuevo_id()
+        RecordatorioTareaEnviadoModel.objects.bulk_create(
+            [RecordatorioTareaEnviadoModel(tarea_id=m.pk, vencimiento=m.vencimiento, lote=lote)
+             for m in pendientes],
+            batch_size=BULK_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        propias = set(
+            RecordatorioTareaEnviadoModel.objects.filter(lote=lote).values_list('tarea_id', flat=True)
+        )
+        internadas: Internadas = {}
+        return [self._tareas._to_entity(m, internadas) for m in pendientes if m.pk in propias]
+
+
 # ========================================
 # Repositorio: DjangoCitaRepository
 # ========================================
-class DjangoCitaRepository(CitaRepository):
+class DjangoCitaRepository(_DjangoRepositoryBase, CitaRepository):
     """Implementación Django ORM del repositorio de Cita"""
 
-    def _to_entity(self, model: CitaModel) -> CitaEntity:
-        return CitaEntity(
+    modelo = CitaModel
+    # `_to_entity` solo lee columnas propias (solicitud_id): no hay relaciones que cargar
+    perfil_carga = PerfilCarga()
+    relaciones = {'solicitud': SolicitudMigratoriaModel}
+
+    def _to_entity(self, model: CitaModel, internadas: Optional[Internadas] = None) -> CitaEntity:
+        entity = CitaEntity(
             idCita=model.id_cita,
-            solicitudCodigo=model.solicitud.codigo,
+            solicitudCodigo=model.solicitud_id,  # la PK de la solicitud es su código
             observacion=model.observacion,
             rango=RangoFechaHora(inicio=model.inicio, fin=model.fin),
             tipo=TipoCita(model.tipo),
             estado=EstadoCita(model.estado),
+            recursoCodigo=model.recurso_id,
         )
+        entity.marcar_persistida(self._estado(entity))
+        return entity
+
+    def _valores(self, cita: CitaEntity) -> Dict[str, Any]:
+        """Columnas propias de la cita (sin la solicitud ni la clave)"""
+        return {
+            'recurso_id': cita.recursoCodigo,
+            'observacion': cita.observacion,
+            'tipo': cita.tipo.value,
+            'estado': cita.estado.value,
+            'inicio': cita.rango.inicio,
+            'fin': cita.rango.fin,
+        }
+
+    def _estado(self, cita: CitaEntity) -> Dict[str, Any]:
+        return {**self._valores(cita), 'solicitud': cita.solicitudCodigo}
 
     def guardar(self, cita: CitaEntity) -> CitaEntity:
+        estado = self._estado(cita)
+        if self._guardar_cambios(cita, {'id_cita': cita.idCita}, estado):
+            return cita
         solicitud = SolicitudMigratoriaModel.objects.get(codigo=cita.solicitudCodigo)
         model, _ = CitaModel.objects.update_or_create(
             id_cita=cita.idCita,
-            defaults={
-                'solicitud': solicitud,
-                'observacion': cita.observacion,
-                'tipo': cita.tipo.value,
-                'estado': cita.estado.value,
-                'inicio': cita.rango.inicio,
-                'fin': cita.rango.fin,
-            }
+            defaults={'solicitud': solicitud, **self._valores(cita)},
         )
+        cita.marcar_persistida(estado)
         return self._to_entity(model)
 
+    def guardar_muchos(self, citas: Iterable[CitaEntity]) -> List[CitaEntity]:
+        citas = _sin_duplicados(citas, lambda c: c.idCita)
+        with transaction.atomic():
+            codigos = {c.solicitudCodigo for c in citas}
+            solicitudes = SolicitudMigratoriaModel.objects.in_bulk(list(codigos)) if codigos else {}
+            faltantes = codigos - set(solicitudes)
+            if faltantes:
+                raise SolicitudMigratoriaModel.DoesNotExist(
+                    f"No existen las solicitudes: {', '.join(sorted(faltantes))}"
+                )
+            models = [
+                CitaModel(id_cita=c.idCita, solicitud=solicitudes[c.solicitudCodigo], **self._valores(c))
+                for c in citas
+            ]
+            _bulk_upsert(
+                CitaModel, models,
+                unique_fields=['id_cita'],
+                update_fields=['solicitud', 'recurso', 'observacion', 'tipo', 'estado', 'inicio', 'fin',
+                               'fecha_actualizacion'],
+            )
+        for cita in citas:
+            cita.marcar_persistida(self._estado(cita))
+        return [self._to_entity(m) for m in models]
+
+    def reservar(self, cita: CitaEntity, excluir_id: Optional[str] = None) -> Optional[CitaEntity]:
+        """
+        Verifica y guarda dentro de una transacción serializada:
+        - Cita con recurso: se bloquea la fila del recurso, así que solo se serializan
+          las reservas de esa ventanilla/asesor y se lee su capacidad vigente.
+        - Agenda general en PostgreSQL: la restricción EXCLUDE USING gist de la tabla
+          cita rechaza el solapamiento aunque dos transacciones verifiquen a la vez.
+        - Agenda general en otros motores: se bloquean las filas de los días que toca.
+        """
+        inicio, fin = cita.rango.inicio, cita.rango.fin
+        alias = router.db_for_write(CitaModel)
+        try:
+            with transaction.atomic(using=alias):
+                capacidad = 1
+                if cita.recursoCodigo is not None:
+                    capacidad = self._bloquear_recurso(cita.recursoCodigo, alias)
+                elif connections[alias].vendor != 'postgresql':
+                    self._bloquear_dias(inicio, fin, alias)
+                if not self.verificar_disponibilidad(inicio, fin, excluir_id=excluir_id,
+                                                     recurso=cita.recursoCodigo, capacidad=capacidad):
+                    return None
+                return self.guardar(cita)
+        except IntegrityError as e:
+            if _es_violacion_exclusion(e):
+                return None
+            raise
+
+    def _bloquear_recurso(self, codigo: str, alias: str) -> int:
+        """
+        Bloquea la fila del recurso (SQLite: UPDATE sin cambios) y retorna su capacidad.
+        Se comprueba aquí y no solo en el servicio: el recurso puede haberse
+        desactivado después de agendar la cita o mientras se reserva.
+        """
+        recursos = RecursoCitaModel.objects.using(alias).filter(codigo=codigo, activo=True)
+        if connections[alias].features.has_select_for_update:
+            recursos = recursos.select_for_update()
+        else:
+            recursos.update(capacidad=F('capacidad'))
+        capacidad = recursos.values_list('capacidad', flat=True).first()
+        if capacidad is None:
+            raise CitaInvalidaError(f"No existe un recurso activo con código {codigo}")
+        return capacidad
+
+    def _bloquear_dias(self, inicio: datetime, fin: datetime, alias: str) -> None:
+        """
+        Bloquea las filas de agenda de cada día en [inicio, fin) en orden (sin interbloqueos).
+        Dos rangos que se solapan comparten al menos un día, así que se serializan.
+        SQLite ignora FOR UPDATE: el UPDATE toma el bloqueo de escritura de la base.
+        """
+        dias = []
+        dia, ultimo = _dia(inicio), _dia(fin - timedelta(microseconds=1))
+        while dia <= ultimo:
+            dias.append(dia)
+            dia += timedelta(days=1)
+
+        bloqueos = BloqueoAgendaCitaModel.objects.using(alias)
+        bloqueos.bulk_create([BloqueoAgendaCitaModel(dia=d) for d in dias], ignore_conflicts=True)
+        if connections[alias].features.has_select_for_update:
+            list(bloqueos.select_for_update().filter(dia__in=dias).order_by('dia'))
+        else:
+            bloqueos.filter(dia__in=dias).update(version=F('version') + 1)
+
     def obtener_por_id(self, id_cita: str) -> Optional[CitaEntity]:
         try:
-            model = CitaModel.objects.select_related('solicitud').get(id_cita=id_cita)
+            model = self._consulta().get(id_cita=id_cita)
             return self._to_entity(model)
         except CitaModel.DoesNotExist:
             return None
 
     def listar_todas(self) -> List[CitaEntity]:
-        return [
-            self._to_entity(m) for m in
-            CitaModel.objects.select_related('solicitud').all()
-        ]
+        return list(self.iterar_todas())
+
+    def iterar_todas(self) -> Iterator[CitaEntity]:
+        yield from self._iterar(self._consulta())
+
+    def listar_pagina(self, cursor: Optional[str] = None,
+                      limite: int = TAMANO_PAGINA) -> Pagina[CitaEntity]:
+        return self._paginar(self._consulta(), cursor, limite)
 
     def listar_por_estado(self, estado: EstadoCita) -> List[CitaEntity]:
-        return [
-            self._to_entity(m) for m in
-            CitaModel.objects.filter(estado=estado.value)
-        ]
+        return list(self.iterar_por_estado(estado))
+
+    def iterar_por_estado(self, estado: EstadoCita) -> Iterator[CitaEntity]:
+        yield from self._iterar(self._consulta().filter(estado=estado.value))
 
     def listar_por_tipo(self, tipo: TipoCita) -> List[CitaEntity]:
-        return [
-            self._to_entity(m) for m in
-            CitaModel.objects.filter(tipo=tipo.value)
-        ]
+        return list(self.iterar_por_tipo(tipo))
+
+    def iterar_por_tipo(self, tipo: TipoCita) -> Iterator[CitaEntity]:
+        yield from self._iterar(self._consulta().filter(tipo=tipo.value))
 
     def listar_por_solicitud(self, solicitud_codigo: str) -> List[CitaEntity]:
-        return [
-            self._to_entity(m) for m in
-            CitaModel.objects.filter(solicitud__codigo=solicitud_codigo)
-        ]
+        return list(self.iterar_por_solicitud(solicitud_codigo))
+
+    def iterar_por_solicitud(self, solicitud_codigo: str) -> Iterator[CitaEntity]:
+        yield from self._iterar(self._consulta().filter(solicitud__codigo=solicitud_codigo))
 
     def listar_por_rango_fecha(self, inicio: datetime, fin: datetime) -> List[CitaEntity]:
-        return [
-            self._to_entity(m) for m in
-            CitaModel.objects.filter(
+        return list(self.iterar_por_rango_fecha(inicio, fin))
+
+    def iterar_por_rango_fecha(self, inicio: datetime, fin: datetime) -> Iterator[CitaEntity]:
+        yield from self._iterar(
+            self._consulta().filter(
                 Q(inicio__gte=inicio) & Q(inicio__lte=fin)
             )
+        )
+
+    def listar_agenda(self, inicio: datetime, fin: datetime,
+                      email_asesor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Un SELECT con los JOIN a solicitud, solicitante y asesor; solo las columnas de la agenda"""
+        queryset = CitaModel.objects.filter(inicio__gte=inicio, inicio__lte=fin)
+        if email_asesor is not None:
+            queryset = queryset.filter(solicitud__asesor__email_asesor=email_asesor)
+        filas = queryset.order_by('inicio').values_list(
+            'id_cita', 'solicitud_id', 'tipo', 'estado', 'inicio', 'fin', 'observacion',
+            'solicitud__solicitante__nombres', 'solicitud__solicitante__apellidos',
+            'solicitud__asesor__nombres', 'solicitud__asesor__apellidos',
+        )
+        return [
+            {
+                'id_cita': id_cita,
+                'solicitud_codigo': solicitud_codigo,
+                'tipo': tipo,
+                'estado': estado,
+                'inicio': inicio_cita,
+                'fin': fin_cita,
+                'observacion': observacion,
+                'solicitante_nombre': f"{s_nombres} {s_apellidos}" if s_nombres is not None else None,
+                'asesor_nombre': f"{a_nombres} {a_apellidos}" if a_nombres is not None else None,
+            }
+            for (id_cita, solicitud_codigo, tipo, estado, inicio_cita, fin_cita, observacion,
+                 s_nombres, s_apellidos, a_nombres, a_apellidos) in filas
         ]
 
-    def verificar_disponibilidad(self, inicio: datetime, fin: datetime) -> bool:
-        """Verifica que no haya citas que se solapen con el rango dado"""
-        conflictos = CitaModel.objects.filter(
+    def _activas_solapadas(self, inicio: datetime, fin: datetime):
+        """
+        Citas activas que se solapan con [inicio, fin): cada una empieza antes de que
+        termine la otra, lo que incluye las que empezaron antes de `inicio`.
+        """
+        return CitaModel.objects.filter(
             Q(inicio__lt=fin) & Q(fin__gt=inicio)
         ).exclude(
             estado__in=[EstadoCita.CANCELADA.value, EstadoCita.COMPLETADA.value]
         )
-        return not conflictos.exists()
+
+    def ocupados_por_recurso(self, inicio: datetime, fin: datetime) -> Dict[Optional[str], List[RangoFechaHora]]:
+        """Solo (recurso, inicio, fin) de las citas activas del rango, en una consulta"""
+        ocupados: Dict[Optional[str], List[RangoFechaHora]] = {}
+        filas = self._activas_solapadas(inicio, fin).order_by('inicio').values_list('recurso_id', 'inicio', 'fin')
+        for recurso, i, f in filas:
+            ocupados.setdefault(recurso, []).append(RangoFechaHora(inicio=i, fin=f))
+        return ocupados
+
+    def verificar_disponibilidad(self, inicio: datetime, fin: datetime,
+                                 excluir_id: Optional[str] = None,
+                                 recurso: Optional[str] = None, capacidad: int = 1) -> bool:
+        """
+        Consulta acotada al recurso sobre los índices parciales de citas activas
+        ((recurso, inicio, fin) o (inicio, fin) para la agenda general).
+        Capacidad 1: un único SELECT ... LIMIT 1 (EXISTS).
+        Capacidad mayor: trae solo (inicio, fin) de las solapadas y cuenta el máximo
+        de citas simultáneas dentro de [inicio, fin).
+        """
+        conflictos = self._activas_solapadas(inicio, fin)
+        if recurso is None:
+            conflictos = conflictos.filter(recurso__isnull=True)
+        else:
+            conflictos = conflictos.filter(recurso_id=recurso)
+        if excluir_id is not None:
+            conflictos = conflictos.exclude(id_cita=excluir_id)
+        if capacidad <= 1:
+            return not conflictos.exists()
+
+        rango = RangoFechaHora(inicio=inicio, fin=fin)
+        solapadas = [RangoFechaHora(inicio=i, fin=f).recortar(rango) for i, f in conflictos.values_list('inicio', 'fin')]
+        return max_simultaneos(solapadas) < capacidad
 
     def eliminar(self, id_cita: str) -> bool:
         deleted, _ = CitaModel.objects.filter(id_cita=id_cita).delete()
@@ -550,13 +1816,50 @@ class DjangoCitaRepository(CitaRepository):
         return CitaModel.objects.filter(id_cita=id_cita).exists()
 
 
+# ========================================
+# Repositorio: DjangoRecursoCitaRepository
+# ========================================
+class DjangoRecursoCitaRepository(RecursoCitaRepository):
+    """Implementación Django ORM del repositorio de RecursoCita"""
+
+    def _to_entity(self, model: RecursoCitaModel) -> RecursoCitaEntity:
+        return RecursoCitaEntity(
+            codigo=model.codigo,
+            nombre=model.nombre,
+            tipo=TipoRecursoCita(model.tipo),
+            capacidad=model.capacidad,
+            activo=model.activo,
+        )
+
+    def guardar(self, recurso: RecursoCitaEntity) -> RecursoCitaEntity:
+        model, _ = RecursoCitaModel.objects.update_or_create(
+            codigo=recurso.codigo,
+            defaults={
+                'nombre': recurso.nombre,
+                'tipo': recurso.tipo.value,
+                'capacidad': recurso.capacidad,
+                'activo': recurso.activo,
+            },
+        )
+        return self._to_entity(model)
+
+    def obtener_por_codigo(self, codigo: str) -> Optional[RecursoCitaEntity]:
+        model = RecursoCitaModel.objects.filter(codigo=codigo).first()
+        return self._to_entity(model) if model else None
+
+    def listar_activos(self) -> List[RecursoCitaEntity]:
+        return [self._to_entity(m) for m in RecursoCitaModel.objects.filter(activo=True).order_by('codigo')]
+
+
 # ========================================
 # Repositorio: DjangoNotificacionRepository
 # ========================================
-class DjangoNotificacionRepository(NotificacionRepository):
+class DjangoNotificacionRepository(_DjangoRepositoryBase, NotificacionRepository):
     """Implementación Django ORM del repositorio de Notificacion"""
 
-    def _to_entity(self, model: NotificacionModel) -> NotificacionEntity:
+    modelo = NotificacionModel
+
+    def _to_entity(self, model: NotificacionModel, internadas: Optional[Internadas] = None) -> NotificacionEntity:
         from SGPM.domain.enums import TipoNotificacion
         entity = NotificacionEntity(
             id_notificacion=model.id_notificacion,
@@ -568,45 +1871,115 @@ class DjangoNotificacionRepository(NotificacionRepository):
         entity._creada_en = model.fecha_creacion
         return entity
 
+    def _valores(self, notificacion: NotificacionEntity) -> Dict[str, Any]:
+        """Columnas persistibles de la notificación (sin la clave)"""
+        return {
+            'destinatario': notificacion.obtener_destinatario(),
+            'tipo': notificacion.obtener_tipo().value,
+            'mensaje': notificacion.obtener_mensaje(),
+            'leida': notificacion.esta_leida(),
+        }
+
+    @staticmethod
+    def _clave_no_leidas(destinatario: str) -> str:
+        return f"sgpm:notificaciones:no_leidas:{destinatario}"
+
+    def _invalidar_no_leidas(self, destinatarios: Iterable[str]) -> None:
+        """
+        Descarta el contador en caché de los destinatarios afectados. Se repite al
+        confirmar la transacción: una lectura concurrente pudo volver a cachear el
+        valor anterior mientras la escritura seguía sin confirmar.
+        """
+        claves = [self._clave_no_leidas(d) for d in set(destinatarios)]
+        if not claves:
+            return
+        cache.delete_many(claves)
+        transaction.on_commit(lambda: cache.delete_many(claves))
+
     def guardar(self, notificacion: NotificacionEntity) -> NotificacionEntity:
         model, _ = NotificacionModel.objects.update_or_create(
             id_notificacion=notificacion._id,
-            defaults={
-                'destinatario': notificacion.obtener_destinatario(),
-                'tipo': notificacion.obtener_tipo().value,
-                'mensaje': notificacion.obtener_mensaje(),
-                'leida': notificacion.esta_leida(),
-            }
+            defaults=self._valores(notificacion),
         )
+        self._invalidar_no_leidas([model.destinatario])
         return self._to_entity(model)
 
+    def guardar_muchos(self, notificaciones: Iterable[NotificacionEntity]) -> List[NotificacionEntity]:
+        notificaciones = _sin_duplicados(notificaciones, lambda n: n._id)
+        models = [
+            NotificacionModel(id_notificacion=n._id, **self._valores(n))
+            for n in notificaciones
+        ]
+        with transaction.atomic():
+            _bulk_upsert(
+                NotificacionModel, models,
+                unique_fields=['id_notificacion'],
+                update_fields=['destinatario', 'tipo', 'mensaje', 'leida'],
+            )
+        self._invalidar_no_leidas(m.destinatario for m in models)
+        return [self._to_entity(m) for m in models]
+
     def obtener_por_id(self, id_notificacion: str) -> Optional[NotificacionEntity]:
         try:
-            model = NotificacionModel.objects.get(id_notificacion=id_notificacion)
+            model = self._consulta().get(id_notificacion=id_notificacion)
             return self._to_entity(model)
         except NotificacionModel.DoesNotExist:
             return None
 
     def listar_por_destinatario(self, destinatario: str) -> List[NotificacionEntity]:
-        return [
-            self._to_entity(m) for m in
-            NotificacionModel.objects.filter(destinatario=destinatario)
-        ]
+        return list(self.iterar_por_destinatario(destinatario))
 
-    def listar_no_leidas(self, destinatario: str) -> List[NotificacionEntity]:
-        return [
-            self._to_entity(m) for m in
-            NotificacionModel.objects.filter(destinatario=destinatario, leida=False)
-        ]
+    def iterar_por_destinatario(self, destinatario: str) -> Iterator[NotificacionEntity]:
+        yield from self._iterar(self._consulta().filter(destinatario=destinatario))
+
+    def listar_pagina_por_destinatario(self, destinatario: str, cursor: Optional[str] = None,
+                                       limite: int = TAMANO_PAGINA) -> Pagina[NotificacionEntity]:
+        return self._paginar(self._consulta().filter(destinatario=destinatario), cursor, limite)
 
-    def marcar_como_leida(self, id_notificacion: str) -> bool:
+    def listar_no_leidas(self, destinatario: str) -> List[NotificacionEntity]:
+        return list(self.iterar_no_leidas(destinatario))
+
+    def iterar_no_leidas(self, destinatario: str) -> Iterator[NotificacionEntity]:
+        yield from self._iterar(self._consulta().filter(destinatario=destinatario, leida=False))
+
+    def contar_no_leidas(self, destinatario: str) -> int:
+        """COUNT(*) sobre notif_no_leidas_idx, servido desde caché hasta la próxima escritura"""
+        clave = self._clave_no_leidas(destinatario)
+        total = cache.get(clave)
+        if total is None:
+            total = NotificacionModel.objects.filter(destinatario=destinatario, leida=False).count()
+            cache.set(clave, total, NO_LEIDAS_CACHE_TTL)
+        return total
+
+    def marcar_como_leida(self, id_notificacion: str, destinatario: Optional[str] = None) -> bool:
+        if destinatario is None:
+            destinatario = (
+                NotificacionModel.objects.filter(id_notificacion=id_notificacion)
+                .values_list('destinatario', flat=True)
+                .first()
+            )
+            if destinatario is None:
+                return False
         updated = NotificacionModel.objects.filter(
-            id_notificacion=id_notificacion
+            id_notificacion=id_notificacion, destinatario=destinatario
         ).update(leida=True)
+        if updated:
+            self._invalidar_no_leidas([destinatario])
         return updated > 0
 
+    def marcar_todas_como_leidas(self, destinatario: str) -> int:
+        """Un único UPDATE ... WHERE destinatario = %s AND NOT leida"""
+        updated = NotificacionModel.objects.filter(
+            destinatario=destinatario, leida=False
+        ).update(leida=True)
+        self._invalidar_no_leidas([destinatario])
+        return updated
+
     def eliminar(self, id_notificacion: str) -> bool:
-        deleted, _ = NotificacionModel.objects.filter(id_notificacion=id_notificacion).delete()
+        consulta = NotificacionModel.objects.filter(id_notificacion=id_notificacion)
+        destinatarios = list(consulta.values_list('destinatario', flat=True))
+        deleted, _ = consulta.delete()
+        self._invalidar_no_leidas(destinatarios)
         return deleted > 0
 
     def existe(self, id_notificacion: str) -> bool:
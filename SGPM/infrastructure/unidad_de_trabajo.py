@@ -0,0 +1,142 @@
+"""
+Unidad de trabajo por petición, compartida por los repositorios Django.
+
+Mientras hay una activa (`with UnidadDeTrabajo():`, o durante toda la
+petición con `SGPM.presentation.middleware.UnidadDeTrabajoMiddleware`):
+
+- Mapa de identidad: la misma clave devuelve la misma entidad sin volver a
+  consultarla, y las filas ya cargadas (asesor, solicitante, solicitud)
+  resuelven claves foráneas al guardar sin otro SELECT.
+- Escrituras diferidas: `guardar` de los repositorios que lo admiten solo
+  marca la entidad como modificada. `confirmar` las vuelca todas en una única
+  transacción, con un `guardar_muchos` por repositorio. Los servicios lo piden
+  al terminar cada operación (`confirmar_cambios` del repositorio), para que
+  los errores de la base lleguen a la vista; al salir se vuelca lo que quede.
+
+Las consultas no ven datos atrasados: antes de ejecutar cualquier SQL que
+nombre una tabla con cambios pendientes, estos se vuelcan primero.
+"""
+from __future__ import annotations
+
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from django.db import connection, transaction
+
+
+_actual: ContextVar[Optional["UnidadDeTrabajo"]] = ContextVar("sgpm_unidad_de_trabajo", default=None)
+
+
+def unidad_de_trabajo_actual() -> Optional["UnidadDeTrabajo"]:
+    """Unidad de trabajo activa en el contexto actual, o None"""
+    return _actual.get()
+
+
+class UnidadDeTrabajo:
+    """
+    Mapa de identidad y cambios pendientes de un contexto (normalmente una
+    petición). Las entidades se guardan por (clase del repositorio, clave) y las
+    filas por (modelo, campo de la clave natural, valor).
+    """
+
+    def __init__(self):
+        self._entidades: Dict[Tuple[type, Any], Any] = {}
+        self._filas: Dict[Tuple[type, str, Any], Any] = {}
+        self._pendientes: Dict[Tuple[type, Any], Tuple[Any, Any]] = {}
+        self._tablas_pendientes: Set[str] = set()
+        self._al_confirmar: List[Callable[[], None]] = []
+        self._volcando = False
+        self._token = None
+        self._envoltura = None
+        self.volcados = 0
+
+    def __enter__(self) -> "UnidadDeTrabajo":
+        self._token = _actual.set(self)
+        self._envoltura = connection.execute_wrapper(self._antes_de_ejecutar)
+        self._envoltura.__enter__()
+        return self
+
+    def __exit__(self, tipo, valor, traza) -> bool:
+        try:
+            if tipo is None:
+                self.confirmar()
+        finally:
+            self._envoltura.__exit__(None, None, None)
+            _actual.reset(self._token)
+        return False
+
+    # ---- mapa de identidad ----
+
+    def entidad(self, tipo: type, clave: Any) -> Optional[Any]:
+        return self._entidades.get((tipo, clave))
+
+    def registrar_entidad(self, tipo: type, clave: Any, entidad: Any) -> None:
+        self._entidades[(tipo, clave)] = entidad
+
+    def fila(self, modelo: type, campo: str, valor: Any) -> Optional[Any]:
+        return self._filas.get((modelo, campo, valor))
+
+    def registrar_fila(self, modelo: type, campo: str, valor: Any, fila: Any) -> None:
+        self._filas[(modelo, campo, valor)] = fila
+
+    def olvidar(self) -> None:
+        """Vacía el mapa de identidad (tras un borrado, que puede propagarse en cascada)"""
+        self._entidades.clear()
+        self._filas.clear()
+
+    # ---- cambios pendientes ----
+
+    @property
+    def volcando(self) -> bool:
+        return self._volcando
+
+    def tiene_pendientes(self) -> bool:
+        return bool(self._pendientes)
+
+    def registrar_modificada(self, repositorio: Any, clave: Any, entidad: Any,
+                             tablas: Iterable[str]) -> None:
+        """Marca la entidad para guardarla al confirmar; `tablas` son las que escribirá"""
+        self._pendientes[(type(repositorio), clave)] = (repositorio, entidad)
+        self._entidades[(type(repositorio), clave)] = entidad
+        self._tablas_pendientes.update(connection.ops.quote_name(t) for t in tablas)
+
+    def al_confirmar(self, funcion: Callable[[], None]) -> None:
+        """Ejecuta `funcion` tras el próximo volcado (o ya, si no hay nada pendiente)"""
+        if self._pendientes:
+            self._al_confirmar.append(funcion)
+        else:
+            funcion()
+
+    def confirmar(self) -> None:
+        """Vuelca los cambios pendientes en una transacción, un lote por repositorio"""
+        if not self._pendientes:
+            return
+        lotes: Dict[type, Tuple[Any, List[Any]]] = {}
+        for repositorio, entidad in self._pendientes.values():
+            lotes.setdefault(type(repositorio), (repositorio, []))[1].append(entidad)
+        self._pendientes.clear()
+        self._tablas_pendientes.clear()
+        funciones, self._al_confirmar = self._al_confirmar, []
+
+        self._volcando = True
+        try:
+            with transaction.atomic():
+                for repositorio, entidades in lotes.values():
+                    repositorio.guardar_muchos(entidades)
+        finally:
+            self._volcando = False
+        self.volcados += 1
+        for funcion in funciones:
+            transaction.on_commit(funcion)
+
+    def descartar(self) -> None:
+        """Abandona los cambios pendientes y el mapa de identidad"""
+        self._pendientes.clear()
+        self._tablas_pendientes.clear()
+        self._al_confirmar.clear()
+        self.olvidar()
+
+    def _antes_de_ejecutar(self, execute, sql, params, many, context):
+        if self._pendientes and not self._volcando and any(t in sql for t in self._tablas_pendientes):
+            self.confirmar()
+        return execute(sql, params, many, context)
@@ -0,0 +1,88 @@
+"""
+Comando para medir los viajes a la base de datos de guardar vs guardar_muchos.
+Uso: python manage.py benchmark_guardar_muchos [--filas 1000]
+
+Todo se ejecuta dentro de una transacción que se revierte al final,
+por lo que no deja datos en la base.
+"""
+from datetime import timedelta
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from SGPM.domain.entities import Asesor, Tarea
+from SGPM.domain.enums import EstadoTarea, PrioridadTarea, RolUsuario
+from SGPM.infrastructure.repositories import DjangoAsesorRepository, DjangoTareaRepository
+
+
+class Command(BaseCommand):
+    help = 'Compara consultas y tiempo de guardar (fila a fila) contra guardar_muchos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--filas',
+            type=int,
+            default=1000,
+            help='Cantidad de tareas a guardar en cada modo (default: 1000)'
+        )
+
+    def _tareas(self, prefijo, filas, asesores):
+        vencimiento = timezone.now() + timedelta(days=7)
+        return [
+            Tarea(
+                idTarea=f"{prefijo}-{i:06d}",
+                titulo=f"Tarea de benchmark {i}",
+                prioridad=list(PrioridadTarea)[i % len(PrioridadTarea)],
+                vencimiento=vencimiento,
+                estado=EstadoTarea.PENDIENTE,
+                asignadaA=asesores[i % len(asesores)],
+            )
+            for i in range(filas)
+        ]
+
+    def _medir(self, funcion):
+        # El log de consultas tiene un tope; se vacía para que el conteo sea exacto
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as consultas:
+            inicio = perf_counter()
+            funcion()
+            duracion = perf_counter() - inicio
+        return len(consultas.captured_queries), duracion
+
+    def handle(self, *args, **options):
+        filas = options['filas']
+        tarea_repo = DjangoTareaRepository()
+
+        with transaction.atomic():
+            asesores = DjangoAsesorRepository().guardar_muchos([
+                Asesor(
+                    nombres="Bench",
+                    apellidos=str(i),
+                    emailAsesor=f"bench{i}@sgpm.local",
+                    rol=RolUsuario.ASESOR,
+                )
+                for i in range(10)
+            ])
+
+            fila_a_fila = self._tareas("BENCH-A", filas, asesores)
+            lote = self._tareas("BENCH-B", filas, asesores)
+
+            resultados = [
+                ("guardar (insert)", self._medir(lambda: [tarea_repo.guardar(t) for t in fila_a_fila])),
+                ("guardar_muchos (insert)", self._medir(lambda: tarea_repo.guardar_muchos(lote))),
+                ("guardar (update)", self._medir(lambda: [tarea_repo.guardar(t) for t in fila_a_fila])),
+                ("guardar_muchos (update)", self._medir(lambda: tarea_repo.guardar_muchos(lote))),
+            ]
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'\nTareas por modo: {filas} ({connection.vendor})\n')
+        for nombre, (consultas, duracion) in resultados:
+            por_mil = consultas * 1000 / filas if filas else 0
+            self.stdout.write(
+                f'  {nombre:<26} {consultas:>7} consultas '
+                f'({por_mil:,.1f} por 1.000 filas)  {duracion * 1000:>9.1f} ms'
+            )
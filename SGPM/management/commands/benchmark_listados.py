@@ -0,0 +1,156 @@
+"""
+Comando para comparar la lectura de los listados: entidades + DTO contra las
+filas planas de `.values()` convertidas directamente a DTO.
+Uso: python manage.py benchmark_listados [--filas 10000] [--repeticiones 3]
+
+Mide, por listado, la latencia (mediana de las repeticiones) y la memoria
+asignada con tracemalloc (pico durante la lectura y lo que retiene el
+resultado). Todo se ejecuta dentro de una transacción que se revierte al
+final, por lo que no deja datos en la base.
+"""
+import tracemalloc
+from datetime import timedelta
+from statistics import median
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from SGPM.application.services import CitaService, SolicitudMigratoriaService, TareaService
+from SGPM.domain.entities import Asesor, Cita, Solicitante, SolicitudMigratoria, Tarea
+from SGPM.domain.enums import (
+    EstadoSolicitud, EstadoTarea, PrioridadTarea, RolUsuario, TipoCita, TipoServicio,
+)
+from SGPM.domain.value_objects import RangoFechaHora
+from SGPM.infrastructure.models import Cita as CitaModel
+from SGPM.infrastructure.repositories import (
+    DjangoAsesorRepository,
+    DjangoCitaRepository,
+    DjangoSolicitudMigratoriaRepository,
+    DjangoTareaRepository,
+)
+
+
+class Command(BaseCommand):
+    help = 'Compara latencia y memoria de los listados con entidades contra las filas planas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--filas',
+            type=int,
+            default=10000,
+            help='Filas de cada listado (default: 10000)'
+        )
+        parser.add_argument(
+            '--repeticiones',
+            type=int,
+            default=3,
+            help='Lecturas por modo para la mediana de latencia (default: 3)'
+        )
+
+    def _crear_datos(self, filas):
+        asesores = DjangoAsesorRepository().guardar_muchos([
+            Asesor(nombres="Bench", apellidos=str(i), emailAsesor=f"bench{i}@sgpm.local", rol=RolUsuario.ASESOR)
+            for i in range(10)
+        ])
+        solicitudes = [
+            SolicitudMigratoria(
+                codigo=f"BENCH-S-{i:06d}",
+                tipoServicio=list(TipoServicio)[i % len(TipoServicio)],
+                estadoActual=EstadoSolicitud.EN_REVISION,
+                solicitante=Solicitante(f"B{i:09d}", "Nombre", f"Bench {i}", f"bench{i}@correo.local", "0999"),
+                asesor=asesores[i % len(asesores)],
+            )
+            for i in range(filas)
+        ]
+        DjangoSolicitudMigratoriaRepository().guardar_muchos(solicitudes)
+
+        ahora = timezone.now()
+        DjangoTareaRepository().guardar_muchos([
+            Tarea(
+                idTarea=f"BENCH-T-{i:06d}",
+                titulo=f"Tarea de benchmark {i}",
+                prioridad=list(PrioridadTarea)[i % len(PrioridadTarea)],
+                vencimiento=ahora + timedelta(days=7),
+                estado=EstadoTarea.PENDIENTE,
+                asignadaA=asesores[i % len(asesores)],
+            )
+            for i in range(filas)
+        ])
+        DjangoCitaRepository().guardar_muchos([
+            Cita(
+                idCita=f"BENCH-C-{i:06d}",
+                solicitudCodigo=solicitudes[i].codigo,
+                rango=RangoFechaHora(
+                    inicio=ahora + timedelta(minutes=i),
+                    fin=ahora + timedelta(minutes=i + 1),
+                ),
+                tipo=list(TipoCita)[i % len(TipoCita)],
+            )
+            for i in range(filas)
+        ])
+        return ahora, ahora + timedelta(minutes=filas)
+
+    def _medir(self, funcion, repeticiones):
+        """(consultas, filas, mediana en segundos, pico KiB, retenido KiB)"""
+        duraciones = []
+        for _ in range(repeticiones):
+            inicio = perf_counter()
+            funcion()
+            duraciones.append(perf_counter() - inicio)
+
+        # tracemalloc ralentiza la lectura: se mide aparte de la latencia
+        connection.queries_log.clear()
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as consultas:
+                resultado = funcion()
+            retenido, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return len(consultas.captured_queries), len(resultado), median(duraciones), pico / 1024, retenido / 1024
+
+    def handle(self, *args, **options):
+        filas = options['filas']
+        repeticiones = max(options['repeticiones'], 1)
+        tareas = TareaService(DjangoTareaRepository())
+        solicitudes = SolicitudMigratoriaService(DjangoSolicitudMigratoriaRepository())
+        citas = CitaService(DjangoCitaRepository())
+
+        with transaction.atomic():
+            inicio, fin = self._crear_datos(filas)
+            agenda_modelos = CitaModel.objects.select_related(
+                "solicitud", "solicitud__solicitante", "solicitud__asesor",
+            ).filter(inicio__gte=inicio, inicio__lte=fin).order_by("inicio")
+
+            casos = [
+                ("tareas", [
+                    ("entidades + DTO", lambda: tareas.listar_pagina(limite=filas).elementos),
+                    ("filas planas", lambda: tareas.listar_pagina_resumen(limite=filas).elementos),
+                ]),
+                ("solicitudes", [
+                    ("entidades + DTO", lambda: solicitudes.listar_pagina(limite=filas).elementos),
+                    ("filas planas", lambda: solicitudes.listar_pagina_resumen(limite=filas).elementos),
+                ]),
+                ("citas (agenda)", [
+                    ("modelos select_related", lambda: list(agenda_modelos.all())),
+                    ("filas planas", lambda: citas.listar_agenda(inicio, fin)),
+                ]),
+            ]
+            resultados = [
+                (listado, [(modo, self._medir(funcion, repeticiones)) for modo, funcion in modos])
+                for listado, modos in casos
+            ]
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'\nFilas por listado: {filas} ({connection.vendor}, mediana de {repeticiones})\n')
+        for listado, modos in resultados:
+            self.stdout.write(f'  {listado}')
+            for modo, (consultas, leidas, duracion, pico, retenido) in modos:
+                self.stdout.write(
+                    f'    {modo:<24} {leidas:>7} filas {consultas:>3} consultas '
+                    f'{duracion * 1000:>9.1f} ms  pico {pico:>10,.0f} KiB  retenido {retenido:>10,.0f} KiB'
+                )
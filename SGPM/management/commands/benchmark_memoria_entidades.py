@@ -0,0 +1,95 @@
+"""
+Comando para medir con tracemalloc la memoria de un listado grande de entidades.
+Uso: python manage.py benchmark_memoria_entidades [--filas 100000]
+
+Compara la conversión fila a fila sin compartir relaciones (un Asesor por
+tarea) con la lectura por bloques de los listados (`_iterar`), que comparte el
+asesor entre las filas de cada bloque.
+Informa la memoria retenida por el resultado, el pico durante la lectura y los
+objetos Asesor distintos. Todo se ejecuta dentro de una transacción que se
+revierte al final, por lo que no deja datos en la base.
+"""
+import gc
+import tracemalloc
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from SGPM.domain.entities import Asesor, Tarea
+from SGPM.domain.enums import EstadoTarea, PrioridadTarea, RolUsuario
+from SGPM.infrastructure.repositories import ITER_CHUNK_SIZE, DjangoAsesorRepository, DjangoTareaRepository
+
+
+class Command(BaseCommand):
+    help = 'Mide con tracemalloc la memoria de listar muchas tareas como entidades'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--filas',
+            type=int,
+            default=100000,
+            help='Cantidad de tareas del listado (default: 100000)'
+        )
+
+    def _crear_datos(self, repo, filas):
+        asesores = DjangoAsesorRepository().guardar_muchos([
+            Asesor(nombres="Bench", apellidos=str(i), emailAsesor=f"bench{i}@sgpm.local", rol=RolUsuario.ASESOR)
+            for i in range(10)
+        ])
+        vencimiento = timezone.now() + timedelta(days=7)
+        for inicio in range(0, filas, 10000):
+            repo.guardar_muchos([
+                Tarea(
+                    idTarea=f"BENCH-M-{i:07d}",
+                    titulo=f"Tarea de benchmark {i}",
+                    prioridad=list(PrioridadTarea)[i % len(PrioridadTarea)],
+                    vencimiento=vencimiento,
+                    estado=EstadoTarea.PENDIENTE,
+                    asignadaA=asesores[i % len(asesores)],
+                )
+                for i in range(inicio, min(inicio + 10000, filas))
+            ])
+
+    def _medir(self, funcion):
+        """(entidades, retenido KiB, pico KiB)"""
+        gc.collect()
+        tracemalloc.start()
+        try:
+            resultado = funcion()
+            retenido, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return resultado, retenido / 1024, pico / 1024
+
+    def handle(self, *args, **options):
+        filas = options['filas']
+        repo = DjangoTareaRepository()
+
+        with transaction.atomic():
+            self._crear_datos(repo, filas)
+            consulta = repo._consulta().filter(id_tarea__startswith="BENCH-M-")
+
+            modos = [
+                ("un asesor por fila", lambda: [
+                    repo._to_entity(m) for m in consulta.iterator(chunk_size=ITER_CHUNK_SIZE)
+                ]),
+                ("asesor compartido", lambda: list(repo._iterar(consulta))),
+            ]
+            resultados = []
+            for nombre, funcion in modos:
+                tareas, retenido, pico = self._medir(funcion)
+                asesores = len({id(t.asignadaA) for t in tareas})
+                resultados.append((nombre, len(tareas), asesores, retenido, pico))
+                del tareas
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'\nTareas: {filas} ({connection.vendor})\n')
+        for nombre, leidas, asesores, retenido, pico in resultados:
+            por_fila = retenido * 1024 / leidas if leidas else 0
+            self.stdout.write(
+                f'  {nombre:<20} {leidas:>8} tareas {asesores:>7} objetos Asesor  '
+                f'retenido {retenido:>10,.0f} KiB ({por_fila:,.0f} B/fila)  pico {pico:>10,.0f} KiB'
+            )
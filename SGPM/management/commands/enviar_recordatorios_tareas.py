@@ -0,0 +1,58 @@
+"""
+Comando para enviar los recordatorios de vencimiento de tareas.
+Uso: python manage.py enviar_recordatorios_tareas [--horas 24] [--simular]
+
+Pensado para ejecutarse periódicamente (cron). Cada tarea abierta y asignada
+que vence en las próximas horas recibe un único recordatorio por vencimiento:
+las ejecuciones siguientes la omiten salvo que su vencimiento cambie.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from SGPM.application.services import NotificacionService, TareaService
+from SGPM.infrastructure.repositories import (
+    DjangoNotificacionRepository,
+    DjangoRecordatorioTareaRepository,
+    DjangoTareaRepository,
+)
+
+
+class Command(BaseCommand):
+    help = 'Envía en lote los recordatorios de tareas por vencer, sin repetir los ya enviados'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horas',
+            type=int,
+            default=24,
+            help='Ventana de vencimiento en horas desde ahora (default: 24)'
+        )
+        parser.add_argument(
+            '--simular',
+            action='store_true',
+            help='Solo lista las tareas que se recordarían, sin enviar ni marcar nada'
+        )
+
+    def handle(self, *args, **options):
+        horas = options['horas']
+        if horas < 1:
+            raise CommandError('--horas debe ser mayor que cero')
+
+        recordatorio_repo = DjangoRecordatorioTareaRepository()
+
+        if options['simular']:
+            pendientes = recordatorio_repo.listar_pendientes(horas)
+            for tarea in pendientes:
+                self.stdout.write(
+                    f'  {tarea.idTarea} {tarea.asignadaA.emailAsesor} '
+                    f'vence {tarea.vencimiento:%Y-%m-%d %H:%M}: {tarea.titulo}'
+                )
+            self.stdout.write(f'{len(pendientes)} recordatorio(s) pendiente(s) en las próximas {horas} h')
+            return
+
+        tarea_service = TareaService(
+            DjangoTareaRepository(),
+            notificacion_service=NotificacionService(DjangoNotificacionRepository()),
+            recordatorio_repo=recordatorio_repo,
+        )
+        enviados = tarea_service.enviar_recordatorios_vencimiento(horas)
+        self.stdout.write(self.style.SUCCESS(f'Recordatorios enviados: {enviados}'))
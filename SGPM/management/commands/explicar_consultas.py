@@ -0,0 +1,178 @@
+"""
+Comando para revisar el plan de ejecución de las consultas de los repositorios.
+Uso: python manage.py explicar_consultas [--solo-escaneos] [--estricto]
+
+Ejecuta cada consulta de lectura de los repositorios Django, captura el SQL
+que generan y lo pasa por EXPLAIN. Marca las que recorren la tabla completa
+(SCAN en SQLite, Seq Scan en PostgreSQL, type=ALL en MySQL). Un recorrido
+ordenado por índice con LIMIT (paginación por cursor) no se marca: se detiene
+al completar la página.
+
+Los planes dependen de las estadísticas de la base: con tablas vacías o sin
+ANALYZE el planificador puede preferir un recorrido completo aunque exista
+el índice adecuado.
+"""
+import re
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from SGPM.domain.enums import (
+    EstadoSolicitud,
+    EstadoDocumento,
+    EstadoTarea,
+    EstadoCita,
+    TipoDocumento,
+    TipoCita,
+    PrioridadTarea,
+)
+from SGPM.infrastructure.repositories import (
+    DjangoSolicitanteRepository,
+    DjangoAsesorRepository,
+    DjangoSolicitudMigratoriaRepository,
+    DjangoExpedienteRepository,
+    DjangoDocumentoRepository,
+    DjangoTareaRepository,
+    DjangoCitaRepository,
+    DjangoNotificacionRepository,
+)
+
+
+# Patrones de recorrido completo por motor (sobre cada línea del plan)
+ESCANEO_COMPLETO = {
+    'sqlite': re.compile(r'^SCAN '),
+    'postgresql': re.compile(r'\bSeq Scan on\b'),
+    'mysql': re.compile(r'\| ALL \|'),
+}
+
+
+def _consultas_repositorios():
+    """Catálogo (nombre, llamada) de las lecturas filtradas de los repositorios"""
+    ahora = timezone.now()
+    email = 'explain@sgpm.local'
+    solicitantes = DjangoSolicitanteRepository()
+    asesores = DjangoAsesorRepository()
+    solicitudes = DjangoSolicitudMigratoriaRepository()
+    expedientes = DjangoExpedienteRepository()
+    documentos = DjangoDocumentoRepository()
+    tareas = DjangoTareaRepository()
+    citas = DjangoCitaRepository()
+    notificaciones = DjangoNotificacionRepository()
+
+    return [
+        ('solicitantes.obtener_por_cedula', lambda: solicitantes.obtener_por_cedula('0000000000')),
+        ('solicitantes.obtener_por_correo', lambda: solicitantes.obtener_por_correo(email)),
+        ('solicitantes.listar_pagina', lambda: solicitantes.listar_pagina()),
+        ('asesores.obtener_por_email', lambda: asesores.obtener_por_email(email)),
+        ('asesores.listar_activos', lambda: asesores.listar_activos()),
+        ('solicitudes.listar_pagina', lambda: solicitudes.listar_pagina()),
+        ('solicitudes.listar_por_estado', lambda: solicitudes.listar_por_estado(EstadoSolicitud.EN_REVISION)),
+        ('solicitudes.listar_por_solicitante', lambda: solicitudes.listar_por_solicitante('0000000000')),
+        ('solicitudes.listar_por_asesor', lambda: solicitudes.listar_por_asesor(email)),
+        ('solicitudes.listar_pagina_historial_estados', lambda: solicitudes.listar_pagina_historial_estados('SOL-0000')),
+        ('solicitudes.listar_pagina_historial_fechas', lambda: solicitudes.listar_pagina_historial_fechas('SOL-0000')),
+        ('expedientes.listar_por_solicitante', lambda: expedientes.listar_por_solicitante('0000000000')),
+        ('expedientes.obtener_por_codigo', lambda: expedientes.obtener_por_codigo('SOL-0000')),
+        ('documentos.listar_por_solicitud', lambda: documentos.listar_por_solicitud('SOL-0000')),
+        ('documentos.listar_por_estado', lambda: documentos.listar_por_estado(EstadoDocumento.RECIBIDO)),
+        ('documentos.listar_por_tipo', lambda: documentos.listar_por_tipo(TipoDocumento.PASAPORTE)),
+        ('tareas.listar_pagina', lambda: tareas.listar_pagina()),
+        ('tareas.listar_pagina (asesor)', lambda: tareas.listar_pagina(email_asesor=email)),
+        ('tareas.listar_por_estado', lambda: tareas.listar_por_estado(EstadoTarea.PENDIENTE)),
+        ('tareas.listar_por_prioridad', lambda: tareas.listar_por_prioridad(PrioridadTarea.ALTA)),
+        ('tareas.listar_por_asesor', lambda: tareas.listar_por_asesor(email)),
+        ('tareas.listar_por_solicitud', lambda: tareas.listar_por_solicitud('SOL-0000')),
+        ('tareas.listar_vencidas', lambda: tareas.listar_vencidas()),
+        ('tareas.listar_por_vencer', lambda: tareas.listar_por_vencer(24)),
+        ('citas.listar_pagina', lambda: citas.listar_pagina()),
+        ('citas.listar_por_estado', lambda: citas.listar_por_estado(EstadoCita.PROGRAMADA)),
+        ('citas.listar_por_tipo', lambda: citas.listar_por_tipo(TipoCita.CONSULAR)),
+        ('citas.listar_por_solicitud', lambda: citas.listar_por_solicitud('SOL-0000')),
+        ('citas.listar_por_rango_fecha', lambda: citas.listar_por_rango_fecha(ahora, ahora + timedelta(days=1))),
+        ('citas.ocupados_por_recurso', lambda: citas.ocupados_por_recurso(ahora, ahora + timedelta(days=7))),
+        ('citas.verificar_disponibilidad',
+         lambda: citas.verificar_disponibilidad(ahora, ahora + timedelta(hours=1))),
+        ('citas.verificar_disponibilidad (excluir_id)',
+         lambda: citas.verificar_disponibilidad(ahora, ahora + timedelta(hours=1), excluir_id='CITA-0000')),
+        ('citas.verificar_disponibilidad (recurso)',
+         lambda: citas.verificar_disponibilidad(ahora, ahora + timedelta(hours=1), recurso='VENT-01', capacidad=3)),
+        ('notificaciones.listar_por_destinatario', lambda: notificaciones.listar_por_destinatario(email)),
+        ('notificaciones.listar_no_leidas', lambda: notificaciones.listar_no_leidas(email)),
+        ('notificaciones.listar_pagina_por_destinatario', lambda: notificaciones.listar_pagina_por_destinatario(email)),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta EXPLAIN sobre las consultas de los repositorios y marca los recorridos completos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--solo-escaneos',
+            action='store_true',
+            help='Muestra solo las consultas con recorrido completo de tabla'
+        )
+        parser.add_argument(
+            '--estricto',
+            action='store_true',
+            help='Termina con error si alguna consulta recorre la tabla completa'
+        )
+
+    def _capturar_sql(self, llamada):
+        """SQL (con parámetros ya interpolados) de los SELECT que ejecuta la llamada"""
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as consultas:
+            llamada()
+        return [
+            q['sql'] for q in consultas.captured_queries
+            if q['sql'].lstrip().upper().startswith('SELECT')
+        ]
+
+    def _explicar(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}')
+            filas = cursor.fetchall()
+        if connection.vendor == 'sqlite':
+            # (id, parent, notused, detail)
+            return [fila[-1] for fila in filas]
+        return [' | '.join(str(c) for c in fila) for fila in filas]
+
+    def _recorrido_acotado(self, sql, linea):
+        """Recorrido por índice que termina en LIMIT: lee solo las filas de la página"""
+        return ' LIMIT ' in sql.upper() and 'INDEX' in linea.upper()
+
+    def handle(self, *args, **options):
+        patron = ESCANEO_COMPLETO.get(connection.vendor)
+        if patron is None:
+            raise CommandError(f'Motor no soportado para el análisis de planes: {connection.vendor}')
+
+        marcadas = []
+        with transaction.atomic():
+            for nombre, llamada in _consultas_repositorios():
+                for sql in self._capturar_sql(llamada):
+                    plan = self._explicar(sql)
+                    escaneos = [
+                        linea for linea in plan
+                        if patron.search(linea) and not self._recorrido_acotado(sql, linea)
+                    ]
+                    if escaneos:
+                        marcadas.append(nombre)
+                    elif options['solo_escaneos']:
+                        continue
+
+                    estado = self.style.ERROR('ESCANEO COMPLETO') if escaneos else self.style.SUCCESS('ok')
+                    self.stdout.write(f'\n{nombre}: {estado}')
+                    for linea in plan:
+                        self.stdout.write(f'    {linea}')
+            transaction.set_rollback(True)
+
+        total = len(_consultas_repositorios())
+        self.stdout.write(
+            f'\n{len(set(marcadas))} de {total} consultas con recorrido completo ({connection.vendor})'
+        )
+        if marcadas:
+            self.stdout.write('  ' + ', '.join(sorted(set(marcadas))))
+        if options['estricto'] and marcadas:
+            raise CommandError('Hay consultas de repositorio que recorren la tabla completa')
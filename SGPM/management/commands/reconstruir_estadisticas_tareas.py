@@ -0,0 +1,62 @@
+"""
+Comando para recalcular las estadísticas materializadas de tareas.
+Uso: python manage.py reconstruir_estadisticas_tareas [--solo-verificar]
+
+Compara la tabla estadistica_tarea_diaria con los conteos reales de la tabla
+de tareas, la reconstruye desde cero y verifica que el resultado coincida.
+Útil tras cargas masivas o cambios hechos por fuera de TareaService
+(admin, guardar_muchos, borrados en cascada de solicitudes).
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from SGPM.infrastructure.repositories import DjangoEstadisticaTareaRepository
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye la tabla de estadísticas diarias de tareas y verifica que coincida'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--solo-verificar',
+            action='store_true',
+            help='Solo informa las diferencias, sin reconstruir (termina con error si hay)'
+        )
+        parser.add_argument(
+            '--mostrar',
+            type=int,
+            default=20,
+            help='Cantidad máxima de diferencias a listar (default: 20)'
+        )
+
+    def _informar(self, diferencias, mostrar):
+        for (dia, email, estado, prioridad), (materializado, real) in sorted(
+            diferencias.items(), key=lambda item: (str(item[0][0]), item[0][1:])
+        )[:mostrar]:
+            self.stdout.write(
+                f'  {dia or "sin vencimiento"} {email or "sin asignar"} {estado}/{prioridad}: '
+                f'tabla={materializado} real={real}'
+            )
+        if len(diferencias) > mostrar:
+            self.stdout.write(f'  ... y {len(diferencias) - mostrar} más')
+
+    def handle(self, *args, **options):
+        repo = DjangoEstadisticaTareaRepository()
+
+        diferencias = repo.diferencias()
+        if diferencias:
+            self.stdout.write(self.style.WARNING(f'{len(diferencias)} grupo(s) con conteos distintos:'))
+            self._informar(diferencias, options['mostrar'])
+        else:
+            self.stdout.write(self.style.SUCCESS('La tabla de estadísticas coincide con las tareas'))
+
+        if options['solo_verificar']:
+            if diferencias:
+                raise CommandError('Las estadísticas materializadas no coinciden con las tareas')
+            return
+
+        filas = repo.reconstruir()
+        restantes = repo.diferencias()
+        if restantes:
+            self._informar(restantes, options['mostrar'])
+            raise CommandError('La reconstrucción no coincide con las tareas')
+        self.stdout.write(self.style.SUCCESS(f'Estadísticas reconstruidas: {filas} fila(s) verificadas'))
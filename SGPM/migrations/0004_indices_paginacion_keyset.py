@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SGPM', '0003_add_password_to_asesor'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cita',
+            index=models.Index(fields=['fecha_creacion', 'id_cita'], name='cita_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitante',
+            index=models.Index(fields=['fecha_creacion', 'id'], name='solicitante_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitudmigratoria',
+            index=models.Index(fields=['fecha_creacion', 'codigo'], name='solicitud_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['fecha_creacion', 'id_tarea'], name='tarea_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['asignada_a', 'fecha_creacion', 'id_tarea'], name='tarea_asesor_keyset_idx'),
+        ),
+    ]
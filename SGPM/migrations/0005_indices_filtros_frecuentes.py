@@ -0,0 +1,53 @@
+# Generated by Django 6.0.1 on 2026-10-17 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SGPM', '0004_indices_paginacion_keyset'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cita',
+            index=models.Index(fields=['inicio'], name='cita_inicio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cita',
+            index=models.Index(condition=models.Q(('estado__in', ['CANCELADA', 'COMPLETADA']), _negated=True), fields=['inicio', 'fin'], name='cita_activa_rango_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cita',
+            index=models.Index(fields=['estado', 'fecha_creacion'], name='cita_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documento',
+            index=models.Index(fields=['estado', 'fecha_expiracion'], name='documento_estado_exp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(fields=['destinatario', 'fecha_creacion'], name='notif_destinatario_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(condition=models.Q(('leida', False)), fields=['destinatario', 'fecha_creacion'], name='notif_no_leidas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitante',
+            index=models.Index(fields=['correo'], name='solicitante_correo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitudmigratoria',
+            index=models.Index(fields=['estado_actual', 'fecha_creacion'], name='solicitud_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['estado', 'fecha_creacion'], name='tarea_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(condition=models.Q(('estado', 'COMPLETADA'), _negated=True), fields=['vencimiento'], name='tarea_abierta_venc_idx'),
+        ),
+    ]
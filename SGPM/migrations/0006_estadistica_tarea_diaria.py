@@ -0,0 +1,58 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:45
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def poblar_estadisticas(apps, schema_editor):
+    """Carga inicial de los conteos desde las tareas existentes"""
+    Tarea = apps.get_model('SGPM', 'Tarea')
+    EstadisticaTareaDiaria = apps.get_model('SGPM', 'EstadisticaTareaDiaria')
+    filas = (
+        Tarea.objects.order_by()
+        .annotate(dia=TruncDate('vencimiento', tzinfo=timezone.get_default_timezone()))
+        .values('dia', 'asignada_a__email_asesor', 'estado', 'prioridad')
+        .annotate(cantidad=Count('pk'))
+    )
+    EstadisticaTareaDiaria.objects.bulk_create(
+        [
+            EstadisticaTareaDiaria(
+                dia=f['dia'],
+                asesor_email=f['asignada_a__email_asesor'] or '',
+                estado=f['estado'],
+                prioridad=f['prioridad'],
+                cantidad=f['cantidad'],
+            )
+            for f in filas
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SGPM', '0005_indices_filtros_frecuentes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadisticaTareaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField(blank=True, null=True)),
+                ('asesor_email', models.EmailField(blank=True, default='', max_length=254)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'PENDIENTE'), ('EN_PROGRESO', 'EN_PROGRESO'), ('COMPLETADA', 'COMPLETADA'), ('CANCELADA', 'CANCELADA')], max_length=20)),
+                ('prioridad', models.CharField(choices=[('BAJA', 'BAJA'), ('MEDIA', 'MEDIA'), ('ALTA', 'ALTA'), ('CRITICA', 'CRITICA')], max_length=20)),
+                ('cantidad', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'estadistica_tarea_diaria',
+                'ordering': ['dia', 'asesor_email', 'estado', 'prioridad'],
+                'constraints': [models.UniqueConstraint(fields=('dia', 'asesor_email', 'estado', 'prioridad'), name='estadistica_tarea_clave_uniq'), models.UniqueConstraint(condition=models.Q(('dia__isnull', True)), fields=('asesor_email', 'estado', 'prioridad'), name='estadistica_tarea_sin_dia_uniq')],
+            },
+        ),
+        migrations.RunPython(poblar_estadisticas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 6.0.1 on 2026-10-17 14:10
+
+from django.db import migrations, models
+
+
+# Solo PostgreSQL: ninguna cita activa puede solaparse con otra (rango semiabierto [inicio, fin))
+CREAR_EXCLUSION_CITAS = """
+    ALTER TABLE cita ADD CONSTRAINT cita_sin_solapamiento_excl
+    EXCLUDE USING gist (tstzrange(inicio, fin, '[)') WITH &&)
+    WHERE (estado NOT IN ('CANCELADA', 'COMPLETADA'))
+"""
+ELIMINAR_EXCLUSION_CITAS = "ALTER TABLE cita DROP CONSTRAINT IF EXISTS cita_sin_solapamiento_excl"
+
+# Pares de citas activas que se solapan: con alguno, ADD CONSTRAINT falla. Antes
+# de esta migración nada impedía solapes, así que una base existente puede tenerlos.
+SOLAPAMIENTOS_CITAS = """
+    SELECT a.id_cita, a.inicio, a.fin, b.id_cita, b.inicio, b.fin
+    FROM cita a
+    JOIN cita b ON a.id_cita < b.id_cita AND a.inicio < b.fin AND b.inicio < a.fin
+    WHERE a.estado NOT IN ('CANCELADA', 'COMPLETADA')
+      AND b.estado NOT IN ('CANCELADA', 'COMPLETADA')
+    ORDER BY a.inicio, a.id_cita, b.id_cita
+"""
+SOLAPAMIENTOS_LISTADOS = 20
+
+
+def solapamientos_citas(connection):
+    with connection.cursor() as cursor:
+        cursor.execute(SOLAPAMIENTOS_CITAS)
+        return cursor.fetchall()
+
+
+def mensaje_solapamientos(pares) -> str:
+    listado = "".join(
+        f"\n  {a} [{a_inicio} - {a_fin}) con {b} [{b_inicio} - {b_fin})"
+        for a, a_inicio, a_fin, b, b_inicio, b_fin in pares[:SOLAPAMIENTOS_LISTADOS]
+    )
+    if len(pares) > SOLAPAMIENTOS_LISTADOS:
+        listado += f"\n  ... y {len(pares) - SOLAPAMIENTOS_LISTADOS} más"
+    return (
+        f"No se puede crear cita_sin_solapamiento_excl: {len(pares)} par(es) de citas "
+        f"activas se solapan. Reprograme una cita de cada par o cancélela "
+        f"(UPDATE cita SET estado = 'CANCELADA' WHERE id_cita IN (...)) y vuelva a "
+        f"ejecutar migrate:{listado}"
+    )
+
+
+def crear_exclusion_citas(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        pares = solapamientos_citas(schema_editor.connection)
+        if pares:
+            raise RuntimeError(mensaje_solapamientos(pares))
+        schema_editor.execute(CREAR_EXCLUSION_CITAS)
+
+
+def eliminar_exclusion_citas(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(ELIMINAR_EXCLUSION_CITAS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SGPM', '0006_estadistica_tarea_diaria'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BloqueoAgendaCita',
+            fields=[
+                ('dia', models.DateField(primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'bloqueo_agenda_cita',
+            },
+        ),
+        migrations.RunPython(crear_exclusion_citas, eliminar_exclusion_citas),
+    ]
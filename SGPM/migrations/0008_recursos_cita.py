@@ -0,0 +1,86 @@
+# Generated by Django 6.0.1 on 2026-10-17 17:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Solo PostgreSQL: la exclusión de solapamientos pasa a cubrir solo la agenda general.
+# Las citas con recurso admiten solapes hasta la capacidad del recurso y se serializan
+# bloqueando la fila del recurso al reservar.
+EXCLUSION_AGENDA_GENERAL = """
+    ALTER TABLE cita DROP CONSTRAINT IF EXISTS cita_sin_solapamiento_excl;
+    ALTER TABLE cita ADD CONSTRAINT cita_sin_solapamiento_excl
+    EXCLUDE USING gist (tstzrange(inicio, fin, '[)') WITH &&)
+    WHERE (recurso_id IS NULL AND estado NOT IN ('CANCELADA', 'COMPLETADA'))
+"""
+EXCLUSION_TODAS = """
+    ALTER TABLE cita DROP CONSTRAINT IF EXISTS cita_sin_solapamiento_excl;
+    ALTER TABLE cita ADD CONSTRAINT cita_sin_solapamiento_excl
+    EXCLUDE USING gist (tstzrange(inicio, fin, '[)') WITH &&)
+    WHERE (estado NOT IN ('CANCELADA', 'COMPLETADA'))
+"""
+# Al revertir, las citas con recurso que se solapan (hasta su capacidad) impiden
+# volver a la exclusión sobre todas las citas
+SOLAPAMIENTOS_CITAS = """
+    SELECT a.id_cita, b.id_cita
+    FROM cita a
+    JOIN cita b ON a.id_cita < b.id_cita AND a.inicio < b.fin AND b.inicio < a.fin
+    WHERE a.estado NOT IN ('CANCELADA', 'COMPLETADA')
+      AND b.estado NOT IN ('CANCELADA', 'COMPLETADA')
+    ORDER BY a.inicio, a.id_cita, b.id_cita
+"""
+
+
+def exclusion_agenda_general(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(EXCLUSION_AGENDA_GENERAL)
+
+
+def exclusion_todas(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(SOLAPAMIENTOS_CITAS)
+            pares = cursor.fetchall()
+        if pares:
+            listado = ", ".join(f"{a}/{b}" for a, b in pares[:20])
+            raise RuntimeError(
+                f"No se puede revertir: {len(pares)} par(es) de citas activas se solapan "
+                f"(citas con recurso). Cancele o reprograme una de cada par: {listado}"
+            )
+        schema_editor.execute(EXCLUSION_TODAS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SGPM', '0007_reserva_citas_sin_solapamiento'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecursoCita',
+            fields=[
+                ('codigo', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('nombre', models.CharField(blank=True, max_length=100)),
+                ('tipo', models.CharField(choices=[('VENTANILLA', 'VENTANILLA'), ('ASESOR', 'ASESOR')], default='VENTANILLA', max_length=20)),
+                ('capacidad', models.PositiveSmallIntegerField(default=1)),
+                ('activo', models.BooleanField(default=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'recurso_cita',
+                'ordering': ['codigo'],
+                'constraints': [models.CheckConstraint(condition=models.Q(('capacidad__gte', 1)), name='recurso_cita_capacidad_positiva')],
+            },
+        ),
+        migrations.AddField(
+            model_name='cita',
+            name='recurso',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='citas', to='SGPM.recursocita'),
+        ),
+        migrations.AddIndex(
+            model_name='cita',
+            index=models.Index(condition=models.Q(('estado__in', ['CANCELADA', 'COMPLETADA']), _negated=True), fields=['recurso', 'inicio', 'fin'], name='cita_recurso_activa_idx'),
+        ),
+        migrations.RunPython(exclusion_agenda_general, exclusion_todas),
+    ]
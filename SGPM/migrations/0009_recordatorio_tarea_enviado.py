@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-17 18:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SGPM', '0008_recursos_cita'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecordatorioTareaEnviado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vencimiento', models.DateTimeField()),
+                ('lote', models.CharField(max_length=32)),
+                ('enviado_en', models.DateTimeField(auto_now_add=True)),
+                ('tarea', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recordatorios_enviados', to='SGPM.tarea')),
+            ],
+            options={
+                'db_table': 'recordatorio_tarea_enviado',
+                'ordering': ['-enviado_en'],
+                'indexes': [models.Index(fields=['lote'], name='recordatorio_lote_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tarea', 'vencimiento'), name='recordatorio_tarea_venc_uniq')],
+            },
+        ),
+    ]
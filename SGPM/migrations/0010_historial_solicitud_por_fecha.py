@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-17 18:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SGPM', '0009_recordatorio_tarea_enviado'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='historialestadosolicitud',
+            name='fecha_cambio',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='historialfechaproceso',
+            name='fecha_cambio',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='historialestadosolicitud',
+            index=models.Index(fields=['solicitud', 'fecha_cambio', 'id'], name='hist_estado_solicitud_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historialfechaproceso',
+            index=models.Index(fields=['solicitud', 'fecha_cambio', 'id'], name='hist_fecha_solicitud_idx'),
+        ),
+    ]
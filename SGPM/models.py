@@ -5,7 +5,11 @@ from SGPM.infrastructure.models import (
     SolicitudMigratoria,
     Documento,
     Tarea,
+    EstadisticaTareaDiaria,
+    RecordatorioTareaEnviado,
+    RecursoCita,
     Cita,
+    BloqueoAgendaCita,
     Notificacion,
     HistorialEstadoSolicitud,
     HistorialFechaProceso,
@@ -17,7 +21,11 @@ __all__ = [
     'SolicitudMigratoria',
     'Documento',
     'Tarea',
+    'EstadisticaTareaDiaria',
+    'RecordatorioTareaEnviado',
+    'RecursoCita',
     'Cita',
+    'BloqueoAgendaCita',
     'Notificacion',
     'HistorialEstadoSolicitud',
     'HistorialFechaProceso',
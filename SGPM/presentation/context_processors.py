@@ -0,0 +1,17 @@
+"""
+Context processors del proyecto (registrados en TEMPLATES en settings).
+"""
+from SGPM.application import contenedor
+from SGPM.application.services import NotificacionService
+
+
+def notificaciones(request):
+    """
+    Contador de notificaciones no leídas del asesor en sesión para el indicador
+    de la barra lateral. Sale de la caché en casi todas las peticiones.
+    """
+    email = request.session.get("asesor_email") if hasattr(request, "session") else None
+    if not email:
+        return {}
+    service = contenedor.obtener(NotificacionService)
+    return {"notificaciones_no_leidas": service.contar_no_leidas(email)}
@@ -0,0 +1,188 @@
+"""
+Middleware de la capa de presentación.
+"""
+import logging
+import re
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib import messages
+from django.db import connection
+
+from SGPM.infrastructure.unidad_de_trabajo import UnidadDeTrabajo
+
+
+logger = logging.getLogger(__name__)
+
+
+class UnidadDeTrabajoMiddleware:
+    """
+    Abre una unidad de trabajo por petición: los repositorios comparten el mapa
+    de identidad durante la vista. Los servicios vuelcan sus escrituras diferidas
+    al terminar cada operación (`confirmar_cambios`), dentro del try de la vista;
+    aquí solo queda lo que se guardó sin pasar por un servicio. Si la vista
+    responde con un error de servidor se descarta.
+
+    Ese último volcado ocurre con la respuesta ya armada: si falla, se descartan
+    los mensajes que la vista dejó en cola (un "guardado correctamente" que ya
+    no es cierto) y el error sigue su curso.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with UnidadDeTrabajo() as unidad:
+            request.unidad_de_trabajo = unidad
+            response = self.get_response(request)
+            if response.status_code >= 500:
+                unidad.descartar()
+            else:
+                try:
+                    unidad.confirmar()
+                except Exception:
+                    unidad.descartar()
+                    # Recorrer los mensajes los marca como usados: no se guardan
+                    for _ in messages.get_messages(request):
+                        pass
+                    raise
+        return response
+
+
+# ========================================
+# Presupuesto de consultas y latencia por vista
+# ========================================
+# Presupuesto de las URL y métodos sin entrada en SGPM_PRESUPUESTOS_PETICION
+PRESUPUESTO_PETICION_DEFECTO = {'consultas': 20, 'ms': 1000}
+
+# HEAD ejecuta la misma vista que GET
+_METODO_EQUIVALENTE = {'HEAD': 'GET'}
+
+# Huellas del SQL que se registran cuando una petición se pasa del presupuesto
+HUELLAS_REGISTRADAS = 5
+
+_CADENA = re.compile(r"'(?:[^']|'')*'")
+_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SAVEPOINT = re.compile(r'"s\d+_x\d+"')
+_LISTA = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+_FILAS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_ESPACIOS = re.compile(r"\s+")
+
+
+def huella_sql(sql: str) -> str:
+    """
+    SQL sin los valores concretos: la misma consulta con otros parámetros, con
+    una lista IN de otro largo o un INSERT de otro número de filas da la misma huella.
+    """
+    sql = _SAVEPOINT.sub("?", sql)
+    sql = _CADENA.sub("?", sql)
+    sql = _NUMERO.sub("?", sql)
+    sql = _LISTA.sub("(...)", sql)
+    sql = _FILAS.sub("(...)", sql)
+    return _ESPACIOS.sub(" ", sql).strip()
+
+
+@dataclass(frozen=True)
+class Presupuesto:
+    consultas: int
+    ms: float
+
+
+def _por_metodo(entrada: Optional[Dict], metodo: str) -> Optional[Dict]:
+    # Una entrada es un presupuesto para todos los métodos o un dict por método
+    if not entrada or 'consultas' in entrada:
+        return entrada
+    return entrada.get(metodo)
+
+
+def presupuesto_peticion(url_name: Optional[str], metodo: str = 'GET') -> Presupuesto:
+    """
+    Presupuesto configurado para el nombre de URL y el método HTTP; si no lo
+    hay, el de '*' para ese método, y si tampoco, el por defecto.
+    """
+    presupuestos = getattr(settings, 'SGPM_PRESUPUESTOS_PETICION', {})
+    metodo = metodo.upper()
+    metodo = _METODO_EQUIVALENTE.get(metodo, metodo)
+    valores = (
+        _por_metodo(presupuestos.get(url_name), metodo)
+        or _por_metodo(presupuestos.get('*'), metodo)
+        or PRESUPUESTO_PETICION_DEFECTO
+    )
+    return Presupuesto(consultas=valores['consultas'], ms=valores['ms'])
+
+
+@dataclass
+class MedicionPeticion:
+    """Consultas, tiempo en la base y tiempo total de una petición"""
+    url_name: Optional[str] = None
+    consultas: int = 0
+    ms_bd: float = 0.0
+    ms: float = 0.0
+    # huella -> [ejecuciones, milisegundos]
+    huellas: Dict[str, List[float]] = field(default_factory=dict)
+
+    def __call__(self, execute, sql, params, many, context):
+        # Se instala con connection.execute_wrapper durante la petición
+        inicio = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = (perf_counter() - inicio) * 1000
+            self.consultas += 1
+            self.ms_bd += duracion
+            acumulado = self.huellas.setdefault(huella_sql(sql), [0, 0.0])
+            acumulado[0] += 1
+            acumulado[1] += duracion
+
+    def huellas_principales(self, cantidad: int = HUELLAS_REGISTRADAS) -> List[Tuple[str, int, float]]:
+        """(huella, ejecuciones, ms) de las más repetidas y, a igualdad, más lentas"""
+        ordenadas = sorted(self.huellas.items(), key=lambda h: (-h[1][0], -h[1][1]))
+        return [(huella, int(n), ms) for huella, (n, ms) in ordenadas[:cantidad]]
+
+    def excesos(self, presupuesto: Presupuesto) -> List[str]:
+        excesos = []
+        if self.consultas > presupuesto.consultas:
+            excesos.append(f"{self.consultas} consultas (presupuesto {presupuesto.consultas})")
+        if self.ms > presupuesto.ms:
+            excesos.append(f"{self.ms:.0f} ms (presupuesto {presupuesto.ms:.0f} ms)")
+        return excesos
+
+
+class PresupuestoPeticionMiddleware:
+    """
+    Mide cada petición (consultas SQL, tiempo en la base y tiempo total) y la
+    compara con el presupuesto de su nombre de URL y método. Las que se pasan se
+    registran como aviso con las huellas del SQL más repetido: un N+1 aparece
+    como una misma huella ejecutada muchas veces.
+
+    La medición queda en `request.medicion_peticion`. Va antes de las sesiones
+    y de la unidad de trabajo para contar también sus consultas.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        medicion = MedicionPeticion()
+        inicio = perf_counter()
+        with connection.execute_wrapper(medicion):
+            response = self.get_response(request)
+        medicion.ms = (perf_counter() - inicio) * 1000
+
+        resolver_match = getattr(request, 'resolver_match', None)
+        medicion.url_name = resolver_match.url_name if resolver_match else None
+        request.medicion_peticion = medicion
+
+        excesos = medicion.excesos(presupuesto_peticion(medicion.url_name, request.method))
+        if excesos:
+            detalle = "".join(
+                f"\n  {n} x {ms:.1f} ms  {huella}" for huella, n, ms in medicion.huellas_principales()
+            )
+            logger.warning(
+                "%s %s (%s) fuera de presupuesto: %s; %.0f ms en la base%s",
+                request.method, request.path, medicion.url_name or "sin nombre",
+                ", ".join(excesos), medicion.ms_bd, detalle,
+            )
+        return response
@@ -32,6 +32,7 @@ urlpatterns = [
     path("", login_view, name="home"),  # Redirigir raíz a login
     path("citas/", listar_citas_view, name="citas_listar"),
     path("citas/crear/", crear_cita_view, name="citas_crear"),
+    path("citas/huecos/", buscar_huecos_view, name="citas_huecos"),
     path("citas/reprogramar/<str:cita_id>/", reprogramar_cita_view, name="citas_reprogramar"),
     path("citas/cancelar/<str:cita_id>/", cancelar_cita_view, name="citas_cancelar"),
     path("citas/eliminar/<str:cita_id>/", eliminar_cita_view, name="citas_eliminar"),
@@ -40,4 +41,7 @@ urlpatterns = [
     path("tareas/editar/<str:tarea_id>/", editar_tarea_view, name="tareas_editar"),
     path("tareas/eliminar/<str:tarea_id>/", eliminar_tarea_view, name="tareas_eliminar"),
     path("tareas/reportes/", reportes_tareas_view, name="tareas_reportes"),
+    path("notificaciones/", bandeja_notificaciones_view, name="notificaciones_bandeja"),
+    path("notificaciones/leer-todas/", marcar_todas_leidas_view, name="notificaciones_leer_todas"),
+    path("notificaciones/<str:id_notificacion>/leer/", marcar_notificacion_leida_view, name="notificaciones_leer"),
 ]
@@ -1,18 +1,21 @@
 from __future__ import annotations
 
-from datetime import datetime, date, time
-from uuid import uuid4
+from datetime import datetime, date, time, timedelta
 
 from django.contrib import messages
 from django.db import IntegrityError
+from django.http import JsonResponse
 from django.shortcuts import render, redirect
 from django.utils import timezone
 
+from SGPM.application import contenedor
 from SGPM.application.dtos import CitaDTO
 from SGPM.application.services import CitaService, HorarioNoDisponibleError, CitaInvalidaError
 from SGPM.domain.enums import TipoCita
+from SGPM.domain.identificadores import nuevo_id
+from SGPM.domain.repositories import CitaRepository, RecursoCitaRepository
+from SGPM.domain.value_objects import HorarioLaboral
 from SGPM.infrastructure.models import Cita as CitaModel, SolicitudMigratoria as SolicitudModel
-from SGPM.infrastructure.repositories import DjangoCitaRepository
 
 
 def _require_login(request):
@@ -38,6 +41,8 @@ def _get_fecha_from_request(request) -> date:
         return date.fromisoformat(raw)
     except ValueError:
         return timezone.localdate()
+
+
 def listar_citas_view(request):
     """
     Lista citas en formato calendario/agenda
@@ -53,18 +58,10 @@ def listar_citas_view(request):
     inicio = timezone.make_aware(datetime.combine(fecha, time.min), tz)
     fin = timezone.make_aware(datetime.combine(fecha, time.max), tz)
 
-    qs = CitaModel.objects.select_related(
-        "solicitud",
-        "solicitud__solicitante",
-        "solicitud__asesor",
-    ).filter(inicio__gte=inicio, inicio__lte=fin)
-
     rol = request.session.get("asesor_rol")
     email = request.session.get("asesor_email")
-    if rol != "SUPERVISOR":
-        qs = qs.filter(solicitud__asesor__email_asesor=email)
-
-    citas = list(qs.order_by("inicio"))
+    cita_service = contenedor.obtener(CitaService)
+    citas = cita_service.listar_agenda(inicio, fin, email_asesor=None if rol == "SUPERVISOR" else email)
 
     context = {
         'asesor_nombre': request.session.get('asesor_nombre'),
@@ -84,12 +81,14 @@ def crear_cita_view(request):
     if redirect_resp:
         return redirect_resp
 
-    cita_service = CitaService(DjangoCitaRepository())
+    recurso_repo = contenedor.obtener(RecursoCitaRepository)
+    cita_service = contenedor.obtener(CitaService)
 
     if request.method == "POST":
         try:
             solicitud_codigo = (request.POST.get("solicitud_id") or "").strip()
             tipo = (request.POST.get("tipo") or "").strip()
+            recurso_codigo = (request.POST.get("recurso") or "").strip() or None
             inicio = _parse_datetime_local(request.POST.get("inicio"))
             fin = _parse_datetime_local(request.POST.get("fin"))
             observacion = (request.POST.get("observacion") or "").strip()
@@ -100,12 +99,13 @@ def crear_cita_view(request):
                 messages.error(request, "La fecha/hora de fin debe ser mayor que la de inicio.")
             else:
                 dto = CitaDTO(
-                    id_cita=str(uuid4()),
+                    id_cita=nuevo_id(),
                     solicitud_codigo=solicitud_codigo,
                     tipo=tipo,
                     inicio=inicio,
                     fin=fin,
                     observacion=observacion,
+                    recurso_codigo=recurso_codigo,
                 )
                 cita_service.agendar_cita(dto)
                 messages.success(request, "Cita creada correctamente.")
@@ -138,9 +138,55 @@ def crear_cita_view(request):
         'asesor_rol': request.session.get('asesor_rol'),
         'solicitudes': solicitudes,
         'tipos_cita': list(TipoCita),
+        'recursos': recurso_repo.listar_activos(),
     }
     return render(request, 'citas/crear.html', context)
 
+def buscar_huecos_view(request):
+    """
+    Tramos libres de la agenda en JSON (GET) para el formulario de citas.
+    Parámetros: desde (fecha ISO, hoy por defecto), dias (1-31, 7 por defecto),
+    duracion en minutos (30 por defecto), apertura/cierre (HH:MM, 08:00-17:00).
+    """
+    if not request.session.get("asesor_email"):
+        return JsonResponse({"error": "Sesión expirada"}, status=401)
+
+    try:
+        desde_fecha = date.fromisoformat(request.GET["desde"]) if request.GET.get("desde") else timezone.localdate()
+        dias = int(request.GET.get("dias") or 7)
+        duracion = timedelta(minutes=int(request.GET.get("duracion") or 30))
+        horario = HorarioLaboral(
+            apertura=time.fromisoformat(request.GET.get("apertura") or "08:00"),
+            cierre=time.fromisoformat(request.GET.get("cierre") or "17:00"),
+            zona=timezone.get_current_timezone(),
+        )
+        if not 1 <= dias <= 31:
+            raise ValueError("dias debe estar entre 1 y 31")
+    except ValueError as e:
+        return JsonResponse({"error": f"Parámetros inválidos: {e}"}, status=400)
+
+    tz = timezone.get_current_timezone()
+    desde = max(timezone.now(), timezone.make_aware(datetime.combine(desde_fecha, time.min), tz))
+    hasta = timezone.make_aware(datetime.combine(desde_fecha + timedelta(days=dias), time.min), tz)
+
+    try:
+        cita_service = contenedor.obtener(CitaService)
+        huecos = cita_service.buscar_huecos(desde, hasta, duracion, horario)
+    except CitaInvalidaError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({
+        "duracion_minutos": int(duracion.total_seconds() // 60),
+        "huecos": [
+            {
+                "inicio": timezone.localtime(h.inicio).isoformat(timespec="minutes"),
+                "fin": timezone.localtime(h.fin).isoformat(timespec="minutes"),
+            }
+            for h in huecos
+        ],
+    })
+
+
 def reprogramar_cita_view(request, cita_id):
     """
     Reprograma una cita
@@ -149,7 +195,7 @@ def reprogramar_cita_view(request, cita_id):
     if redirect_resp:
         return redirect_resp
 
-    cita_service = CitaService(DjangoCitaRepository())
+    cita_service = contenedor.obtener(CitaService)
 
     cita = CitaModel.objects.select_related(
         "solicitud",
@@ -201,7 +247,7 @@ def cancelar_cita_view(request, cita_id: str):
     if request.method != "POST":
         return redirect("citas_listar")
 
-    cita_service = CitaService(DjangoCitaRepository())
+    cita_service = contenedor.obtener(CitaService)
     try:
         cita_service.cancelar_cita(cita_id, motivo="")
         messages.success(request, "Cita cancelada.")
@@ -231,7 +277,7 @@ def eliminar_cita_view(request, cita_id: str):
         messages.error(request, "Solo se pueden eliminar citas canceladas.")
         return redirect("citas_listar")
 
-    deleted = DjangoCitaRepository().eliminar(cita_id)
+    deleted = contenedor.obtener(CitaRepository).eliminar(cita_id)
     if deleted:
         messages.success(request, "Cita eliminada.")
     else:
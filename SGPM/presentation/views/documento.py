@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import os
-from uuid import uuid4
 from pathlib import Path
 from datetime import datetime
 
@@ -9,10 +8,11 @@ from django.contrib import messages
 from django.shortcuts import render, redirect
 from django.conf import settings
 
+from SGPM.application import contenedor
 from SGPM.application.dtos import DocumentoDTO
 from SGPM.application.services import DocumentoService, DocumentoInvalidoError
 from SGPM.domain.enums import TipoDocumento, EstadoDocumento
-from SGPM.infrastructure.repositories import DjangoDocumentoRepository, DjangoSolicitudMigratoriaRepository
+from SGPM.domain.identificadores import nuevo_id
 
 
 def _require_login(request):
@@ -29,10 +29,7 @@ def gestionar_documentos_view(request, codigo: str):
     if redirect_resp:
         return redirect_resp
 
-    service = DocumentoService(
-        DjangoDocumentoRepository(),
-        solicitud_repo=DjangoSolicitudMigratoriaRepository(),
-    )
+    service = contenedor.obtener(DocumentoService)
 
     if request.method == "POST":
         tipo = (request.POST.get("tipo") or "").strip()
@@ -47,7 +44,7 @@ def gestionar_documentos_view(request, codigo: str):
             else:
                 # Guardar metadata en dominio/BD
                 dto = DocumentoDTO(
-                    id_documento=str(uuid4()),
+                    id_documento=nuevo_id(),
                     tipo=tipo,
                     estado="RECIBIDO",
                     observacion=observacion,
@@ -98,10 +95,7 @@ def editar_documento_view(request, id_documento: str):
 
     codigo = request.GET.get("codigo") or request.POST.get("codigo") or ""
 
-    service = DocumentoService(
-        DjangoDocumentoRepository(),
-        solicitud_repo=DjangoSolicitudMigratoriaRepository(),
-    )
+    service = contenedor.obtener(DocumentoService)
 
     doc = service.obtener_por_id(id_documento)
     if doc is None:
@@ -166,10 +160,7 @@ def eliminar_documento_view(request, id_documento: str):
             return redirect("solicitud_documentos", codigo=codigo)
         return redirect("solicitud_documentos_menu")
 
-    service = DocumentoService(
-        DjangoDocumentoRepository(),
-        solicitud_repo=DjangoSolicitudMigratoriaRepository(),
-    )
+    service = contenedor.obtener(DocumentoService)
     try:
         ok = service.eliminar_documento(id_documento)
         if ok:
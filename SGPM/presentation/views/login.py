@@ -1,6 +1,7 @@
 from django.shortcuts import render, redirect
 from django.contrib import messages
 
+from SGPM.application import contenedor
 from SGPM.application.auth_service import (
     AuthenticationService,
     CredencialesInvalidasError,
@@ -29,7 +30,7 @@ def login_view(request):
             return render(request, 'login.html', {'email': email})
 
         # Intentar autenticar
-        auth_service = AuthenticationService()
+        auth_service = contenedor.obtener(AuthenticationService)
 
         try:
             asesor = auth_service.autenticar(email, password)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from django.contrib import messages
+from django.shortcuts import render, redirect
+
+from SGPM.application import contenedor
+from SGPM.application.services import NotificacionService
+
+
+def _require_login(request):
+    if not request.session.get("asesor_email"):
+        return redirect("login")
+    return None
+
+
+def _notificacion_service() -> NotificacionService:
+    return contenedor.obtener(NotificacionService)
+
+
+def bandeja_notificaciones_view(request):
+    """
+    Bandeja de notificaciones del asesor en sesión (paginada por cursor con `?cursor=`)
+    """
+    redirect_resp = _require_login(request)
+    if redirect_resp:
+        return redirect_resp
+
+    email = request.session.get("asesor_email")
+    service = _notificacion_service()
+    try:
+        pagina = service.listar_bandeja(email, request.GET.get("cursor"))
+    except ValueError:
+        messages.error(request, "La página solicitada no es válida. Se muestra la primera página.")
+        pagina = service.listar_bandeja(email)
+
+    context = {
+        'asesor_nombre': request.session.get('asesor_nombre'),
+        'asesor_email': email,
+        'asesor_rol': request.session.get('asesor_rol'),
+        'notificaciones': pagina.elementos,
+        'pagina': pagina,
+    }
+    return render(request, 'notificaciones/bandeja.html', context)
+
+
+def marcar_notificacion_leida_view(request, id_notificacion: str):
+    """
+    Marca como leída una notificación del asesor en sesión (POST).
+    """
+    redirect_resp = _require_login(request)
+    if redirect_resp:
+        return redirect_resp
+
+    if request.method == "POST":
+        email = request.session.get("asesor_email")
+        if not _notificacion_service().marcar_como_leida(id_notificacion, email):
+            messages.error(request, "Notificación no encontrada.")
+
+    return redirect("notificaciones_bandeja")
+
+
+def marcar_todas_leidas_view(request):
+    """
+    Marca como leídas todas las notificaciones del asesor en sesión (POST).
+    """
+    redirect_resp = _require_login(request)
+    if redirect_resp:
+        return redirect_resp
+
+    if request.method == "POST":
+        email = request.session.get("asesor_email")
+        marcadas = _notificacion_service().marcar_todas_como_leidas(email)
+        if marcadas:
+            messages.success(request, f"{marcadas} notificación(es) marcada(s) como leída(s).")
+
+    return redirect("notificaciones_bandeja")
@@ -6,14 +6,15 @@ from django.contrib import messages
 from django.shortcuts import render, redirect
 from django.utils import timezone
 
+from SGPM.application import contenedor
 from SGPM.application.dtos import SolicitanteDTO
 from SGPM.application.services import (
+    ExpedienteQueryService,
     SolicitanteService,
     DatosObligatoriosFaltantesError,
     SolicitanteDuplicadoError,
     SolicitanteNoEncontradoError,
 )
-from SGPM.infrastructure.repositories import DjangoSolicitanteRepository
 
 
 def _require_login(request):
@@ -47,7 +48,7 @@ def registro_solicitante_view(request):
     if redirect_resp:
         return redirect_resp
 
-    service = SolicitanteService(DjangoSolicitanteRepository())
+    service = contenedor.obtener(SolicitanteService)
     form_data = {}
 
     if request.method == "POST":
@@ -115,7 +116,7 @@ def actualizar_datos_view(request):
     if redirect_resp:
         return redirect_resp
 
-    service = SolicitanteService(DjangoSolicitanteRepository())
+    service = contenedor.obtener(SolicitanteService)
 
     solicitante = None
     cedula_busqueda = (request.GET.get("cedula") or "").strip()
@@ -143,8 +144,12 @@ def actualizar_datos_view(request):
         except Exception as e:
             messages.error(request, f"Ocurrió un error al actualizar los datos: {e}")
 
-    # Para listado de solicitantes asociados (simple tabla)
-    solicitantes_lista = service.listar_todos()
+    # Para listado de solicitantes asociados (simple tabla, paginada por cursor)
+    try:
+        pagina = service.listar_pagina(request.GET.get("cursor"))
+    except ValueError:
+        messages.error(request, "La página solicitada no es válida. Se muestra la primera página.")
+        pagina = service.listar_pagina()
 
     context = {
         "asesor_nombre": request.session.get("asesor_nombre"),
@@ -153,25 +158,40 @@ def actualizar_datos_view(request):
         "page_title": "actualizar datos",
         "solicitante": solicitante,
         "cedula_busqueda": cedula_busqueda,
-        "solicitantes_lista": solicitantes_lista,
+        "solicitantes_lista": pagina.elementos,
+        "pagina": pagina,
     }
     return render(request, "solicitante/actualizacion_datos.html", context)
 
 
 def consulta_expedientes_view(request):
     """
-    Consulta de expedientes de solicitantes.
-    De momento solo renderiza la vista; la búsqueda detallada
-    puede conectarse luego con SolicitudMigratoriaService.
+    Consulta de expedientes de solicitantes por código de expediente (?codigo=)
+    o por cédula (?cedula=). El expediente completo se carga con
+    ExpedienteQueryService en un número fijo de consultas.
     """
     redirect_resp = _require_login(request)
     if redirect_resp:
         return redirect_resp
 
+    codigo = (request.GET.get("codigo") or "").strip()
+    cedula = (request.GET.get("cedula") or "").strip()
+    expediente = None
+    if codigo or cedula:
+        service = contenedor.obtener(ExpedienteQueryService)
+        if codigo:
+            expediente = service.consultar_por_codigo(codigo)
+        else:
+            expediente = service.consultar_por_solicitante(cedula)
+
     context = {
         "asesor_nombre": request.session.get("asesor_nombre"),
         "asesor_email": request.session.get("asesor_email"),
         "asesor_rol": request.session.get("asesor_rol"),
         "page_title": "consulta expedientes",
+        "codigo": codigo,
+        "cedula": cedula,
+        "busqueda": bool(codigo or cedula),
+        "expediente": expediente,
     }
     return render(request, "solicitante/consulta_expediente.html", context)
\ No newline at end of file
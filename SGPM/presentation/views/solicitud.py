@@ -1,14 +1,13 @@
 from __future__ import annotations
 
+import re
+
 from django.contrib import messages
 from django.shortcuts import render, redirect
 
-from SGPM.application.services import SolicitudMigratoriaService, SolicitudNoEncontradaError
-from SGPM.infrastructure.repositories import (
-    DjangoSolicitudMigratoriaRepository,
-    DjangoSolicitanteRepository,
-    DjangoAsesorRepository,
-)
+from SGPM.application import contenedor
+from SGPM.application.services import ExpedienteQueryService, SolicitudMigratoriaService, SolicitudNoEncontradaError, ServiceError
+from SGPM.domain.enums import EstadoSolicitud
 
 
 def _require_login(request):
@@ -42,11 +41,7 @@ def registro_solicitud_view(request):
     if redirect_resp:
         return redirect_resp
 
-    service = SolicitudMigratoriaService(
-        DjangoSolicitudMigratoriaRepository(),
-        solicitante_repo=DjangoSolicitanteRepository(),
-        asesor_repo=DjangoAsesorRepository(),
-    )
+    service = contenedor.obtener(SolicitudMigratoriaService)
 
     form_data = {}
 
@@ -97,43 +92,60 @@ def registro_solicitud_view(request):
 def listado_view(request):
     """
     Lista de solicitudes usando SolicitudMigratoriaService.
+    Paginada por cursor: `?cursor=` lleva la posición de la última fila mostrada.
     """
     redirect_resp = _require_login(request)
     if redirect_resp:
         return redirect_resp
 
-    service = SolicitudMigratoriaService(
-        DjangoSolicitudMigratoriaRepository(),
-        solicitante_repo=DjangoSolicitanteRepository(),
-        asesor_repo=DjangoAsesorRepository(),
-    )
-    solicitudes = service.listar_todas()
+    service = contenedor.obtener(SolicitudMigratoriaService)
+    try:
+        pagina = service.listar_pagina_resumen(request.GET.get("cursor"))
+    except ValueError:
+        messages.error(request, "La página solicitada no es válida. Se muestra la primera página.")
+        pagina = service.listar_pagina_resumen()
 
     context = {
         "asesor_nombre": request.session.get("asesor_nombre"),
         "asesor_email": request.session.get("asesor_email"),
         "asesor_rol": request.session.get("asesor_rol"),
         "page_title": "listado solicitudes",
-        "solicitudes": solicitudes,
+        "solicitudes": pagina.elementos,
+        "pagina": pagina,
     }
     return render(request, "solicitudes/listado.html", context)
 
 
 def detalle_view(request):
     """
-    Consulta de detalle de una solicitud.
-    (por ahora, solo renderiza la vista; la lógica detallada se puede conectar
-    vía endpoints adicionales o parámetros de búsqueda).
+    Consulta de detalle de una solicitud por código (?codigo=) o de la más
+    reciente de un solicitante (?cedula=), cargada con ExpedienteQueryService.
     """
     redirect_resp = _require_login(request)
     if redirect_resp:
         return redirect_resp
 
+    codigo = (request.GET.get("codigo") or "").strip()
+    cedula = (request.GET.get("cedula") or "").strip()
+    expediente = None
+    if codigo or cedula:
+        service = contenedor.obtener(ExpedienteQueryService)
+        if codigo:
+            expediente = service.consultar_por_codigo(codigo)
+        else:
+            expediente = service.consultar_por_solicitante(cedula)
+        if expediente is None or not expediente.solicitudes:
+            messages.error(request, "No se encontró ninguna solicitud con esos datos.")
+
     context = {
         "asesor_nombre": request.session.get("asesor_nombre"),
         "asesor_email": request.session.get("asesor_email"),
         "asesor_rol": request.session.get("asesor_rol"),
         "page_title": "detalle solicitudes",
+        "codigo": codigo,
+        "cedula": cedula,
+        "solicitante": expediente.solicitante if expediente else None,
+        "detalle": expediente.solicitudes[0] if expediente and expediente.solicitudes else None,
     }
     return render(request, "solicitudes/detalle.html", context)
 
@@ -141,18 +153,56 @@ def detalle_view(request):
 def cambio_estado_view(request):
     """
     Pantalla de cambio de estado.
-    Aquí podríamos, en una siguiente iteración, procesar un POST que
-    llame a SolicitudMigratoriaService.cambiar_estado.
+    El POST aplica un cambio masivo: varios códigos (separados por espacios,
+    comas o saltos de línea) pasan al mismo estado con
+    SolicitudMigratoriaService.cambiar_estado_masivo. Solo SUPERVISOR.
     """
     redirect_resp = _require_login(request)
     if redirect_resp:
         return redirect_resp
 
+    resultados = None
+    codigos_texto = request.POST.get("codigos") or ""
+    if request.method == "POST" and request.session.get("asesor_rol") != "SUPERVISOR":
+        # El cambio masivo (cierres por lote) es solo para supervisores
+        messages.error(request, "No tienes permisos para cambiar estados en lote.")
+    elif request.method == "POST" and request.POST.get("accion") == "elegibles":
+        # Precarga los expedientes cuyo estado permite pasar al estado elegido
+        service = contenedor.obtener(SolicitudMigratoriaService)
+        try:
+            elegibles = service.codigos_elegibles(request.POST.get("nuevo_estado") or "")
+        except ServiceError as e:
+            messages.error(request, str(e))
+        else:
+            codigos_texto = "\n".join(elegibles)
+            messages.info(request, f"{len(elegibles)} solicitud(es) pueden pasar al estado elegido.")
+    elif request.method == "POST":
+        codigos = [c for c in re.split(r"[\s,;]+", codigos_texto) if c]
+        if not codigos:
+            messages.error(request, "Ingresa al menos un código de solicitud.")
+        else:
+            service = contenedor.obtener(SolicitudMigratoriaService)
+            try:
+                resultados = service.cambiar_estado_masivo(
+                    codigos,
+                    request.POST.get("nuevo_estado") or "",
+                    usuario=request.session.get("asesor_email"),
+                    motivo=(request.POST.get("motivo") or "").strip(),
+                )
+            except ServiceError as e:
+                messages.error(request, str(e))
+            else:
+                aceptadas = sum(1 for r in resultados.values() if r["resultado"] == "aceptado")
+                messages.info(request, f"{aceptadas} de {len(resultados)} solicitud(es) cambiaron de estado.")
+
     context = {
         "asesor_nombre": request.session.get("asesor_nombre"),
         "asesor_email": request.session.get("asesor_email"),
         "asesor_rol": request.session.get("asesor_rol"),
         "page_title": "cambio estado",
+        "estados": [(e.name, e.value) for e in EstadoSolicitud],
+        "resultados_masivos": resultados,
+        "codigos_texto": codigos_texto,
     }
     return render(request, "solicitudes/cambio_estado.html", context)
 
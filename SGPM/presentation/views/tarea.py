@@ -1,12 +1,12 @@
 from __future__ import annotations
 
 from datetime import datetime
-from uuid import uuid4
 
 from django.contrib import messages
 from django.shortcuts import render, redirect
 from django.utils import timezone
 
+from SGPM.application import contenedor
 from SGPM.application.dtos import TareaDTO
 from SGPM.application.services import (
     AsesorService,
@@ -17,7 +17,7 @@ from SGPM.application.services import (
     ServiceError,
 )
 from SGPM.domain.enums import EstadoTarea, PrioridadTarea
-from SGPM.infrastructure.repositories import DjangoTareaRepository, DjangoAsesorRepository
+from SGPM.domain.identificadores import nuevo_id
 
 
 def _require_login(request):
@@ -37,24 +37,30 @@ def _parse_datetime_local(value: str | None) -> datetime | None:
 
 def listar_tareas_view(request):
     """
-    Lista todas las tareas
+    Lista todas las tareas (paginadas por cursor con `?cursor=`)
     """
     redirect_resp = _require_login(request)
     if redirect_resp:
         return redirect_resp
 
-    tarea_service = TareaService(DjangoTareaRepository(), asesor_repo=DjangoAsesorRepository())
+    tarea_service = contenedor.obtener(TareaService)
 
     # Supervisor ve todo; asesor solo sus tareas
     rol = request.session.get("asesor_rol")
     email = request.session.get("asesor_email")
-    tareas = tarea_service.listar_todas() if rol == "SUPERVISOR" else tarea_service.listar_por_asesor(email)
+    email_filtro = None if rol == "SUPERVISOR" else email
+    try:
+        pagina = tarea_service.listar_pagina_resumen(request.GET.get("cursor"), email_asesor=email_filtro)
+    except ValueError:
+        messages.error(request, "La página solicitada no es válida. Se muestra la primera página.")
+        pagina = tarea_service.listar_pagina_resumen(email_asesor=email_filtro)
 
     context = {
         'asesor_nombre': request.session.get('asesor_nombre'),
         'asesor_email': request.session.get('asesor_email'),
         'asesor_rol': request.session.get('asesor_rol'),
-        'tareas': tareas,
+        'tareas': pagina.elementos,
+        'pagina': pagina,
     }
     return render(request, 'tareas/listar.html', context)
     
@@ -66,7 +72,7 @@ def crear_tarea_view(request):
     if redirect_resp:
         return redirect_resp
 
-    tarea_service = TareaService(DjangoTareaRepository(), asesor_repo=DjangoAsesorRepository())
+    tarea_service = contenedor.obtener(TareaService)
 
     if request.method == "POST":
         try:
@@ -81,7 +87,7 @@ def crear_tarea_view(request):
                 messages.error(request, "Título y prioridad son obligatorios.")
             else:
                 dto = TareaDTO(
-                    id_tarea=str(uuid4()),
+                    id_tarea=nuevo_id(),
                     titulo=titulo,
                     prioridad=prioridad,
                     estado=estado,
@@ -104,7 +110,7 @@ def crear_tarea_view(request):
             messages.error(request, "Ocurrió un error al crear la tarea.")
 
     # Solo asesores con rol ASESOR para asignación de tareas
-    asesores_activos = AsesorService(DjangoAsesorRepository()).listar_activos()
+    asesores_activos = contenedor.obtener(AsesorService).listar_activos()
     asesores = [a for a in asesores_activos if a.rol == "ASESOR"]
     context = {
         'asesor_nombre': request.session.get('asesor_nombre'),
@@ -125,7 +131,7 @@ def editar_tarea_view(request, tarea_id):
     if redirect_resp:
         return redirect_resp
 
-    tarea_service = TareaService(DjangoTareaRepository(), asesor_repo=DjangoAsesorRepository())
+    tarea_service = contenedor.obtener(TareaService)
 
     tarea = tarea_service.obtener_por_id(tarea_id)
     if tarea is None:
@@ -168,7 +174,7 @@ def editar_tarea_view(request, tarea_id):
             # Re-cargar para que la vista muestre el estado real si algo falló
             tarea = tarea_service.obtener_por_id(tarea_id) or tarea
 
-    asesores_activos = AsesorService(DjangoAsesorRepository()).listar_activos()
+    asesores_activos = contenedor.obtener(AsesorService).listar_activos()
     asesores = [a for a in asesores_activos if a.rol == "ASESOR"]
     context = {
         'asesor_nombre': request.session.get('asesor_nombre'),
@@ -189,10 +195,10 @@ def eliminar_tarea_view(request, tarea_id):
     if redirect_resp:
         return redirect_resp
 
-    tarea_service = TareaService(DjangoTareaRepository(), asesor_repo=DjangoAsesorRepository())
+    tarea_service = contenedor.obtener(TareaService)
 
     if request.method == "POST":
-        deleted = DjangoTareaRepository().eliminar(tarea_id)
+        deleted = tarea_service.eliminar(tarea_id)
         if deleted:
             messages.success(request, "Tarea eliminada.")
         else:
@@ -225,10 +231,7 @@ def reportes_tareas_view(request):
         messages.error(request, "No tienes permisos para ver reportes.")
         return redirect("tareas_listar")
 
-    reporte_service = ReporteTareasService(
-        DjangoTareaRepository(),
-        asesor_repo=DjangoAsesorRepository(),
-    )
+    reporte_service = contenedor.obtener(ReporteTareasService)
     estadisticas = reporte_service.generar_resumen_global()
 
     context = {
@@ -1,3 +1,1649 @@
-from django.test import TestCase
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from importlib import import_module
+from io import StringIO
+from threading import Event
+from time import sleep
 
-# Create your tests here.
+from django.contrib import messages
+from django.contrib.messages import get_messages
+from django.contrib.messages.storage import default_storage
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, OperationalError, connection
+from django.http import HttpResponseRedirect
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from SGPM.application import Contenedor, DependenciaNoRegistradaError, contenedor
+from SGPM.application.dtos import CitaDTO, FiltroReporteTareasDTO, TareaDTO
+from SGPM.application.services import (
+    CitaService,
+    CitaInvalidaError,
+    ExpedienteQueryService,
+    HorarioNoDisponibleError,
+    NotificacionService,
+    ReporteTareasService,
+    ServiceError,
+    SolicitanteService,
+    SolicitudMigratoriaService,
+    TareaService,
+)
+from SGPM.domain.entities import Asesor, Cita, Documento, RecursoCita, Solicitante, SolicitudMigratoria, Tarea
+from SGPM.domain.enums import (
+    EstadoCita, EstadoDocumento, EstadoSolicitud, EstadoTarea, PrioridadTarea, RolUsuario, TipoCita, TipoDocumento,
+)
+from SGPM.domain.identificadores import GeneradorULID, instante_ulid, nuevo_id
+from SGPM.domain.repositories import (
+    AsesorRepository, NotificacionRepository, SolicitanteRepository, SolicitudMigratoriaRepository,
+)
+from SGPM.domain.value_objects import HorarioLaboral, RangoFechaHora, max_simultaneos
+from SGPM.infrastructure.models import (
+    Cita as CitaModel,
+    Documento as DocumentoModel,
+    Notificacion as NotificacionModel,
+    Solicitante as SolicitanteModel,
+    SolicitudMigratoria as SolicitudMigratoriaModel,
+    Tarea as TareaModel,
+)
+from SGPM.infrastructure.repositories import (
+    DjangoAsesorRepository,
+    DjangoCitaRepository,
+    DjangoDocumentoRepository,
+    DjangoEstadisticaTareaRepository,
+    DjangoExpedienteRepository,
+    DjangoNotificacionRepository,
+    DjangoRecordatorioTareaRepository,
+    DjangoRecursoCitaRepository,
+    DjangoSolicitanteRepository,
+    DjangoSolicitudMigratoriaRepository,
+    DjangoTareaRepository,
+)
+from SGPM.infrastructure.unidad_de_trabajo import UnidadDeTrabajo
+from SGPM.management.commands.explicar_consultas import ESCANEO_COMPLETO
+from SGPM.presentation.middleware import (
+    Presupuesto,
+    UnidadDeTrabajoMiddleware,
+    huella_sql,
+    presupuesto_peticion,
+)
+from SGPM.infrastructure.cache_repositorios import (
+    AsesorRepositoryEnCache,
+    SolicitanteRepositoryEnCache,
+    SolicitudMigratoriaRepositoryEnCache,
+    en_cache,
+    estadisticas_cache,
+    reiniciar_estadisticas_cache,
+)
+
+
+def _asesor(i: int) -> Asesor:
+    return Asesor(nombres="Asesor", apellidos=str(i), emailAsesor=f"asesor{i}@sgpm.com", rol=RolUsuario.ASESOR)
+
+
+def _solicitud(i: int, asesor: Asesor = None) -> SolicitudMigratoria:
+    return SolicitudMigratoria(
+        codigo=f"SOL-{i:04d}",
+        estadoActual=EstadoSolicitud.EN_REVISION,
+        solicitante=Solicitante(f"C{i:04d}", "Nombre", "Apellido", f"s{i}@correo.com", "0999"),
+        asesor=asesor,
+    )
+
+
+def _tarea(i: int, asesor: Asesor = None, estado: EstadoTarea = EstadoTarea.PENDIENTE) -> Tarea:
+    return Tarea(
+        idTarea=f"T-{i:04d}",
+        titulo=f"Tarea {i}",
+        prioridad=PrioridadTarea.MEDIA,
+        vencimiento=timezone.now() + timedelta(days=1),
+        estado=estado,
+        asignadaA=asesor,
+    )
+
+
+# ========================================
+# Repositorios: escritura en lote
+# ========================================
+class GuardarMuchosTests(TestCase):
+
+    def setUp(self):
+        self.asesores = DjangoAsesorRepository().guardar_muchos([_asesor(i) for i in range(3)])
+        self.repo = DjangoTareaRepository()
+
+    def test_inserta_y_actualiza_con_consultas_constantes(self):
+        tareas = [_tarea(i, self.asesores[i % 3]) for i in range(50)]
+        with self.assertNumQueries(4):  # savepoint + asesores + insert + release
+            self.repo.guardar_muchos(tareas)
+        self.assertEqual(TareaModel.objects.count(), 50)
+
+        for t in tareas:
+            t.estado = EstadoTarea.EN_PROGRESO
+        with self.assertNumQueries(4):
+            self.repo.guardar_muchos(tareas)
+
+        self.assertEqual(TareaModel.objects.filter(estado=EstadoTarea.EN_PROGRESO.value).count(), 50)
+        self.assertEqual(TareaModel.objects.filter(asignada_a__email_asesor="asesor1@sgpm.com").count(), 17)
+
+    def test_duplicados_en_el_lote_gana_el_ultimo(self):
+        primera = _tarea(1)
+        segunda = _tarea(1, estado=EstadoTarea.EN_PROGRESO)
+        guardadas = self.repo.guardar_muchos([primera, segunda])
+
+        self.assertEqual(len(guardadas), 1)
+        self.assertEqual(self.repo.obtener_por_id("T-0001").estado, EstadoTarea.EN_PROGRESO)
+
+
+# ========================================
+# Repositorios: perfiles de carga (sin N+1)
+# ========================================
+class PerfilCargaTests(TestCase):
+
+    def _crear_datos(self, filas: int):
+        asesores = DjangoAsesorRepository().guardar_muchos([_asesor(i) for i in range(filas)])
+        DjangoTareaRepository().guardar_muchos([_tarea(i, asesores[i]) for i in range(filas)])
+        DjangoSolicitudMigratoriaRepository().guardar_muchos([_solicitud(i, asesores[i]) for i in range(filas)])
+
+    def _consultas_por_listado(self):
+        tarea_repo = DjangoTareaRepository()
+        solicitud_repo = DjangoSolicitudMigratoriaRepository()
+        listados = {
+            "tareas_por_estado": lambda: tarea_repo.listar_por_estado(EstadoTarea.PENDIENTE),
+            "tareas_por_asesor": lambda: tarea_repo.listar_por_asesor("asesor0@sgpm.com"),
+            "tareas_vencidas": tarea_repo.listar_vencidas,
+            "solicitudes_por_estado": lambda: solicitud_repo.listar_por_estado(EstadoSolicitud.EN_REVISION),
+            "solicitudes_por_asesor": lambda: solicitud_repo.listar_por_asesor("asesor0@sgpm.com"),
+        }
+        conteos = {}
+        for nombre, listar in listados.items():
+            with CaptureQueriesContext(connection) as consultas:
+                [
+                    (getattr(e, "asignadaA", None), getattr(e, "_solicitante", None), getattr(e, "_asesor", None))
+                    for e in listar()
+                ]
+            conteos[nombre] = len(consultas)
+        return conteos
+
+    def test_consultas_constantes_sin_importar_las_filas(self):
+        self._crear_datos(2)
+        con_pocas = self._consultas_por_listado()
+
+        self._crear_datos(25)
+        con_muchas = self._consultas_por_listado()
+
+        self.assertEqual(con_pocas, con_muchas)
+        self.assertTrue(all(n == 1 for n in con_muchas.values()), con_muchas)
+
+
+# ========================================
+# Servicios: reportes agregados en la base
+# ========================================
+class ReporteAgregadoTests(TestCase):
+
+    def setUp(self):
+        asesores = DjangoAsesorRepository().guardar_muchos([_asesor(i) for i in range(2)])
+        tareas = [_tarea(i, asesores[i % 2]) for i in range(6)]
+        tareas[0].estado = EstadoTarea.COMPLETADA
+        tareas[1].vencimiento = timezone.now() - timedelta(days=1)
+        DjangoTareaRepository().guardar_muchos(tareas)
+        self.service = ReporteTareasService(DjangoTareaRepository(), asesor_repo=DjangoAsesorRepository())
+
+    def test_resumen_global_agregado(self):
+        with self.assertNumQueries(2):  # conteos agrupados + nombres de asesores
+            resumen = self.service.generar_resumen_global()
+
+        self.assertEqual(resumen["total"], 6)
+        self.assertEqual(resumen["completadas"], 1)
+        self.assertEqual(resumen["vencidas"], 1)
+        self.assertEqual(resumen["por_asesor"]["asesor0@sgpm.com"]["completadas"], 1)
+        self.assertEqual(resumen["por_asesor"]["asesor1@sgpm.com"]["pendientes"], 3)
+
+    def test_reporte_por_asesor_filtra_por_periodo(self):
+        filtro = FiltroReporteTareasDTO(
+            desde=timezone.now() - timedelta(days=2),
+            hasta=timezone.now(),
+            asesor_email="asesor1@sgpm.com",
+        )
+        with self.assertNumQueries(1):
+            reporte = self.service.generar_reporte(filtro)
+
+        self.assertEqual(reporte.estadisticas.total_tareas, 1)
+        self.assertEqual(reporte.estadisticas.vencidas_por_asesor, {"asesor1@sgpm.com": 1})
+
+    def test_ranking_completadas(self):
+        filtro = FiltroReporteTareasDTO(
+            desde=timezone.now() - timedelta(days=2),
+            hasta=timezone.now() + timedelta(days=2),
+        )
+        self.assertEqual(self.service.obtener_ranking_completadas(filtro), [("asesor0@sgpm.com", 1)])
+
+
+# ========================================
+# Repositorios: paginación por cursor
+# ========================================
+class PaginacionKeysetTests(TestCase):
+
+    def setUp(self):
+        asesores = DjangoAsesorRepository().guardar_muchos([_asesor(i) for i in range(2)])
+        DjangoTareaRepository().guardar_muchos([_tarea(i, asesores[i % 2]) for i in range(23)])
+        # Empates en fecha_creacion: el desempate por pk mantiene el orden total
+        TareaModel.objects.filter(id_tarea__lt="T-0010").update(fecha_creacion=timezone.now())
+        self.repo = DjangoTareaRepository()
+
+    def _recorrer(self, **filtros):
+        vistos, cursor, paginas = [], None, 0
+        while True:
+            with self.assertNumQueries(1):
+                pagina = self.repo.listar_pagina(cursor, limite=5, **filtros)
+            vistos.extend(t.idTarea for t in pagina)
+            paginas += 1
+            if not pagina.tiene_siguiente:
+                return vistos, paginas
+            cursor = pagina.siguiente_cursor
+
+    def test_paginas_disjuntas_y_completas(self):
+        vistos, paginas = self._recorrer()
+
+        self.assertEqual(paginas, 5)
+        self.assertEqual(len(vistos), 23)
+        self.assertEqual(set(vistos), set(TareaModel.objects.values_list("id_tarea", flat=True)))
+
+    def test_paginas_filtradas_por_asesor(self):
+        vistos, _ = self._recorrer(email_asesor="asesor1@sgpm.com")
+
+        self.assertEqual(len(vistos), 11)
+        self.assertEqual(len(set(vistos)), 11)
+
+    def test_cursor_invalido(self):
+        with self.assertRaises(ValueError):
+            self.repo.listar_pagina("no-es-un-cursor")
+
+
+# ========================================
+# Listados: filas planas sin entidades
+# ========================================
+class ListadoResumenTests(TestCase):
+
+    def setUp(self):
+        asesores = DjangoAsesorRepository().guardar_muchos([_asesor(i) for i in range(2)])
+        DjangoTareaRepository().guardar_muchos([_tarea(i, asesores[i % 2]) for i in range(12)])
+        DjangoSolicitudMigratoriaRepository().guardar_muchos([_solicitud(i, asesores[0]) for i in range(3)])
+        inicio = timezone.now().replace(hour=10, minute=0, second=0, microsecond=0)
+        DjangoCitaRepository().guardar_muchos([
+            Cita(idCita=f"C-{i}", solicitudCodigo=f"SOL-{i:04d}", tipo=TipoCita.CONSULAR,
+                 rango=RangoFechaHora(inicio=inicio + timedelta(hours=i), fin=inicio + timedelta(hours=i, minutes=30)))
+            for i in range(2)
+        ])
+        self.tareas = TareaService(DjangoTareaRepository())
+        self.solicitudes = SolicitudMigratoriaService(DjangoSolicitudMigratoriaRepository())
+        self.inicio = inicio
+
+    def test_misma_pagina_que_con_entidades(self):
+        completa = self.tareas.listar_pagina(limite=5, email_asesor="asesor1@sgpm.com")
+        with self.assertNumQueries(1):
+            resumen = self.tareas.listar_pagina_resumen(limite=5, email_asesor="asesor1@sgpm.com")
+
+        columnas = ("id_tarea", "titulo", "prioridad", "estado", "vencimiento", "asesor_email")
+        self.assertEqual(
+            [tuple(getattr(t, c) for c in columnas) for t in resumen.elementos],
+            [tuple(getattr(t, c) for c in columnas) for t in completa.elementos],
+        )
+        self.assertEqual(resumen.siguiente_cursor, completa.siguiente_cursor)
+
+    def test_cursor_recorre_todas_las_filas(self):
+        vistos, cursor = [], None
+        while True:
+            pagina = self.tareas.listar_pagina_resumen(cursor, limite=5)
+            vistos.extend(t.id_tarea for t in pagina.elementos)
+            if not pagina.tiene_siguiente:
+                break
+            cursor = pagina.siguiente_cursor
+        self.assertEqual(sorted(vistos), [f"T-{i:04d}" for i in range(12)])
+
+    def test_solicitudes_y_agenda(self):
+        with self.assertNumQueries(1):
+            [primera, *_] = self.solicitudes.listar_pagina_resumen(limite=10).elementos
+        self.assertEqual(primera.solicitante_cedula, f"C{primera.codigo[-4:]}")
+        self.assertEqual(primera.tipo_servicio, "")
+
+        with self.assertNumQueries(1):
+            agenda = CitaService(DjangoCitaRepository()).listar_agenda(
+                self.inicio, self.inicio + timedelta(days=1), email_asesor="asesor0@sgpm.com"
+            )
+        self.assertEqual([c.id_cita for c in agenda], ["C-0", "C-1"])
+        self.assertEqual((agenda[0].solicitante_nombre, agenda[0].asesor_nombre), ("Nombre Apellido", "Asesor 0"))
+
+    def test_vistas_de_listado(self):
+        sesion = self.client.session
+        sesion["asesor_email"] = "asesor0@sgpm.com"
+        sesion["asesor_rol"] = "SUPERVISOR"
+        sesion.save()
+
+        self.assertContains(self.client.get(reverse("tareas_listar")), "T-0011")
+        self.assertContains(self.client.get(reverse("listado")), "C0002")
+        respuesta = self.client.get(reverse("citas_listar"), {"fecha": timezone.localdate(self.inicio).isoformat()})
+        self.assertContains(respuesta, "Asesor 0")
+
+
+# ========================================
+# Índices: planes de las consultas frecuentes
+# ========================================
+class ExplicarConsultasTests(TestCase):
+
+    def _planes(self):
+        """Líneas del plan de cada consulta, por nombre, según la salida del comando"""
+        salida = StringIO()
+        call_command("explicar_consultas", stdout=salida)
+        planes, actual = {}, None
+        for linea in salida.getvalue().splitlines():
+            if linea.startswith("    ") and actual is not None:
+                planes[actual].append(linea.strip())
+            elif ": " in linea:
+                actual = linea.rsplit(": ", 1)[0]
+                planes.setdefault(actual, [])
+            else:
+                actual = None
+        return planes
+
+    def test_consultas_con_indice_parcial_no_recorren_la_tabla(self):
+        planes = self._planes()
+
+        for nombre in ("tareas.listar_vencidas", "tareas.listar_por_vencer",
+                       "tareas.listar_por_estado", "citas.verificar_disponibilidad",
+                       "citas.listar_por_rango_fecha", "notificaciones.listar_no_leidas",
+                       "solicitudes.listar_por_estado", "documentos.listar_por_estado"):
+            with self.subTest(nombre=nombre):
+                self.assertTrue(planes.get(nombre), f"Sin plan para {nombre}")
+                for linea in planes[nombre]:
+                    self.assertNotRegex(linea, ESCANEO_COMPLETO[connection.vendor])
+
+
+# ========================================
+# Servicios: estadísticas materializadas de tareas
+# ========================================
+class EstadisticaTareaDiariaTests(TestCase):
+
+    def setUp(self):
+        DjangoAsesorRepository().guardar_muchos([_asesor(i) for i in range(2)])
+        self.estadisticas = DjangoEstadisticaTareaRepository()
+        self.service = TareaService(
+            DjangoTareaRepository(),
+            asesor_repo=DjangoAsesorRepository(),
+            estadistica_repo=self.estadisticas,
+        )
+        ahora = timezone.now()
+        for i, horas in enumerate([-72, -30, -1, 1, 30, 72, None]):
+            self.service.crear_tarea(TareaDTO(
+                id_tarea=f"T-{i:04d}",
+                titulo=f"Tarea {i}",
+                prioridad="ALTA" if i % 2 else "BAJA",
+                vencimiento=ahora + timedelta(hours=horas) if horas is not None else None,
+            ))
+            if i % 3:
+                self.service.asignar_a_asesor(f"T-{i:04d}", f"asesor{i % 2}@sgpm.com",
+                                              enviar_notificacion=False)
+        self.service.cambiar_estado("T-0001", "EN_PROGRESO")
+        self.service.cambiar_estado("T-0001", "COMPLETADA")
+        self.service.actualizar_prioridad("T-0003", "CRITICA")
+        self.service.editar_tarea("T-0004", vencimiento=ahora - timedelta(hours=2))
+        self.service.eliminar("T-0005")
+
+    def test_se_mantiene_igual_a_las_tareas(self):
+        self.assertEqual(self.estadisticas.diferencias(), {})
+
+    def test_reportes_coinciden_con_la_agregacion_en_vivo(self):
+        en_vivo = ReporteTareasService(DjangoTareaRepository())
+        materializado = ReporteTareasService(DjangoTareaRepository(), estadistica_repo=self.estadisticas)
+        ahora = timezone.now()
+
+        self.assertEqual(en_vivo.generar_resumen_global(momento_actual=ahora),
+                         materializado.generar_resumen_global(momento_actual=ahora))
+        for desde, hasta, email in [
+            (ahora - timedelta(days=2, hours=5), ahora + timedelta(hours=3), None),
+            (ahora - timedelta(days=5), ahora + timedelta(days=5), "asesor1@sgpm.com"),
+            (ahora - timedelta(hours=2), ahora, None),
+        ]:
+            filtro = FiltroReporteTareasDTO(desde=desde, hasta=hasta, asesor_email=email)
+            self.assertEqual(en_vivo.generar_reporte(filtro, ahora).estadisticas,
+                             materializado.generar_reporte(filtro, ahora).estadisticas)
+
+    def test_guardar_desde_copias_atrasadas_no_desvia_los_conteos(self):
+        # Dos ediciones cargadas antes de que la otra se guarde, como en dos peticiones concurrentes
+        repo = DjangoTareaRepository()
+        primera, segunda = repo.obtener_por_id("T-0002"), repo.obtener_por_id("T-0002")
+        primera.cambiar_estado(EstadoTarea.EN_PROGRESO)
+        segunda.cambiar_estado(EstadoTarea.CANCELADA)
+        self.service._guardar(primera)
+        self.service._guardar(segunda)
+        self.assertEqual(TareaModel.objects.get(id_tarea="T-0002").estado, EstadoTarea.CANCELADA.value)
+        self.assertEqual(self.estadisticas.diferencias(), {})
+
+        # Columnas distintas: la fila combina ambas y los conteos la siguen
+        primera, segunda = repo.obtener_por_id("T-0006"), repo.obtener_por_id("T-0006")
+        primera.actualizar_prioridad(PrioridadTarea.CRITICA)
+        segunda.cambiar_estado(EstadoTarea.EN_PROGRESO)
+        self.service._guardar(primera)
+        self.service._guardar(segunda)
+        self.assertEqual(self.estadisticas.diferencias(), {})
+
+    def test_reconstruir_corrige_la_deriva(self):
+        TareaModel.objects.filter(id_tarea="T-0000").delete()  # cambio por fuera del servicio
+        self.assertEqual(len(self.estadisticas.diferencias()), 1)
+
+        call_command("reconstruir_estadisticas_tareas", stdout=StringIO())
+        self.assertEqual(self.estadisticas.diferencias(), {})
+
+
+# ========================================
+# Servicios: disponibilidad de citas
+# ========================================
+class DisponibilidadCitaTests(TestCase):
+
+    def setUp(self):
+        DjangoSolicitudMigratoriaRepository().guardar_muchos([_solicitud(0)])
+        self.service = CitaService(DjangoCitaRepository())
+        self.base = timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+    def _agendar(self, id_cita: str, desde_h: float, hasta_h: float) -> CitaDTO:
+        return self.service.agendar_cita(CitaDTO(
+            id_cita=id_cita,
+            solicitud_codigo="SOL-0000",
+            tipo="CONSULAR",
+            inicio=self.base + timedelta(hours=desde_h),
+            fin=self.base + timedelta(hours=hasta_h),
+        ))
+
+    def test_agendar_rechaza_solapamientos(self):
+        self._agendar("CITA-1", 9, 11)
+        with self.assertRaises(HorarioNoDisponibleError):
+            self._agendar("CITA-2", 10, 12)
+        self._agendar("CITA-3", 11, 12)  # contiguas no se solapan
+
+    def test_reprogramar_detecta_citas_que_empiezan_antes_del_rango(self):
+        self._agendar("CITA-1", 9, 12)
+        self._agendar("CITA-2", 13, 14)
+
+        with self.assertRaises(HorarioNoDisponibleError):
+            self.service.reprogramar_cita("CITA-2", self.base + timedelta(hours=10),
+                                          self.base + timedelta(hours=11))
+
+    def test_reprogramar_excluye_la_propia_cita_en_una_consulta(self):
+        self._agendar("CITA-1", 9, 10)
+        with self.assertNumQueries(1):
+            disponible = self.service.verificar_disponibilidad(
+                self.base + timedelta(hours=9, minutes=30), self.base + timedelta(hours=10, minutes=30),
+                excluir_id="CITA-1",
+            )
+        self.assertTrue(disponible)
+
+        reprogramada = self.service.reprogramar_cita("CITA-1", self.base + timedelta(hours=9, minutes=30),
+                                                     self.base + timedelta(hours=10, minutes=30))
+        self.assertEqual(reprogramada.estado, "REPROGRAMADA")
+
+
+# ========================================
+# Servicios: recordatorios de vencimiento en lote
+# ========================================
+class RecordatoriosVencimientoTests(TestCase):
+
+    def setUp(self):
+        asesores = [_asesor(0), _asesor(1)]
+        DjangoAsesorRepository().guardar_muchos(asesores)
+        ahora = timezone.now()
+        tareas = [
+            _tarea(0, asesores[0]),
+            _tarea(1, asesores[1]),
+            _tarea(2),  # sin asignar
+            _tarea(3, asesores[0], estado=EstadoTarea.COMPLETADA),
+            _tarea(4, asesores[1]),  # fuera de la ventana
+        ]
+        for tarea, horas in zip(tareas, [2, 5, 2, 2, 48]):
+            tarea.vencimiento = ahora + timedelta(hours=horas)
+        DjangoTareaRepository().guardar_muchos(tareas)
+        self.service = TareaService(
+            DjangoTareaRepository(),
+            notificacion_service=NotificacionService(DjangoNotificacionRepository()),
+            recordatorio_repo=DjangoRecordatorioTareaRepository(),
+        )
+
+    def test_despacho_en_lote_no_repite_recordatorios(self):
+        # SELECT pendientes, INSERT marcas, SELECT marcas del lote, INSERT notificaciones
+        # (más los SAVEPOINT de las transacciones anidadas), sin importar cuántas tareas haya
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(self.service.enviar_recordatorios_vencimiento(), 2)
+        sentencias = [q["sql"] for q in consultas.captured_queries if "SAVEPOINT" not in q["sql"]]
+        self.assertEqual(len(sentencias), 4)
+
+        destinatarios = sorted(NotificacionModel.objects.values_list("destinatario", flat=True))
+        self.assertEqual(destinatarios, ["asesor0@sgpm.com", "asesor1@sgpm.com"])
+        self.assertEqual(self.service.enviar_recordatorios_vencimiento(), 0)
+
+        # Un nuevo vencimiento es un nuevo recordatorio
+        TareaModel.objects.filter(id_tarea="T-0000").update(vencimiento=timezone.now() + timedelta(hours=3))
+        self.assertEqual(self.service.enviar_recordatorios_vencimiento(), 1)
+        self.assertEqual(NotificacionModel.objects.count(), 3)
+
+    def test_comando_simula_y_envia(self):
+        salida = StringIO()
+        call_command("enviar_recordatorios_tareas", "--simular", stdout=salida)
+        self.assertIn("2 recordatorio(s) pendiente(s)", salida.getvalue())
+        self.assertEqual(NotificacionModel.objects.count(), 0)
+
+        salida = StringIO()
+        call_command("enviar_recordatorios_tareas", "--horas", "72", stdout=salida)
+        self.assertIn("Recordatorios enviados: 3", salida.getvalue())
+
+
+# ========================================
+# Dominio: identificadores ordenados por tiempo
+# ========================================
+class IdentificadoresTests(TestCase):
+
+    def test_ids_unicos_y_ordenados_entre_hilos(self):
+        def generar(_):
+            return [nuevo_id("NOTIF") for _ in range(2000)]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            lotes = list(pool.map(generar, range(8)))
+
+        self.assertEqual(len({i for lote in lotes for i in lote}), 16000)
+        for lote in lotes:
+            self.assertEqual(lote, sorted(lote))
+
+    def test_monotono_aunque_el_reloj_se_repita_o_retroceda(self):
+        instantes = iter([1_700_000_000_000, 1_700_000_000_000, 1_699_999_999_000, 1_700_000_000_001])
+        generador = GeneradorULID(reloj=lambda: next(instantes))
+
+        ids = [generador.nuevo() for _ in range(4)]
+
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), 4)
+        self.assertEqual(instante_ulid(ids[0]).timestamp(), 1_700_000_000)
+
+    def test_servicios_de_distintas_peticiones_no_se_pisan(self):
+        for _ in range(2):
+            NotificacionService(DjangoNotificacionRepository()).crear_notificacion(
+                "asesor0@sgpm.com", "RECORDATORIO", "mensaje")
+        self.assertEqual(NotificacionModel.objects.count(), 2)
+
+        filtro = FiltroReporteTareasDTO(desde=timezone.now(), hasta=timezone.now())
+        reportes = [ReporteTareasService(DjangoTareaRepository()).generar_reporte(filtro) for _ in range(2)]
+        self.assertNotEqual(reportes[0].id_reporte, reportes[1].id_reporte)
+
+
+# ========================================
+# Repositorios: historial persistido de la solicitud
+# ========================================
+class HistorialSolicitudTests(TestCase):
+
+    def setUp(self):
+        self.repo = DjangoSolicitudMigratoriaRepository()
+        self.repo.guardar(_solicitud(0))
+        self.service = SolicitudMigratoriaService(self.repo)
+
+    def test_guardar_vuelca_el_historial_pendiente_en_lote(self):
+        solicitud = self.repo.obtener_por_codigo("SOL-0000")
+        solicitud.cambiar_estado(nuevo=EstadoSolicitud.DOCUMENTOS_PENDIENTES, usuario="asesor", motivo="faltan")
+        solicitud.cambiar_estado(nuevo=EstadoSolicitud.EN_REVISION, usuario="asesor", motivo="completos")
+        solicitud.cambiar_estado(nuevo=EstadoSolicitud.ENVIADA, usuario="asesor", motivo="")
+
+        with CaptureQueriesContext(connection) as consultas:
+            self.repo.guardar(solicitud)
+        inserts = [q["sql"] for q in consultas.captured_queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len([q for q in inserts if "historial_estado_solicitud" in q]), 1)
+
+        # Lo ya persistido no se vuelve a escribir
+        self.repo.guardar(solicitud)
+        historial = self.service.obtener_historial_estados("SOL-0000")
+        self.assertEqual(
+            [h["nuevo"] for h in historial],
+            [e.value for e in (EstadoSolicitud.ENVIADA, EstadoSolicitud.EN_REVISION, EstadoSolicitud.DOCUMENTOS_PENDIENTES)],
+        )
+
+    def test_historial_paginado_y_fechas_conservadas(self):
+        hoy = timezone.localdate().isoformat()
+        for nuevo in ("DOCUMENTOS_PENDIENTES", "EN_REVISION", "DOCUMENTOS_PENDIENTES"):
+            self.assertEqual(self.service.cambiar_estado("SOL-0000", nuevo, "asesor")["resultado"], "aceptado")
+        self.service.asignar_fecha_proceso("SOL-0000", "fechaRecepcionDocs", hoy, "asesor")
+        self.service.asignar_fecha_proceso("SOL-0000", "fechaEnvioSolicitud", hoy, "asesor")
+
+        primera = self.service.listar_historial_estados("SOL-0000", limite=2)
+        segunda = self.service.listar_historial_estados("SOL-0000", primera.siguiente_cursor, limite=2)
+        self.assertEqual(len(primera.elementos), 2)
+        self.assertEqual([h["anterior"] for h in segunda.elementos], [EstadoSolicitud.EN_REVISION.value])
+        self.assertFalse(segunda.tiene_siguiente)
+
+        # La fecha asignada antes sigue en la solicitud tras recargarla
+        self.assertEqual(self.repo.obtener_por_codigo("SOL-0000").obtener_fecha_proceso("fechaRecepcionDocs"), hoy)
+        fechas = self.service.obtener_historial_fechas("SOL-0000")
+        self.assertEqual([f["campo"] for f in fechas], ["fechaEnvioSolicitud", "fechaRecepcionDocs"])
+
+
+# ========================================
+# Servicios: consulta del expediente completo
+# ========================================
+class ExpedienteQueryTests(TestCase):
+
+    def setUp(self):
+        self.repo = DjangoSolicitudMigratoriaRepository()
+        self.repo.guardar_muchos([_solicitud(0), _solicitud(1)])
+        self.service = ExpedienteQueryService(DjangoExpedienteRepository())
+
+    def _ampliar(self, codigo: str, n: int):
+        """Añade n documentos, citas, tareas y cambios de estado a la solicitud"""
+        solicitud = SolicitudMigratoriaModel.objects.get(codigo=codigo)
+        inicio = timezone.now() + timedelta(days=1)
+        DocumentoModel.objects.bulk_create(
+            DocumentoModel(id_documento=f"{codigo}-D{i}", solicitud=solicitud, tipo="PASAPORTE") for i in range(n)
+        )
+        CitaModel.objects.bulk_create(
+            CitaModel(id_cita=f"{codigo}-C{i}", solicitud=solicitud, tipo="CONSULAR",
+                      inicio=inicio + timedelta(hours=i), fin=inicio + timedelta(hours=i, minutes=30))
+            for i in range(n)
+        )
+        TareaModel.objects.bulk_create(
+            TareaModel(id_tarea=f"{codigo}-T{i}", solicitud=solicitud, titulo=f"Tarea {i}", prioridad="MEDIA")
+            for i in range(n)
+        )
+        entidad = self.repo.obtener_por_codigo(codigo)
+        for i in range(n):
+            nuevo = EstadoSolicitud.DOCUMENTOS_PENDIENTES if i % 2 == 0 else EstadoSolicitud.EN_REVISION
+            entidad.cambiar_estado(nuevo=nuevo, usuario="asesor", motivo=f"paso {i}")
+        self.repo.guardar(entidad)
+
+    def test_numero_de_consultas_constante(self):
+        self._ampliar("SOL-0000", 2)
+        with self.assertNumQueries(6):
+            pequeno = self.service.consultar_por_codigo("SOL-0000")
+
+        self._ampliar("SOL-0001", 30)
+        with self.assertNumQueries(6):
+            grande = self.service.consultar_por_codigo("SOL-0001")
+
+        detalle = grande.solicitudes[0]
+        self.assertEqual(grande.solicitante.cedula, "C0001")
+        self.assertEqual((len(detalle.documentos), len(detalle.citas), len(detalle.tareas)), (30, 30, 30))
+        self.assertEqual(len(detalle.historial_estados), 30)
+        self.assertEqual(detalle.historial_estados[0]["motivo"], "paso 29")
+        self.assertEqual([c.id_cita for c in detalle.citas[:2]], ["SOL-0001-C0", "SOL-0001-C1"])
+        self.assertEqual(len(pequeno.solicitudes[0].documentos), 2)
+
+        with self.assertNumQueries(6):
+            por_cedula = self.service.consultar_por_solicitante("C0001")
+        self.assertEqual([s.solicitud.codigo for s in por_cedula.solicitudes], ["SOL-0001"])
+        self.assertIsNone(self.service.consultar_por_codigo("SOL-9999"))
+
+    def test_vistas_de_consulta_y_detalle(self):
+        self._ampliar("SOL-0000", 3)
+        sesion = self.client.session
+        sesion["asesor_email"] = "asesor0@sgpm.com"
+        sesion.save()
+
+        respuesta = self.client.get(reverse("consultar-expediente"), {"cedula": "C0000"})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertContains(respuesta, "SOL-0000")
+        self.assertEqual(len(respuesta.context["expediente"].solicitudes[0].citas), 3)
+
+        respuesta = self.client.get(reverse("detalle"), {"codigo": "SOL-0000"})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.context["detalle"].solicitud.codigo, "SOL-0000")
+
+        respuesta = self.client.get(reverse("consultar-expediente"), {"codigo": "SOL-9999"})
+        self.assertIsNone(respuesta.context["expediente"])
+
+
+# ========================================
+# Servicios: cambio de estado masivo
+# ========================================
+class CambioEstadoMasivoTests(TestCase):
+
+    def setUp(self):
+        self.repo = DjangoSolicitudMigratoriaRepository()
+        solicitudes = [_solicitud(i) for i in range(4)]
+        solicitudes[3].estadoActual = EstadoSolicitud.CREADA
+        self.repo.guardar_muchos(solicitudes)
+        self.service = SolicitudMigratoriaService(self.repo)
+
+    def test_valida_cada_transicion_y_escribe_en_lote(self):
+        codigos = ["SOL-0000", "SOL-0001", "SOL-0002", "SOL-0003", "SOL-9999"]
+        with CaptureQueriesContext(connection) as consultas:
+            resultados = self.service.cambiar_estado_masivo(codigos, "ENVIADA", "supervisor")
+        # SELECT de las solicitudes, UPDATE en lote e INSERT del historial (más el
+        # UPDATE sin cambios que bloquea las filas donde no hay FOR UPDATE)
+        sentencias = [q["sql"] for q in consultas.captured_queries if "SAVEPOINT" not in q["sql"]]
+        self.assertEqual(len(sentencias), 3 if connection.features.has_select_for_update else 4)
+
+        self.assertEqual(list(resultados), codigos)
+        self.assertEqual(
+            [r["resultado"] for r in resultados.values()],
+            ["aceptado", "aceptado", "aceptado", "rechazado", "rechazado"],
+        )
+        enviada = self.repo.obtener_por_codigo("SOL-0001")
+        self.assertEqual(enviada.estadoActual, EstadoSolicitud.ENVIADA)
+        self.assertEqual(self.repo.obtener_por_codigo("SOL-0003").estadoActual, EstadoSolicitud.CREADA)
+        self.assertEqual(len(self.service.obtener_historial_estados("SOL-0002")), 1)
+        self.assertEqual(self.service.obtener_historial_estados("SOL-0003"), [])
+
+    def test_motivo_obligatorio_y_estado_invalido(self):
+        resultados = self.service.cambiar_estado_masivo(["SOL-0000"], "RECHAZADA", "supervisor")
+        self.assertEqual(resultados["SOL-0000"]["resultado"], "rechazado")
+        with self.assertRaises(ServiceError):
+            self.service.cambiar_estado_masivo(["SOL-0000"], "NO_EXISTE", "supervisor")
+
+    def test_tabla_de_transiciones_compilada_e_inmutable(self):
+        tabla = SolicitudMigratoria.TRANSICIONES
+        self.assertIs(_solicitud(9)._transiciones_permitidas(), tabla)
+        with self.assertRaises(TypeError):
+            tabla[EstadoSolicitud.CERRADA] = frozenset({EstadoSolicitud.CREADA})
+
+        estados = [EstadoSolicitud.EN_REVISION, EstadoSolicitud.CERRADA, EstadoSolicitud.ARCHIVADA]
+        validas = SolicitudMigratoria.transiciones_validas(estados)
+        self.assertIn(EstadoSolicitud.ENVIADA, validas[0])
+        self.assertEqual(validas[1:], [frozenset(), frozenset()])
+        self.assertEqual(
+            SolicitudMigratoria.origenes_validos(EstadoSolicitud.ENVIADA),
+            {EstadoSolicitud.EN_REVISION},
+        )
+
+    def test_codigos_elegibles_desde_la_base(self):
+        with self.assertNumQueries(1):
+            elegibles = self.repo.codigos_elegibles(EstadoSolicitud.ENVIADA)
+        self.assertEqual(elegibles, {"SOL-0000", "SOL-0001", "SOL-0002"})
+        self.assertEqual(self.repo.codigos_elegibles(EstadoSolicitud.EN_REVISION, ["SOL-0000", "SOL-0003"]), {"SOL-0003"})
+        self.assertEqual(self.service.codigos_elegibles("CREADA"), [])
+
+    def test_vista_aplica_el_cambio_masivo(self):
+        sesion = self.client.session
+        sesion["asesor_email"] = "supervisor@sgpm.com"
+        sesion["asesor_rol"] = "SUPERVISOR"
+        sesion.save()
+        respuesta = self.client.post(reverse("cambio-estado"), {
+            "codigos": "SOL-0000, SOL-0001\nSOL-0003", "nuevo_estado": "CERRADA", "motivo": "cierre de mes",
+        })
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(len(respuesta.context["resultados_masivos"]), 3)
+        self.assertEqual(self.repo.obtener_por_codigo("SOL-0003").estadoActual, EstadoSolicitud.CERRADA)
+
+    def test_vista_rechaza_el_cambio_masivo_de_un_asesor(self):
+        sesion = self.client.session
+        sesion["asesor_email"] = "asesor0@sgpm.com"
+        sesion["asesor_rol"] = "ASESOR"
+        sesion.save()
+        for datos in ({"codigos": "SOL-0000 SOL-0003", "nuevo_estado": "CERRADA", "motivo": "cierre"},
+                      {"accion": "elegibles", "nuevo_estado": "CERRADA"}):
+            respuesta = self.client.post(reverse("cambio-estado"), datos)
+            self.assertEqual(respuesta.status_code, 200)
+            self.assertIsNone(respuesta.context["resultados_masivos"])
+            self.assertEqual(respuesta.context["codigos_texto"], datos.get("codigos", ""))
+            errores = [str(m) for m in get_messages(respuesta.wsgi_request) if m.level == messages.ERROR]
+            self.assertEqual(len(errores), 1)
+            self.assertNotContains(respuesta, "Cambio Masivo de Estado")
+
+        self.assertEqual(self.repo.obtener_por_codigo("SOL-0000").estadoActual, EstadoSolicitud.EN_REVISION)
+        self.assertEqual(self.repo.obtener_por_codigo("SOL-0003").estadoActual, EstadoSolicitud.CREADA)
+
+    def test_bloquear_toma_la_escritura_antes_de_leer(self):
+        with CaptureQueriesContext(connection) as consultas, self.repo.transaccion():
+            self.repo.obtener_por_codigos(["SOL-0000", "SOL-0001"], bloquear=True)
+        sentencias = [q["sql"] for q in consultas.captured_queries if "SAVEPOINT" not in q["sql"]]
+        if connection.features.has_select_for_update:
+            self.assertIn("FOR UPDATE", sentencias[0])
+        else:
+            self.assertTrue(sentencias[0].startswith('UPDATE "solicitud_migratoria"'))
+            self.assertTrue(sentencias[1].startswith("SELECT"))
+
+
+# ========================================
+# Repositorios: caché de lectura por clave
+# ========================================
+class RepositorioEnCacheTests(TransactionTestCase):
+    """Fuera de TestCase: dentro de una transacción la lectura no puebla la caché"""
+
+    def setUp(self):
+        cache.clear()
+        reiniciar_estadisticas_cache()
+        self.repo = SolicitudMigratoriaRepositoryEnCache(DjangoSolicitudMigratoriaRepository())
+        self.repo.guardar(_solicitud(0))
+
+    def test_lectura_cacheada_e_invalidada_al_escribir(self):
+        with self.assertNumQueries(1):
+            self.repo.obtener_por_codigo("SOL-0000")
+        with self.assertNumQueries(0):
+            solicitud = self.repo.obtener_por_codigo("SOL-0000")
+
+        solicitud.cambiar_estado(nuevo=EstadoSolicitud.ENVIADA, usuario="asesor", motivo="")
+        self.repo.guardar(solicitud)
+        self.assertEqual(self.repo.obtener_por_codigo("SOL-0000").estadoActual, EstadoSolicitud.ENVIADA)
+
+        # Las ausencias no se guardan y el resto de métodos se delega
+        self.assertIsNone(self.repo.obtener_por_codigo("SOL-9999"))
+        self.assertTrue(self.repo.existe("SOL-0000"))
+        self.assertTrue(self.repo.eliminar("SOL-0000"))
+        self.assertIsNone(self.repo.obtener_por_codigo("SOL-0000"))
+
+        estadisticas = estadisticas_cache()["solicitud"]
+        self.assertEqual((estadisticas.aciertos, estadisticas.fallos), (1, 4))
+        self.assertEqual(estadisticas.invalidaciones, 3)
+
+    def test_las_escrituras_del_servicio_no_parten_de_la_copia_cacheada(self):
+        service = SolicitudMigratoriaService(self.repo)
+        self.repo.obtener_por_codigo("SOL-0000")
+
+        # Otro proceso cambia la fila sin pasar por esta caché
+        otro = DjangoSolicitudMigratoriaRepository()
+        solicitud = otro.obtener_por_codigo("SOL-0000")
+        solicitud.asignar_fecha_proceso(campo="fechaRecepcionDocs",
+                                        valor_iso=(date.today() + timedelta(days=5)).isoformat(),
+                                        usuario="otro")
+        solicitud.cambiar_estado(nuevo=EstadoSolicitud.RECHAZADA, usuario="otro", motivo="Incompleta")
+        otro.guardar(solicitud)
+        self.assertEqual(self.repo.obtener_por_codigo("SOL-0000").estadoActual, EstadoSolicitud.EN_REVISION)
+
+        # EN_REVISION -> ENVIADA valía sobre la copia cacheada, no sobre la fila
+        resultado = service.cambiar_estado("SOL-0000", "ENVIADA", "asesor")
+        self.assertEqual(resultado["resultado"], "rechazado")
+        resultado = service.asignar_fecha_proceso("SOL-0000", "fechaEnvioSolicitud",
+                                                  (date.today() + timedelta(days=1)).isoformat(), "asesor")
+        self.assertEqual(resultado["resultado"], "rechazado")
+
+        guardada = otro.obtener_por_codigo("SOL-0000")
+        self.assertEqual(guardada.estadoActual, EstadoSolicitud.RECHAZADA)
+        self.assertIsNotNone(guardada.obtener_fechas_clave()["fechaRecepcionDocs"])
+
+    def test_escribir_solicitante_o_asesor_invalida_sus_solicitudes(self):
+        solicitantes = SolicitanteRepositoryEnCache(DjangoSolicitanteRepository())
+        asesores = AsesorRepositoryEnCache(DjangoAsesorRepository())
+        asesores.guardar(_asesor(0))
+        self.repo.guardar(_solicitud(1, DjangoAsesorRepository().obtener_por_email("asesor0@sgpm.com")))
+        self.repo.obtener_por_codigo("SOL-0000")
+        self.repo.obtener_por_codigo("SOL-0001")
+
+        solicitantes.guardar(Solicitante("C0000", "Renombrado", "Apellido", "nuevo@correo.com", "0999"))
+        solicitante = self.repo.obtener_por_codigo("SOL-0000")._solicitante
+        self.assertEqual((solicitante.nombres, solicitante.correo), ("Renombrado", "nuevo@correo.com"))
+
+        asesores.guardar(Asesor(nombres="Asesor", apellidos="Jefe", emailAsesor="asesor0@sgpm.com",
+                                rol=RolUsuario.SUPERVISOR))
+        asesor = self.repo.obtener_por_codigo("SOL-0001")._asesor
+        self.assertEqual((asesor.apellidos, asesor.rol), ("Jefe", RolUsuario.SUPERVISOR))
+
+        # Al borrar el asesor la solicitud deja de tenerlo
+        asesores.eliminar("asesor0@sgpm.com")
+        self.assertIsNone(self.repo.obtener_por_codigo("SOL-0001")._asesor)
+
+    def test_en_cache_respeta_el_ttl_configurado(self):
+        repo = DjangoSolicitudMigratoriaRepository()
+        self.assertIs(en_cache(repo, ttl=0), repo)
+        self.assertIs(en_cache(DjangoCitaRepository), DjangoCitaRepository)
+        with self.settings(SGPM_REPOSITORIOS_CACHE_TTL=30):
+            self.assertIsInstance(en_cache(repo), SolicitudMigratoriaRepositoryEnCache)
+
+
+# ========================================
+# Repositorios: unidad de trabajo por petición
+# ========================================
+class UnidadDeTrabajoTests(TransactionTestCase):
+    """Fuera de TestCase: dentro de una transacción del llamador no se difiere"""
+
+    def setUp(self):
+        DjangoAsesorRepository().guardar(_asesor(0))
+        self.tareas = DjangoTareaRepository()
+        self.tareas.guardar(_tarea(0))
+        self.solicitudes = DjangoSolicitudMigratoriaRepository()
+        self.solicitudes.guardar(_solicitud(0))
+
+    @staticmethod
+    def _consultas(capturadas, sentencia: str, tabla: str):
+        """SQL capturado de `SELECT ... FROM tabla` o `INSERT INTO tabla`"""
+        marca = {"SELECT": f'FROM "{tabla}"', "INSERT": f'INSERT INTO "{tabla}"'}[sentencia]
+        return [q["sql"] for q in capturadas if marca in q["sql"]]
+
+    def test_asignar_reutiliza_el_asesor_cargado_y_vuelca_al_terminar_el_servicio(self):
+        service = TareaService(self.tareas, asesor_repo=DjangoAsesorRepository())
+        with CaptureQueriesContext(connection) as consultas:
+            with UnidadDeTrabajo() as unidad:
+                tarea = self.tareas.obtener_por_id("T-0000")
+                service.asignar_a_asesor("T-0000", "asesor0@sgpm.com", enviar_notificacion=False)
+                # El servicio escribe antes de devolver: un error de la base llega a la vista
+                self.assertFalse(unidad.tiene_pendientes())
+                self.assertEqual(unidad.volcados, 1)
+                asignada = TareaModel.objects.select_related("asignada_a").get(id_tarea="T-0000").asignada_a
+                self.assertEqual(asignada.email_asesor, "asesor0@sgpm.com")
+                # El mapa de identidad sigue vivo hasta el final de la petición
+                self.assertIs(self.tareas.obtener_por_id("T-0000"), tarea)
+
+        self.assertEqual(len(self._consultas(consultas.captured_queries, "SELECT", "asesor")), 1)
+        self.assertEqual(TareaModel.objects.get(id_tarea="T-0000").asignada_a.email_asesor, "asesor0@sgpm.com")
+
+    def test_guardados_repetidos_se_escriben_una_vez(self):
+        with CaptureQueriesContext(connection) as consultas:
+            with UnidadDeTrabajo() as unidad:
+                solicitud = self.solicitudes.obtener_por_codigo("SOL-0000")
+                solicitud.cambiar_estado(nuevo=EstadoSolicitud.DOCUMENTOS_PENDIENTES, usuario="asesor", motivo="")
+                self.solicitudes.guardar(solicitud)
+                solicitud.cambiar_estado(nuevo=EstadoSolicitud.EN_REVISION, usuario="asesor", motivo="")
+                self.solicitudes.guardar(solicitud)
+                self.assertIs(self.solicitudes.obtener_por_codigo("SOL-0000"), solicitud)
+                self.assertEqual(unidad.volcados, 0)
+
+        capturadas = consultas.captured_queries
+        self.assertEqual(len(self._consultas(capturadas, "INSERT", "solicitud_migratoria")), 1)
+        self.assertEqual(len(self._consultas(capturadas, "INSERT", "historial_estado_solicitud")), 1)
+        # El solicitante llegó con la solicitud (select_related): no se vuelve a buscar
+        self.assertEqual(self._consultas(capturadas, "SELECT", "solicitante"), [])
+        historial = list(self.solicitudes.iterar_historial_estados("SOL-0000"))
+        self.assertEqual(len(historial), 2)
+
+    def test_error_en_la_vista_descarta_lo_pendiente(self):
+        with UnidadDeTrabajo() as unidad:
+            tarea = self.tareas.obtener_por_id("T-0000")
+            tarea.titulo = "cambiada"
+            self.tareas.guardar(tarea)
+            unidad.descartar()
+        self.assertEqual(TareaModel.objects.get(id_tarea="T-0000").titulo, "Tarea 0")
+
+    @staticmethod
+    def _fallar_insert(tabla: str):
+        """Envoltura de ejecución que hace fallar los INSERT en `tabla` como lo haría la base"""
+        def envoltura(execute, sql, params, many, context):
+            if sql.startswith(f'INSERT INTO "{tabla}"'):
+                raise IntegrityError(f"fallo simulado en {tabla}")
+            return execute(sql, params, many, context)
+        return envoltura
+
+    def test_error_al_escribir_llega_al_manejo_de_errores_de_la_vista(self):
+        sesion = self.client.session
+        sesion["asesor_email"] = "asesor0@sgpm.com"
+        sesion.save()
+        datos = {"cedula": "N0001", "nombres": "Ana", "apellidos": "Paz",
+                 "correo": "ana@correo.com", "telefono": "0999"}
+        with connection.execute_wrapper(self._fallar_insert("solicitante")):
+            respuesta = self.client.post(reverse("registro"), datos)
+
+        # La vista vuelve a mostrar el formulario con su error, sin el mensaje de éxito
+        self.assertEqual(respuesta.status_code, 200)
+        avisos = [(m.level, str(m)) for m in get_messages(respuesta.wsgi_request)]
+        self.assertEqual([nivel for nivel, _ in avisos], [messages.ERROR])
+        self.assertIn("fallo simulado", avisos[0][1])
+        self.assertFalse(SolicitanteModel.objects.filter(cedula="N0001").exists())
+
+    def test_volcado_final_fallido_descarta_los_mensajes_de_la_vista(self):
+        def vista(request):
+            # Escritura directa al repositorio: solo se vuelca al salir de la petición
+            DjangoSolicitanteRepository().guardar(Solicitante("N0002", "Ana", "Paz", "ana@correo.com", "0999"))
+            messages.success(request, "Solicitante registrado correctamente.")
+            return HttpResponseRedirect("/solicitante/")
+
+        request = RequestFactory().post("/registro/")
+        request.session = SessionStore()
+        request._messages = default_storage(request)
+        with connection.execute_wrapper(self._fallar_insert("solicitante")), self.assertRaises(IntegrityError):
+            UnidadDeTrabajoMiddleware(vista)(request)
+
+        self.assertTrue(request._messages.used)
+        self.assertFalse(SolicitanteModel.objects.filter(cedula="N0002").exists())
+
+
+# ========================================
+# Aplicación: contenedor de servicios
+# ========================================
+class _NotificacionesContadas(DjangoNotificacionRepository):
+
+    def __init__(self):
+        super().__init__()
+        self.conteos = 0
+
+    def contar_no_leidas(self, destinatario: str) -> int:
+        self.conteos += 1
+        return super().contar_no_leidas(destinatario)
+
+
+class ContenedorTests(TestCase):
+
+    def test_servicios_compartidos_entre_peticiones(self):
+        tareas = contenedor.obtener(TareaService)
+        self.assertIs(contenedor.obtener(TareaService), tareas)
+        self.assertIs(tareas._asesor_repo, contenedor.obtener(AsesorRepository))
+        self.assertIs(contenedor.obtener(ReporteTareasService)._tarea_repo, tareas._repo)
+
+    def test_alcance_sustituye_solo_lo_que_depende_de_la_sustitucion(self):
+        tareas = contenedor.obtener(TareaService)
+        solicitudes = contenedor.obtener(SolicitudMigratoriaService)
+        sin_cache = DjangoSolicitanteRepository()
+
+        with contenedor.alcance({SolicitanteRepository: sin_cache}):
+            solicitantes = contenedor.obtener(SolicitanteService)
+            self.assertIs(solicitantes._repo, sin_cache)
+            self.assertIs(contenedor.obtener(SolicitanteService), solicitantes)
+            self.assertIsNot(contenedor.obtener(SolicitudMigratoriaService), solicitudes)
+            self.assertIs(contenedor.obtener(TareaService), tareas)
+            with contenedor.alcance({AsesorRepository: DjangoAsesorRepository()}):
+                self.assertIsNot(contenedor.obtener(TareaService), tareas)
+                self.assertIs(contenedor.obtener(SolicitanteService)._repo, sin_cache)
+
+        self.assertIs(contenedor.obtener(SolicitudMigratoriaService), solicitudes)
+        self.assertIsNot(contenedor.obtener(SolicitanteService)._repo, sin_cache)
+
+    def test_las_vistas_usan_el_alcance_activo(self):
+        sesion = self.client.session
+        sesion["asesor_email"] = "asesor0@sgpm.com"
+        sesion.save()
+        contadas = _NotificacionesContadas()
+        with contenedor.alcance({NotificacionRepository: contadas}):
+            respuesta = self.client.get(reverse("notificaciones_bandeja"))
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(contadas.conteos, 1)
+
+    def test_cambiar_el_ttl_rehace_los_repositorios(self):
+        with self.settings(SGPM_REPOSITORIOS_CACHE_TTL=0):
+            self.assertIsInstance(contenedor.obtener(SolicitudMigratoriaRepository), DjangoSolicitudMigratoriaRepository)
+        self.assertIsInstance(contenedor.obtener(SolicitudMigratoriaRepository), SolicitudMigratoriaRepositoryEnCache)
+
+    def test_clave_sin_registrar(self):
+        with self.assertRaises(DependenciaNoRegistradaError):
+            Contenedor().obtener(TareaService)
+
+
+# ========================================
+# Repositorios: escritura de las columnas modificadas
+# ========================================
+class GuardarCambiosTests(TestCase):
+
+    def setUp(self):
+        DjangoAsesorRepository().guardar(_asesor(0))
+        self.tareas = DjangoTareaRepository()
+        self.tareas.guardar(_tarea(0))
+        self.solicitudes = DjangoSolicitudMigratoriaRepository()
+        self.solicitudes.guardar(_solicitud(0))
+
+    @staticmethod
+    def _escrituras(capturadas):
+        return [q["sql"] for q in capturadas if "SAVEPOINT" not in q["sql"]]
+
+    def test_entidad_cargada_sin_cambios_no_escribe(self):
+        tarea = self.tareas.obtener_por_id("T-0000")
+        with CaptureQueriesContext(connection) as consultas:
+            self.tareas.guardar(tarea)
+        self.assertEqual(self._escrituras(consultas.captured_queries), [])
+
+    def test_cambio_de_estado_actualiza_solo_sus_columnas(self):
+        tarea = self.tareas.obtener_por_id("T-0000")
+        tarea.estado = EstadoTarea.EN_PROGRESO
+        with CaptureQueriesContext(connection) as consultas:
+            self.tareas.guardar(tarea)
+
+        [sql] = self._escrituras(consultas.captured_queries)
+        self.assertTrue(sql.startswith('UPDATE "tarea" SET "estado"'))
+        self.assertIn('"fecha_actualizacion"', sql)
+        self.assertNotIn('"titulo"', sql)
+        self.assertEqual(TareaModel.objects.get(id_tarea="T-0000").estado, EstadoTarea.EN_PROGRESO.value)
+
+    def test_asignar_asesor_resuelve_la_clave_foranea(self):
+        tarea = self.tareas.obtener_por_id("T-0000")
+        tarea.asignadaA = _asesor(0)
+        with CaptureQueriesContext(connection) as consultas:
+            self.tareas.guardar(tarea)
+
+        escrituras = [q for q in self._escrituras(consultas.captured_queries) if q.startswith("UPDATE")]
+        self.assertEqual(len(escrituras), 1)
+        self.assertNotIn('"titulo"', escrituras[0])
+        self.assertEqual(TareaModel.objects.get(id_tarea="T-0000").asignada_a.email_asesor, "asesor0@sgpm.com")
+
+    def test_solicitud_escribe_estado_e_historial(self):
+        solicitud = self.solicitudes.obtener_por_codigo("SOL-0000")
+        solicitud.cambiar_estado(nuevo=EstadoSolicitud.DOCUMENTOS_PENDIENTES, usuario="asesor", motivo="")
+        with CaptureQueriesContext(connection) as consultas:
+            self.solicitudes.guardar(solicitud)
+
+        escrituras = self._escrituras(consultas.captured_queries)
+        self.assertEqual(len(escrituras), 2)  # UPDATE solicitud + INSERT historial
+        self.assertTrue(escrituras[0].startswith('UPDATE "solicitud_migratoria" SET "estado_actual"'))
+        self.assertEqual(len(list(self.solicitudes.iterar_historial_estados("SOL-0000"))), 1)
+
+    def test_aprobar_documento_es_un_update(self):
+        documentos = DjangoDocumentoRepository()
+        documentos.guardar(Documento("DOC-1", TipoDocumento.PASAPORTE, EstadoDocumento.RECIBIDO), "SOL-0000")
+        documento = documentos.obtener_por_id("DOC-1")
+        documento.marcar_como_aprobado()
+        with CaptureQueriesContext(connection) as consultas:
+            documentos.guardar(documento, "SOL-0000")
+
+        [sql] = self._escrituras(consultas.captured_queries)
+        self.assertTrue(sql.startswith('UPDATE "documento" SET "estado"'))
+        self.assertEqual(DocumentoModel.objects.get(id_documento="DOC-1").estado, EstadoDocumento.APROBADO.value)
+
+    def test_entidad_nueva_usa_la_escritura_completa(self):
+        tarea = _tarea(1)
+        self.tareas.guardar(tarea)
+        tarea.comentario = "revisar"
+        self.tareas.guardar(tarea)
+        self.assertEqual(TareaModel.objects.get(id_tarea="T-0001").comentario, "revisar")
+
+
+# ========================================
+# Dominio: entidades compactas y relaciones compartidas
+# ========================================
+class EntidadesCompactasTests(TestCase):
+
+    def setUp(self):
+        asesores = DjangoAsesorRepository()
+        asesores.guardar(_asesor(0))
+        asesores.guardar(_asesor(1))
+        self.tareas = DjangoTareaRepository()
+        self.tareas.guardar_muchos([_tarea(i, _asesor(i % 2)) for i in range(6)])
+        self.solicitudes = DjangoSolicitudMigratoriaRepository()
+        self.solicitudes.guardar_muchos([_solicitud(i, _asesor(0)) for i in range(3)])
+
+    def test_listado_comparte_el_asesor_de_las_filas(self):
+        tareas = self.tareas.listar_todas()
+        por_email = {}
+        for tarea in tareas:
+            por_email.setdefault(tarea.asignadaA.emailAsesor, []).append(tarea.asignadaA)
+        self.assertEqual(len(por_email), 2)
+        for asesores in por_email.values():
+            self.assertEqual(len({id(a) for a in asesores}), 1)
+
+        solicitudes = self.solicitudes.listar_todas()
+        self.assertIs(solicitudes[0]._asesor, solicitudes[1]._asesor)
+        self.assertIsNot(solicitudes[0]._solicitante, solicitudes[1]._solicitante)
+
+    def test_busqueda_por_clave_no_comparte_entre_llamadas(self):
+        primera = self.tareas.obtener_por_id("T-0000")
+        segunda = self.tareas.obtener_por_id("T-0002")
+        self.assertIsNot(primera.asignadaA, segunda.asignadaA)
+
+    def test_entidad_sin_dict_y_colecciones_perezosas(self):
+        solicitud = self.solicitudes.obtener_por_codigo("SOL-0000")
+        self.assertFalse(hasattr(solicitud, "__dict__"))
+        with self.assertRaises(AttributeError):
+            solicitud.atributo_inexistente = 1
+        self.assertIsNone(SolicitudMigratoria._citas.existente(solicitud))
+        self.assertIsNone(SolicitudMigratoria._historial_estados.existente(solicitud))
+        self.assertEqual(solicitud.historial_pendiente(), ([], []))
+        self.assertIsNone(SolicitudMigratoria._historial_estados.existente(solicitud))
+
+        solicitud.cambiar_estado(nuevo=EstadoSolicitud.DOCUMENTOS_PENDIENTES, usuario="asesor", motivo="")
+        estados, _ = solicitud.historial_pendiente()
+        self.assertEqual(len(estados), 1)
+        self.solicitudes.guardar(solicitud)
+        self.assertEqual(
+            self.solicitudes.obtener_por_codigo("SOL-0000").estadoActual,
+            EstadoSolicitud.DOCUMENTOS_PENDIENTES,
+        )
+
+
+# ========================================
+# Servicios: bandeja y contador de notificaciones
+# ========================================
+class NotificacionesBandejaTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.service = NotificacionService(DjangoNotificacionRepository())
+        for i in range(5):
+            self.service.crear_notificacion("asesor0@sgpm.com", "RECORDATORIO", f"mensaje {i}")
+        self.service.crear_notificacion("asesor1@sgpm.com", "RECORDATORIO", "ajena")
+
+    def test_contador_se_sirve_de_cache_e_invalida_al_escribir(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.service.contar_no_leidas("asesor0@sgpm.com"), 5)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.service.contar_no_leidas("asesor0@sgpm.com"), 5)
+
+        primera = self.service.listar_no_leidas("asesor0@sgpm.com")[0]
+        self.assertTrue(self.service.marcar_como_leida(primera.id_notificacion))
+        self.assertEqual(self.service.contar_no_leidas("asesor0@sgpm.com"), 4)
+
+        self.service.crear_notificacion("asesor0@sgpm.com", "RECORDATORIO", "nueva")
+        self.assertEqual(self.service.contar_no_leidas("asesor0@sgpm.com"), 5)
+
+        # Con destinatario solo se marca si la notificación es suya
+        ajena = self.service.listar_no_leidas("asesor1@sgpm.com")[0]
+        self.assertFalse(self.service.marcar_como_leida(ajena.id_notificacion, "asesor0@sgpm.com"))
+        self.assertEqual(self.service.contar_no_leidas("asesor1@sgpm.com"), 1)
+
+    def test_marcar_todas_es_un_solo_update(self):
+        self.service.contar_no_leidas("asesor0@sgpm.com")
+        with self.assertNumQueries(1):
+            self.assertEqual(self.service.marcar_todas_como_leidas("asesor0@sgpm.com"), 5)
+        self.assertEqual(self.service.contar_no_leidas("asesor0@sgpm.com"), 0)
+        self.assertEqual(self.service.contar_no_leidas("asesor1@sgpm.com"), 1)
+
+    def test_bandeja_paginada_y_vista(self):
+        primera = self.service.listar_bandeja("asesor0@sgpm.com", limite=3)
+        segunda = self.service.listar_bandeja("asesor0@sgpm.com", primera.siguiente_cursor, limite=3)
+        mensajes = [n.mensaje for n in primera.elementos + segunda.elementos]
+        self.assertEqual(sorted(mensajes), [f"mensaje {i}" for i in range(5)])
+        self.assertFalse(segunda.tiene_siguiente)
+
+        sesion = self.client.session
+        sesion["asesor_email"] = "asesor0@sgpm.com"
+        sesion.save()
+        respuesta = self.client.get(reverse("notificaciones_bandeja"))
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.context["notificaciones_no_leidas"], 5)
+        self.assertNotContains(respuesta, "ajena")
+
+        self.client.post(reverse("notificaciones_leer_todas"))
+        self.assertEqual(self.service.contar_no_leidas("asesor0@sgpm.com"), 0)
+
+
+# ========================================
+# Servicios: búsqueda de huecos en la agenda
+# ========================================
+class HuecosCitaTests(TestCase):
+
+    def setUp(self):
+        DjangoSolicitudMigratoriaRepository().guardar_muchos([_solicitud(0)])
+        self.service = CitaService(DjangoCitaRepository())
+        hoy = timezone.localdate()
+        lunes = hoy + timedelta(days=7 - hoy.weekday())
+        self.lunes = timezone.make_aware(datetime.combine(lunes, time.min))
+
+    def _agendar(self, id_cita: str, desde: time, hasta: time) -> None:
+        self.service.agendar_cita(CitaDTO(
+            id_cita=id_cita,
+            solicitud_codigo="SOL-0000",
+            tipo="CONSULAR",
+            inicio=self.lunes.replace(hour=desde.hour, minute=desde.minute),
+            fin=self.lunes.replace(hour=hasta.hour, minute=hasta.minute),
+        ))
+
+    def _horas(self, huecos):
+        return [(h.inicio.strftime("%a %H:%M"), h.fin.strftime("%a %H:%M")) for h in huecos]
+
+    def test_fusiona_ocupados_y_descarta_tramos_cortos_en_una_consulta(self):
+        self._agendar("CITA-1", time(9), time(10))
+        self._agendar("CITA-2", time(10), time(11))
+        self._agendar("CITA-3", time(13), time(13, 15))
+        self._agendar("CITA-4", time(13, 45), time(14))
+
+        with self.assertNumQueries(1):
+            huecos = self.service.buscar_huecos(self.lunes, self.lunes + timedelta(days=1), timedelta(hours=1))
+
+        self.assertEqual(self._horas(huecos), [
+            ("Mon 08:00", "Mon 09:00"),
+            ("Mon 11:00", "Mon 13:00"),
+            ("Mon 14:00", "Mon 17:00"),
+        ])
+
+    def test_respeta_horario_laboral_y_dias_habiles(self):
+        sabado = self.lunes - timedelta(days=2)
+        horario = HorarioLaboral(apertura=time(9), cierre=time(12))
+
+        huecos = self.service.buscar_huecos(sabado, self.lunes + timedelta(days=2), timedelta(minutes=30), horario)
+
+        self.assertEqual(self._horas(huecos), [("Mon 09:00", "Mon 12:00"), ("Tue 09:00", "Tue 12:00")])
+
+    def test_endpoint_devuelve_huecos_en_json(self):
+        self.assertEqual(self.client.get(reverse("citas_huecos")).status_code, 401)
+
+        sesion = self.client.session
+        sesion["asesor_email"] = "asesor@sgpm.local"
+        sesion.save()
+        self._agendar("CITA-1", time(8), time(16))
+
+        respuesta = self.client.get(reverse("citas_huecos"), {
+            "desde": self.lunes.date().isoformat(), "dias": 1, "duracion": 45,
+        })
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json(), {
+            "duracion_minutos": 45,
+            "huecos": [{
+                "inicio": f"{self.lunes.date().isoformat()}T16:00+00:00",
+                "fin": f"{self.lunes.date().isoformat()}T17:00+00:00",
+            }],
+        })
+        self.assertEqual(self.client.get(reverse("citas_huecos"), {"duracion": "x"}).status_code, 400)
+
+
+# ========================================
+# Servicios: citas por ventanilla/asesor con capacidad
+# ========================================
+class RecursoCitaTests(TestCase):
+
+    def setUp(self):
+        DjangoSolicitudMigratoriaRepository().guardar_muchos([_solicitud(0)])
+        self.recurso_repo = DjangoRecursoCitaRepository()
+        self.service = CitaService(DjangoCitaRepository(), recurso_repo=self.recurso_repo)
+        self.base = timezone.now().replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        self.citas = 0
+
+    def _agendar(self, desde_h: float, hasta_h: float, recurso: str = None) -> CitaDTO:
+        self.citas += 1
+        return self.service.agendar_cita(CitaDTO(
+            id_cita=f"CITA-{self.citas}",
+            solicitud_codigo="SOL-0000",
+            tipo="CONSULAR",
+            inicio=self.base + timedelta(hours=desde_h),
+            fin=self.base + timedelta(hours=hasta_h),
+            recurso_codigo=recurso,
+        ))
+
+    def test_capacidad_limita_las_citas_simultaneas_del_recurso(self):
+        self.recurso_repo.guardar(RecursoCita(codigo="VENT-01", capacidad=2))
+        self.recurso_repo.guardar(RecursoCita(codigo="VENT-02", capacidad=1))
+
+        self._agendar(0, 1, "VENT-01")
+        self._agendar(0.5, 1.5, "VENT-01")
+        with self.assertRaises(HorarioNoDisponibleError):
+            self._agendar(0.75, 1, "VENT-01")
+        # Otro recurso no se ve afectado, y tras liberarse una plaza vuelve a haber cupo
+        self._agendar(0.75, 1, "VENT-02")
+        self._agendar(1, 2, "VENT-01")
+        with self.assertRaises(CitaInvalidaError):
+            self._agendar(3, 4, "VENT-99")
+
+    def test_reprogramar_con_el_recurso_desactivado(self):
+        self.recurso_repo.guardar(RecursoCita(codigo="VENT-01", capacidad=1))
+        cita = self._agendar(0, 1, "VENT-01")
+        self.recurso_repo.guardar(RecursoCita(codigo="VENT-01", capacidad=1, activo=False))
+
+        with self.assertRaisesMessage(CitaInvalidaError, "VENT-01"):
+            self.service.reprogramar_cita(cita.id_cita, self.base + timedelta(hours=2), self.base + timedelta(hours=3))
+        self.assertEqual(CitaModel.objects.get(id_cita=cita.id_cita).inicio, self.base)
+
+    def test_recurso_desconocido(self):
+        cita = Cita(idCita="CITA-X", solicitudCodigo="SOL-0000", tipo=TipoCita.CONSULAR, recursoCodigo="VENT-99",
+                    rango=RangoFechaHora(inicio=self.base, fin=self.base + timedelta(hours=1)))
+        with self.assertRaises(CitaInvalidaError):
+            DjangoCitaRepository().reservar(cita)
+        with self.assertRaises(ServiceError):
+            CitaService(DjangoCitaRepository()).agendar_cita(CitaDTO(
+                id_cita="CITA-Y", solicitud_codigo="SOL-0000", tipo="CONSULAR",
+                inicio=self.base, fin=self.base + timedelta(hours=1), recurso_codigo="VENT-99",
+            ))
+        self.assertFalse(CitaModel.objects.exists())
+
+    def test_asignacion_reparte_la_ocupacion_entre_recursos(self):
+        self.recurso_repo.guardar(RecursoCita(codigo="VENT-01", capacidad=1))
+        self.recurso_repo.guardar(RecursoCita(codigo="VENT-02", capacidad=2))
+
+        asignados = [self._agendar(0, 1).recurso_codigo for _ in range(3)]
+
+        # VENT-02 empata en ocupación (0) con más capacidad libre; luego VENT-01 queda al 0%
+        self.assertEqual(asignados, ["VENT-02", "VENT-01", "VENT-02"])
+        with self.assertRaises(HorarioNoDisponibleError):
+            self._agendar(0.5, 1.5)
+
+    def test_huecos_solo_excluyen_tramos_con_todos_los_recursos_completos(self):
+        self.recurso_repo.guardar(RecursoCita(codigo="VENT-01", capacidad=1))
+        self.recurso_repo.guardar(RecursoCita(codigo="VENT-02", capacidad=2))
+        self._agendar(0, 2, "VENT-01")
+        self._agendar(0, 1, "VENT-02")
+        self._agendar(0.5, 1.5, "VENT-02")
+
+        with self.assertNumQueries(2):
+            huecos = self.service.buscar_huecos(
+                self.base, self.base + timedelta(hours=3), timedelta(minutes=15),
+                HorarioLaboral(apertura=time(0), cierre=time(23, 59), dias=range(7)),
+            )
+
+        self.assertEqual(
+            [(h.inicio - self.base, h.fin - self.base) for h in huecos],
+            [(timedelta(0), timedelta(minutes=30)), (timedelta(hours=1), timedelta(hours=3))],
+        )
+
+
+# ========================================
+# Servicios: reservas concurrentes de citas
+# ========================================
+class ReservaConcurrenteCitaTests(TransactionTestCase):
+
+    RESERVAS = 300
+    HILOS = 16
+
+    def setUp(self):
+        DjangoSolicitudMigratoriaRepository().guardar_muchos([_solicitud(0)])
+        self.base = timezone.now().replace(hour=8, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        self.recurso_repo = None
+
+    def _reservar(self, i: int, inicio_min: int, duracion_min: int, salida: Event) -> bool:
+        dto = CitaDTO(
+            id_cita=f"CITA-{i:04d}",
+            solicitud_codigo="SOL-0000",
+            tipo="CONSULAR",
+            inicio=self.base + timedelta(minutes=inicio_min),
+            fin=self.base + timedelta(minutes=inicio_min + duracion_min),
+        )
+        salida.wait()
+        try:
+            while True:
+                try:
+                    CitaService(DjangoCitaRepository(), recurso_repo=self.recurso_repo).agendar_cita(dto)
+                    return True
+                except HorarioNoDisponibleError:
+                    return False
+                except OperationalError as e:
+                    # La base en memoria compartida no espera al bloqueo: se reintenta
+                    if "locked" not in str(e):
+                        raise
+                    sleep(0.001)
+        finally:
+            connection.close()
+
+    def _lanzar(self) -> int:
+        """Lanza todas las reservas a la vez y retorna cuántas se aceptaron"""
+        azar = random.Random(2024)
+        # 300 intentos sobre 4 horas de agenda en bloques de 15 minutos: la mayoría chocan
+        intentos = [(i, azar.randrange(0, 240, 15), azar.choice([15, 30, 45, 60])) for i in range(self.RESERVAS)]
+        salida = Event()
+
+        with ThreadPoolExecutor(max_workers=self.HILOS) as pool:
+            futuros = [pool.submit(self._reservar, *a, salida) for a in intentos]
+            salida.set()
+            return sum(f.result() for f in futuros)
+
+    def test_reservas_concurrentes_sin_solapamientos(self):
+        aceptadas = self._lanzar()
+
+        citas = list(CitaModel.objects.order_by("inicio").values_list("inicio", "fin"))
+        self.assertEqual(len(citas), aceptadas)
+        self.assertGreater(len(citas), 0)
+        for (_, fin_anterior), (inicio, _) in zip(citas, citas[1:]):
+            self.assertLessEqual(fin_anterior, inicio)
+
+    def test_reservas_concurrentes_respetan_la_capacidad_de_cada_recurso(self):
+        self.recurso_repo = DjangoRecursoCitaRepository()
+        self.recurso_repo.guardar(RecursoCita(codigo="VENT-01", capacidad=1))
+        self.recurso_repo.guardar(RecursoCita(codigo="VENT-02", capacidad=2))
+
+        aceptadas = self._lanzar()
+
+        self.assertEqual(CitaModel.objects.count(), aceptadas)
+        for codigo, capacidad in (("VENT-01", 1), ("VENT-02", 2)):
+            rangos = [RangoFechaHora(inicio=i, fin=f)
+                      for i, f in CitaModel.objects.filter(recurso_id=codigo).values_list("inicio", "fin")]
+            self.assertGreater(len(rangos), 0)
+            self.assertEqual(max_simultaneos(rangos), capacidad)
+
+
+# ========================================
+# Migraciones: exclusión de solapamientos sobre citas existentes
+# ========================================
+class MigracionExclusionCitasTests(TestCase):
+    """La consulta es SQL portable: se prueba en SQLite aunque la exclusión sea de PostgreSQL"""
+
+    def test_lista_las_citas_activas_que_se_solapan(self):
+        migracion = import_module("SGPM.migrations.0007_reserva_citas_sin_solapamiento")
+        DjangoSolicitudMigratoriaRepository().guardar_muchos([_solicitud(0)])
+        base = timezone.now().replace(hour=8, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+        def cita(id_cita, desde, hasta, estado=EstadoCita.PROGRAMADA):
+            return Cita(idCita=id_cita, solicitudCodigo="SOL-0000", tipo=TipoCita.CONSULAR, estado=estado,
+                        rango=RangoFechaHora(inicio=base + timedelta(minutes=desde),
+                                             fin=base + timedelta(minutes=hasta)))
+
+        DjangoCitaRepository().guardar_muchos([
+            cita("C-A", 0, 60),
+            cita("C-B", 30, 90),
+            # Contigua a C-B: el rango es semiabierto
+            cita("C-C", 90, 120),
+            cita("C-D", 0, 60, EstadoCita.CANCELADA),
+        ])
+
+        pares = migracion.solapamientos_citas(connection)
+        self.assertEqual([(a, b) for a, _, _, b, _, _ in pares], [("C-A", "C-B")])
+        mensaje = migracion.mensaje_solapamientos(pares)
+        self.assertIn("1 par(es)", mensaje)
+        self.assertIn("C-A", mensaje)
+        self.assertNotIn("C-D", mensaje)
+
+
+# ========================================
+# Presentación: presupuesto de consultas por vista
+# ========================================
+class PresupuestoPeticionTests(TestCase):
+    """Las páginas y sus formularios se mantienen dentro de SGPM_PRESUPUESTOS_PETICION"""
+
+    PAGINAS = [
+        ("login", {}, {}),
+        ("dashboard", {}, {}),
+        ("solicitante", {}, {}),
+        ("actualizar", {}, {"cedula": "C0000"}),
+        ("consultar-expediente", {}, {"cedula": "C0000"}),
+        ("consultar-expediente", {}, {"codigo": "SOL-0000"}),
+        ("listado", {}, {}),
+        ("detalle", {}, {"codigo": "SOL-0000"}),
+        ("solicitud_documentos", {"codigo": "SOL-0000"}, {}),
+        ("citas_crear", {}, {}),
+        ("citas_huecos", {}, {}),
+        ("tareas_listar", {}, {}),
+        ("tareas_editar", {"tarea_id": "T-0000"}, {}),
+        ("tareas_reportes", {}, {}),
+        ("notificaciones_bandeja", {}, {}),
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.inicio = (timezone.now() + timedelta(days=1)).replace(hour=8, minute=0, second=0, microsecond=0)
+        self.creadas = 0
+        sesion = self.client.session
+        sesion["asesor_email"] = "asesor0@sgpm.com"
+        sesion["asesor_rol"] = "SUPERVISOR"
+        sesion.save()
+
+    def _crear_datos(self, hasta: int):
+        filas = range(self.creadas, hasta)
+        asesores = DjangoAsesorRepository().guardar_muchos([_asesor(i) for i in filas])
+        DjangoSolicitudMigratoriaRepository().guardar_muchos([_solicitud(i, a) for i, a in zip(filas, asesores)])
+        DjangoTareaRepository().guardar_muchos([_tarea(i, a) for i, a in zip(filas, asesores)])
+        DjangoCitaRepository().guardar_muchos([
+            Cita(idCita=f"C-{i}", solicitudCodigo=f"SOL-{i:04d}", tipo=TipoCita.CONSULAR,
+                 rango=RangoFechaHora(inicio=self.inicio + timedelta(minutes=15 * i),
+                                      fin=self.inicio + timedelta(minutes=15 * i + 15)))
+            for i in filas
+        ])
+        documentos = DjangoDocumentoRepository()
+        notificaciones = NotificacionService(DjangoNotificacionRepository())
+        for i in filas:
+            documentos.guardar(Documento(f"DOC-{i}", TipoDocumento.PASAPORTE, EstadoDocumento.RECIBIDO), "SOL-0000")
+            notificaciones.crear_notificacion("asesor0@sgpm.com", "RECORDATORIO", f"mensaje {i}")
+        self.creadas = hasta
+
+    def _medir_paginas(self):
+        consultas = {}
+        for nombre, kwargs, parametros in self.PAGINAS:
+            respuesta = self.client.get(reverse(nombre, kwargs=kwargs), parametros)
+            self.assertLess(respuesta.status_code, 400, nombre)
+            consultas[(nombre, tuple(parametros))] = respuesta.wsgi_request.medicion_peticion.consultas
+        consultas[("citas_listar", ())] = self.client.get(
+            reverse("citas_listar"), {"fecha": timezone.localdate(self.inicio).isoformat()}
+        ).wsgi_request.medicion_peticion.consultas
+        return consultas
+
+    def test_paginas_dentro_del_presupuesto_y_sin_n_mas_1(self):
+        self._crear_datos(3)
+        con_pocas = self._medir_paginas()
+        self._crear_datos(30)
+        con_muchas = self._medir_paginas()
+
+        for (nombre, parametros), consultas in con_muchas.items():
+            with self.subTest(pagina=nombre, parametros=parametros):
+                self.assertLessEqual(consultas, presupuesto_peticion(nombre, "GET").consultas)
+                self.assertEqual(consultas, con_pocas[(nombre, parametros)])
+
+    def _formularios(self):
+        """POST habituales de cada formulario: (nombre de URL, kwargs, datos)"""
+        inicio = timezone.localtime(self.inicio + timedelta(days=2))
+        return [
+            ("registro", {}, {"cedula": "N0001", "nombres": "Ana", "apellidos": "Paz",
+                              "correo": "ana@correo.com", "telefono": "0999"}),
+            ("actualizar", {}, {"cedula": "C0000", "correo": "c0@correo.com", "telefono": "0988",
+                                "direccion": "Calle 1"}),
+            ("solicitud_registro", {}, {"codigo": "SOL-9000", "tipo_servicio": "VISA_TURISMO",
+                                        "solicitante_cedula": "C0001"}),
+            ("cambio-estado", {}, {"accion": "elegibles", "nuevo_estado": "ENVIADA"}),
+            ("cambio-estado", {}, {"codigos": "SOL-0001 SOL-0002", "nuevo_estado": "ENVIADA"}),
+            ("citas_crear", {}, {"solicitud_id": "SOL-0001", "tipo": "CONSULAR",
+                                 "inicio": inicio.strftime("%Y-%m-%dT%H:%M"),
+                                 "fin": (inicio + timedelta(minutes=30)).strftime("%Y-%m-%dT%H:%M")}),
+            ("citas_cancelar", {"cita_id": "C-1"}, {}),
+            ("tareas_crear", {}, {"titulo": "Nueva", "prioridad": "ALTA",
+                                  "vencimiento": inicio.strftime("%Y-%m-%dT%H:%M"),
+                                  "asesor_email": "asesor1@sgpm.com"}),
+            ("tareas_editar", {"tarea_id": "T-0000"}, {"titulo": "Editada", "prioridad": "ALTA",
+                                                       "estado": "EN_PROGRESO", "comentario": "revisada"}),
+            ("tareas_editar", {"tarea_id": "T-0001"}, {"titulo": "Editada", "prioridad": "ALTA",
+                                                       "estado": "EN_PROGRESO", "comentario": "reasignada",
+                                                       "vencimiento": inicio.strftime("%Y-%m-%dT%H:%M"),
+                                                       "asesor_email": "asesor2@sgpm.com"}),
+            ("tareas_eliminar", {"tarea_id": "T-0002"}, {}),
+            ("notificaciones_leer_todas", {}, {}),
+        ]
+
+    def test_formularios_dentro_del_presupuesto_de_post(self):
+        self._crear_datos(30)
+
+        for nombre, kwargs, datos in self._formularios():
+            with self.subTest(formulario=nombre, datos=datos):
+                respuesta = self.client.post(reverse(nombre, kwargs=kwargs), datos)
+                self.assertLess(respuesta.status_code, 400)
+                errores = [str(m) for m in get_messages(respuesta.wsgi_request) if m.level == messages.ERROR]
+                self.assertEqual(errores, [])
+                self.assertLessEqual(respuesta.wsgi_request.medicion_peticion.consultas,
+                                     presupuesto_peticion(nombre, "POST").consultas)
+
+    def test_presupuesto_por_metodo(self):
+        presupuestos = {
+            "*": {"GET": {"consultas": 10, "ms": 500}, "POST": {"consultas": 20, "ms": 1000}},
+            "tareas_editar": {"GET": {"consultas": 4, "ms": 300}, "POST": {"consultas": 40, "ms": 1000}},
+            "tareas_listar": {"GET": {"consultas": 3, "ms": 300}},
+            "login": {"consultas": 5, "ms": 200},
+        }
+        with self.settings(SGPM_PRESUPUESTOS_PETICION=presupuestos):
+            self.assertEqual(presupuesto_peticion("tareas_editar", "GET"), Presupuesto(4, 300))
+            self.assertEqual(presupuesto_peticion("tareas_editar", "post"), Presupuesto(40, 1000))
+            self.assertEqual(presupuesto_peticion("tareas_editar", "HEAD"), Presupuesto(4, 300))
+            # Sin el método en la entrada de la URL se usa el de '*'
+            self.assertEqual(presupuesto_peticion("tareas_listar", "POST"), Presupuesto(20, 1000))
+            self.assertEqual(presupuesto_peticion("login", "POST"), Presupuesto(5, 200))
+            self.assertEqual(presupuesto_peticion(None, "GET"), Presupuesto(10, 500))
+            self.assertEqual(presupuesto_peticion(None, "DELETE"), Presupuesto(20, 1000))
+
+    def test_peticion_fuera_de_presupuesto_registra_las_huellas(self):
+        self._crear_datos(3)
+        presupuestos = {"tareas_listar": {"consultas": 0, "ms": 10_000}}
+        with self.settings(SGPM_PRESUPUESTOS_PETICION=presupuestos), \
+                self.assertLogs("SGPM.presentation.middleware", "WARNING") as registro:
+            self.client.get(reverse("tareas_listar"))
+
+        [mensaje] = registro.output
+        self.assertIn("tareas_listar", mensaje)
+        self.assertIn('FROM "tarea"', mensaje)
+        self.assertNotIn("asesor0@sgpm.com", mensaje)
+
+    def test_huella_sin_valores(self):
+        self.assertEqual(
+            huella_sql("SELECT  *\n FROM \"tarea\" WHERE \"id\" IN (%s, %s, %s) AND \"titulo\" = 'x''y' LIMIT 21"),
+            huella_sql("SELECT * FROM \"tarea\" WHERE \"id\" IN (%s) AND \"titulo\" = 'z' LIMIT 5"),
+        )
+        self.assertEqual(
+            huella_sql('INSERT INTO "tarea" ("id", "titulo") VALUES (%s, %s), (%s, %s)'),
+            'INSERT INTO "tarea" ("id", "titulo") VALUES (...)',
+        )
+        self.assertEqual(huella_sql('SAVEPOINT "s1403_x12"'), "SAVEPOINT ?")
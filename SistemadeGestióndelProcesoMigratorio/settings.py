@@ -42,12 +42,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'SGPM.presentation.middleware.PresupuestoPeticionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'SGPM.presentation.middleware.UnidadDeTrabajoMiddleware',
 ]
 
 ROOT_URLCONF = 'SistemadeGestióndelProcesoMigratorio.urls'
@@ -63,6 +65,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'SGPM.presentation.context_processors.notificaciones',
             ],
         },
     },
@@ -82,6 +85,70 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# Guarda, entre otros, el contador de notificaciones no leídas de cada asesor.
+# LocMemCache es por proceso: con varios workers usar un backend compartido
+# (Redis/Memcached) para que la invalidación llegue a todos.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sgpm',
+    }
+}
+
+# Segundos que las vistas guardan en caché las entidades buscadas por clave
+# (solicitud por código, solicitante por cédula, asesor por email); ver
+# SGPM.infrastructure.cache_repositorios. 0 desactiva la caché.
+SGPM_REPOSITORIOS_CACHE_TTL = 60
+
+# Presupuesto por petición según el nombre de URL (SGPM/presentation/urls.py)
+# y el método: consultas SQL y milisegundos de principio a fin. Las peticiones
+# que lo superan se registran con las huellas de su SQL; ver
+# SGPM.presentation.middleware.PresupuestoPeticionMiddleware. '*' vale para
+# las URL o los métodos sin entrada. Un POST escribe y vuelve a leer (las
+# estadísticas de tareas, el bloqueo de agenda de las citas), por eso lleva
+# su propio presupuesto. Los tests comprueban las consultas de estas páginas.
+SGPM_PRESUPUESTOS_PETICION = {
+    '*': {
+        'GET': {'consultas': 10, 'ms': 500},
+        'POST': {'consultas': 20, 'ms': 1000},
+    },
+    'login': {'GET': {'consultas': 3, 'ms': 300}},
+    'dashboard': {'GET': {'consultas': 3, 'ms': 300}},
+    'solicitante': {'GET': {'consultas': 3, 'ms': 300}},
+    'registro': {'POST': {'consultas': 10, 'ms': 500}},
+    'actualizar': {
+        'GET': {'consultas': 4, 'ms': 300},
+        'POST': {'consultas': 10, 'ms': 500},
+    },
+    'consultar-expediente': {'GET': {'consultas': 8, 'ms': 500}},
+    'solicitud_registro': {'POST': {'consultas': 12, 'ms': 500}},
+    'listado': {'GET': {'consultas': 3, 'ms': 300}},
+    'detalle': {'GET': {'consultas': 8, 'ms': 500}},
+    'cambio-estado': {'POST': {'consultas': 12, 'ms': 1000}},
+    'solicitud_documentos': {'GET': {'consultas': 3, 'ms': 300}},
+    'citas_listar': {'GET': {'consultas': 3, 'ms': 300}},
+    'citas_crear': {
+        'GET': {'consultas': 4, 'ms': 300},
+        'POST': {'consultas': 16, 'ms': 1000},
+    },
+    'citas_huecos': {'GET': {'consultas': 4, 'ms': 500}},
+    'citas_cancelar': {'POST': {'consultas': 10, 'ms': 500}},
+    'tareas_listar': {'GET': {'consultas': 3, 'ms': 300}},
+    'tareas_crear': {'POST': {'consultas': 40, 'ms': 1000}},
+    'tareas_editar': {
+        'GET': {'consultas': 4, 'ms': 300},
+        'POST': {'consultas': 40, 'ms': 1000},
+    },
+    'tareas_eliminar': {'POST': {'consultas': 16, 'ms': 1000}},
+    'tareas_reportes': {'GET': {'consultas': 4, 'ms': 500}},
+    'notificaciones_bandeja': {'GET': {'consultas': 3, 'ms': 300}},
+    'notificaciones_leer_todas': {'POST': {'consultas': 4, 'ms': 300}},
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 